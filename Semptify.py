@@ -12,48 +12,29 @@ from datetime import datetime, timedelta
 from services.storage_enforcer import enforce_storage_requirement
 enforce_storage_requirement(strict=False)  # Warn in dev, block in prod (RENDER/PRODUCTION env)
 # ============================================================================
+from werkzeug.middleware.proxy_fix import ProxyFix
 from flask import Flask, render_template, request, jsonify, redirect, url_for, g, session, send_file, Response
-from security import _get_or_create_csrf_token, _load_json, ADMIN_FILE, incr_metric, validate_admin_token, validate_user_token, _hash_token, check_rate_limit, is_breakglass_active, consume_breakglass, log_event, record_request_latency, _require_admin_or_401, _atomic_write_json
-from engines.prime_learning_engine import create_seed_data
-import hashlib
-import requests
-from user_database import (
-    create_pending_user, verify_code, get_pending_user, get_user,
-    resend_verification_code, mask_contact, update_user_login, log_user_interaction,
-    check_existing_user, generate_verification_code, hash_code)
-from user_database import _get_db as get_user_db
-from learning_adapter import generate_dashboard_for_user, LearningAdapter
-from preliminary_learning_routes import learning_module_bp
-from engines.ledger_calendar_engine import init_ledger_calendar
-from ledger_calendar_routes import ledger_calendar_bp
-from engines.data_flow_engine import init_data_flow
-from data_flow_routes import data_flow_bp
-from ledger_tracking_routes import ledger_tracking_bp
-from ledger_admin_routes import ledger_admin_bp
-from av_routes import av_routes_bp
-from engines.learning_engine import init_learning
-from learning_routes import learning_bp
-from adaptive_registration import (
-    register_user_adaptive,
-    report_issue_adaptive,
-    report_outcome_adaptive,
-    contribute_resource_adaptive)
-# Cards catalog model
-try:
-    from cards_model import get_cards_grouped, get_cards, init_cards_tables, seed_default_cards, seed_expanded_cards
-except Exception:
-    get_cards_grouped = None
-    get_cards = None
-    def init_cards_tables():
-        pass
-    def seed_default_cards():
-        pass
-    def seed_expanded_cards():
-        pass
+from security import _get_or_create_csrf_token, _load_json, ADMIN_FILE, incr_metric, validate_admin_token, validate_user_token, _hash_token, check_rate_limit, rate_limited, is_breakglass_active, consume_breakglass, log_event, record_request_latency, install_request_metrics, _require_admin_or_401, _atomic_write_json
+from profiling import install_request_tracing
+from lazy_blueprints import register_blueprints
+from startup import add_startup_task, ensure_startup
+from static_assets import init_static_assets
+from templating import install_bytecode_cache, install_render_timing, warm_templates
+# Feature modules (user_database, cards_model, engines.*, route modules) are
+# no longer imported here: their blueprints load on first request and their
+# I/O runs in the startup phase below.
 # Route Discovery & Dynamic Data Source Integration
 # Route Discovery & Dynamic Data Source Integration\ntry:\n    from route_discovery_routes import route_discovery_bp, init_route_discovery_api\nexcept ImportError:\n    route_discovery_bp = None\n    init_route_discovery_api = None\n\n
 
 app = Flask(__name__)
+# Render (and most hosts) put one proxy in front of the app; without this
+# every client shares the proxy's address and its rate limit bucket.
+# Set TRUSTED_PROXY_HOPS=0 when serving directly.
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "1"))
+if TRUSTED_PROXY_HOPS:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_HOPS, x_proto=TRUSTED_PROXY_HOPS)
+install_request_metrics(app)  # requests_total + per-endpoint latency histograms
+install_request_tracing(app)  # nested spans per request -> /admin/status
 
 
 def _build_evidence_prompt(prompt: str, location: str, timestamp: str, form_type: str, form_data: dict) -> str:
@@ -90,9 +71,11 @@ app.config['SESSION_COOKIE_HTTPONLY'] = True
 app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
 app.config['PERMANENT_SESSION_LIFETIME'] = 7 * 24 * 60 * 60  # 7 days (604800 seconds)
 
-# Dev: make changes show immediately
-app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0
-app.config['TEMPLATES_AUTO_RELOAD'] = True
+# Fingerprinted static URLs + immutable caching in production; template
+# auto-reload and uncached static files only in dev (static_assets.py)
+init_static_assets(app)
+install_bytecode_cache(app)  # compiled templates shared across workers/restarts
+install_render_timing(app)  # per-template context/render split -> /admin/status
 
 # Register blueprints
 try:
@@ -102,27 +85,16 @@ except NameError:
     print('[WARN] Dashboard API not available')
 
 
-try:
-    from register import register_bp
-    app.register_blueprint(register_bp)
-    print('[OK] Registration blueprint registered')
-except ImportError as e:
-    print(f'[WARN] Registration blueprint not available: {e}')
-
-try:
-    from vault import vault_bp
-    app.register_blueprint(vault_bp)
-    print('[OK] Vault blueprint registered')
-except ImportError as e:
-    print(f'[WARN] Vault blueprint not available: {e}')
-
-
 # ============================================================================
-# BLUEPRINT REGISTRATION - Auto-discover and register available blueprints
+# BLUEPRINT REGISTRATION - Lazily, from blueprint_manifest.json
 # ============================================================================
+# Regenerate the manifest after adding or changing routes:
+#   python scripts/build_blueprint_manifest.py
 
-# Core Features
 blueprints_to_register = [
+    ('register', 'register_bp'),
+    ('vault', 'vault_bp'),
+
     ('calendar_api', 'calendar_api_bp'),
     ('calendar_hub_routes', 'calendar_hub_bp'),
     ('calendar_master', 'calendar_master_bp'),
@@ -160,36 +132,79 @@ blueprints_to_register = [
     ('feature_admin_routes', 'feature_admin_bp'),
     ('doc_explorer_routes', 'doc_explorer_bp'),
     ('route_discovery_routes', 'route_discovery_bp'),
+
+    # Context Data System™ APIs
+    ('complaint_context_api', 'complaint_context_api_bp'),
+    ('context_api_routes', 'context_api_bp'),
 ]
 
-for module_name, bp_name in blueprints_to_register:
-    try:
-        module = __import__(module_name, fromlist=[bp_name])
-        bp = getattr(module, bp_name)
-        app.register_blueprint(bp)
-        print(f'[OK] {bp_name} registered')
-    except (ImportError, AttributeError) as e:
-        print(f'[SKIP] {bp_name}: {e}')
+register_blueprints(app, blueprints_to_register)
 
 
-# Add more blueprint registrations here...
+# ============================================================================
+# STARTUP PHASE - I/O that used to run at import time, in parallel
+# ============================================================================
 
+def _init_user_database():
+    from user_database import init_user_database
+    init_user_database()  # R2 restore, then schema
 
 
-# Complaint Context API - Auto-fill complaints using Context System
-try:
-    from complaint_context_api import complaint_context_api_bp
-    app.register_blueprint(complaint_context_api_bp)
-    print("[OK] Complaint Context API registered (/api/complaint/*)")
-except ImportError as e:
-    print(f"[WARN] Complaint Context API not available: {e}")
-# Context API - Context Data System™ access
-try:
-    from context_api_routes import context_api_bp
-    app.register_blueprint(context_api_bp)
-    print("[OK] Context API registered (/api/context/*)")
-except ImportError as e:
-    print(f"[WARN] Context API not available: {e}")
+def _init_cards():
+    from cards_model import ensure_cards_tables
+    ensure_cards_tables()
+
+
+def _init_ledger_calendar():
+    from engines.ledger_calendar_engine import get_ledger
+    get_ledger()
+
+
+def _init_data_flow():
+    from engines.data_flow_engine import get_data_flow
+    get_data_flow()
+
+
+def _init_learning():
+    from engines.learning_engine import get_learning
+    get_learning()
+
+
+def _warm_jurisdiction():
+    from engines.jurisdiction_engine import get_jurisdiction_engine
+    get_jurisdiction_engine()
+
+
+def _warm_admin_overview():
+    from services.admin_control_service import warm_admin_overview
+    warm_admin_overview()
+
+
+def _warm_templates():
+    warm_templates(app)
+
+
+def _preload_blueprints():
+    from lazy_blueprints import load_all
+    load_all(app)
+
+
+add_startup_task("user_database", _init_user_database)
+add_startup_task("cards", _init_cards, requires=["user_database"])
+add_startup_task("ledger_calendar", _init_ledger_calendar)
+add_startup_task("data_flow", _init_data_flow, requires=["ledger_calendar"])
+add_startup_task("learning", _init_learning)
+# Cache warm-ups: useful, but the app can serve before they finish
+add_startup_task("jurisdiction", _warm_jurisdiction, required=False)
+add_startup_task("templates", _warm_templates, required=False)
+add_startup_task("admin_overview", _warm_admin_overview, requires=["user_database"], required=False)
+if os.getenv("SEMPTIFY_PRELOAD_BLUEPRINTS", "0") == "1":
+    add_startup_task("blueprints", _preload_blueprints, requires=["user_database"], required=False)
+
+# Entry points start the startup phase before serving; this covers
+# everything else (flask run, tests) on the first request, and holds
+# non-probe requests until a background startup phase has finished.
+app.before_request(ensure_startup)
 
 if __name__ == '__main__':
     app.run(debug=True)
@@ -215,7 +230,28 @@ def admin_status():
     if not _require_admin_or_401():
         return jsonify({"error": "Unauthorized"}), 401
     from security import get_metrics
-    return jsonify({"status": "ok", "metrics": get_metrics()})
+    from profiling import recent_traces
+    from startup import readiness
+    from templating import template_report
+    limit = request.args.get('traces', 20, type=int)
+    return jsonify({"status": "ok", "metrics": get_metrics(), "startup": readiness(),
+                    "templates": template_report(), "recent_traces": recent_traces(limit)})
+
+
+@app.route('/admin/profile', methods=['GET', 'POST'])
+def admin_profile():
+    """Sample all worker threads for a window; returns collapsed stacks for flamegraphs."""
+    if not _require_admin_or_401():
+        return jsonify({"error": "Unauthorized"}), 401
+    from profiling import profile_for
+    seconds = request.args.get('seconds', 10, type=float)
+    hz = request.args.get('hz', 100, type=int)
+    profiler = profile_for(seconds, hz)
+    if profiler is None:
+        return jsonify({"error": "A profile is already running"}), 409
+    log_event("profile_captured", {"seconds": seconds, "hz": profiler.hz, "samples": profiler.sample_count})
+    return Response(profiler.collapsed(), mimetype="text/plain",
+                    headers={"Content-Disposition": "attachment; filename=profile.collapsed"})
 
 @app.route('/register')
 
@@ -245,25 +281,20 @@ def health():
 
 @app.route('/metrics')
 def metrics():
-    from security import get_metrics
+    from security import get_metrics, get_latency_stats, render_prometheus
     format_type = request.args.get("format", "json")
     accept = request.headers.get("Accept", "")
     if "text/plain" in accept or format_type == "prometheus":
-        # Return Prometheus format
-        metrics_data = get_metrics()
-        output = []
-        for key, value in metrics_data.items():
-            if isinstance(value, (int, float)):
-                output.append(f"{key} {value}")
-        return Response("\n".join(output), mimetype="text/plain; charset=utf-8")
+        # Prometheus text exposition format
+        return Response(render_prometheus(), mimetype="text/plain")
     metrics = get_metrics()
-    from security import get_latency_stats
     metrics['latency_stats'] = get_latency_stats()
+    from response_cache import cache_stats
+    metrics['response_cache'] = cache_stats()
+    from templating import template_report
+    metrics['templates'] = template_report()
     return jsonify(metrics)
 
-@app.route('/readyz')
-
-
 # ============================================================================
 # MISSING ROUTES - Stubs for incomplete features
 # ============================================================================
@@ -316,6 +347,7 @@ def witness_statement_save():
     return jsonify({"status": "saved"}), 200
 
 @app.route('/api/evidence-copilot', methods=['POST'])
+@rate_limited('ai', 10)
 def evidence_copilot():
     '''AI evidence collection guidance'''
     # Check CSRF in enforced mode
@@ -331,7 +363,10 @@ def resource_download(filename):
     return jsonify({"error": "not found"}), 404
 @app.route('/readyz')
 def readyz():
-    return jsonify({'status': 'ready'})
+    '''Readiness probe: 503 until every required startup task has succeeded'''
+    from startup import readiness
+    state = readiness()
+    return jsonify(state), 200 if state['status'] == 'ready' else 503
 
 # Add more routes as needed...
 
@@ -303,7 +303,6 @@ def control_panel():
                 'ai_provider': os.environ.get('AI_PROVIDER', 'openai'),
                 'admin_tokens': 0,
                 'total_users': 0,
-                'timeline_events': 0,
             },
             'panels': [],
             'recent_events': [],
@@ -8,6 +8,7 @@ import json
 import os
 from datetime import datetime
 from user_database import _get_db
+from services.admin_stats_service import record_user_created
 
 admin_panel_bp = Blueprint('admin_panel', __name__, url_prefix='/admin/panel')
 
@@ -188,6 +189,7 @@ def create_user_manual():
         )
         db.commit()
         user_id = cursor.lastrowid
+        record_user_created()
         
         return jsonify({'success': True, 'user_id': user_id, 'message': f'User created: {email}'})
     except Exception as e:
@@ -4,6 +4,8 @@ AI Development Assistant - GitHub Copilot integration for building new features
 from flask import Blueprint, render_template, request, jsonify
 from local_ai_config import ollama_chat, ollama_generate
 import json
+from llm_client import sse_response, wants_stream
+from security import rate_limited
 
 ai_dev_bp = Blueprint("ai_dev", __name__, url_prefix="/gui")
 
@@ -13,6 +15,7 @@ def ai_development_ui():
     return render_template("ai_dev_assistant.html")
 
 @ai_dev_bp.route("/ai-dev/generate", methods=["POST"])
+@rate_limited("ai", 10)
 def generate_feature():
     """Generate code for new feature using AI"""
     data = request.get_json()
@@ -51,8 +54,9 @@ Format as JSON with keys: blueprint_code, engine_code, template_code, registrati
         return jsonify({"success": False, "error": result.get("error")}), 500
 
 @ai_dev_bp.route("/ai-dev/chat", methods=["POST"])
+@rate_limited("ai", 10)
 def ai_chat():
-    """Chat with AI about development"""
+    """Chat with AI about development (SSE with Accept: text/event-stream)"""
     data = request.get_json()
     messages = data.get("messages", [])
     
@@ -73,6 +77,8 @@ Tech stack: Flask, SQLite, Jinja2, Waitress, Ollama, boto3 (R2)
     }
     
     full_messages = [system_message] + messages
+    if wants_stream(request):
+        return sse_response(ollama_chat(full_messages, max_tokens=2000, stream=True))
     result = ollama_chat(full_messages, max_tokens=2000)
     
     if result.get("success"):
@@ -81,6 +87,7 @@ Tech stack: Flask, SQLite, Jinja2, Waitress, Ollama, boto3 (R2)
         return jsonify({"success": False, "error": result.get("error")}), 500
 
 @ai_dev_bp.route("/ai-dev/analyze-code", methods=["POST"])
+@rate_limited("ai", 10)
 def analyze_code():
     """Analyze existing code and suggest improvements"""
     data = request.get_json()
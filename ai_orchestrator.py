@@ -5,9 +5,12 @@ If configured providers (Ollama/OpenAI) are available it will call them, otherwi
 """
 import os
 import json
+import threading
 import time
 from typing import List, Dict, Any
 
+from deadline_calls import DeadlineCalls
+
 # Try to import existing provider helpers if available
 try:
     from copilot_routes import generate_response as copilot_generate
@@ -19,6 +22,12 @@ try:
 except Exception:
     requests = None
 
+ORCHESTRATOR_MODE = os.getenv("ORCHESTRATOR_MODE", "sequential")
+ORCHESTRATOR_WORKERS = int(os.getenv("ORCHESTRATOR_WORKERS", "4"))
+# Token budget for the prompt each agent sees (base prompt + prior replies)
+ORCHESTRATOR_CONTEXT_TOKENS = int(os.getenv("ORCHESTRATOR_CONTEXT_TOKENS", "2000"))
+ORCHESTRATOR_AGENT_TIMEOUT = float(os.getenv("ORCHESTRATOR_AGENT_TIMEOUT", "60"))
+
 
 def _simulate_response(agent_name: str, prompt: str, context: Dict[str, Any]) -> str:
     # Short deterministic simulation to allow local testing
@@ -26,53 +35,161 @@ def _simulate_response(agent_name: str, prompt: str, context: Dict[str, Any]) ->
 
 
 class Agent:
-    def __init__(self, id: str, role: str, description: str, provider: str = 'local'):
+    def __init__(self, id: str, role: str, description: str, provider: str = 'local',
+                 depends_on: List[str] = None, timeout: float = None):
         self.id = id
         self.role = role
         self.description = description
         self.provider = provider
+        self.depends_on = list(depends_on or [])
+        self.timeout = timeout
 
     def to_dict(self):
-        return {"id": self.id, "role": self.role, "description": self.description, "provider": self.provider}
+        return {"id": self.id, "role": self.role, "description": self.description, "provider": self.provider,
+                "depends_on": self.depends_on, "timeout": self.timeout}
+
+
+def _call_agent(a: Agent, prompt: str, context: Dict[str, Any]) -> str:
+    if a.provider == 'copilot' and copilot_generate:
+        try:
+            return copilot_generate(prompt, context)
+        except Exception as e:
+            return f"[error calling copilot] {e}"
+    elif a.provider in ('openai','ollama') and requests:
+        # Keep this lightweight — don't implement full provider calls here
+        return _simulate_response(a.role, prompt, context)
+    return _simulate_response(a.role, prompt, context)
+
+
+def _estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English text
+    return len(text) // 4 + 1
+
+
+def budget_context(prompt: str, replies: List[tuple], budget_tokens: int = ORCHESTRATOR_CONTEXT_TOKENS) -> str:
+    """Base prompt plus "<role> says: <reply>" lines, truncated to a token budget.
+
+    Replies share what is left after the prompt: short replies are kept
+    whole and the longest ones are cut (marked with "[...]").
+    """
+    lines = [(f"{role} says: ", reply or "") for role, reply in replies]
+    available = max(0, budget_tokens * 4 - len(prompt) - sum(len(label) + 2 for label, _ in lines))
+    limits = {}
+    remaining = available
+    order = sorted(range(len(lines)), key=lambda i: len(lines[i][1]))
+    for n, i in enumerate(order):
+        share = remaining // (len(order) - n)
+        limits[i] = min(len(lines[i][1]), share)
+        remaining -= limits[i]
+    parts = [prompt]
+    for i, (label, reply) in enumerate(lines):
+        text = reply if limits[i] >= len(reply) else reply[:max(0, limits[i] - 6)].rstrip() + " [...]"
+        parts.append(f"{label}{text}")
+    return "\n\n".join(parts)
 
 
 class Orchestrator:
-    def __init__(self, agents: List[Agent]):
+    """Runs a round of agents.
+
+    mode="sequential" (the default) calls agents one after another, each
+    seeing every earlier reply. mode="concurrent" runs up to max_workers
+    agents at once; an agent only waits for (and sees the replies of) the agents in
+    its depends_on. Either way the context is kept to a token budget, an
+    agent that exceeds its timeout is recorded as "timeout" without failing
+    the round, and the timeline records queue vs. execution time per agent.
+    """
+
+    def __init__(self, agents: List[Agent], mode: str = None, max_workers: int = ORCHESTRATOR_WORKERS,
+                 context_tokens: int = ORCHESTRATOR_CONTEXT_TOKENS, agent_timeout: float = ORCHESTRATOR_AGENT_TIMEOUT,
+                 call=None):
         self.agents = agents
-
-    def run_round(self, prompt: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
+        self.mode = mode or ORCHESTRATOR_MODE
+        self.max_workers = max_workers
+        # Shared by every round, so agents stuck past their timeout count
+        # toward max_workers instead of piling up threads
+        self._slots = threading.BoundedSemaphore(max(1, max_workers))
+        self.context_tokens = context_tokens
+        self.agent_timeout = agent_timeout
+        self.call = call or _call_agent
+
+    def _dependencies(self, mode: str) -> Dict[str, List[str]]:
+        if mode == "sequential":
+            return {a.id: [b.id for b in self.agents[:i]] for i, a in enumerate(self.agents)}
+        return {a.id: list(a.depends_on) for a in self.agents}
+
+    def run_round(self, prompt: str, context: Dict[str, Any] = None, mode: str = None) -> Dict[str, Any]:
         context = context or {}
-        timeline = []
-
-        # Feed the prompt to each agent sequentially and collect replies
-        for a in self.agents:
-            start = time.time()
-            reply = None
-            if a.provider == 'copilot' and copilot_generate:
-                try:
-                    reply = copilot_generate(prompt, context)
-                except Exception as e:
-                    reply = f"[error calling copilot] {e}"
-            elif a.provider in ('openai','ollama') and requests:
-                # Keep this lightweight — don't implement full provider calls here
-                reply = _simulate_response(a.role, prompt, context)
+        mode = mode or self.mode
+        if mode not in ("sequential", "concurrent"):
+            raise ValueError(f"Unknown orchestrator mode: {mode}")
+        deps = self._dependencies(mode)
+        by_id = {a.id: a for a in self.agents}
+        entries = {a.id: {"agent_id": a.id, "role": a.role, "provider": a.provider, "depends_on": deps[a.id],
+                          "status": "pending", "request": None, "response": None,
+                          "queue_ms": None, "exec_ms": None, "ms": None} for a in self.agents}
+        round_start = time.perf_counter()
+        marks = {}  # agent id -> {"ready": t, "start": t}
+
+        def run(a: Agent, agent_prompt: str):
+            marks[a.id]["start"] = time.perf_counter()
+            return self.call(a, agent_prompt, context)
+
+        def finished(agent_id: str, status: str, response=None):
+            now = time.perf_counter()
+            entry, mark = entries[agent_id], marks[agent_id]
+            start = mark.get("start", now)
+            entry.update(status=status, response=response,
+                         queue_ms=round((start - mark["ready"]) * 1000),
+                         exec_ms=round((now - start) * 1000),
+                         started_at_ms=round((start - round_start) * 1000),
+                         finished_at_ms=round((now - round_start) * 1000))
+            entry["ms"] = entry["exec_ms"]
+
+        pending = [a.id for a in self.agents]
+        # Sequential rounds run one agent at a time through their dependencies;
+        # the spare slots let the next agent start while a timed-out one is
+        # still stuck on its thread
+        calls = DeadlineCalls(name="orchestrator", slots=self._slots)
+        while pending or calls:
+            for agent_id in list(pending):
+                unknown = [d for d in deps[agent_id] if d not in entries]
+                if unknown:
+                    marks[agent_id] = {"ready": time.perf_counter()}
+                    finished(agent_id, "skipped", f"[unknown dependency {', '.join(unknown)}]")
+                elif all(entries[d]["status"] not in ("pending", "running") for d in deps[agent_id]):
+                    # Replies of failed or timed-out dependencies are simply left out
+                    replies = [(entries[d]["role"], entries[d]["response"]) for d in deps[agent_id]
+                               if entries[d]["status"] == "ok"]
+                    agent_prompt = budget_context(prompt, replies, self.context_tokens)
+                    entries[agent_id].update(status="running", request=agent_prompt)
+                    marks[agent_id] = {"ready": time.perf_counter()}
+                    calls.submit(agent_id, run, by_id[agent_id], agent_prompt,
+                                 timeout=by_id[agent_id].timeout or self.agent_timeout)
+                else:
+                    continue
+                pending.remove(agent_id)
+
+            if not calls:
+                for agent_id in pending:
+                    marks[agent_id] = {"ready": time.perf_counter()}
+                    finished(agent_id, "skipped", "[dependency cycle]")
+                break
+
+            # A timed-out call is abandoned on its thread; the round moves on
+            agent_id, status, value = calls.next()
+            if status == "error":
+                finished(agent_id, "error", f"[error calling {by_id[agent_id].provider}] {value}")
             else:
-                reply = _simulate_response(a.role, prompt, context)
-
-            duration = round((time.time() - start) * 1000)
-            timeline.append({
-                "agent_id": a.id,
-                "role": a.role,
-                "provider": a.provider,
-                "request": prompt,
-                "response": reply,
-                "ms": duration
-            })
-
-            # Prepare the next prompt: include previous response in context
-            prompt = f"{prompt}\n\n{a.role} says: {reply}"
+                finished(agent_id, status, value)
 
-        return {"timeline": timeline, "final_prompt": prompt}
+        timeline = [entries[a.id] for a in self.agents]
+        replies = [(e["role"], e["response"]) for e in timeline if e["status"] == "ok"]
+        return {
+            "mode": mode,
+            "timeline": timeline,
+            "final_prompt": budget_context(prompt, replies, self.context_tokens),
+            "total_ms": round((time.perf_counter() - round_start) * 1000),
+        }
 
 
 # Convenience helper to load agents from a file
@@ -81,7 +198,8 @@ def load_agents_from_file(path: str):
         return []
     with open(path, 'r', encoding='utf-8') as f:
         data = json.load(f)
-    agents = [Agent(a['id'], a['role'], a.get('description',''), a.get('provider','local')) for a in data.get('agents', [])]
+    agents = [Agent(a['id'], a['role'], a.get('description',''), a.get('provider','local'),
+                    a.get('depends_on'), a.get('timeout')) for a in data.get('agents', [])]
     return agents
 
 
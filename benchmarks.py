@@ -0,0 +1,460 @@
+"""
+Benchmark suite for Semptify's hot paths.
+
+Each benchmark builds a reproducible synthetic dataset (seeded RNG, sizes
+scaled by `scale`) inside a scratch workspace, then times one operation
+for a number of rounds after a warm-up call:
+
+    vault_upload / vault_download   POST /vault/upload, GET /vault/download
+    validate_user_token             against a users.json with 10k users
+    learning_observe_action         LearningEngine with 5k users' habits
+    ledger_query                    Ledger.get_entries over 20k entries
+    search_library                  librarian search over 1k resources
+    document_intelligence           process_document on synthetic leases
+    dashboard                       generate_dashboard_for_user, cold/warm
+
+Results are written as JSON; compare_results() reports benchmarks whose
+tracked metric (median ms by default) got slower than a baseline by more
+than the threshold. See scripts/bench.py for the command line.
+"""
+
+import hashlib
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+BENCH_ROUNDS = int(os.getenv("BENCH_ROUNDS", "20"))
+BENCH_SEED = int(os.getenv("BENCH_SEED", "1234"))
+# A benchmark regressed when its tracked metric grew by more than this
+BENCH_REGRESSION_THRESHOLD = float(os.getenv("BENCH_REGRESSION_THRESHOLD", "0.25"))
+TRACKED_METRIC = "median_ms"
+RESULTS_VERSION = 1
+
+
+@dataclass
+class Benchmark:
+    name: str
+    setup: Callable[["Workspace", Any], Callable[[], Any]]
+    params: Sequence[Any] = (None,)
+    rounds: Optional[int] = None
+    description: str = ""
+
+
+_BENCHMARKS: "OrderedDict[str, Benchmark]" = OrderedDict()
+
+
+def benchmark(name: str, params: Sequence[Any] = (None,), rounds: Optional[int] = None):
+    """
+    Register a benchmark. The decorated function gets the workspace and one
+    param, builds what it needs, and returns the zero-argument callable to
+    time.
+    """
+    def decorator(fn):
+        _BENCHMARKS[name] = Benchmark(name, fn, tuple(params), rounds,
+                                      (fn.__doc__ or "").strip().splitlines()[0] if fn.__doc__ else "")
+        return fn
+    return decorator
+
+
+def list_benchmarks() -> List[Benchmark]:
+    return list(_BENCHMARKS.values())
+
+
+def _result_key(name: str, param: Any) -> str:
+    return name if param is None else f"{name}[{param}]"
+
+
+# ============================================================================
+# Workspace and datasets
+# ============================================================================
+
+class Workspace:
+    """
+    Scratch directory the benchmarks run in (the process chdirs into it, so
+    cwd-relative paths such as security/users.json resolve here), plus the
+    shared datasets, built on first use.
+    """
+
+    def __init__(self, scale: float = 1.0, seed: int = BENCH_SEED):
+        self.scale = scale
+        self.seed = seed
+        self.root = tempfile.mkdtemp(prefix="semptify-bench-")
+        self.data_dir = os.path.join(self.root, "data")
+        os.makedirs(os.path.join(self.root, "security"))
+        os.makedirs(os.path.join(self.root, "logs"))
+        os.makedirs(self.data_dir)
+        self._previous_cwd = None
+        self._restore: List[Callable[[], None]] = []
+        self._users: Optional[List[Dict]] = None
+        self._client = None
+
+    def __enter__(self):
+        self._previous_cwd = os.getcwd()
+        os.chdir(self.root)
+        return self
+
+    def __exit__(self, *exc):
+        for restore in reversed(self._restore):
+            restore()
+        os.chdir(self._previous_cwd)
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def rng(self, name: str) -> random.Random:
+        """Independent, reproducible random stream per dataset."""
+        return random.Random(f"{self.seed}:{name}")
+
+    def size(self, n: int) -> int:
+        return max(1, int(n * self.scale))
+
+    def patch(self, obj, attr: str, value):
+        """Set an attribute for the rest of the run."""
+        original = getattr(obj, attr)
+        setattr(obj, attr, value)
+        self._restore.append(lambda: setattr(obj, attr, original))
+
+    def setenv(self, name: str, value: str):
+        original = os.environ.get(name)
+        os.environ[name] = value
+        self._restore.append(lambda: os.environ.__setitem__(name, original) if original is not None
+                             else os.environ.pop(name, None))
+
+    @property
+    def users(self) -> List[Dict]:
+        """users.json with 10k token users; returns [{"id", "token"}]."""
+        if self._users is None:
+            rng = self.rng("users")
+            users, stored = [], {}
+            for n in range(self.size(10000)):
+                token = "".join(rng.choice("0123456789") for _ in range(16))
+                user_id = f"user_{n:06d}"
+                users.append({"id": user_id, "token": token})
+                stored[user_id] = {"hash": hashlib.sha256(token.encode()).hexdigest(),
+                                   "created": "2025-01-01T00:00:00", "enabled": True}
+            with open(os.path.join(self.root, "security", "users.json"), "w", encoding="utf-8") as f:
+                json.dump(stored, f)
+            self._users = users
+        return self._users
+
+    @property
+    def client(self):
+        """Flask test client for the app, with vault uploads in the workspace."""
+        if self._client is None:
+            self.setenv("SECURITY_MODE", "open")
+            self.setenv("RATE_LIMIT_VAULT_UPLOAD", "100000000/60")
+            import vault
+            from Semptify import app
+            self.patch(vault, "UPLOAD_ROOT", os.path.join(self.root, "uploads", "vault"))
+            app.config["TESTING"] = True
+            self._client = app.test_client()
+            self._client.get("/healthz")  # runs the startup phase outside the timings
+        return self._client
+
+
+# ============================================================================
+# Benchmarks
+# ============================================================================
+
+FILE_SIZES = {"1KB": 1024, "256KB": 256 * 1024, "4MB": 4 * 1024 * 1024}
+
+
+def _upload(ws: Workspace, user: Dict, payload: bytes, filename: str):
+    import io
+    response = ws.client.post("/vault/upload", data={"user_token": user["token"],
+                                                      "file": (io.BytesIO(payload), filename)},
+                              content_type="multipart/form-data")
+    if response.status_code != 200:
+        raise RuntimeError(f"/vault/upload returned {response.status_code}: {response.get_data(as_text=True)[:200]}")
+    return response
+
+
+@benchmark("vault_upload", params=list(FILE_SIZES), rounds=10)
+def bench_vault_upload(ws: Workspace, size: str):
+    """Encrypt and store a file through POST /vault/upload."""
+    user = ws.users[-1]
+    payload = ws.rng(f"file:{size}").randbytes(FILE_SIZES[size])
+    return lambda: _upload(ws, user, payload, f"bench_{size}.bin")
+
+
+@benchmark("vault_download", params=list(FILE_SIZES), rounds=10)
+def bench_vault_download(ws: Workspace, size: str):
+    """Verify and decrypt a stored file through GET /vault/download."""
+    import vault
+    user = ws.users[-2]
+    payload = ws.rng(f"file:{size}").randbytes(FILE_SIZES[size])
+    filename = f"download_{size}.bin"
+    _upload(ws, user, payload, filename)
+    doc_id = next(d["doc_id"] for d in reversed(vault._get_user_documents(user["id"]))
+                  if d["filename"] == filename)
+
+    def download():
+        response = ws.client.get(f"/vault/download?doc_id={doc_id}&user_token={user['token']}")
+        if response.status_code != 200:
+            raise RuntimeError(f"/vault/download returned {response.status_code}")
+        return response
+    return download
+
+
+@benchmark("validate_user_token", params=["first", "last", "unknown"], rounds=50)
+def bench_validate_user_token(ws: Workspace, which: str):
+    """security.validate_user_token against 10k users."""
+    from security import validate_user_token
+    users = ws.users
+    token = {"first": users[0]["token"], "last": users[-1]["token"], "unknown": "0" * 17}[which]
+    return lambda: validate_user_token(token)
+
+
+ACTIONS = ["upload_lease", "file_complaint", "view_timeline", "pay_rent", "send_notice",
+           "request_repair", "open_vault", "ask_copilot"]
+
+
+@benchmark("learning_observe_action", rounds=20)
+def bench_learning_observe_action(ws: Workspace, _):
+    """LearningEngine.observe_action with 5k users' learned habits."""
+    from engines.learning_engine import LearningEngine
+    rng = ws.rng("learning")
+    data_dir = os.path.join(ws.data_dir, "learning")
+    engine = LearningEngine(data_dir)
+    for n in range(ws.size(5000)):
+        engine.patterns["user_habits"][f"user_{n}"] = {a: rng.randint(1, 40) for a in rng.sample(ACTIONS, 4)}
+    for a in ACTIONS:
+        for b in ACTIONS:
+            engine.patterns["sequences"][f"{a}->{b}"] = rng.randint(0, 500)
+    users = [f"user_{rng.randrange(ws.size(5000))}" for _ in range(64)]
+    calls = iter(range(10 ** 9))
+
+    def observe():
+        n = next(calls)
+        engine.observe_action(users[n % len(users)], ACTIONS[n % len(ACTIONS)], {"success": True})
+    return observe
+
+
+LEDGER_TYPES = ["document", "payment", "complaint", "evidence", "notice", "action"]
+
+
+@benchmark("ledger_query", params=["by_type", "by_actor", "time_range"], rounds=30)
+def bench_ledger_query(ws: Workspace, query: str):
+    """Ledger.get_entries over 20k entries."""
+    from engines.ledger_calendar_engine import Ledger
+    data_dir = os.path.join(ws.data_dir, "ledger")
+    if not os.path.exists(os.path.join(data_dir, "ledger.json")):
+        rng = ws.rng("ledger")
+        os.makedirs(data_dir)
+        start = 1735689600.0  # 2025-01-01
+        with open(os.path.join(data_dir, "ledger.json"), "w", encoding="utf-8") as f:
+            for n in range(ws.size(20000)):
+                data = {"amount": rng.randint(50, 2500), "note": f"entry {n}"}
+                f.write(json.dumps({"id": f"entry-{n}", "timestamp": start + n * 600,
+                                    "entry_type": rng.choice(LEDGER_TYPES), "actor": f"user_{rng.randrange(500)}",
+                                    "data": data, "files": [], "hash": f"{n:064x}"}) + "\n")
+    ledger = Ledger(data_dir)
+    midpoint = 1735689600.0 + ws.size(20000) * 300
+    kwargs = {"by_type": {"entry_type": "payment"},
+              "by_actor": {"actor": "user_42"},
+              "time_range": {"start_time": midpoint, "end_time": midpoint + 86400 * 7}}[query]
+    return lambda: ledger.get_entries(**kwargs)
+
+
+LIBRARY_TOPICS = ["eviction", "security deposit", "repairs", "habitability", "late fees",
+                  "retaliation", "discrimination", "lease termination", "rent increase", "mold"]
+
+
+@benchmark("search_library", params=["eviction", "no-match"], rounds=20)
+def bench_search_library(ws: Workspace, query: str):
+    """librarian_engine.search_library over 1k resources."""
+    from engines.librarian_engine import search_library
+    library_dir = os.path.join(ws.data_dir, "library")
+    if not os.path.exists(library_dir):
+        rng = ws.rng("library")
+        os.makedirs(library_dir)
+        for n in range(ws.size(1000)):
+            topic = rng.choice(LIBRARY_TOPICS)
+            resource = {
+                "id": f"res_{n:05d}",
+                "title": f"{topic.title()} guide {n}",
+                "category": rng.choice(["statute", "guide", "case_law", "form"]),
+                "jurisdiction": rng.choice(["Minnesota", "California", "Texas", "Federal"]),
+                "summary": f"What tenants should know about {topic}. " * rng.randint(2, 8),
+                "key_facts": [f"Fact {k} about {rng.choice(LIBRARY_TOPICS)}" for k in range(rng.randint(3, 10))],
+            }
+            with open(os.path.join(library_dir, f"{resource['id']}.json"), "w", encoding="utf-8") as f:
+                json.dump(resource, f)
+    term = "zzz-not-present" if query == "no-match" else query
+    return lambda: search_library(term, data_dir=ws.data_dir)
+
+
+LEASE_CLAUSES = [
+    "The Tenant shall pay monthly rent of ${rent:,} due on the 1st day of each month.",
+    "A security deposit of ${deposit:,} is due upon signing and will be returned within 21 days.",
+    "This Lease Agreement is made on {date} between {landlord} (\"Landlord\") and {tenant} (\"Tenant\").",
+    "The premises located at {address}, Minneapolis, Minnesota 55401 shall be used as a residence.",
+    "Late fees of ${late} will be charged if rent is received after the 5th.",
+    "Landlord may enter with 24 hours notice. Contact: {phone}, {email}.",
+    "This lease is governed by the laws of the State of Minnesota.",
+    "Signed: ______________________ Date: {date}",
+]
+
+
+def _lease_text(rng: random.Random, pages: int) -> str:
+    values = {
+        "rent": rng.randint(800, 3000), "deposit": rng.randint(500, 3000), "late": rng.randint(25, 100),
+        "date": f"{rng.randint(1, 12)}/{rng.randint(1, 28)}/2025", "landlord": "ABC Property Management LLC",
+        "tenant": "Jordan Tenant", "address": f"{rng.randint(100, 9999)} Main Street Apt {rng.randint(1, 40)}",
+        "phone": f"(612) 555-{rng.randint(1000, 9999)}", "email": "leasing@abc-mgmt.example",
+    }
+    paragraphs = []
+    for page in range(pages):
+        for _ in range(12):
+            paragraphs.append(rng.choice(LEASE_CLAUSES).format(**values))
+        paragraphs.append(f"Page {page + 1}")
+    return "\n\n".join(paragraphs)
+
+
+@benchmark("document_intelligence", params=["2_pages", "20_pages"], rounds=10)
+def bench_document_intelligence(ws: Workspace, size: str):
+    """DocumentIntelligenceEngine.process_document on a synthetic lease."""
+    from document_intelligence import DocumentIntelligenceEngine
+    pages = int(size.split("_")[0])
+    path = os.path.join(ws.data_dir, f"lease_{size}.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(_lease_text(ws.rng(f"lease:{size}"), pages))
+    engine = DocumentIntelligenceEngine()
+    return lambda: engine.process_document(path, doc_type="lease")
+
+
+@benchmark("dashboard", params=["cold", "warm"], rounds=20)
+def bench_dashboard(ws: Workspace, mode: str):
+    """learning_adapter.generate_dashboard_for_user for a returning user."""
+    import learning_adapter
+    user = {"location": "Minneapolis, MN", "issue_type": "repairs", "stage": "HAVING_TROUBLE", "monthly_rent": 1450}
+
+    def generate():
+        if mode == "cold":
+            learning_adapter.clear_dashboard_cache()
+        return learning_adapter.generate_dashboard_for_user("bench_user", user)
+    return generate
+
+
+# ============================================================================
+# Running and comparing
+# ============================================================================
+
+def _time(fn: Callable[[], Any], rounds: int) -> Dict[str, float]:
+    fn()  # warm-up
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "rounds": rounds,
+        "min_ms": round(timings[0], 4),
+        "median_ms": round(statistics.median(timings), 4),
+        "p95_ms": round(timings[min(len(timings) - 1, int(0.95 * len(timings)))], 4),
+        "mean_ms": round(statistics.fmean(timings), 4),
+        "max_ms": round(timings[-1], 4),
+    }
+
+
+def run_benchmarks(names: Optional[Sequence[str]] = None, scale: float = 1.0, seed: int = BENCH_SEED,
+                   rounds: Optional[int] = None, progress: Optional[Callable[[str, Dict], None]] = None) -> Dict:
+    """Run the selected benchmarks (default: all) and return the results document."""
+    selected = [b for b in list_benchmarks() if not names or b.name in names]
+    unknown = set(names or ()) - {b.name for b in selected}
+    if unknown:
+        raise ValueError(f"Unknown benchmark(s): {', '.join(sorted(unknown))}")
+
+    results: Dict[str, Dict] = {}
+    with Workspace(scale=scale, seed=seed) as ws:
+        for bench in selected:
+            for param in bench.params:
+                key = _result_key(bench.name, param)
+                try:
+                    fn = bench.setup(ws, param)
+                    result = _time(fn, rounds or bench.rounds or BENCH_ROUNDS)
+                except Exception as e:
+                    result = {"error": f"{type(e).__name__}: {e}"}
+                results[key] = result
+                if progress:
+                    progress(key, result)
+
+    return {
+        "version": RESULTS_VERSION,
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scale": scale,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def write_results(results: Dict, path: str):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def load_results(path: str) -> Dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare_results(baseline: Dict, current: Dict, threshold: float = BENCH_REGRESSION_THRESHOLD,
+                    metric: str = TRACKED_METRIC) -> Dict:
+    """
+    Compare two results documents on `metric`.
+
+    Returns rows for every benchmark in both, plus the keys that regressed
+    (slower by more than `threshold`, as a fraction), improved, errored, or
+    exist on only one side. Results from different scales are not
+    comparable and raise ValueError.
+    """
+    if baseline["meta"].get("scale") != current["meta"].get("scale"):
+        raise ValueError(f"Scale differs: baseline {baseline['meta'].get('scale')}, "
+                         f"current {current['meta'].get('scale')}")
+
+    report = {"metric": metric, "threshold": threshold, "rows": [], "regressions": [],
+              "improvements": [], "errors": [], "missing": [], "new": []}
+    base, now = baseline["results"], current["results"]
+    for key in base:
+        if key not in now:
+            report["missing"].append(key)
+    for key, result in now.items():
+        if key not in base:
+            report["new"].append(key)
+            continue
+        if "error" in result or "error" in base[key]:
+            report["errors"].append(key)
+            continue
+        before, after = base[key][metric], result[metric]
+        change = (after - before) / before if before else 0.0
+        report["rows"].append({"benchmark": key, "baseline": before, "current": after, "change": round(change, 4)})
+        if change > threshold:
+            report["regressions"].append(key)
+        elif change < -threshold:
+            report["improvements"].append(key)
+    return report
+
+
+def format_comparison(report: Dict) -> str:
+    lines = [f"{'benchmark':40} {'baseline':>12} {'current':>12} {'change':>9}"]
+    for row in report["rows"]:
+        flag = "  REGRESSED" if row["benchmark"] in report["regressions"] else ""
+        lines.append(f"{row['benchmark']:40} {row['baseline']:>10.3f}ms {row['current']:>10.3f}ms "
+                     f"{row['change'] * 100:>+8.1f}%{flag}")
+    for label in ("errors", "missing", "new"):
+        if report[label]:
+            lines.append(f"{label}: {', '.join(report[label])}")
+    return "\n".join(lines)
@@ -4,7 +4,9 @@ Handles AI-powered assistance using local Ollama models
 """
 
 from flask import Blueprint, request, jsonify, session
-from security import log_event
+from security import log_event, rate_limited
+from llm_cache import cached_completion_stream
+from llm_client import LLMError, sse_response, wants_stream
 import requests
 import os
 
@@ -13,8 +15,12 @@ ai_bp = Blueprint('ai', __name__, url_prefix='/api')
 
 
 @ai_bp.route('/copilot', methods=['POST'])
+@rate_limited('ai', 10)
 def copilot_api():
-    """Copilot API endpoint for AI assistance - powered by Ollama (local AI)"""
+    """Copilot API endpoint for AI assistance - powered by Ollama (local AI)
+
+    Send Accept: text/event-stream (or ?stream=1) to receive tokens as SSE.
+    """
     data = request.get_json(force=True, silent=True)
     if not data or 'prompt' not in data:
         return jsonify({"error": "missing_prompt"}), 400
@@ -44,57 +50,60 @@ Key areas of expertise:
 - Lease termination procedures
 - Court filing procedures and deadlines"""
 
+    # Repeated and paraphrased questions are answered from the cache
+    stream = cached_completion_stream(
+        "copilot",
+        prompt=f"{system_prompt}\n\nUser question: {user_prompt}\n\nProvide helpful, accurate advice:",
+        match_text=user_prompt,
+        models={"ollama": model},
+        providers=("ollama",),
+        max_tokens=512  # Max response length
+    )
+
+    user_id = session.get('user_id', 'anonymous')
+
+    def _log_usage(stream, ai_response):
+        # Log AI usage
+        log_event("copilot_used", {
+            "user_id": user_id,
+            "model": model,
+            "prompt_length": len(user_prompt),
+            "response_length": len(ai_response),
+            "provider": "ollama_local",
+            "cached": stream.stats.get("cached", False)
+        })
+
+    if wants_stream(request):
+        return sse_response(stream, on_done=_log_usage)
+
     try:
-        # Call local Ollama API
-        ollama_response = requests.post(
-            'http://localhost:11434/api/generate',
-            json={
-                "model": model,
-                "prompt": f"{system_prompt}\n\nUser question: {user_prompt}\n\nProvide helpful, accurate advice:",
-                "stream": False,
-                "options": {
-                    "temperature": 0.7,
-                    "num_predict": 512  # Max response length
-                }
-            },
-            timeout=30
-        )
-        
-        if ollama_response.status_code == 200:
-            ai_response = ollama_response.json().get('response', '')
-            
-            # Log AI usage
-            log_event("copilot_used", {
-                "user_id": session.get('user_id', 'anonymous'),
-                "model": model,
-                "prompt_length": len(user_prompt),
-                "response_length": len(ai_response),
-                "provider": "ollama_local"
-            })
-            
-            return jsonify({
-                "status": "ok",
-                "response": ai_response,
-                "model": model,
-                "provider": "ollama",
-                "cost": 0  # FREE!
-            }), 200
-        else:
-            # Ollama error
+        ai_response = stream.text()
+        _log_usage(stream, ai_response)
+
+        return jsonify({
+            "status": "ok",
+            "response": ai_response,
+            "model": model,
+            "provider": "ollama",
+            "cached": stream.stats.get("cached", False),
+            "cost": 0  # FREE!
+        }), 200
+
+    except LLMError as e:
+        if isinstance(e.errors.get("ollama"), requests.exceptions.ConnectionError):
+            # Ollama not running
             return jsonify({
                 "status": "error",
-                "error": "ollama_unavailable",
-                "message": "Local AI service is not responding. Please check if Ollama is running.",
-                "help": "Run 'ollama serve' in terminal to start Ollama"
+                "error": "ollama_not_running",
+                "message": "Ollama is not running. Start it with 'ollama serve'",
+                "fallback": "AI assistance temporarily unavailable"
             }), 503
-            
-    except requests.exceptions.ConnectionError:
-        # Ollama not running
+        # Ollama error
         return jsonify({
             "status": "error",
-            "error": "ollama_not_running",
-            "message": "Ollama is not running. Start it with 'ollama serve'",
-            "fallback": "AI assistance temporarily unavailable"
+            "error": "ollama_unavailable",
+            "message": "Local AI service is not responding. Please check if Ollama is running.",
+            "help": "Run 'ollama serve' in terminal to start Ollama"
         }), 503
     except Exception as e:
         # Unexpected error
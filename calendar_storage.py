@@ -5,6 +5,7 @@ from cryptography.hazmat.backends import default_backend
 import json, os, base64
 from datetime import datetime
 from doc_id_generator import generate_doc_id, verify_doc_certificate
+from security import timed_operation
 
 class EncryptedCalendarStorage:
     def __init__(self, cloud_client, user_token):
@@ -18,7 +19,8 @@ class EncryptedCalendarStorage:
             return self.encryption_key
         salt = os.urandom(32)
         kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=100000, backend=default_backend())
-        self.encryption_key = kdf.derive(self.user_token.encode())
+        with timed_operation("kdf", "pbkdf2"):
+            self.encryption_key = kdf.derive(self.user_token.encode())
         return self.encryption_key
     
     def encrypt_data(self, data_dict):
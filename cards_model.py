@@ -4,9 +4,13 @@ Backed by SQLite using the same DB as user_database.
 """
 import sqlite3
 import os
+import threading
 from typing import List, Dict, Any, Optional
 
-from user_database import DB_PATH, init_database  # ensure base DB exists
+from user_database import DB_PATH, init_user_database  # ensure base DB exists
+
+_init_lock = threading.Lock()
+_initialized = False
 
 
 def _db_connect():
@@ -229,6 +233,7 @@ def seed_expanded_cards():
 
 
 def get_cards(group: Optional[str] = None) -> List[Dict[str, Any]]:
+    ensure_cards_tables()
     conn = _db_connect()
     cur = conn.cursor()
     if group:
@@ -251,11 +256,23 @@ def get_cards_grouped() -> Dict[str, List[Dict[str, Any]]]:
     return grouped
 
 
-# Ensure base DB and cards table exist on import, then seed defaults
-try:
-    init_database()
-    init_cards_tables()
-    seed_default_cards()
-except Exception:
-    # Avoid import-time hard failures; routes can trigger initialization later if needed
-    pass
+def ensure_cards_tables():
+    """Ensure base DB and cards table exist, then seed defaults (once).
+
+    Called from the startup phase and lazily by readers; this used to run
+    at import time.
+    """
+    global _initialized
+    if _initialized:
+        return
+    with _init_lock:
+        if _initialized:
+            return
+        try:
+            init_user_database()
+            init_cards_tables()
+            seed_default_cards()
+            _initialized = True
+        except Exception:
+            # Avoid hard failures; the next reader retries initialization
+            pass
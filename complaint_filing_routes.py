@@ -4,6 +4,7 @@
 from flask import Blueprint, render_template, request, jsonify, session
 from engines.complaint_filing_engine import get_filing_engine, VenueType
 from engines.accuracy_engine import get_accuracy_engine
+from response_cache import cached_response
 import json
 
 complaint_filing_bp = Blueprint('complaint_filing', __name__)
@@ -18,6 +19,7 @@ def file_complaint_page():
 
 
 @complaint_filing_bp.route('/api/complaint/identify-venues', methods=['POST'])
+@cached_response(ttl=300, tags=("filing_venues", "laws"), vary_on_body=True)
 def identify_venues():
     """
     Identify all applicable filing venues for issue.
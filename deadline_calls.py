@@ -0,0 +1,124 @@
+"""
+Concurrent calls with per-call deadlines.
+
+A ThreadPoolExecutor can't enforce a timeout on a call that never returns:
+the call keeps its worker, so everything queued behind it waits. And a
+deadline that starts when a worker picks the job up never fires for jobs
+still in the queue.
+
+DeadlineCalls runs each call on its own daemon thread, at most
+`max_workers` at a time. A call's deadline starts when it is submitted.
+When the deadline passes, the call is reported as timed out and the
+caller moves on; the abandoned thread finishes in the background and its
+result is dropped. It keeps its slot until it returns, so `max_workers`
+bounds live threads, hung ones included. Pass a shared `slots` semaphore
+to apply one bound across short-lived instances (e.g. one per query):
+once every slot is held by a hung call, new calls time out in the queue
+instead of starting more threads.
+
+    calls = DeadlineCalls(max_workers=4, name="probe")
+    for path in paths:
+        calls.submit(path, probe, path, timeout=2.0)
+    while calls:
+        path, status, value = calls.next()   # "ok" | "error" | "timeout"
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Hashable, Optional, Tuple
+
+OK = "ok"
+ERROR = "error"
+TIMEOUT = "timeout"
+
+# How often queued calls re-check for a free slot
+SLOT_POLL_SECONDS = 0.05
+
+
+class DeadlineCalls:
+    """Runs keyed calls concurrently; next() reports each as ok, error or timeout."""
+
+    def __init__(self, max_workers: Optional[int] = None, name: str = "deadline-call",
+                 slots: Optional[threading.Semaphore] = None):
+        if slots is None and max_workers is not None:
+            slots = threading.BoundedSemaphore(max(1, max_workers))
+        self._slots = slots
+        self.name = name
+        self._waiting: Deque[Tuple[Hashable, Callable, tuple, float]] = deque()
+        self._running: Dict[Hashable, Tuple[int, float]] = {}  # key -> (submission, deadline)
+        self._submissions = 0
+        self._expired: Deque[Tuple[Hashable, str, Any]] = deque()
+        self._results: "queue.Queue[Tuple[int, Hashable, str, Any]]" = queue.Queue()
+
+    def __len__(self) -> int:
+        """Calls not yet reported by next()."""
+        return len(self._waiting) + len(self._running) + len(self._expired)
+
+    def submit(self, key: Hashable, fn: Callable, *args, timeout: float):
+        """Queue fn(*args). It must finish within `timeout` seconds from now."""
+        self._waiting.append((key, fn, args, time.monotonic() + timeout))
+        self._start_waiting()
+
+    def _start_waiting(self):
+        while self._waiting and (self._slots is None or self._slots.acquire(blocking=False)):
+            key, fn, args, deadline = self._waiting.popleft()
+            self._submissions += 1
+            self._running[key] = (self._submissions, deadline)
+            threading.Thread(target=self._call, args=(self._submissions, key, fn, args), daemon=True,
+                             name=f"{self.name}-{key}").start()
+
+    def _call(self, submission: int, key: Hashable, fn: Callable, args: tuple):
+        try:
+            outcome = (OK, fn(*args))
+        except Exception as e:
+            outcome = (ERROR, e)
+        finally:
+            if self._slots is not None:
+                self._slots.release()
+        self._results.put((submission, key) + outcome)
+
+    def _expire(self, now: float):
+        for key, (_, deadline) in list(self._running.items()):
+            if deadline <= now:
+                del self._running[key]
+                self._expired.append((key, TIMEOUT, None))
+        still_waiting = deque()
+        for item in self._waiting:
+            if item[3] <= now:
+                self._expired.append((item[0], TIMEOUT, None))
+            else:
+                still_waiting.append(item)
+        self._waiting = still_waiting
+        self._start_waiting()
+
+    def next(self) -> Tuple[Hashable, str, Any]:
+        """
+        Block until a call finishes or a deadline passes. Returns
+        (key, status, value), where value is the result for "ok", the
+        exception for "error", and None for "timeout".
+        """
+        while True:
+            if self._expired:
+                return self._expired.popleft()
+            if not self._running and not self._waiting:
+                raise LookupError("No calls left")
+            now = time.monotonic()
+            deadlines = [d for _, d in self._running.values()] + [item[3] for item in self._waiting]
+            wait = min(deadlines) - now
+            if self._waiting:
+                # A shared slot freed by another instance's call doesn't wake us
+                wait = min(wait, SLOT_POLL_SECONDS)
+            try:
+                submission, key, status, value = self._results.get(timeout=max(0.0, wait))
+            except queue.Empty:
+                self._expire(time.monotonic())
+                continue
+            if self._running.get(key, (None,))[0] != submission:
+                # Finished after it was reported as timed out; its slot is free
+                self._start_waiting()
+                continue
+            del self._running[key]
+            self._start_waiting()
+            return key, status, value
@@ -20,8 +20,10 @@ import os
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from collections import defaultdict
+from profiling import trace_persistence
 
 
+@trace_persistence
 class DataAccuracyEngine:
     """
     Ensures all guidance is sound, accurate, and trustworthy.
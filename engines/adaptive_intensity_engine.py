@@ -19,11 +19,24 @@ GOOD LANDLORD RECOGNITION:
 - Bad tenants exist too - system recognizes both sides
 """
 
+import copy
 import json
 import os
+import threading
+from bisect import bisect_left, insort
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from enum import Enum
+from profiling import trace_persistence
+
+# Raw ratings are appended to a JSONL log; landlord_ratings.json holds the
+# aggregates plus the log offset they cover and is rewritten every N ratings.
+LANDLORD_RATINGS_LOG = "landlord_ratings.jsonl"
+LANDLORD_SNAPSHOT_EVERY = int(os.getenv("LANDLORD_SNAPSHOT_EVERY", "100"))
+# Half-life of a rating's weight in the time-decayed score
+LANDLORD_RATING_HALF_LIFE_DAYS = float(os.getenv("LANDLORD_RATING_HALF_LIFE_DAYS", "180"))
+
+ALL_COUNTIES = "*"
 
 
 class IntensityLevel(Enum):
@@ -53,6 +66,7 @@ class LandlordResponsiveness(Enum):
     HOSTILE = "hostile"  # Ignores, retaliates, threatens
 
 
+@trace_persistence
 class AdaptiveIntensityEngine:
     """
     Determines appropriate response intensity based on:
@@ -65,17 +79,64 @@ class AdaptiveIntensityEngine:
     def __init__(self, data_dir: str = "data"):
         self.data_dir = data_dir
         self.landlord_ratings_file = os.path.join(data_dir, "landlord_ratings.json")
+        self.landlord_ratings_log = os.path.join(data_dir, LANDLORD_RATINGS_LOG)
         self.intensity_history_file = os.path.join(data_dir, "intensity_history.json")
 
+        self._ratings_lock = threading.Lock()
+        self._log_offset = 0
+        self._unsaved_ratings = 0
+        # county key -> sorted [(average_rating, total_ratings, landlord_id)]
+        self._leaderboards: Dict[str, List[Tuple[float, int, str]]] = {}
+
         self.landlord_ratings = self._load_landlord_ratings()
+        self._build_leaderboards()
         self.intensity_history = self._load_intensity_history()
 
     def _load_landlord_ratings(self) -> Dict:
-        """Load landlord ratings (good/bad history)."""
+        """Load the aggregate snapshot and replay ratings logged after it."""
+        snapshot = {}
         if os.path.exists(self.landlord_ratings_file):
             with open(self.landlord_ratings_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return {}
+                snapshot = json.load(f)
+
+        if snapshot and "landlords" not in snapshot:
+            return self._migrate_legacy_ratings(snapshot)
+
+        landlords = snapshot.get("landlords", {})
+        offset = snapshot.get("log_offset", 0)
+        if not os.path.exists(self.landlord_ratings_log):
+            self._log_offset = 0
+            return landlords
+        if offset > os.path.getsize(self.landlord_ratings_log):
+            # Log was replaced underneath the snapshot; rebuild from scratch
+            landlords, offset = {}, 0
+
+        with open(self.landlord_ratings_log, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # torn final write
+                offset += len(line)
+                if line.strip():
+                    _apply_rating(landlords, json.loads(line))
+        self._log_offset = offset
+        return landlords
+
+    def _migrate_legacy_ratings(self, legacy: Dict) -> Dict:
+        """Move ratings out of the old all-in-one JSON file into the log."""
+        records = []
+        for landlord_id, data in legacy.items():
+            for r in data.get("ratings", []):
+                records.append({"landlord_id": landlord_id, **r})
+        records.sort(key=lambda r: r.get("timestamp") or "")
+
+        landlords: Dict = {}
+        for record in records:
+            _apply_rating(landlords, record)
+        self._save_rating_records(records)
+        self.landlord_ratings = landlords
+        self._save_landlord_ratings()
+        return landlords
 
     def _load_intensity_history(self) -> Dict:
         """Load intensity escalation history per situation."""
@@ -84,11 +145,24 @@ class AdaptiveIntensityEngine:
                 return json.load(f)
         return {}
 
+    def _save_rating_records(self, records: List[Dict]):
+        """Append raw ratings to the log."""
+        if not records:
+            return
+        os.makedirs(self.data_dir, exist_ok=True)
+        data = "".join(json.dumps(r) + "\n" for r in records).encode("utf-8")
+        with open(self.landlord_ratings_log, 'ab') as f:
+            f.write(data)
+        self._log_offset += len(data)
+
     def _save_landlord_ratings(self):
-        """Persist landlord ratings."""
+        """Snapshot the aggregates together with the log offset they cover."""
         os.makedirs(self.data_dir, exist_ok=True)
-        with open(self.landlord_ratings_file, 'w', encoding='utf-8') as f:
-            json.dump(self.landlord_ratings, f, indent=2)
+        tmp_path = self.landlord_ratings_file + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"log_offset": self._log_offset, "landlords": self.landlord_ratings}, f)
+        os.replace(tmp_path, self.landlord_ratings_file)
+        self._unsaved_ratings = 0
 
     def _save_intensity_history(self):
         """Persist intensity history."""
@@ -352,74 +426,67 @@ class AdaptiveIntensityEngine:
         rating: float,  # 1-5 stars
         category: str,  # "responsiveness", "maintenance", "communication", "fairness"
         comment: Optional[str] = None,
-        tenant_id: Optional[str] = None
+        tenant_id: Optional[str] = None,
+        county: Optional[str] = None
     ):
         """
         Rate landlord in specific category.
         Good landlords deserve recognition!
-        """
-        if landlord_id not in self.landlord_ratings:
-            self.landlord_ratings[landlord_id] = {
-                "landlord_id": landlord_id,
-                "ratings": [],
-                "average_rating": 0.0,
-                "total_ratings": 0,
-                "category_averages": {},
-                "recognition": None
-            }
-
-        landlord_data = self.landlord_ratings[landlord_id]
 
-        # Add rating
-        landlord_data["ratings"].append({
+        The rating is appended to the log and folded into the landlord's
+        running aggregates; the aggregate snapshot is only rewritten every
+        LANDLORD_SNAPSHOT_EVERY ratings (call flush_landlord_ratings() to
+        force it).
+        """
+        record = {
+            "landlord_id": landlord_id,
             "rating": rating,
             "category": category,
             "comment": comment,
             "timestamp": datetime.now().isoformat(),
-            "tenant_id": tenant_id
-        })
-
-        # Recalculate averages
-        all_ratings = [r["rating"] for r in landlord_data["ratings"]]
-        landlord_data["average_rating"] = sum(all_ratings) / len(all_ratings)
-        landlord_data["total_ratings"] = len(all_ratings)
-
-        # Calculate category averages
-        categories = {}
-        for r in landlord_data["ratings"]:
-            cat = r["category"]
-            if cat not in categories:
-                categories[cat] = []
-            categories[cat].append(r["rating"])
-
-        landlord_data["category_averages"] = {
-            cat: sum(ratings) / len(ratings)
-            for cat, ratings in categories.items()
+            "tenant_id": tenant_id,
+            "county": county
         }
-
-        # Determine recognition level
-        avg = landlord_data["average_rating"]
-        total = landlord_data["total_ratings"]
-
-        if avg >= 4.5 and total >= 5:
-            landlord_data["recognition"] = "EXCELLENT - Community Asset"
-        elif avg >= 4.0 and total >= 3:
-            landlord_data["recognition"] = "GOOD - Reliable Landlord"
-        elif avg >= 3.0:
-            landlord_data["recognition"] = "FAIR - Meets Basic Standards"
-        elif avg >= 2.0:
-            landlord_data["recognition"] = "POOR - Frequent Issues"
-        else:
-            landlord_data["recognition"] = "PROBLEM - Persistent Violations"
-
-        self._save_landlord_ratings()
+        with self._ratings_lock:
+            before = self.landlord_ratings.get(landlord_id)
+            old_key = _leaderboard_key(before) if before else None
+            old_county = _county_key(before.get("county")) if before else None
+
+            self._save_rating_records([record])
+            landlord_data = _apply_rating(self.landlord_ratings, record)
+            self._reindex(landlord_id, old_key, old_county, landlord_data)
+
+            self._unsaved_ratings += 1
+            if self._unsaved_ratings >= LANDLORD_SNAPSHOT_EVERY:
+                self._save_landlord_ratings()
+
+    def flush_landlord_ratings(self):
+        """Write the aggregate snapshot now."""
+        with self._ratings_lock:
+            if self._unsaved_ratings:
+                self._save_landlord_ratings()
+
+    def get_landlord_ratings(self, landlord_id: str, limit: Optional[int] = None) -> List[Dict]:
+        """Raw ratings for one landlord, newest first (reads the log)."""
+        if landlord_id not in self.landlord_ratings or not os.path.exists(self.landlord_ratings_log):
+            return []
+        needle = json.dumps(landlord_id)
+        ratings = []
+        with open(self.landlord_ratings_log, 'r', encoding='utf-8') as f:
+            for line in f:
+                if needle in line:
+                    record = json.loads(line)
+                    if record["landlord_id"] == landlord_id:
+                        ratings.append(record)
+        ratings.reverse()
+        return ratings[:limit] if limit else ratings
 
     def get_landlord_profile(self, landlord_id: str) -> Optional[Dict]:
         """Get landlord profile with ratings and recognition."""
         if landlord_id not in self.landlord_ratings:
             return None
 
-        profile = self.landlord_ratings[landlord_id].copy()
+        profile = copy.deepcopy(self.landlord_ratings[landlord_id])
 
         # Add recognition message
         avg = profile["average_rating"]
@@ -436,6 +503,69 @@ class AdaptiveIntensityEngine:
 
         return profile
 
+    # ------------------------------------------------------------------------
+    # Leaderboards
+    # ------------------------------------------------------------------------
+
+    def _build_leaderboards(self):
+        """Build the sorted per-county indexes from the aggregates."""
+        boards: Dict[str, List[Tuple[float, int, str]]] = {ALL_COUNTIES: []}
+        for landlord_id, data in self.landlord_ratings.items():
+            key = _leaderboard_key(data)
+            boards[ALL_COUNTIES].append(key)
+            county = _county_key(data.get("county"))
+            if county:
+                boards.setdefault(county, []).append(key)
+        for board in boards.values():
+            board.sort()
+        self._leaderboards = boards
+
+    def _reindex(self, landlord_id: str, old_key, old_county: Optional[str], data: Dict):
+        """Move one landlord to its new position in the sorted indexes."""
+        new_key = _leaderboard_key(data)
+        new_county = _county_key(data.get("county"))
+        for county in (ALL_COUNTIES, old_county):
+            board = self._leaderboards.get(county)
+            if board is not None and old_key is not None:
+                i = bisect_left(board, old_key)
+                if i < len(board) and board[i] == old_key:
+                    board.pop(i)
+        for county in (ALL_COUNTIES, new_county):
+            if county:
+                insort(self._leaderboards.setdefault(county, []), new_key)
+
+    def top_landlords(
+        self,
+        county: Optional[str] = None,
+        limit: int = 10,
+        bottom: bool = False,
+        min_ratings: int = 1
+    ) -> List[Dict]:
+        """
+        Best (or, with bottom=True, worst) rated landlords, optionally in one
+        county. Reads from the sorted index; landlords with fewer than
+        min_ratings ratings are skipped.
+        """
+        with self._ratings_lock:
+            board = self._leaderboards.get(_county_key(county) or ALL_COUNTIES, [])
+            ordered = iter(board) if bottom else reversed(board)
+            results = []
+            for average, total, landlord_id in ordered:
+                if total < min_ratings:
+                    continue
+                data = self.landlord_ratings[landlord_id]
+                results.append({
+                    "landlord_id": landlord_id,
+                    "county": data.get("county"),
+                    "average_rating": average,
+                    "decayed_rating": data["decayed_rating"],
+                    "total_ratings": total,
+                    "recognition": data["recognition"]
+                })
+                if len(results) >= limit:
+                    break
+            return results
+
     def generate_landlord_recognition_certificate(self, landlord_id: str) -> Optional[Dict]:
         """
         Generate recognition certificate for excellent landlords.
@@ -504,6 +634,96 @@ class AdaptiveIntensityEngine:
         pass
 
 
+# ============================================================================
+# RATING AGGREGATES
+# ============================================================================
+
+def _recognition(avg: float, total: int) -> str:
+    if avg >= 4.5 and total >= 5:
+        return "EXCELLENT - Community Asset"
+    elif avg >= 4.0 and total >= 3:
+        return "GOOD - Reliable Landlord"
+    elif avg >= 3.0:
+        return "FAIR - Meets Basic Standards"
+    elif avg >= 2.0:
+        return "POOR - Frequent Issues"
+    return "PROBLEM - Persistent Violations"
+
+
+def _apply_rating(landlords: Dict, record: Dict) -> Dict:
+    """
+    Fold one rating into a landlord's running aggregates in O(1).
+
+    Keeps count/sum/sum of squares overall and per category, and an
+    exponentially decayed sum and weight anchored at `decay_at`; their ratio
+    is the time-decayed rating and doesn't depend on when it is read.
+    """
+    landlord_id = record["landlord_id"]
+    data = landlords.get(landlord_id)
+    if data is None:
+        data = landlords[landlord_id] = {
+            "landlord_id": landlord_id,
+            "county": None,
+            "average_rating": 0.0,
+            "total_ratings": 0,
+            "rating_sum": 0.0,
+            "rating_sum_sq": 0.0,
+            "rating_stddev": 0.0,
+            "category_stats": {},
+            "category_averages": {},
+            "decayed_sum": 0.0,
+            "decayed_weight": 0.0,
+            "decay_at": None,
+            "decayed_rating": 0.0,
+            "last_rated": None,
+            "recognition": None
+        }
+
+    rating = float(record["rating"])
+    data["total_ratings"] += 1
+    data["rating_sum"] += rating
+    data["rating_sum_sq"] += rating * rating
+    total = data["total_ratings"]
+    data["average_rating"] = data["rating_sum"] / total
+    data["rating_stddev"] = max(0.0, data["rating_sum_sq"] / total - data["average_rating"] ** 2) ** 0.5
+
+    stats = data["category_stats"].setdefault(record["category"], {"count": 0, "sum": 0.0, "sum_sq": 0.0})
+    stats["count"] += 1
+    stats["sum"] += rating
+    stats["sum_sq"] += rating * rating
+    data["category_averages"][record["category"]] = stats["sum"] / stats["count"]
+
+    timestamp = record.get("timestamp") or datetime.now().isoformat()
+    if data["decay_at"] is None:
+        data["decay_at"] = timestamp
+    age_days = (datetime.fromisoformat(timestamp) - datetime.fromisoformat(data["decay_at"])).total_seconds() / 86400
+    if age_days >= 0:
+        # Move the anchor forward: older weight shrinks, new rating counts fully
+        factor = 0.5 ** (age_days / LANDLORD_RATING_HALF_LIFE_DAYS)
+        data["decayed_sum"] = data["decayed_sum"] * factor + rating
+        data["decayed_weight"] = data["decayed_weight"] * factor + 1.0
+        data["decay_at"] = timestamp
+    else:
+        weight = 0.5 ** (-age_days / LANDLORD_RATING_HALF_LIFE_DAYS)
+        data["decayed_sum"] += rating * weight
+        data["decayed_weight"] += weight
+    data["decayed_rating"] = data["decayed_sum"] / data["decayed_weight"]
+    data["last_rated"] = max(data["last_rated"] or timestamp, timestamp)
+
+    if record.get("county"):
+        data["county"] = record["county"]
+    data["recognition"] = _recognition(data["average_rating"], total)
+    return data
+
+
+def _leaderboard_key(data: Dict) -> Tuple[float, int, str]:
+    return (data["average_rating"], data["total_ratings"], data["landlord_id"])
+
+
+def _county_key(county: Optional[str]) -> Optional[str]:
+    return county.strip().lower() if county else None
+
+
 # Global instance
 _adaptive_intensity_engine = None
 
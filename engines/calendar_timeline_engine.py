@@ -7,7 +7,9 @@ import json
 import os
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
+from profiling import trace_persistence
 
+@trace_persistence
 class CalendarTimelineEngine:
     """
     Manages timeline events for rent, court, deadlines, and notices.
@@ -21,13 +21,19 @@ VENUES COVERED:
 - Media/public pressure
 """
 
+import heapq
 import json
 import os
+from collections import defaultdict
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Set
 from dataclasses import dataclass
 from enum import Enum
 
+from engines.jurisdiction_engine import jurisdiction_state
+from profiling import trace_persistence
+from response_cache import invalidate_tags
+
 
 class VenueType(Enum):
     """All possible complaint venues."""
@@ -63,6 +69,7 @@ class FilingVenue:
     notes: str
 
 
+@trace_persistence
 class ComplaintFilingEngine:
     """
     Determines ALL venues where user can file complaints.
@@ -80,6 +87,9 @@ class ComplaintFilingEngine:
         self.procedures = self._load_procedures()
         self.outcomes = self._load_outcomes()
 
+        self._build_venue_index()
+        self._build_effectiveness_index()
+
     def _load_venues(self) -> Dict:
         """Load filing venue database."""
         if os.path.exists(self.venues_file):
@@ -106,18 +116,21 @@ class ComplaintFilingEngine:
         os.makedirs(self.data_dir, exist_ok=True)
         with open(self.venues_file, 'w', encoding='utf-8') as f:
             json.dump(self.venues, f, indent=2)
+        invalidate_tags("filing_venues")
 
     def _save_procedures(self):
         """Persist procedures."""
         os.makedirs(self.data_dir, exist_ok=True)
         with open(self.procedures_file, 'w', encoding='utf-8') as f:
             json.dump(self.procedures, f, indent=2)
+        invalidate_tags("filing_venues")
 
     def _save_outcomes(self):
         """Persist outcome tracking."""
         os.makedirs(self.data_dir, exist_ok=True)
         with open(self.outcomes_file, 'w', encoding='utf-8') as f:
             json.dump(self.outcomes, f, indent=2)
+        invalidate_tags("filing_venues")
 
     # ========================================================================
     # INITIALIZE DEFAULT VENUES (Updated from user outcomes)
@@ -284,6 +297,80 @@ class ComplaintFilingEngine:
             }
         }
 
+    # ========================================================================
+    # VENUE INDEX (Candidate lookup without scanning every venue)
+    # ========================================================================
+
+    @staticmethod
+    def _location_key(location: Dict) -> str:
+        return f"{location.get('city')}_{location.get('state')}_{location.get('zip')}"
+
+    @staticmethod
+    def _jurisdiction_key(venue_data: Dict) -> tuple:
+        """Index bucket for a venue, mirroring the rules in _venue_applies."""
+        jurisdiction = venue_data.get("jurisdiction")
+        if jurisdiction == "federal":
+            return ("federal",)
+        elif jurisdiction == "state":
+            return ("state", jurisdiction_state(venue_data.get("state")))
+        elif jurisdiction in ["county", "city"]:
+            return ("local", venue_data.get("location_key"))
+        # Anything else (e.g. "minnesota") is not restricted by location
+        return ("any",)
+
+    def _build_venue_index(self):
+        """Index venues by issue type and by jurisdiction level/location."""
+        self._venue_order: Dict[str, int] = {}
+        self._venues_by_issue: Dict[str, Set[str]] = defaultdict(set)
+        self._venues_any_issue: Set[str] = set()
+        self._venues_by_jurisdiction: Dict[tuple, Set[str]] = defaultdict(set)
+        for venue_key, venue_data in self.venues.items():
+            self._index_venue(venue_key, venue_data)
+
+    def _index_venue(self, venue_key: str, venue_data: Dict):
+        self._venue_order.setdefault(venue_key, len(self._venue_order))
+        if "applies_to" in venue_data:
+            for issue in venue_data["applies_to"]:
+                self._venues_by_issue[issue].add(venue_key)
+        else:
+            self._venues_any_issue.add(venue_key)
+        self._venues_by_jurisdiction[self._jurisdiction_key(venue_data)].add(venue_key)
+
+    def _unindex_venue(self, venue_key: str, venue_data: Dict):
+        for issue in venue_data.get("applies_to", []):
+            self._venues_by_issue.get(issue, set()).discard(venue_key)
+        self._venues_any_issue.discard(venue_key)
+        self._venues_by_jurisdiction.get(self._jurisdiction_key(venue_data), set()).discard(venue_key)
+
+    def register_venue(self, venue_key: str, venue_data: Dict):
+        """Add or replace a venue (e.g. a discovered local agency) and persist it."""
+        if venue_key in self.venues:
+            self._unindex_venue(venue_key, self.venues[venue_key])
+        self.venues[venue_key] = venue_data
+        self._index_venue(venue_key, venue_data)
+        self._save_venues()
+
+    def _candidate_venues(self, issue_type: str, location: Dict) -> Set[str]:
+        """Venues matching both the issue type and the location."""
+        by_jurisdiction = self._venues_by_jurisdiction
+        by_issue = self._venues_by_issue.get(issue_type, set()) | self._venues_any_issue
+        in_location = (
+            by_jurisdiction.get(("federal",), set())
+            | by_jurisdiction.get(("any",), set())
+            | by_jurisdiction.get(("state", jurisdiction_state(location.get("state"))), set())
+            | by_jurisdiction.get(("local", self._location_key(location)), set())
+        )
+        return by_issue & in_location
+
+    def _build_effectiveness_index(self):
+        """Precompute outcome-based effectiveness per venue/location/issue."""
+        self._effectiveness: Dict[str, float] = {}
+        for outcome_key, outcome_data in self.outcomes.items():
+            total_count = outcome_data.get("total_count", 0)
+            self._effectiveness[outcome_key] = (
+                outcome_data.get("success_count", 0) / total_count if total_count else 0.5
+            )
+
     # ========================================================================
     # IDENTIFY ALL APPLICABLE VENUES FOR ISSUE
     # ========================================================================
@@ -292,7 +379,8 @@ class ComplaintFilingEngine:
         self,
         issue_type: str,
         location: Dict[str, str],
-        user_situation: Dict
+        user_situation: Dict,
+        limit: Optional[int] = None
     ) -> List[Dict]:
         """
         Identify ALL venues where user can file complaint.
@@ -302,28 +390,31 @@ class ComplaintFilingEngine:
             issue_type: "discrimination_disability", "no_heat", "illegal_eviction", etc.
             location: {city, county, state, zip}
             user_situation: {has_section8, has_disability, issue_details}
+            limit: Only return the N most effective venues
 
         Returns:
             List of applicable venues with current procedures
         """
         applicable_venues = []
 
-        # Check each venue in database
-        for venue_key, venue_data in self.venues.items():
-            if self._venue_applies(venue_data, issue_type, location, user_situation):
-                # Get most current procedures
-                procedures = self._get_current_procedures(venue_key, location)
-
-                # Get effectiveness score from outcomes
-                effectiveness = self._get_effectiveness_score(venue_key, location, issue_type)
-
-                applicable_venues.append({
-                    "venue_key": venue_key,
-                    "venue_data": venue_data,
-                    "procedures": procedures,
-                    "effectiveness": effectiveness,
-                    "confidence": procedures.get("confidence", 0.5)
-                })
+        # Candidates come from the venue index; scores are precomputed
+        ranked = [
+            (-self._get_effectiveness_score(venue_key, location, issue_type), self._venue_order[venue_key], venue_key)
+            for venue_key in self._candidate_venues(issue_type, location)
+        ]
+        ranked = heapq.nsmallest(limit, ranked) if limit else sorted(ranked)
+
+        for neg_effectiveness, _, venue_key in ranked:
+            # Get most current procedures
+            procedures = self._get_current_procedures(venue_key, location)
+
+            applicable_venues.append({
+                "venue_key": venue_key,
+                "venue_data": self.venues[venue_key],
+                "procedures": procedures,
+                "effectiveness": -neg_effectiveness,
+                "confidence": procedures.get("confidence", 0.5)
+            })
 
         # Discover local venues if not yet in database
         local_venues = self._discover_local_venues(location, issue_type)
@@ -332,7 +423,7 @@ class ComplaintFilingEngine:
         # Sort by effectiveness (best first)
         applicable_venues.sort(key=lambda x: x["effectiveness"], reverse=True)
 
-        return applicable_venues
+        return applicable_venues[:limit] if limit else applicable_venues
 
     def _venue_applies(
         self,
@@ -352,7 +443,7 @@ class ComplaintFilingEngine:
         if jurisdiction == "federal":
             return True  # Federal applies everywhere
         elif jurisdiction == "state":
-            return venue_data.get("state") == location.get("state")
+            return jurisdiction_state(venue_data.get("state")) == jurisdiction_state(location.get("state"))
         elif jurisdiction in ["county", "city"]:
             return venue_data.get("location_key") == f"{location.get('city')}_{location.get('state')}_{location.get('zip')}"
 
@@ -403,21 +494,13 @@ class ComplaintFilingEngine:
         Get effectiveness score based on actual outcomes.
         Returns 0-1 score (higher = more effective).
         """
-        location_key = f"{location.get('city')}_{location.get('state')}_{location.get('zip')}"
-        outcome_key = f"{venue_key}:{location_key}:{issue_type}"
+        outcome_key = f"{venue_key}:{self._location_key(location)}:{issue_type}"
 
-        if outcome_key not in self.outcomes:
+        score = self._effectiveness.get(outcome_key)
+        if score is None:
             # No outcome data - use default from venue config
             return self.venues.get(venue_key, {}).get("effectiveness_score", 0.5)
-
-        outcome_data = self.outcomes[outcome_key]
-        success_count = outcome_data.get("success_count", 0)
-        total_count = outcome_data.get("total_count", 0)
-
-        if total_count == 0:
-            return 0.5
-
-        return success_count / total_count
+        return score
 
     def _discover_local_venues(
         self,
@@ -544,9 +627,6 @@ class ComplaintFilingEngine:
         # Get all applicable venues
         venues = self.identify_venues(issue_type, location, user_situation)
 
-        # Get all applicable venues
-        venues = self.identify_venues(issue_type, location, user_situation)
-
         if not venues:
             return {
                 "error": "No applicable filing venues found",
@@ -828,6 +908,7 @@ class ComplaintFilingEngine:
 
         # Calculate new effectiveness score
         outcome_data["effectiveness"] = outcome_data["success_count"] / outcome_data["total_count"]
+        self._effectiveness[outcome_key] = outcome_data["effectiveness"]
 
         self._save_outcomes()
 
@@ -9,8 +9,10 @@ import os
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 from collections import defaultdict, Counter
+from profiling import trace_persistence
 
 
+@trace_persistence
 class CuriosityEngine:
     """
     Drives autonomous learning through curiosity.
@@ -7,6 +7,7 @@ import json
 import os
 from datetime import datetime
 from typing import Dict, List, Optional
+from profiling import trace_persistence
 
 # Widget registry - all available widgets
 AVAILABLE_WIDGETS = {
@@ -62,6 +63,7 @@ DEFAULT_LAYOUT = {
     "f": "rent_ledger"
 }
 
+@trace_persistence
 class DashboardEngine:
     def __init__(self, data_dir: str = "data"):
         self.data_dir = data_dir
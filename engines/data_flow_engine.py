@@ -21,6 +21,7 @@ from pathlib import Path
 import threading
 
 from engines.ledger_calendar_engine import get_ledger, get_calendar, LedgerEntry, CalendarEvent
+from profiling import trace_persistence
 
 
 class DataFlowRegistry:
@@ -154,6 +155,7 @@ class DataFlowEvent:
         }
 
 
+@trace_persistence
 class DataFlowEngine:
     """Central engine routing all data through calendar."""
 
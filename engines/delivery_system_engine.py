@@ -9,6 +9,7 @@ import os
 from datetime import datetime
 from typing import Dict, List, Optional
 from enum import Enum
+from profiling import trace_persistence
 
 
 class DeliveryMethodType(Enum):
@@ -39,6 +40,7 @@ class MethodStatus(Enum):
     CANCELLED = "CANCELLED"
 
 
+@trace_persistence
 class DeliverySystem:
     """
     Manages delivery jobs with multiple methods.
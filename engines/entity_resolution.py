@@ -0,0 +1,338 @@
+"""
+Entity Resolution for Semptify
+Recognizes that "ABC Property Mgmt" and "ABC Property Management LLC" are
+the same landlord, so reports about one company don't fragment.
+
+Names are normalized into a blocking key (case, punctuation, common
+abbreviations and legal suffixes). Only an exact key match resolves a
+name to an existing entity: "Kim Property Management" and "Kin Property
+Management" are different landlords, and merging them would put one's
+complaints on the other. Fuzzy matches are suggestions (find_entities)
+or inputs to an explicit merge. They come from a trigram index over the
+distinctive part of each name (industry filler words removed), using only
+the query's rarest trigrams (prefix filtering), and are verified with
+trigram Jaccard similarity.
+
+Entity attributes are kept as sets and counters, and fees as per-type
+summaries (count, min, max, sum and a sample for the median) instead of an
+ever-growing list.
+"""
+
+import os
+import random
+import re
+from collections import Counter
+from datetime import datetime
+from math import ceil
+from typing import Dict, List, Optional, Set, Tuple
+
+# Minimum trigram Jaccard similarity (of the distinctive words) for a
+# fuzzy suggestion
+ENTITY_MATCH_THRESHOLD = float(os.getenv("ENTITY_MATCH_THRESHOLD", "0.8"))
+# Fee amounts sampled per fee type for the median estimate
+FEE_SAMPLE_SIZE = int(os.getenv("ENTITY_FEE_SAMPLE_SIZE", "32"))
+# Extra rare trigrams counted per fuzzy lookup; candidates must share one
+# more of them than this before the full similarity is computed
+PREFIX_EXTRA = 1
+
+APPLICATION_FEE_CAP = 58.23  # CA 2025 max
+
+ABBREVIATIONS = {
+    "mgmt": "management", "mgt": "management", "mngmt": "management", "mngt": "management",
+    "mgr": "manager", "prop": "property", "props": "properties", "apts": "apartments",
+    "assoc": "association", "assn": "association", "grp": "group", "svc": "services",
+    "svcs": "services", "rlty": "realty", "intl": "international", "natl": "national",
+    "bros": "brothers", "hldgs": "holdings",
+}
+
+LEGAL_SUFFIXES = {
+    "llc", "inc", "incorporated", "corp", "corporation", "co", "company",
+    "ltd", "limited", "lp", "llp", "pllc", "plc", "the",
+}
+
+# Generic words that make unrelated company names look alike
+FILLER_WORDS = {
+    "property", "properties", "management", "residential", "group", "apartments",
+    "realty", "services", "rentals", "homes", "housing", "holdings", "real", "estate",
+}
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_NUMBERS = re.compile(r"\d+")
+
+_rng = random.Random()
+
+
+def normalize_entity_name(name: str) -> str:
+    """Blocking key for an entity name."""
+    text = name.lower().replace("&", " and ").replace("l.l.c", "llc")
+    tokens = [ABBREVIATIONS.get(t, t) for t in _NON_ALNUM.sub(" ", text).split()]
+    kept = [t for t in tokens if t not in LEGAL_SUFFIXES]
+    return " ".join(kept or tokens)
+
+
+def distinctive_name(normalized: str) -> str:
+    """Normalized name without filler words ("kim" for "kim property management")."""
+    kept = [t for t in normalized.split() if t not in FILLER_WORDS]
+    return " ".join(kept) or normalized
+
+
+def number_key(normalized: str) -> str:
+    """Numbers in a name; "Unit 5 Properties" and "Unit 6 Properties" differ."""
+    return " ".join(_NUMBERS.findall(normalized))
+
+
+def trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    overlap = len(a & b)
+    return overlap / (len(a) + len(b) - overlap)
+
+
+# ============================================================================
+# Entity records
+# ============================================================================
+
+def new_entity(name: str, entity_type: str) -> Dict:
+    return {
+        "name": name,
+        "type": entity_type,
+        "first_seen": datetime.utcnow().isoformat(),
+        "report_count": 0,
+        "aliases": {name},
+        "addresses": set(),
+        "contacts": set(),
+        "fees": {},  # fee type -> summary
+        "issues": Counter(),
+        "complaints": 0,
+        "court_cases": 0,
+        "outcomes": {"tenant_won": 0, "landlord_won": 0, "settled": 0}
+    }
+
+
+def load_entity(entity: Dict) -> Dict:
+    """Turn a stored entity (or a pre-resolution one) back into sets and summaries."""
+    entity["aliases"] = set(entity.get("aliases") or [entity["name"]])
+    entity["addresses"] = set(entity.get("addresses", []))
+    entity["contacts"] = set(entity.get("contacts", []))
+    issues = entity.get("issues", {})
+    entity["issues"] = Counter(issues if isinstance(issues, dict) else {i: 1 for i in issues})
+    fees = entity.get("fees", {})
+    if isinstance(fees, list):
+        summaries: Dict[str, Dict] = {}
+        for fee in fees:
+            add_fee(summaries, fee)
+        fees = summaries
+    entity["fees"] = fees
+    return entity
+
+
+def merge_entity(target: Dict, source: Dict) -> Dict:
+    """Fold source's reports into target."""
+    target["report_count"] += source["report_count"]
+    target["aliases"] |= source["aliases"]
+    target["addresses"] |= source["addresses"]
+    target["contacts"] |= source["contacts"]
+    target["issues"].update(source["issues"])
+    for fee_type, summary in source["fees"].items():
+        if fee_type in target["fees"]:
+            target["fees"][fee_type] = merge_fee_summaries(target["fees"][fee_type], summary)
+        else:
+            target["fees"][fee_type] = summary
+    target["complaints"] += source["complaints"]
+    target["court_cases"] += source["court_cases"]
+    for outcome, count in source["outcomes"].items():
+        target["outcomes"][outcome] = target["outcomes"].get(outcome, 0) + count
+    target["first_seen"] = min(target["first_seen"], source["first_seen"])
+    if source.get("last_seen"):
+        target["last_seen"] = max(target.get("last_seen") or "", source["last_seen"])
+    return target
+
+
+# ============================================================================
+# Fee summaries
+# ============================================================================
+
+def add_fee(summaries: Dict[str, Dict], fee: Dict):
+    """Add one {"type", "amount"} fee to the per-type summaries."""
+    amount = float(fee["amount"])
+    summary = summaries.setdefault(fee.get("type", "other"), {
+        "count": 0, "min": amount, "max": amount, "sum": 0.0, "over_cap": 0, "sample": []
+    })
+    summary["count"] += 1
+    summary["min"] = min(summary["min"], amount)
+    summary["max"] = max(summary["max"], amount)
+    summary["sum"] += amount
+    if fee.get("type") == "application" and amount > APPLICATION_FEE_CAP:
+        summary["over_cap"] += 1
+    # Reservoir sample: every amount seen has the same chance of being kept
+    if len(summary["sample"]) < FEE_SAMPLE_SIZE:
+        summary["sample"].append(amount)
+    else:
+        slot = _rng.randrange(summary["count"])
+        if slot < FEE_SAMPLE_SIZE:
+            summary["sample"][slot] = amount
+
+
+def merge_fee_summaries(a: Dict, b: Dict) -> Dict:
+    count = a["count"] + b["count"]
+    sample = list(a["sample"]) + list(b["sample"])
+    if len(sample) > FEE_SAMPLE_SIZE:
+        # Draw from each side in proportion to how many fees it represents
+        pools = (list(a["sample"]), list(b["sample"]))
+        sample = []
+        while len(sample) < FEE_SAMPLE_SIZE and (pools[0] or pools[1]):
+            side = 0 if pools[0] and (not pools[1] or _rng.random() < a["count"] / count) else 1
+            sample.append(pools[side].pop(_rng.randrange(len(pools[side]))))
+    return {"count": count, "min": min(a["min"], b["min"]), "max": max(a["max"], b["max"]),
+            "sum": a["sum"] + b["sum"], "over_cap": a.get("over_cap", 0) + b.get("over_cap", 0),
+            "sample": sample}
+
+
+def fee_report(summary: Dict) -> Dict:
+    """Public view of a fee summary."""
+    sample = sorted(summary["sample"])
+    return {
+        "count": summary["count"],
+        "min": summary["min"],
+        "max": summary["max"],
+        "average": round(summary["sum"] / summary["count"], 2),
+        "median": sample[len(sample) // 2] if sample else None,
+        "over_cap": summary.get("over_cap", 0)
+    }
+
+
+# ============================================================================
+# Index
+# ============================================================================
+
+class EntityIndex:
+    """
+    Resolves names to entity keys over a dict of entities.
+
+    Every alias of every entity is indexed by its normalized form (exact
+    lookups) and by its trigrams (fuzzy lookups). Entities stored under a
+    non-normalized key, or whose names normalize to the same key, are
+    re-keyed and merged when the index is built.
+    """
+
+    def __init__(self, entities: Dict[str, Dict], threshold: float = ENTITY_MATCH_THRESHOLD):
+        self.entities = entities
+        self.threshold = threshold
+        self._aliases: Dict[str, str] = {}  # normalized alias -> entity key
+        self._grams: Dict[str, Set[str]] = {}  # normalized alias -> trigrams
+        # number key -> trigram -> normalized aliases; names only match
+        # names with the same numbers in them
+        self._postings: Dict[str, Dict[str, Set[str]]] = {}
+
+        stored = list(entities.items())
+        entities.clear()
+        for key, entity in stored:
+            load_entity(entity)
+            canonical = normalize_entity_name(entity["name"]) or key
+            if canonical in entities:
+                merge_entity(entities[canonical], entity)
+            else:
+                entities[canonical] = entity
+        for key, entity in entities.items():
+            for alias in entity["aliases"]:
+                self._index_alias(normalize_entity_name(alias), key)
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+    def _index_alias(self, normalized: str, key: str):
+        self._aliases[normalized] = key
+        if normalized not in self._grams:
+            grams = self._grams[normalized] = trigrams(distinctive_name(normalized))
+            postings = self._postings.setdefault(number_key(normalized), {})
+            for gram in grams:
+                postings.setdefault(gram, set()).add(normalized)
+
+    def candidates(self, name: str, limit: int = 5) -> List[Tuple[str, float]]:
+        """Entity keys whose aliases look like name, best first (suggestions only)."""
+        normalized = normalize_entity_name(name)
+        if normalized in self._aliases:
+            return [(self._aliases[normalized], 1.0)]
+
+        postings = self._postings.get(number_key(normalized))
+        if not postings:
+            return []
+        query = trigrams(distinctive_name(normalized))
+        n = len(query)
+        # A match with Jaccard >= threshold shares at least ceil(threshold * n)
+        # of the query's trigrams, so at least `extra + 1` of its rarest
+        # `n - ceil(threshold * n) + 1 + extra`. Only those postings are
+        # counted, and only aliases that reach the count are verified.
+        extra = min(PREFIX_EXTRA, ceil(self.threshold * n) - 1)
+        prefix = sorted(query, key=lambda g: len(postings.get(g, ())))[:n - ceil(self.threshold * n) + 1 + extra]
+        counts: Counter = Counter()
+        for gram in prefix:
+            counts.update(postings.get(gram, ()))
+
+        scores: Dict[str, float] = {}
+        low, high = self.threshold * n, n / self.threshold
+        for alias, shared in counts.items():
+            if shared <= extra:
+                continue
+            grams = self._grams[alias]
+            if not low <= len(grams) <= high:
+                continue
+            score = similarity(query, grams)
+            if score >= self.threshold:
+                key = self._aliases[alias]
+                scores[key] = max(score, scores.get(key, 0.0))
+        return sorted(scores.items(), key=lambda item: -item[1])[:limit]
+
+    def resolve(self, name: str, fuzzy: bool = False) -> Optional[str]:
+        """
+        Key of the entity this name refers to, or None if it is new. Only
+        exact blocking-key matches count unless fuzzy is set.
+        """
+        if not fuzzy:
+            return self._aliases.get(normalize_entity_name(name))
+        found = self.candidates(name, limit=1)
+        return found[0][0] if found else None
+
+    def add(self, name: str, entity_type: str) -> str:
+        """Resolve name exactly, creating the entity if needed; records the alias."""
+        key = self.resolve(name)
+        if key is None:
+            key = normalize_entity_name(name) or name.lower().strip()
+            self.entities[key] = new_entity(name, entity_type)
+            self._index_alias(normalize_entity_name(name), key)
+        entity = self.entities[key]
+        if name not in entity["aliases"]:
+            entity["aliases"].add(name)
+            self._index_alias(normalize_entity_name(name), key)
+        return key
+
+    def merge(self, keep: str, other: str) -> str:
+        """Merge entity `other` into `keep`; both are entity keys."""
+        if keep == other:
+            return keep
+        source = self.entities.pop(other)
+        merge_entity(self.entities[keep], source)
+        for alias in source["aliases"]:
+            self._aliases[normalize_entity_name(alias)] = keep
+        return keep
+
+
+def serialize_entities(entities: Dict[str, Dict]) -> Dict[str, Dict]:
+    """JSON-ready copy of the entities (sets become sorted lists)."""
+    return {
+        key: {**entity,
+              "aliases": sorted(entity["aliases"]),
+              "addresses": sorted(entity["addresses"]),
+              "contacts": sorted(entity["contacts"]),
+              "issues": dict(entity["issues"])}
+        for key, entity in entities.items()
+    }
+
+
+def top_issues(issues: Counter, limit: int = 5) -> List[str]:
+    return [issue for issue, _ in issues.most_common(limit)]
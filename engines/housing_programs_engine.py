@@ -33,16 +33,62 @@ Used site-wide:
 
 import json
 import os
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from enum import Enum
 import logging
 
+from engines.jurisdiction_engine import jurisdiction_state
+from profiling import trace_persistence
+from response_cache import invalidate_tags
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# 2024 federal poverty guidelines (approximate - these update annually)
+POVERTY_LINE_BASE = 15060  # For 1 person
+POVERTY_LINE_PER_ADDITIONAL = 5380
+
+# Income limits as percent of poverty line, ascending. A household at or
+# below a limit is likely eligible for that tier and every tier above it.
+ELIGIBILITY_TIERS = [
+    (50, [
+        "Section 8 Housing Choice Voucher (very low income)",
+        "Public Housing",
+        "Legal Aid (most programs)",
+        "Most state and local assistance programs"
+    ]),
+    (80, [
+        "Section 8 (low income priority)",
+        "ERAP (if still available)",
+        "Some legal aid programs"
+    ]),
+    (125, [
+        "Legal Services Corporation funded legal aid"
+    ]),
+    (150, [
+        "LIHEAP (in most states)",
+        "Weatherization programs",
+        "Some state rental assistance"
+    ]),
+]
+_TIER_LIMITS = [limit for limit, _ in ELIGIBILITY_TIERS]
+# Programs for each income band (band i = at or below _TIER_LIMITS[i])
+_BAND_PROGRAMS = [
+    [name for _, names in ELIGIBILITY_TIERS[band:] for name in names]
+    for band in range(len(ELIGIBILITY_TIERS) + 1)
+]
+
+ELIGIBILITY_NOTE = "Eligibility varies by program and location. Many programs have additional requirements beyond income. Apply even if you're close to the limits - some programs have flexibility."
+
+# discover_programs() results kept per normalized query
+DISCOVERY_CACHE_SIZE = int(os.getenv("HOUSING_PROGRAMS_CACHE_SIZE", "256"))
+
+
 class ProgramCategory(Enum):
     """Categories of housing assistance programs"""
     RENT_ASSISTANCE = "rent_assistance"
@@ -79,6 +125,7 @@ class UrgencyLevel(Enum):
     EMERGENCY = "emergency"  # Within 24-48 hours (eviction, shutoff)
 
 
+@trace_persistence
 class HousingProgramsEngine:
     """
     Engine to discover and recommend housing programs and resources.
@@ -103,6 +150,10 @@ class HousingProgramsEngine:
         self.contacts = self._load_contacts()
         self.outcomes = self._load_outcomes()
         
+        # Program index and discovery cache (rebuilt when programs/outcomes change)
+        self._discovery_cache: "OrderedDict[tuple, Dict]" = OrderedDict()
+        self._build_program_index()
+        
         # Save initial database if just created
         if not os.path.exists(self.programs_file):
             self._save_programs()
@@ -141,6 +192,7 @@ class HousingProgramsEngine:
         """Save program database"""
         with open(self.programs_file, 'w') as f:
             json.dump(self.programs, f, indent=2)
+        self._build_program_index()
     
     def _save_applications(self):
         """Save application tracking"""
@@ -156,6 +208,56 @@ class HousingProgramsEngine:
         """Save outcomes data"""
         with open(self.outcomes_file, 'w') as f:
             json.dump(self.outcomes, f, indent=2)
+        # Effectiveness scores feed the program ordering
+        self.clear_discovery_cache()
+    
+    # ========================================================================
+    # PROGRAM INDEX & DISCOVERY CACHE
+    # ========================================================================
+    
+    def _build_program_index(self):
+        """Index federal programs and local templates by category."""
+        self._federal_by_category: Dict[Optional[str], List[Tuple[int, str, Dict]]] = defaultdict(list)
+        for position, (program_id, program_data) in enumerate(self.programs.get("federal", {}).items()):
+            self._federal_by_category[program_data.get("category")].append((position, program_id, program_data))
+        
+        self._templates_by_category: Dict[str, Dict[Optional[str], List[Tuple[int, Dict]]]] = {}
+        for template_key in ("state_template", "county_template", "city_template"):
+            by_category = defaultdict(list)
+            for position, prog in enumerate(self.programs.get(template_key, {}).get("common_programs", [])):
+                by_category[prog.get("category")].append((position, prog))
+            self._templates_by_category[template_key] = by_category
+        
+        self.clear_discovery_cache()
+    
+    @staticmethod
+    def _select(by_category: Dict, categories: Optional[List[str]]) -> List[Tuple]:
+        """Entries for the requested categories (all if None), in database order."""
+        if categories:
+            selected = [entry for category in set(categories) for entry in by_category.get(category, [])]
+        else:
+            selected = [entry for entries in by_category.values() for entry in entries]
+        selected.sort(key=lambda entry: entry[0])
+        return selected
+    
+    @staticmethod
+    def _discovery_key(categories, urgency, special_needs, for_landlord) -> tuple:
+        """
+        Normalize a discovery query so equivalent requests share a cache
+        entry. The cached sections don't depend on the location: sections
+        that name it are built per request from the caller's spelling.
+        """
+        return (
+            tuple(sorted(set(categories))) if categories else None,
+            urgency,
+            tuple(sorted(set(special_needs))) if special_needs else None,
+            bool(for_landlord),
+        )
+    
+    def clear_discovery_cache(self):
+        """Drop cached discovery results (e.g. after editing programs by hand)."""
+        self._discovery_cache.clear()
+        invalidate_tags("housing_programs")
     
     def _initialize_programs_database(self) -> Dict:
         """
@@ -523,43 +625,72 @@ class HousingProgramsEngine:
         """
         logger.info(f"Discovering programs for {location.get('city', 'unknown')}, {location.get('state', 'unknown')}")
         
+        # Federal programs, first steps and emergency contacts depend only on
+        # the normalized query, so identical searches are served from the cache
+        cache_key = self._discovery_key(categories, urgency, special_needs, for_landlord)
+        cached = self._discovery_cache.get(cache_key)
+        if cached is None:
+            cached = self._discover_uncached(categories, urgency, special_needs, for_landlord)
+            self._discovery_cache[cache_key] = cached
+            while len(self._discovery_cache) > DISCOVERY_CACHE_SIZE:
+                self._discovery_cache.popitem(last=False)
+        else:
+            self._discovery_cache.move_to_end(cache_key)
+        
         result = {
             "location": location,
             "search_date": datetime.now().isoformat(),
             "urgency": urgency,
+            # Fresh lists/entries so callers can annotate results safely
+            **{section: [dict(entry) for entry in entries] for section, entries in cached.items()},
+            **self._local_programs(location, categories, for_landlord),
+            "eligibility_guidance": {}
+        }
+        
+        # Eligibility guidance
+        if household_size and annual_income:
+            result["eligibility_guidance"] = self._calculate_eligibility(
+                household_size, annual_income, location.get("state")
+            )
+        
+        return result
+    
+    def _local_programs(
+        self,
+        location: Dict[str, str],
+        categories: Optional[List[str]],
+        for_landlord: bool
+    ) -> Dict:
+        """State, county, city and nonprofit entries, named with the caller's spelling."""
+        location = {field: (location.get(field) or "").strip() for field in ("city", "county", "state", "zip")}
+        return {
+            # State programs (with location-specific lookup guidance)
+            "state_programs": self._get_state_programs(location["state"], categories, for_landlord),
+            # County and city programs (guidance for local discovery)
+            "county_programs": self._get_county_programs(location["county"], location["state"], categories),
+            "city_programs": self._get_city_programs(
+                location["city"], location["state"], categories, for_landlord
+            ),
+            "nonprofit_resources": self._get_nonprofit_resources(location, categories),
+        }
+    
+    def _discover_uncached(
+        self,
+        categories: Optional[List[str]],
+        urgency: str,
+        special_needs: Optional[List[str]],
+        for_landlord: bool
+    ) -> Dict:
+        """Build the location-independent program lists for a discovery query."""
+        result = {
             "federal_programs": [],
-            "state_programs": [],
-            "county_programs": [],
-            "city_programs": [],
-            "nonprofit_resources": [],
             "recommended_first_steps": [],
-            "emergency_contacts": [],
-            "eligibility_guidance": {}
+            "emergency_contacts": []
         }
         
         # Get federal programs
         result["federal_programs"] = self._get_federal_programs(
-            categories, household_size, annual_income, special_needs, for_landlord
-        )
-        
-        # Get state programs (with location-specific lookup guidance)
-        result["state_programs"] = self._get_state_programs(
-            location.get("state"), categories, for_landlord
-        )
-        
-        # Get county programs (guidance for local discovery)
-        result["county_programs"] = self._get_county_programs(
-            location.get("county"), location.get("state"), categories
-        )
-        
-        # Get city programs (guidance for local discovery)
-        result["city_programs"] = self._get_city_programs(
-            location.get("city"), location.get("state"), categories, for_landlord
-        )
-        
-        # Get nonprofit resources
-        result["nonprofit_resources"] = self._get_nonprofit_resources(
-            location, categories
+            categories, None, None, special_needs, for_landlord
         )
         
         # Generate recommended first steps based on urgency
@@ -569,15 +700,7 @@ class HousingProgramsEngine:
         
         # Emergency contacts if urgent
         if urgency in ["urgent", "emergency"]:
-            result["emergency_contacts"] = self._get_emergency_contacts(
-                location, categories
-            )
-        
-        # Eligibility guidance
-        if household_size and annual_income:
-            result["eligibility_guidance"] = self._calculate_eligibility(
-                household_size, annual_income, location.get("state")
-            )
+            result["emergency_contacts"] = self._get_emergency_contacts(categories)
         
         return result
     
@@ -592,11 +715,7 @@ class HousingProgramsEngine:
         """Get applicable federal programs"""
         programs = []
         
-        for program_id, program_data in self.programs.get("federal", {}).items():
-            # Skip if not matching category filter
-            if categories and program_data.get("category") not in categories:
-                continue
-            
+        for _, program_id, program_data in self._select(self._federal_by_category, categories):
             # Skip landlord programs if tenant, and vice versa
             if for_landlord and not program_data.get("for_landlords"):
                 continue
@@ -635,21 +754,14 @@ class HousingProgramsEngine:
             return []
         
         # Check if we have state-specific data
-        state_key = f"state_{state.upper()}"
+        state_key = f"state_{jurisdiction_state(state).upper()}"
         if state_key in self.programs:
             # We have specific data for this state
             return self.programs[state_key]
         
         # Otherwise, return template with lookup guidance
-        template = self.programs.get("state_template", {})
-        common_programs = template.get("common_programs", [])
-        
         result = []
-        for prog in common_programs:
-            # Filter by category
-            if categories and prog.get("category") not in categories:
-                continue
-            
+        for _, prog in self._select(self._templates_by_category["state_template"], categories):
             # Filter landlord vs tenant
             if for_landlord and not prog.get("for_landlords"):
                 continue
@@ -677,14 +789,8 @@ class HousingProgramsEngine:
         if not county:
             return []
         
-        template = self.programs.get("county_template", {})
-        common_programs = template.get("common_programs", [])
-        
         result = []
-        for prog in common_programs:
-            if categories and prog.get("category") not in categories:
-                continue
-            
+        for _, prog in self._select(self._templates_by_category["county_template"], categories):
             prog_copy = prog.copy()
             prog_copy["name"] = f"{county} County {prog['name']}"
             prog_copy["level"] = "county"
@@ -705,14 +811,8 @@ class HousingProgramsEngine:
         if not city:
             return []
         
-        template = self.programs.get("city_template", {})
-        common_programs = template.get("common_programs", [])
-        
         result = []
-        for prog in common_programs:
-            if categories and prog.get("category") not in categories:
-                continue
-            
+        for _, prog in self._select(self._templates_by_category["city_template"], categories):
             prog_copy = prog.copy()
             prog_copy["name"] = f"{city} {prog['name']}"
             prog_copy["level"] = "city"
@@ -837,7 +937,6 @@ class HousingProgramsEngine:
     
     def _get_emergency_contacts(
         self,
-        location: Dict[str, str],
         categories: Optional[List[str]]
     ) -> List[Dict]:
         """Get emergency contacts for urgent situations"""
@@ -888,53 +987,36 @@ class HousingProgramsEngine:
         state: Optional[str]
     ) -> Dict:
         """Calculate likely eligibility for programs"""
-        # 2024 federal poverty guidelines (approximate - these update annually)
-        poverty_line_base = 15060  # For 1 person
-        poverty_line_per_additional = 5380
-        
-        poverty_line = poverty_line_base + (household_size - 1) * poverty_line_per_additional
-        
-        income_percent = (annual_income / poverty_line) * 100
-        
-        guidance = {
-            "household_size": household_size,
-            "annual_income": annual_income,
-            "poverty_line": poverty_line,
-            "percent_of_poverty": round(income_percent, 1),
-            "likely_eligible_programs": []
-        }
-        
-        # Determine eligibility
-        if income_percent <= 50:
-            guidance["likely_eligible_programs"].extend([
-                "Section 8 Housing Choice Voucher (very low income)",
-                "Public Housing",
-                "Legal Aid (most programs)",
-                "Most state and local assistance programs"
-            ])
-        
-        if income_percent <= 80:
-            guidance["likely_eligible_programs"].extend([
-                "Section 8 (low income priority)",
-                "ERAP (if still available)",
-                "Some legal aid programs"
-            ])
-        
-        if income_percent <= 125:
-            guidance["likely_eligible_programs"].extend([
-                "Legal Services Corporation funded legal aid"
-            ])
-        
-        if income_percent <= 150:
-            guidance["likely_eligible_programs"].extend([
-                "LIHEAP (in most states)",
-                "Weatherization programs",
-                "Some state rental assistance"
-            ])
+        return self.evaluate_eligibility_batch([
+            {"household_size": household_size, "annual_income": annual_income, "state": state}
+        ])[0]
+    
+    def evaluate_eligibility_batch(self, households: List[Dict]) -> List[Dict]:
+        """
+        Eligibility guidance for many households in one call.
         
-        guidance["note"] = "Eligibility varies by program and location. Many programs have additional requirements beyond income. Apply even if you're close to the limits - some programs have flexibility."
+        Each household is {"household_size", "annual_income", "state"}.
+        Poverty lines and income percentages are computed column-wise, and
+        each household is placed in an income band by bisecting the sorted
+        tier limits; the program list for each band is precomputed.
+        """
+        sizes = [h["household_size"] for h in households]
+        incomes = [h["annual_income"] for h in households]
+        poverty_lines = [POVERTY_LINE_BASE + (size - 1) * POVERTY_LINE_PER_ADDITIONAL for size in sizes]
+        percents = [(income / line) * 100 for income, line in zip(incomes, poverty_lines)]
+        bands = [bisect_left(_TIER_LIMITS, percent) for percent in percents]
         
-        return guidance
+        return [
+            {
+                "household_size": size,
+                "annual_income": income,
+                "poverty_line": line,
+                "percent_of_poverty": round(percent, 1),
+                "likely_eligible_programs": list(_BAND_PROGRAMS[band]),
+                "note": ELIGIBILITY_NOTE
+            }
+            for size, income, line, percent, band in zip(sizes, incomes, poverty_lines, percents, bands)
+        ]
     
     def _get_effectiveness_score(self, program_id: str) -> float:
         """Get effectiveness score from outcomes data"""
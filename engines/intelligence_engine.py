@@ -8,13 +8,26 @@ Never auto-files, never forces decisions, never blocks actions.
 Shows what similar users did, presents options, lets user choose.
 """
 
+import atexit
 import os
 import json
+import threading
+import time
 from datetime import datetime, timedelta
 from collections import defaultdict, Counter
 from typing import Dict, List, Optional, Tuple
+from engines.entity_resolution import (
+    EntityIndex, add_fee, fee_report, serialize_entities, top_issues
+)
+from profiling import trace_persistence
 
+# learn_* calls are persisted in batches: after this many changes or this
+# many seconds since the last save, whichever comes first
+INTELLIGENCE_SAVE_EVERY = int(os.getenv("INTELLIGENCE_SAVE_EVERY", "50"))
+INTELLIGENCE_SAVE_INTERVAL = float(os.getenv("INTELLIGENCE_SAVE_INTERVAL", "5"))
 
+
+@trace_persistence
 class IntelligenceEngine:
     """
     Situational awareness from learned user experiences.
@@ -30,6 +43,11 @@ class IntelligenceEngine:
         self.data_dir = data_dir
         self.kb_file = os.path.join(data_dir, "knowledge_base.json")
         self.knowledge_base = self._load_knowledge_base()
+        self.entity_index = EntityIndex(self.knowledge_base["entities"])
+
+        self._lock = threading.RLock()
+        self._unsaved = 0
+        self._last_save = time.monotonic()
 
     def _load_knowledge_base(self) -> dict:
         """Load accumulated knowledge from all user experiences."""
@@ -66,8 +84,27 @@ class IntelligenceEngine:
     def _save_knowledge_base(self):
         """Persist learned intelligence."""
         os.makedirs(self.data_dir, exist_ok=True)
-        with open(self.kb_file, 'w') as f:
-            json.dump(self.knowledge_base, f, indent=2)
+        with self._lock:
+            snapshot = {**self.knowledge_base, "entities": serialize_entities(self.knowledge_base["entities"])}
+            tmp_path = self.kb_file + ".tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self.kb_file)
+            self._unsaved = 0
+            self._last_save = time.monotonic()
+
+    def _changed(self):
+        """Count a change; save once enough changes or time have built up."""
+        self._unsaved += 1
+        if (self._unsaved >= INTELLIGENCE_SAVE_EVERY
+                or time.monotonic() - self._last_save >= INTELLIGENCE_SAVE_INTERVAL):
+            self._save_knowledge_base()
+
+    def flush(self):
+        """Write pending changes now."""
+        with self._lock:
+            if self._unsaved:
+                self._save_knowledge_base()
 
     # ========================================================================
     # LEARN: Capture user input, decisions, and outcomes
@@ -88,43 +125,47 @@ class IntelligenceEngine:
                 "user_id": "anon_hash"  # anonymous
             }
         """
-        key = entity_name.lower().strip()
-
-        if key not in self.knowledge_base["entities"]:
-            self.knowledge_base["entities"][key] = {
-                "name": entity_name,
-                "type": entity_type,
-                "first_seen": datetime.utcnow().isoformat(),
-                "report_count": 0,
-                "addresses": [],
-                "contacts": [],
-                "fees": [],
-                "issues": [],
-                "complaints": 0,
-                "court_cases": 0,
-                "outcomes": {"tenant_won": 0, "landlord_won": 0, "settled": 0}
-            }
+        with self._lock:
+            key = self.entity_index.add(entity_name, entity_type)
+            entity = self.knowledge_base["entities"][key]
+            entity["report_count"] += 1
+            entity["last_seen"] = datetime.utcnow().isoformat()
 
-        entity = self.knowledge_base["entities"][key]
-        entity["report_count"] += 1
-        entity["last_seen"] = datetime.utcnow().isoformat()
+            # Aggregate data
+            if "address" in data:
+                entity["addresses"].add(data["address"])
 
-        # Aggregate data
-        if "address" in data and data["address"] not in entity["addresses"]:
-            entity["addresses"].append(data["address"])
+            if "contact" in data:
+                entity["contacts"].add(data["contact"])
 
-        if "contact" in data and data["contact"] not in entity["contacts"]:
-            entity["contacts"].append(data["contact"])
+            for fee in data.get("fees", []):
+                add_fee(entity["fees"], fee)
 
-        if "fees" in data:
-            entity["fees"].extend(data["fees"])
+            entity["issues"].update(data.get("issues", []))
 
-        if "issues" in data:
-            for issue in data["issues"]:
-                if issue not in entity["issues"]:
-                    entity["issues"].append(issue)
+            self._changed()
 
-        self._save_knowledge_base()
+    def merge_entities(self, keep_name: str, other_name: str) -> Optional[str]:
+        """
+        Merge two entities the resolver kept apart (e.g. a company and its
+        trading name, or a misspelling find_entities suggested). Names may
+        be fuzzy. Returns the surviving key, or None if either is unknown.
+        """
+        with self._lock:
+            keep = self.entity_index.resolve(keep_name, fuzzy=True)
+            other = self.entity_index.resolve(other_name, fuzzy=True)
+            if keep is None or other is None:
+                return None
+            self.entity_index.merge(keep, other)
+            self._changed()
+            return keep
+
+    def find_entities(self, name: str, limit: int = 5) -> List[Dict]:
+        """Known entities whose names look like `name`, best match first."""
+        return [
+            {"key": key, "name": self.knowledge_base["entities"][key]["name"], "score": round(score, 3)}
+            for key, score in self.entity_index.candidates(name, limit)
+        ]
 
     def learn_address(self, address: str, data: dict):
         """
@@ -169,7 +210,7 @@ class IntelligenceEngine:
                 if issue not in addr["issues"]:
                     addr["issues"].append(issue)
 
-        self._save_knowledge_base()
+        self._changed()
 
     def learn_user_decision(
         self,
@@ -240,7 +281,7 @@ class IntelligenceEngine:
             total_time = opt["avg_time_hours"] * (opt["chosen_count"] - 1) + context["time_invested_hours"]
             opt["avg_time_hours"] = total_time / opt["chosen_count"]
 
-        self._save_knowledge_base()
+        self._changed()
 
     # ========================================================================
     # INTELLIGENCE: Provide situational awareness (USER DECIDES)
@@ -251,8 +292,8 @@ class IntelligenceEngine:
         Get everything known about a landlord/agency.
         Returns intelligence for USER to consider.
         """
-        key = entity_name.lower().strip()
-        entity = self.knowledge_base["entities"].get(key)
+        key = self.entity_index.resolve(entity_name)
+        entity = self.knowledge_base["entities"].get(key) if key else None
 
         if not entity:
             return {
@@ -271,22 +312,21 @@ class IntelligenceEngine:
             risk_level = "MODERATE"
 
         # Fee analysis
-        illegal_fees = []
-        if "fees" in entity and entity["fees"]:
-            for fee in entity["fees"]:
-                if fee["type"] == "application" and fee["amount"] > 58.23:  # CA 2025 max
-                    illegal_fees.append(fee)
+        fees = {fee_type: fee_report(summary) for fee_type, summary in entity["fees"].items()}
+        illegal_fees = sum(report["over_cap"] for report in fees.values())
 
         return {
             "known": True,
             "name": entity["name"],
+            "also_known_as": sorted(entity["aliases"] - {entity["name"]}),
             "reports": report_count,
             "risk_level": risk_level,
             "complaints": entity["complaints"],
             "court_cases": entity["court_cases"],
-            "common_issues": entity["issues"][:5],  # Top 5
-            "illegal_fees_detected": len(illegal_fees),
-            "addresses": entity["addresses"],
+            "common_issues": top_issues(entity["issues"]),  # Top 5
+            "fees": fees,
+            "illegal_fees_detected": illegal_fees,
+            "addresses": sorted(entity["addresses"]),
             "outcomes": entity["outcomes"],
             "intelligence": self._generate_entity_insights(entity)
         }
@@ -469,4 +509,5 @@ def get_intelligence() -> IntelligenceEngine:
     global _intelligence
     if _intelligence is None:
         _intelligence = IntelligenceEngine()
+        atexit.register(_intelligence.flush)
     return _intelligence
@@ -8,9 +8,17 @@ ADAPTIVE VERSION: Automatically learns laws for ANY location from user data.
 
 import json
 import os
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from location_intelligence import get_location_intelligence
+from jurisdiction_detector import STATE_ABBR, normalize_state
+from profiling import trace_persistence
+from response_cache import invalidate_tags
+
+# Memoized (location, issue) law resolutions kept by the jurisdiction graph
+JURISDICTION_CACHE_SIZE = int(os.getenv("JURISDICTION_CACHE_SIZE", "1024"))
 
 
 @dataclass
@@ -27,25 +35,287 @@ class LegalAuthority:
     protective_level: int = 0  # Higher = more protective to tenant
 
 
+HIERARCHY = {
+    "federal": 5,
+    "state": 4,
+    "county": 3,
+    "city": 2,
+    "lease": 1
+}
+
+
+def jurisdiction_state(value: Optional[str]) -> str:
+    """Canonical state key ("MN" for "mn"/"Minnesota"); unknown values are just stripped."""
+    return normalize_state(value) or str(value or "").strip()
+
+
+def _precedence(law: LegalAuthority) -> Tuple[int, int]:
+    return (law.protective_level, HIERARCHY[law.level])
+
+
+def _authority(level: str, jurisdiction: str, key: str, law: Dict, default_level: int) -> LegalAuthority:
+    return LegalAuthority(
+        level=level,
+        jurisdiction=jurisdiction,
+        statute=law.get("statute"),
+        title=key,
+        requirement=law.get("requirement"),
+        deadline=law.get("deadline"),
+        penalty=law.get("penalty"),
+        category=law.get("category"),
+        protective_level=law.get("protective_level", default_level)
+    )
+
+
+class JurisdictionGraph:
+    """
+    Laws database compiled into jurisdiction nodes (federal → state →
+    county → city). Each node keeps its laws already bucketed by issue
+    category, so a lookup only merges the nodes on the location's path.
+    Merged, conflict-resolved results are memoized per normalized
+    location and issue; learned laws from location intelligence
+    invalidate the entries for their state through laws_version(state).
+
+    Owned by JurisdictionEngine; callers of get_jurisdiction_engine()
+    share one compiled graph and its memoized results.
+    """
+
+    LOCAL_PROTECTIVE = {"state": 4, "county": 3, "city": 2}
+
+    def __init__(self, laws: Dict, location_intel, cache_size: int = JURISDICTION_CACHE_SIZE):
+        self.location_intel = location_intel
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[tuple, Dict]" = OrderedDict()
+        self.compile(laws)
+
+    @staticmethod
+    def normalize_location(location: Optional[Dict] = None, **overrides) -> Dict[str, str]:
+        """Stripped city/county/state/zip strings plus the two-letter state code."""
+        merged = dict(location or {})
+        merged.update({k: v for k, v in overrides.items() if v is not None})
+        normalized = {
+            field: str(merged.get(field) or "").strip()
+            for field in ("city", "county", "state", "zip")
+        }
+        normalized["state_code"] = normalize_state(normalized["state"])
+        return normalized
+
+    def compile(self, laws: Dict):
+        """Precompute per-node, per-category law lists from the laws database."""
+        self._cache.clear()
+
+        # Federal: applies_to "all" laws go to every category. Entries keep
+        # their database position so merged lists stay in database order
+        self._federal_all: List[Tuple[int, LegalAuthority]] = []
+        self._federal_by_category: Dict[str, List[Tuple[int, LegalAuthority]]] = {}
+        for position, (key, law) in enumerate(laws.get("federal", {}).items()):
+            authority = _authority("federal", "USA", key, law, 5)
+            applies_to = law.get("applies_to")
+            if applies_to == "all":
+                self._federal_all.append((position, authority))
+            else:
+                for category in applies_to or []:
+                    self._federal_by_category.setdefault(category, []).append((position, authority))
+
+        # Everything else is a flat section keyed by state, county or city
+        # name; which level it acts as depends on where the query puts it
+        self._nodes: Dict[Tuple[str, str], Dict] = {}
+        for section, section_laws in laws.items():
+            if section == "federal" or not isinstance(section_laws, dict):
+                continue
+            for level in ("state", "county", "city"):
+                name = section.title() if level == "state" else section.replace("_", " ").title()
+                by_category: Dict[Optional[str], List[LegalAuthority]] = {}
+                everything: List[LegalAuthority] = []
+                for key, law in section_laws.items():
+                    if not isinstance(law, dict):
+                        continue
+                    authority = _authority(level, name, key, law, self.LOCAL_PROTECTIVE[level])
+                    by_category.setdefault(law.get("category"), []).append(authority)
+                    everything.append(authority)
+                self._nodes[(level, section)] = {"by_category": by_category, "all": everything}
+
+    def _federal_laws(self, issue_category: str) -> List[LegalAuthority]:
+        entries = self._federal_all + self._federal_by_category.get(issue_category, [])
+        return [authority for _, authority in sorted(entries, key=lambda entry: entry[0])]
+
+    def _state_node(self, state: str) -> Optional[Dict]:
+        node = self._nodes.get(("state", state.lower()))
+        if node is None and state:
+            # Accept "MN" for a "minnesota" section and vice versa
+            code = normalize_state(state)
+            for alias in (code.lower(), STATE_ABBR.get(code, "").lower()):
+                node = self._nodes.get(("state", alias))
+                if node is not None:
+                    break
+        return node
+
+    def _location_data(self, loc: Dict[str, str]) -> Dict:
+        location_key = f"{loc['city']}_{loc['state']}_{loc['zip']}"
+        if location_key not in self.location_intel.locations:
+            print(f"🔍 New location detected: {loc['city']}, {loc['state']} - discovering resources...")
+            # Pass the stripped strings so location intelligence stores it
+            # under the same key we look up next time
+            return self.location_intel.discover_resources(
+                {field: loc[field] for field in ("city", "county", "state", "zip")}
+            )
+        return self.location_intel.locations[location_key]
+
+    def _build(self, issue_category: str, loc: Dict[str, str]) -> List[LegalAuthority]:
+        applicable = self._federal_laws(issue_category)
+
+        # State laws learned for this location (dynamic, not compiled)
+        state = loc["state"]
+        state_laws = self._location_data(loc).get("laws", {}).get("state", {})
+        for key, law in state_laws.items():
+            if isinstance(law, dict) and issue_category in ["all", law.get("category")]:
+                applicable.append(_authority(
+                    "state", (state or law.get("jurisdiction") or "").title() or "State", key, law, 4
+                ))
+
+        # Compiled state node: matches the category, or everything for "all"
+        node = self._state_node(state)
+        if node:
+            applicable.extend(node["all"] if issue_category == "all" else node["by_category"].get(issue_category, []))
+
+        # County and city nodes: exact category only
+        for level, name in (("county", loc["county"]), ("city", loc["city"])):
+            node = self._nodes.get((level, name.lower().replace(" ", "_")))
+            if node:
+                applicable.extend(node["by_category"].get(issue_category, []))
+
+        # Sort by protective level (highest first), then by hierarchy
+        applicable.sort(key=_precedence, reverse=True)
+        return applicable
+
+    def _entry(self, issue_category: str, loc: Dict[str, str]) -> Dict:
+        key = (loc["city"], loc["county"], loc["state"], loc["zip"], issue_category)
+        version = self.location_intel.laws_version(loc["state"])
+        entry = self._cache.get(key)
+        if entry is not None and entry["version"] == version:
+            self._cache.move_to_end(key)
+            return entry
+
+        entry = {"version": version, "laws": self._build(issue_category, loc)}
+        self._cache[key] = entry
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return entry
+
+    def applicable_laws(self, issue_category: str, location: Dict[str, str]) -> List[LegalAuthority]:
+        """Laws for an issue at a location, most protective first."""
+        return list(self._entry(issue_category, self.normalize_location(location))["laws"])
+
+    def resolve(self, issue_category: str, location: Dict[str, str]) -> Tuple[List[LegalAuthority], Optional[LegalAuthority], str]:
+        """(laws, winning law, explanation) for an issue at a location, memoized."""
+        entry = self._entry(issue_category, self.normalize_location(location))
+        if "resolution" not in entry:
+            entry["resolution"] = resolve_law_conflict(entry["laws"])
+        winner, explanation = entry["resolution"]
+        return list(entry["laws"]), winner, explanation
+
+
+def resolve_law_conflict(laws: List[LegalAuthority]) -> Tuple[Optional[LegalAuthority], str]:
+    """
+    When multiple laws apply, determine which takes precedence.
+    Expects laws ordered most protective first.
+    """
+    if not laws:
+        return None, "No applicable laws found"
+
+    if len(laws) == 1:
+        return laws[0], f"Only {laws[0].statute} applies"
+
+    # Most protective law wins
+    winner = laws[0]
+
+    explanation = f"Multiple laws apply:\n"
+    for law in laws:
+        explanation += f"  - {law.level.upper()}: {law.statute} ({law.requirement})\n"
+
+    explanation += f"\n✅ APPLICABLE: {winner.statute}\n"
+    explanation += f"   Reason: Most protective standard (level {winner.protective_level})\n"
+
+    if winner.level == "city":
+        explanation += "   Local ordinance is stricter than state law (allowed)\n"
+    elif winner.level == "state":
+        explanation += "   State law applies (no stricter local ordinance)\n"
+
+    return winner, explanation
+
+
+@lru_cache(maxsize=512)
+def _procedural_steps(statute: Optional[str], deadline: Optional[str], category: str) -> Tuple[Dict, ...]:
+    """Procedural steps for a winning law; memoized since few distinct laws exist."""
+    steps = []
+
+    # Step 1: Always document
+    steps.append({
+        "step": 1,
+        "action": "Document the issue",
+        "required": "Photos, dates, detailed description",
+        "legal_basis": statute,
+        "deadline": "Immediately",
+        "validation": "Minimum 10 photos with timestamps"
+    })
+
+    # Step 2: Notice requirement
+    if category in ["health_hazard", "general_repair"]:
+        steps.append({
+            "step": 2,
+            "action": "Send written notice to landlord",
+            "required": "Certified mail with return receipt OR hand delivery with witness",
+            "legal_basis": "Civil Code §1942.4",
+            "deadline": "Before any rent action or complaint",
+            "validation": "Keep tracking number and copy of notice"
+        })
+
+    # Step 3: Wait period
+    if deadline:
+        steps.append({
+            "step": 3,
+            "action": f"Wait for landlord response",
+            "required": f"Landlord has {deadline} to respond/repair",
+            "legal_basis": statute,
+            "deadline": deadline,
+            "validation": "Document all communication during wait"
+        })
+
+    # Step 4: File complaint if ignored
+    if category in ["health_hazard", "general_repair"]:
+        steps.append({
+            "step": 4,
+            "action": "File complaint with authority",
+            "required": "Health Department OR Rent Board",
+            "legal_basis": statute,
+            "deadline": f"After {deadline} if landlord doesn't respond",
+            "validation": "Keep complaint filing receipt"
+        })
+
+    return tuple(steps)
+
+
+@trace_persistence
 class JurisdictionEngine:
     """
     Determines which laws apply based on location and issue type.
     Resolves conflicts by applying most protective standard.
     """
 
-    HIERARCHY = {
-        "federal": 5,
-        "state": 4,
-        "county": 3,
-        "city": 2,
-        "lease": 1
-    }
+    HIERARCHY = HIERARCHY
 
     def __init__(self, data_dir: str = "data"):
         self.data_dir = data_dir
         self.laws_file = os.path.join(data_dir, "laws_database.json")
         self.laws = self._load_laws()
         self.location_intel = get_location_intelligence()  # Adaptive learning
+        self.graph = JurisdictionGraph(self.laws, self.location_intel)
+
+    def reload_laws(self):
+        """Re-read the laws database and recompile the jurisdiction graph."""
+        self.laws = self._load_laws()
+        self.graph.compile(self.laws)
+        invalidate_tags("laws")
 
     def _load_laws(self) -> Dict:
         """
@@ -96,114 +366,10 @@ class JurisdictionEngine:
         Returns:
             List ordered by precedence (most protective first).
         """
-        applicable = []
-
-        # Normalize and extract location info (support both user_location and legacy args)
-        zip_code: Optional[str] = None
-        if user_location:
-            city = user_location.get("city", city)
-            county = user_location.get("county", county)
-            state = user_location.get("state", state)
-            zip_code = user_location.get("zip")
-
-        # Build a safe key for adaptive discovery (avoid None in f-strings)
-        location_key = f"{(city or '').strip()}_{(state or '').strip()}_{(zip_code or '').strip()}"
-        if location_key not in self.location_intel.locations:
-            print(f"🔍 New location detected: {city}, {state} - discovering resources...")
-            location_data = self.location_intel.discover_resources({
-                "city": city,
-                "county": county,
-                "state": state,
-                "zip": zip_code
-            })
-        else:
-            location_data = self.location_intel.locations[location_key]
-
-        # Federal laws (always apply)
-        for key, law in self.laws.get("federal", {}).items():
-            if law.get("applies_to") == "all" or issue_category in law.get("applies_to", []):
-                applicable.append(LegalAuthority(
-                    level="federal",
-                    jurisdiction="USA",
-                    statute=law.get("statute"),
-                    title=key,
-                    requirement=law.get("requirement"),
-                    deadline=law.get("deadline"),
-                    penalty=law.get("penalty"),
-                    category=law.get("category"),
-                    protective_level=law.get("protective_level", 5)
-                ))
-
-        # State laws (from discovered location data)
-        state_laws = location_data.get("laws", {}).get("state", {})
-        for key, law in state_laws.items():
-            if isinstance(law, dict) and (
-                law.get("category") == issue_category or
-                issue_category in ["all", law.get("category")]
-            ):
-                applicable.append(LegalAuthority(
-                    level="state",
-                    jurisdiction=(state or law.get("jurisdiction") or "").title() or "State",
-                    statute=law.get("statute"),
-                    title=key,
-                    requirement=law.get("requirement"),
-                    deadline=law.get("deadline"),
-                    penalty=law.get("penalty"),
-                    category=law.get("category"),
-                    protective_level=law.get("protective_level", 4)
-                ))
-
-        # State laws (from static database)
-        for key, law in self.laws.get((state or "").lower(), {}).items():
-            if law.get("category") == issue_category or issue_category in ["all", law.get("category")]:
-                applicable.append(LegalAuthority(
-                    level="state",
-                    jurisdiction=state.title(),
-                    statute=law.get("statute"),
-                    title=key,
-                    requirement=law.get("requirement"),
-                    deadline=law.get("deadline"),
-                    penalty=law.get("penalty"),
-                    category=law.get("category"),
-                    protective_level=law.get("protective_level", 4)
-                ))
-
-        # County laws
-        county_key = (county or "").lower().replace(" ", "_")
-        for key, law in self.laws.get(county_key, {}).items():
-            if law.get("category") == issue_category:
-                applicable.append(LegalAuthority(
-                    level="county",
-                    jurisdiction=county,
-                    statute=law.get("statute"),
-                    title=key,
-                    requirement=law.get("requirement"),
-                    deadline=law.get("deadline"),
-                    penalty=law.get("penalty"),
-                    category=law.get("category"),
-                    protective_level=law.get("protective_level", 3)
-                ))
-
-        # City laws
-        city_key = (city or "").lower().replace(" ", "_")
-        for key, law in self.laws.get(city_key, {}).items():
-            if law.get("category") == issue_category:
-                applicable.append(LegalAuthority(
-                    level="city",
-                    jurisdiction=city,
-                    statute=law.get("statute"),
-                    title=key,
-                    requirement=law.get("requirement"),
-                    deadline=law.get("deadline"),
-                    penalty=law.get("penalty"),
-                    category=law.get("category"),
-                    protective_level=law.get("protective_level", 2)
-                ))
-
-        # Sort by protective level (highest first), then by hierarchy
-        applicable.sort(key=lambda x: (x.protective_level, self.HIERARCHY[x.level]), reverse=True)
-
-        return applicable
+        # Normalize location info (support both user_location and legacy args);
+        # the compiled graph does the lookup and memoizes it
+        location = {"city": city, "county": county, "state": state, **(user_location or {})}
+        return self.graph.applicable_laws(issue_category, location)
 
     def resolve_conflict(
         self,
@@ -213,28 +379,7 @@ class JurisdictionEngine:
         When multiple laws apply, determine which takes precedence.
         Returns: (winning_law, explanation)
         """
-        if not laws:
-            return None, "No applicable laws found"
-
-        if len(laws) == 1:
-            return laws[0], f"Only {laws[0].statute} applies"
-
-        # Most protective law wins
-        winner = laws[0]
-
-        explanation = f"Multiple laws apply:\n"
-        for law in laws:
-            explanation += f"  - {law.level.upper()}: {law.statute} ({law.requirement})\n"
-
-        explanation += f"\n✅ APPLICABLE: {winner.statute}\n"
-        explanation += f"   Reason: Most protective standard (level {winner.protective_level})\n"
-
-        if winner.level == "city":
-            explanation += "   Local ordinance is stricter than state law (allowed)\n"
-        elif winner.level == "state":
-            explanation += "   State law applies (no stricter local ordinance)\n"
-
-        return winner, explanation
+        return resolve_law_conflict(laws)
 
     def get_procedural_requirements(
         self,
@@ -264,9 +409,10 @@ class JurisdictionEngine:
 
         category = category_map.get(issue_type, "general")
 
-        # Get applicable laws
-        laws = self.determine_applicable_laws(category, city, county, state)
-        winner, explanation = self.resolve_conflict(laws)
+        # Get applicable laws (memoized per location/category by the graph)
+        laws, winner, explanation = self.graph.resolve(
+            category, {"city": city, "county": county, "state": state, "zip": location.get("zip")}
+        )
 
         if not winner:
             return {
@@ -304,52 +450,7 @@ class JurisdictionEngine:
         category: str
     ) -> List[Dict]:
         """Generate procedural steps based on applicable law."""
-        steps = []
-
-        # Step 1: Always document
-        steps.append({
-            "step": 1,
-            "action": "Document the issue",
-            "required": "Photos, dates, detailed description",
-            "legal_basis": law.statute,
-            "deadline": "Immediately",
-            "validation": "Minimum 10 photos with timestamps"
-        })
-
-        # Step 2: Notice requirement
-        if category in ["health_hazard", "general_repair"]:
-            steps.append({
-                "step": 2,
-                "action": "Send written notice to landlord",
-                "required": "Certified mail with return receipt OR hand delivery with witness",
-                "legal_basis": "Civil Code §1942.4",
-                "deadline": "Before any rent action or complaint",
-                "validation": "Keep tracking number and copy of notice"
-            })
-
-        # Step 3: Wait period
-        if law.deadline:
-            steps.append({
-                "step": 3,
-                "action": f"Wait for landlord response",
-                "required": f"Landlord has {law.deadline} to respond/repair",
-                "legal_basis": law.statute,
-                "deadline": law.deadline,
-                "validation": "Document all communication during wait"
-            })
-
-        # Step 4: File complaint if ignored
-        if category in ["health_hazard", "general_repair"]:
-            steps.append({
-                "step": 4,
-                "action": "File complaint with authority",
-                "required": "Health Department OR Rent Board",
-                "legal_basis": law.statute,
-                "deadline": f"After {law.deadline} if landlord doesn't respond",
-                "validation": "Keep complaint filing receipt"
-            })
-
-        return steps
+        return [dict(step) for step in _procedural_steps(law.statute, law.deadline, category)]
 
 
 # Global instance
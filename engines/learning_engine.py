@@ -9,7 +9,9 @@ import json
 from datetime import datetime, timedelta
 from collections import defaultdict, Counter
 from typing import Dict, List, Optional
+from profiling import trace_persistence
 
+@trace_persistence
 class LearningEngine:
     """
     Lightweight ML that learns from user behavior WITHOUT external dependencies.
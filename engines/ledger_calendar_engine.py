@@ -16,6 +16,7 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 from pathlib import Path
 import threading
+from profiling import trace_persistence
 
 # Thread-safe access to ledger data
 _ledger_lock = threading.Lock()
@@ -80,6 +81,7 @@ class LedgerEntry:
         }
 
 
+@trace_persistence
 class Ledger:
     """Central ledger: append-only record of all actions."""
 
@@ -196,6 +198,7 @@ class CalendarEvent:
         }
 
 
+@trace_persistence
 class Calendar:
     """Calendar: time-based view of events and deadlines."""
 
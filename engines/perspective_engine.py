@@ -18,8 +18,10 @@ import json
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from collections import Counter
+from profiling import trace_persistence
 
 
+@trace_persistence
 class PerspectiveEngine:
     """
     Multi-source verification system with baseline neutral perspective.
@@ -418,6 +420,7 @@ class PerspectiveEngine:
 # SIMULATION ENGINE
 # ========================================================================
 
+@trace_persistence
 class SimulationEngine:
     """
     Run simulations to predict outcomes without bias.
@@ -0,0 +1,199 @@
+"""Background writer for logs/events.log.
+
+security.log_event() used to open, append to and close events.log on every
+call, from the request thread. Now the request thread only stamps the
+event, appends it to an in-memory ring (for admin views) and puts it on a
+bounded queue. A single daemon thread drains the queue in batches into one
+long-lived file handle and rotates the file by size:
+
+    events.log -> events.log.1.gz -> ... -> events.log.<EVENT_LOG_BACKUPS>.gz
+
+If the queue is full the event is dropped (and counted) instead of blocking
+the request. Write errors are counted and the last one is kept; see stats().
+Call flush() to wait for everything queued so far to hit the disk (tests,
+shutdown; it is also registered with atexit).
+"""
+
+import atexit
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+EVENT_LOG_QUEUE_SIZE = int(os.getenv("EVENT_LOG_QUEUE_SIZE", "10000"))
+EVENT_LOG_BATCH_SIZE = int(os.getenv("EVENT_LOG_BATCH_SIZE", "500"))
+EVENT_LOG_FLUSH_SECONDS = float(os.getenv("EVENT_LOG_FLUSH_SECONDS", "1.0"))
+EVENT_LOG_MAX_BYTES = int(os.getenv("EVENT_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+EVENT_LOG_BACKUPS = int(os.getenv("EVENT_LOG_BACKUPS", "5"))
+EVENT_LOG_RING_SIZE = int(os.getenv("EVENT_LOG_RING_SIZE", "500"))
+
+
+class EventLogWriter:
+    """Bounded queue + one writer thread + size-based gzip rotation."""
+
+    def __init__(self, path_func: Callable[[], str], max_bytes: int = EVENT_LOG_MAX_BYTES,
+                 backups: int = EVENT_LOG_BACKUPS, queue_size: int = EVENT_LOG_QUEUE_SIZE,
+                 ring_size: int = EVENT_LOG_RING_SIZE):
+        # path_func is called by the writer thread once per batch, so the
+        # request thread never touches the filesystem
+        self.path_func = path_func
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.queue_size = queue_size
+        self.recent = deque(maxlen=ring_size)
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._file = None
+        self._path: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._start_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Request side
+    # ------------------------------------------------------------------
+
+    def emit(self, event_type: str, details: dict = None) -> Dict:
+        event = {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'type': event_type,
+            'details': details or {},
+        }
+        self.recent.append(event)
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+        return event
+
+    def _ensure_thread(self):
+        # Restart after fork: the writer thread does not survive it
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                self._queue = queue.Queue(maxsize=self.queue_size)
+                self._file = None
+                self._path = None
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="event-log-writer", daemon=True)
+            self._thread.start()
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        q = self._queue
+        while True:
+            try:
+                batch = [q.get(timeout=EVENT_LOG_FLUSH_SECONDS)]
+            except queue.Empty:
+                continue
+            while len(batch) < EVENT_LOG_BATCH_SIZE:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            finally:
+                for _ in batch:
+                    q.task_done()
+
+    def _write(self, batch: List[Dict]):
+        try:
+            handle = self._open()
+            handle.write("".join(json.dumps(event, default=str) + "\n" for event in batch))
+            handle.flush()
+            self.written += len(batch)
+            if handle.tell() >= self.max_bytes:
+                self._rotate()
+        except Exception as e:
+            self.errors += 1
+            if self.last_error is None:
+                print(f"[WARN] Event log write failed: {e}")
+            self.last_error = str(e)
+            self._close()
+
+    def _open(self):
+        path = self.path_func()
+        if self._file is None or path != self._path:
+            self._close()
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._file = open(path, "a", encoding="utf-8")
+            self._path = path
+        return self._file
+
+    def _close(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except Exception:
+                pass
+        self._file = None
+
+    def _rotate(self):
+        path = self._path
+        self._close()
+        for i in range(self.backups - 1, 0, -1):
+            older = f"{path}.{i}.gz"
+            if os.path.exists(older):
+                os.replace(older, f"{path}.{i + 1}.gz")
+        if self.backups > 0:
+            with open(path, "rb") as src, gzip.open(f"{path}.1.gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+        os.remove(path)
+
+    # ------------------------------------------------------------------
+    # Introspection
+    # ------------------------------------------------------------------
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every queued event has been written (or timeout)."""
+        if self._thread is None or self._pid != os.getpid():
+            return True
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def recent_events(self, limit: int = 50) -> List[Dict]:
+        """Most recent events from this process, oldest first."""
+        events = list(self.recent)
+        return events[-limit:] if limit else events
+
+    def stats(self) -> Dict:
+        return {
+            'events_logged_total': self.written,
+            'events_dropped_total': self.dropped,
+            'event_log_errors_total': self.errors,
+            'queue_depth': self._queue.qsize(),
+            'last_error': self.last_error,
+        }
+
+
+_writer: Optional[EventLogWriter] = None
+
+
+def get_event_log(path_func: Callable[[], str] = None) -> EventLogWriter:
+    """Get the global writer; path_func is only used the first time."""
+    global _writer
+    if _writer is None:
+        _writer = EventLogWriter(path_func or (lambda: os.path.join("logs", "events.log")))
+        atexit.register(_writer.flush)
+    return _writer
@@ -9,12 +9,14 @@ Endpoints:
 - POST /api/programs/track-outcome - Track application outcome
 - GET /api/programs/intensity-recommendations - Get intensity-based recommendations
 - GET /api/programs/eligibility-check - Check eligibility for programs
+- POST /api/programs/eligibility-check/batch - Check eligibility for many households
 - GET /programs-for-landlords - Landlord resources page
 """
 
 from flask import Blueprint, render_template, request, jsonify
 import logging
 from engines.housing_programs_engine import HousingProgramsEngine, ProgramCategory, UrgencyLevel
+from response_cache import cached_response
 
 # Create blueprint
 housing_programs_bp = Blueprint('housing_programs', __name__)
@@ -32,6 +34,7 @@ def programs():  # Renamed to match template url_for('housing_programs_bp.progra
 
 
 @housing_programs_bp.route('/api/programs/search', methods=['POST'])
+@cached_response(ttl=300, tags=("housing_programs",), vary_on_body=True)
 def search_programs():
     """
     Search for housing programs based on location and criteria.
@@ -106,6 +109,7 @@ def search_programs():
 
 
 @housing_programs_bp.route('/api/programs/category/<category>')
+@cached_response(ttl=300, tags=("housing_programs",))
 def get_programs_by_category(category):
     """
     Get all programs in a specific category.
@@ -158,6 +162,7 @@ def get_programs_by_category(category):
 
 
 @housing_programs_bp.route('/api/programs/guide/<program_id>')
+@cached_response(ttl=300, tags=("housing_programs",))
 def get_application_guide(program_id):
     """
     Get detailed application guide for a specific program.
@@ -332,6 +337,55 @@ def check_eligibility():
         }), 500
 
 
+@housing_programs_bp.route('/api/programs/eligibility-check/batch', methods=['POST'])
+def check_eligibility_batch():
+    """
+    Check eligibility for many households at once.
+    
+    Request body:
+    {
+        "households": [
+            {"household_size": 3, "annual_income": 28000, "state": "MN"},
+            ...
+        ]
+    }
+    
+    Returns eligibility guidance for each household, in order.
+    """
+    try:
+        data = request.get_json() or {}
+        households = data.get('households')
+        
+        if not isinstance(households, list) or not households:
+            return jsonify({
+                "error": "households must be a non-empty list"
+            }), 400
+        
+        normalized = []
+        for household in households:
+            if not all([household.get('household_size'), household.get('annual_income'), household.get('state')]):
+                return jsonify({
+                    "error": "each household needs household_size, annual_income, and state"
+                }), 400
+            normalized.append({
+                "household_size": int(household['household_size']),
+                "annual_income": float(household['annual_income']),
+                "state": household['state']
+            })
+        
+        return jsonify({
+            "results": engine.evaluate_eligibility_batch(normalized),
+            "total": len(normalized)
+        })
+        
+    except Exception as e:
+        logger.error(f"Error checking batch eligibility: {str(e)}")
+        return jsonify({
+            "error": "Failed to check eligibility",
+            "detail": str(e)
+        }), 500
+
+
 @housing_programs_bp.route('/programs-for-landlords')
 def landlord_programs_page():
     """Landlord resources and programs page"""
@@ -339,6 +393,7 @@ def landlord_programs_page():
 
 
 @housing_programs_bp.route('/api/programs/all-categories')
+@cached_response(ttl=3600)
 def get_all_categories():
     """Get list of all program categories with descriptions"""
     categories = [
@@ -443,6 +498,7 @@ def get_all_categories():
 
 
 @housing_programs_bp.route('/api/programs/quick-help')
+@cached_response(ttl=3600)
 def get_quick_help():
     """
     Get immediate help contacts for emergency situations.
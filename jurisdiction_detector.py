@@ -37,6 +37,16 @@ STATE_REGEX = re.compile(r'\b(' + '|'.join([re.escape(name) for name in STATE_NA
 ABBR_REGEX = re.compile(r'\b(' + '|'.join(STATE_ABBR.keys()) + r')\b')
 
 
+def normalize_state(value: Any) -> str:
+    """Two-letter code for a state given as 'MN', 'mn' or 'Minnesota'; '' if unknown."""
+    if not value:
+        return ''
+    text = str(value).strip()
+    if text.upper() in STATE_ABBR:
+        return text.upper()
+    return STATE_NAMES.get(text.lower().replace('_', ' '), '')
+
+
 def detect_jurisdiction(context: Dict[str, Any]) -> Dict[str, Any]:
     """Infer likely U.S. state from multiple weak/strong signals.
     context keys: text, doc_text, registration_state, phone, ip, headers
@@ -0,0 +1,237 @@
+"""Lazy blueprint registration.
+
+Semptify.py used to import every feature module at startup just to call
+register_blueprint. Many of those modules do real work at import time
+(open SQLite, build engines, load knowledge bases), so cold start paid for
+all of it before serving a single request.
+
+Instead, each blueprint's URL rules are read from a small JSON manifest
+(blueprint_manifest.json, generated by scripts/build_blueprint_manifest.py)
+and registered against a stub view. The first request routed to one of
+those rules imports the module, registers the real blueprint on a private
+shadow app and grafts its view functions, hooks and error handlers onto
+the real app; later requests go straight to the real views.
+
+Set SEMPTIFY_LAZY_BLUEPRINTS=0 to register everything eagerly. Blueprints
+missing from the manifest, or flagged "eager" (they install app-wide
+hooks), are always registered eagerly.
+"""
+
+import importlib
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from flask import Flask, current_app, request
+
+MANIFEST_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "blueprint_manifest.json")
+LAZY_BLUEPRINTS = os.getenv("SEMPTIFY_LAZY_BLUEPRINTS", "1") == "1"
+
+# Per-blueprint dicts on Flask apps, keyed by blueprint name (None = app-wide)
+_SCAFFOLD_HOOKS = (
+    "before_request_funcs",
+    "after_request_funcs",
+    "teardown_request_funcs",
+    "url_value_preprocessors",
+    "url_default_functions",
+    "template_context_processors",
+)
+
+
+# ============================================================================
+# MANIFEST
+# ============================================================================
+
+def _import_blueprint(module_name: str, attr: str):
+    module = importlib.import_module(module_name)
+    return getattr(module, attr)
+
+
+def describe_blueprint(bp) -> Dict:
+    """Register bp on a scratch app and record its rules and app-wide hooks."""
+    scratch = Flask("blueprint_manifest")
+    before = {hook: len(getattr(scratch, hook).get(None, ())) for hook in _SCAFFOLD_HOOKS}
+    scratch.register_blueprint(bp)
+
+    rules = []
+    for rule in scratch.url_map.iter_rules():
+        if rule.endpoint == "static":
+            continue
+        auto_options = getattr(rule, "provide_automatic_options", False)
+        methods = sorted(m for m in rule.methods if m != "HEAD" and not (auto_options and m == "OPTIONS"))
+        rules.append({
+            "rule": rule.rule,
+            "endpoint": rule.endpoint,
+            "methods": methods,
+            "defaults": rule.defaults,
+            "strict_slashes": rule.strict_slashes,
+            "provide_automatic_options": auto_options,
+        })
+    rules.sort(key=lambda r: (r["rule"], r["endpoint"]))
+
+    app_wide = any(len(getattr(scratch, hook).get(None, ())) > before[hook] for hook in _SCAFFOLD_HOOKS)
+    app_wide = app_wide or bool(scratch.error_handler_spec.get(None))
+    return {"name": bp.name, "rules": rules, "eager": app_wide}
+
+
+def build_manifest(blueprints: List[Tuple[str, str]]) -> Dict:
+    """Import each (module, attribute) pair and describe its blueprint."""
+    entries = []
+    for module_name, attr in blueprints:
+        entry = {"module": module_name, "attr": attr}
+        try:
+            entry.update(describe_blueprint(_import_blueprint(module_name, attr)))
+        except (ImportError, AttributeError) as e:
+            entry["missing"] = str(e)
+        entries.append(entry)
+    return {"version": 1, "blueprints": entries}
+
+
+def load_manifest(path: str = MANIFEST_FILE) -> Dict[Tuple[str, str], Dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {(e["module"], e["attr"]): e for e in manifest.get("blueprints", [])}
+
+
+# ============================================================================
+# LAZY LOADING
+# ============================================================================
+
+class LazyBlueprint:
+    """One manifest entry whose module is imported on first use."""
+
+    def __init__(self, app: Flask, entry: Dict):
+        self.app = app
+        self.entry = entry
+        self.name = entry["name"]
+        self.loaded = False
+        self.error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def install(self):
+        """Add the manifest's URL rules, all pointing at stub views."""
+        for rule in self.entry["rules"]:
+            self.app.add_url_rule(
+                rule["rule"],
+                endpoint=rule["endpoint"],
+                view_func=self._stub(rule["endpoint"]),
+                methods=rule["methods"],
+                defaults=rule.get("defaults"),
+                strict_slashes=rule.get("strict_slashes"),
+                provide_automatic_options=rule.get("provide_automatic_options", True),
+            )
+
+    def _stub(self, endpoint: str):
+        def lazy_view(**kwargs):
+            self.load()
+            # This request was routed before the blueprint's own hooks
+            # existed on the app; run them now, as Flask would have.
+            blueprints = request.blueprints
+            for name in reversed(blueprints):
+                for fn in current_app.url_value_preprocessors.get(name, ()):
+                    fn(request.endpoint, request.view_args)
+            for name in reversed(blueprints):
+                for fn in current_app.before_request_funcs.get(name, ()):
+                    rv = current_app.ensure_sync(fn)()
+                    if rv is not None:
+                        return rv
+            view = current_app.view_functions[endpoint]
+            return current_app.ensure_sync(view)(**request.view_args)
+
+        lazy_view.__name__ = f"lazy_{endpoint.replace('.', '_')}"
+        lazy_view.lazy_blueprint = self.name
+        return lazy_view
+
+    def load(self):
+        """Import the module and graft its blueprint onto the app (once)."""
+        if self.loaded:
+            return
+        with self._lock:
+            if self.loaded:
+                return
+            bp = _import_blueprint(self.entry["module"], self.entry["attr"])
+            shadow = Flask(self.app.import_name, root_path=self.app.root_path)
+            shadow.config = self.app.config
+            shadow.extensions = self.app.extensions
+            shadow.jinja_env.filters.update(self.app.jinja_env.filters)
+            shadow.jinja_env.globals.update(self.app.jinja_env.globals)
+            shadow.jinja_env.tests.update(self.app.jinja_env.tests)
+            shadow.register_blueprint(bp)
+            self._graft(shadow)
+            self.loaded = True
+            print(f"[OK] {self.entry['attr']} loaded")
+
+    def _graft(self, shadow: Flask):
+        app = self.app
+        known = {rule["endpoint"] for rule in self.entry["rules"]}
+        for rule in shadow.url_map.iter_rules():
+            if rule.endpoint == "static":
+                continue
+            if rule.endpoint not in known:
+                # Manifest is stale; route the new rule anyway
+                print(f"[WARN] {rule.endpoint} missing from blueprint manifest; "
+                      f"run scripts/build_blueprint_manifest.py")
+                app.url_map.add(rule.empty())
+        for endpoint, view in shadow.view_functions.items():
+            if endpoint != "static":
+                app.view_functions[endpoint] = view
+
+        for hook in _SCAFFOLD_HOOKS:
+            target = getattr(app, hook)
+            for name, funcs in getattr(shadow, hook).items():
+                if name is None:
+                    target.setdefault(None, []).extend(f for f in funcs if f not in target.get(None, []))
+                else:
+                    target[name] = funcs
+        for name, handlers in shadow.error_handler_spec.items():
+            app.error_handler_spec[name] = handlers
+        for key in ("filters", "globals", "tests"):
+            getattr(app.jinja_env, key).update(getattr(shadow.jinja_env, key))
+        for name, blueprint in shadow.blueprints.items():
+            app.blueprints.setdefault(name, blueprint)
+
+
+def register_blueprints(app: Flask, blueprints: List[Tuple[str, str]],
+                        manifest: Optional[Dict] = None, lazy: bool = LAZY_BLUEPRINTS) -> Dict[str, LazyBlueprint]:
+    """
+    Register (module, attribute) blueprints in order, lazily where the
+    manifest allows it. Returns the lazy ones by blueprint name.
+    """
+    manifest = load_manifest() if manifest is None else manifest
+    pending = {}
+    for module_name, attr in blueprints:
+        entry = manifest.get((module_name, attr)) if lazy else None
+        if entry and "missing" in entry:
+            print(f"[SKIP] {attr}: {entry['missing']}")
+            continue
+        if entry and not entry.get("eager"):
+            lazy_bp = LazyBlueprint(app, entry)
+            lazy_bp.install()
+            pending[lazy_bp.name] = lazy_bp
+            continue
+        try:
+            app.register_blueprint(_import_blueprint(module_name, attr))
+            print(f"[OK] {attr} registered")
+        except (ImportError, AttributeError) as e:
+            print(f"[SKIP] {attr}: {e}")
+    if pending:
+        print(f"[OK] {len(pending)} blueprints registered lazily from manifest")
+    app.extensions["lazy_blueprints"] = pending
+    return pending
+
+
+def load_all(app: Flask) -> List[str]:
+    """Import every lazy blueprint now (e.g. to warm up after startup)."""
+    loaded = []
+    for name, lazy_bp in app.extensions.get("lazy_blueprints", {}).items():
+        try:
+            lazy_bp.load()
+            loaded.append(name)
+        except Exception as e:
+            lazy_bp.error = str(e)
+            print(f"[WARN] Could not load blueprint {name}: {e}")
+    return loaded
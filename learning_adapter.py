@@ -1,8 +1,21 @@
 """
 Learning Adapter - Generates dashboard components based on user data and learning engine
 Analyzes user stage, location, issue type, and history to populate dashboard
+
+Dashboards are memoized per user. The reasoning analysis is cached by
+(user_id, location, issue_type, stage, state version), and
+generate_dashboard_for_user() keeps a snapshot of each user's five
+components together with the inputs they were built from, rebuilding only
+the components whose inputs changed. Call invalidate_dashboard(user_id)
+when a user's learning state changes (actions, feedback, profile edits).
 """
 
+import copy
+import json
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
 from dashboard_components import (
     DashboardBuilder, RightsComponent, InformationComponent,
     InputComponent, NextStepsComponent, TimelineComponent
@@ -11,6 +24,99 @@ from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 from engines.reasoning_engine import get_reasoning_engine
 
+DASHBOARD_CACHE_SIZE = int(os.getenv("DASHBOARD_CACHE_SIZE", "1024"))
+# Upper bound on how stale a cached reasoning analysis may get (seconds)
+DASHBOARD_ANALYSIS_TTL = int(os.getenv("DASHBOARD_ANALYSIS_TTL", "300"))
+
+# (row, component name) in dashboard order
+DASHBOARD_ROWS = (
+    (1, "rights"),
+    (2, "information"),
+    (3, "input"),
+    (4, "next_steps"),
+    (5, "timeline"),
+)
+
+
+# ============================================================================
+# STATE VERSIONS / ANALYSIS CACHE
+# ============================================================================
+
+_cache_lock = threading.Lock()
+_state_versions: Dict[str, int] = {}
+_global_version = 0
+_analysis_cache: "OrderedDict[tuple, tuple]" = OrderedDict()  # key -> (computed_at, analysis)
+_snapshots: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_cache_stats: Counter = Counter()
+
+
+def dashboard_state_version(user_id: str) -> tuple:
+    """Version of everything a user's dashboard is derived from."""
+    with _cache_lock:
+        return (_global_version, _state_versions.get(user_id, 0))
+
+
+def invalidate_dashboard(user_id: Optional[str] = None):
+    """Mark a user's (or, with no user_id, every user's) dashboard as stale."""
+    global _global_version
+    with _cache_lock:
+        if user_id is None:
+            _global_version += 1
+        else:
+            _state_versions[user_id] = _state_versions.get(user_id, 0) + 1
+
+
+def dashboard_cache_stats() -> Dict[str, Any]:
+    with _cache_lock:
+        stats = dict(_cache_stats)
+        stats["snapshots"] = len(_snapshots)
+        stats["analyses"] = len(_analysis_cache)
+    return stats
+
+
+def clear_dashboard_cache():
+    with _cache_lock:
+        _analysis_cache.clear()
+        _snapshots.clear()
+        _cache_stats.clear()
+
+
+def _cached_analysis(user_id: str, location: str, issue_type: str, stage: str) -> Optional[Dict[str, Any]]:
+    """ReasoningEngine.analyze_situation(), memoized per user and state version."""
+    key = (user_id, location, issue_type, stage, dashboard_state_version(user_id))
+    now = time.monotonic()
+    with _cache_lock:
+        entry = _analysis_cache.get(key)
+        if entry is not None and now - entry[0] < DASHBOARD_ANALYSIS_TTL:
+            _analysis_cache.move_to_end(key)
+            _cache_stats["analysis_hits"] += 1
+            return entry[1]
+        _cache_stats["analysis_misses"] += 1
+
+    try:
+        analysis = get_reasoning_engine().analyze_situation(
+            user_id,
+            context={
+                "location": location,
+                "issue_type": issue_type,
+                "stage": stage
+            }
+        )
+    except Exception as e:
+        print(f"Reasoning engine error: {e}")
+        return None
+
+    with _cache_lock:
+        _analysis_cache[key] = (now, analysis)
+        _analysis_cache.move_to_end(key)
+        while len(_analysis_cache) > DASHBOARD_CACHE_SIZE:
+            _analysis_cache.popitem(last=False)
+    return analysis
+
+
+def _fingerprint(*parts) -> str:
+    return json.dumps(parts, sort_keys=True, default=str)
+
 
 class LearningAdapter:
     """Adapts learning engine output to dashboard components"""
@@ -97,48 +203,35 @@ class LearningAdapter:
         self.stage = user_data.get("stage", self.STAGE_SEARCHING)
         self.history = user_data.get("history", [])
         
-        # NEW: Get reasoning engine analysis
+        # NEW: Get reasoning engine analysis (memoized per user and state version)
         self.reasoning_engine = get_reasoning_engine()
-        self.reasoning_analysis = None
-        try:
-            self.reasoning_analysis = self.reasoning_engine.analyze_situation(
-                self.user_id,
-                context={
-                    "location": self.location,
-                    "issue_type": self.issue_type,
-                    "stage": self.stage
-                }
-            )
-        except Exception as e:
-            print(f"Reasoning engine error: {e}")
-            self.reasoning_analysis = None
+        self.reasoning_analysis = _cached_analysis(self.user_id, self.location, self.issue_type, self.stage)
 
     def build_dashboard(self) -> DashboardBuilder:
         """Generate complete dashboard with all 5 rows populated"""
         builder = DashboardBuilder()
-
-        # Row 1: Rights (always populated)
-        rights_component = self._build_rights_component()
-        builder.add_component(rights_component, 1)
-
-        # Row 2: Information (always populated)
-        info_component = self._build_information_component()
-        builder.add_component(info_component, 2)
-
-        # Row 3: Input (scales based on stage)
-        input_component = self._build_input_component()
-        builder.add_component(input_component, 3)
-
-        # Row 4: Next Steps (always populated)
-        steps_component = self._build_next_steps_component()
-        builder.add_component(steps_component, 4)
-
-        # Row 5: Timeline (always populated)
-        timeline_component = self._build_timeline_component()
-        builder.add_component(timeline_component, 5)
-
+        for row, name in DASHBOARD_ROWS:
+            builder.add_component(self.build_component(name), row)
         return builder
 
+    def build_component(self, name: str):
+        return getattr(self, f"_build_{name}_component")()
+
+    def component_inputs(self) -> Dict[str, str]:
+        """Fingerprint of everything each component is built from."""
+        analysis = self.reasoning_analysis or {}
+        situation = analysis.get("situation", {})
+        data = self.user_data if hasattr(self.user_data, 'get') else {}
+        return {
+            "rights": _fingerprint(self.location, self.issue_type, situation.get("your_rights", [])[:3]),
+            "information": _fingerprint(self.stage, self.issue_type, analysis.get("analysis", {}),
+                                        situation.get("facts", [])[:2]),
+            "input": _fingerprint(self.stage, self.issue_type),
+            "next_steps": _fingerprint(self.stage, analysis.get("actions", [])[:5]),
+            "timeline": _fingerprint(self.stage, self.issue_type, datetime.now().date(),
+                                     *(data.get(k) for k in ("move_date", "court_date", "notice_date", "monthly_rent"))),
+        }
+
     def _build_rights_component(self) -> RightsComponent:
         """Build Row 1: Legal rights specific to location and issue - ENHANCED WITH REASONING ENGINE"""
         component = RightsComponent()
@@ -608,12 +701,42 @@ def generate_dashboard_for_user(user_id: str, user_data: Dict[str, Any]) -> Dict
     """
     user_data['user_id'] = user_id
     adapter = LearningAdapter(user_data)
-    dashboard = adapter.build_dashboard()
+    inputs = adapter.component_inputs()
+
+    with _cache_lock:
+        snapshot = _snapshots.get(user_id)
+        if snapshot is not None:
+            _snapshots.move_to_end(user_id)
+            snapshot = {"inputs": dict(snapshot["inputs"]), "components": dict(snapshot["components"])}
+    if snapshot is None:
+        snapshot = {"inputs": {}, "components": {}}
+
+    # Rebuild only the components whose inputs changed
+    rebuilt = 0
+    for name, fingerprint in inputs.items():
+        if snapshot["inputs"].get(name) != fingerprint:
+            snapshot["components"][name] = adapter.build_component(name).to_dict()
+            snapshot["inputs"][name] = fingerprint
+            rebuilt += 1
+
+    with _cache_lock:
+        _cache_stats["hits" if rebuilt == 0 else "misses"] += 1
+        _cache_stats["components_rebuilt"] += rebuilt
+        _snapshots[user_id] = snapshot
+        _snapshots.move_to_end(user_id)
+        while len(_snapshots) > DASHBOARD_CACHE_SIZE:
+            _snapshots.popitem(last=False)
 
     return {
         "user_id": user_id,
         "stage": adapter.stage,
         "issue_type": adapter.issue_type,
         "location": adapter.location,
-        "dashboard": dashboard.to_json()
+        "dashboard": {
+            "rows": [row for row, _ in DASHBOARD_ROWS],
+            "components": [
+                {"row": row, "component": copy.deepcopy(snapshot["components"][name])}
+                for row, name in DASHBOARD_ROWS
+            ]
+        }
     }
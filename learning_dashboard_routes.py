@@ -7,11 +7,13 @@ from flask import Blueprint, jsonify, request, render_template
 from engines.learning_engine import LearningEngine
 from engines.adaptive_intensity_engine import AdaptiveIntensityEngine
 from engines.curiosity_engine import CuriosityEngine
-from learning_adapter import LearningAdapter
+from learning_adapter import LearningAdapter, invalidate_dashboard
 from user_database import _get_db  # Only for logging actions
 from semptify_core import get_context  # Context Data System
+from dataclasses import asdict
 from datetime import datetime, timedelta
 import json
+from response_cache import cached_response, invalidate_tags
 
 learning_dashboard_bp = Blueprint('learning_dashboard', __name__)
 
@@ -53,6 +55,7 @@ def dashboard():
 
 
 @learning_dashboard_bp.route('/api/learning/dashboard')
+@cached_response(ttl=30, tags=("learning",), scope="user")
 def get_dashboard_data():
     """
     GET /api/learning/dashboard
@@ -65,7 +68,10 @@ def get_dashboard_data():
     curiosity = get_curiosity_engine()
     
     # Get context from Context Data System
-    context = get_context(str(user_id))
+    try:
+        context = get_context(str(user_id))
+    except ValueError:  # no such user yet
+        context = None
     
     # Extract user data
     user_row = context.user if context and context.user else None
@@ -104,13 +110,15 @@ def get_dashboard_data():
             'curiosity': []
         })
     
-    # Convert row to dict
-    user_data = dict(user_row)
+    user_data = asdict(user_row)
     
     # Get intensity level (check if we have situation data)
     intensity_level = 'collaborative'  # Default
     intensity_reason = 'Working on your case'
     
+    conn = _get_db()
+    cursor = conn.cursor()
+
     # Get recent interactions
     cursor.execute('''
         SELECT interaction_type, COUNT(*) as count
@@ -137,19 +145,12 @@ def get_dashboard_data():
     streak_row = cursor.fetchone()
     streak = streak_row['days'] if streak_row else 0
     
-    # Get upcoming deadlines from calendar
-    cursor.execute('''
-        SELECT COUNT(*) as count
-        FROM timeline_events
-        WHERE user_id = ?
-          AND status = 'upcoming'
-          AND date BETWEEN date('now') AND date('now', '+7 days')
-    ''', (user_id,))
-    
-    deadlines_row = cursor.fetchone()
-    deadlines = deadlines_row['count'] if deadlines_row else 0
-    
     conn.close()
+
+    # Upcoming deadlines: timeline events in the next week
+    today = datetime.now().date().isoformat()
+    week_out = (datetime.now() + timedelta(days=7)).date().isoformat()
+    deadlines = sum(1 for event in context.timeline if today <= (event.event_date or '')[:10] <= week_out)
     
     # Generate insights based on learning patterns
     insights = generate_insights(user_id, learning)
@@ -214,6 +215,8 @@ def log_action():
     conn.commit()
     conn.close()
     
+    invalidate_tags("learning")
+    invalidate_dashboard(user_id)
     return jsonify({'success': True, 'action': action_id})
 
 
@@ -251,6 +254,8 @@ def submit_feedback():
     
     conn.commit()
     conn.close()
+    invalidate_tags("learning")
+    invalidate_dashboard(user_id)
     
     return jsonify({'success': True, 'feedback': 'helpful' if helpful else 'not_helpful'})
 
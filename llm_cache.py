@@ -0,0 +1,358 @@
+"""Answer cache for LLM completions (AI summaries, copilot answers).
+
+    stream = cached_completion_stream("copilot", prompt=full_prompt,
+                                      match_text=user_question, providers=("ollama",))
+
+returns either a replay of a stored answer or a live llm_client stream that
+stores its answer once it finishes. Both behave like llm_client.LLMStream
+(iterate, .text(), .provider, .model, .stats, close()), so they work with
+sse_response(); stats["cached"] is "exact" or "near" on a hit.
+
+Exact layer: entries are keyed by (namespace, provider, model, normalized
+prompt hash) - lowercase, punctuation and repeated whitespace dropped. A
+lookup tries every (provider, model) the request could be answered by.
+
+Near-duplicate layer (LLM_CACHE_FUZZY=1, only when match_text is given):
+a 64-permutation MinHash of match_text's words and word pairs, indexed by
+LSH bands, finds paraphrases ("what does a 14 day notice mean" vs "what's
+a 14-day notice mean?"). A candidate must reach LLM_CACHE_SIMILARITY and
+contain exactly the same numbers, so "14-day" never matches "30-day".
+
+Entries live in SQLite (LLM_CACHE_DB) shared by all workers, expire after
+their TTL and are evicted least-recently-used beyond LLM_CACHE_SIZE.
+Hits, near hits, misses and the generation time saved are counted in the
+llm_cache_* metrics.
+"""
+
+import hashlib
+import os
+import random
+import re
+import sqlite3
+import struct
+import threading
+import time
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from llm_client import resolve_providers, stream_completion
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") == "1"
+LLM_CACHE_DB = os.getenv("LLM_CACHE_DB", "security/llm_cache.db")
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "5000"))
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 60 * 60)))
+LLM_CACHE_FUZZY = os.getenv("LLM_CACHE_FUZZY", "1") == "1"
+LLM_CACHE_SIMILARITY = float(os.getenv("LLM_CACHE_SIMILARITY", "0.8"))
+
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16  # 4 rows per band
+_MERSENNE = (1 << 61) - 1
+_rng = random.Random(0x5E4D)
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE), _rng.randrange(0, _MERSENNE)) for _ in range(MINHASH_PERMUTATIONS)]
+
+_STOPWORDS = frozenset(
+    "a an the is are was were be do does did i me my you your it its of to in on for and or "
+    "what whats s can could would should please tell about this that".split()
+)
+# Letters and digits in any script ("\w" without the underscore)
+_WORD = re.compile(r"[^\W_]+")
+
+
+# ============================================================================
+# TEXT FINGERPRINTS
+# ============================================================================
+
+def normalize_prompt(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    return " ".join(_WORD.findall(text))
+
+
+def _words(text: str) -> List[str]:
+    return [w for w in normalize_prompt(text).split() if w not in _STOPWORDS]
+
+
+def _numbers(text: str) -> str:
+    return " ".join(sorted(set(re.findall(r"\d+", normalize_prompt(text)))))
+
+
+def minhash(text: str) -> Tuple[int, ...]:
+    """MinHash signature over words and adjacent word pairs."""
+    words = _words(text)
+    shingles = set(words) | {f"{a} {b}" for a, b in zip(words, words[1:])}
+    if not shingles:
+        return ()
+    bases = [int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big") for s in shingles]
+    return tuple(min((a * h + b) % _MERSENNE for h in bases) for a, b in _PERMUTATIONS)
+
+
+def similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    if not sig_a or len(sig_a) != len(sig_b):
+        return 0.0
+    return sum(a == b for a, b in zip(sig_a, sig_b)) / len(sig_a)
+
+
+def _bands(signature: Tuple[int, ...]) -> Iterable[Tuple[int, str]]:
+    rows = MINHASH_PERMUTATIONS // LSH_BANDS
+    for band in range(LSH_BANDS):
+        chunk = struct.pack(f">{rows}Q", *signature[band * rows:(band + 1) * rows])
+        yield band, hashlib.blake2b(chunk, digest_size=8).hexdigest()
+
+
+def _pack(signature: Tuple[int, ...]) -> bytes:
+    return struct.pack(f">{len(signature)}Q", *signature)
+
+
+def _unpack(blob: Optional[bytes]) -> Tuple[int, ...]:
+    return struct.unpack(f">{len(blob) // 8}Q", blob) if blob else ()
+
+
+# ============================================================================
+# STORAGE
+# ============================================================================
+
+class LLMCache:
+    """Size-bounded, TTL'd answer store in SQLite."""
+
+    def __init__(self, path: str = LLM_CACHE_DB, max_entries: int = LLM_CACHE_SIZE,
+                 ttl: int = LLM_CACHE_TTL, fuzzy: bool = LLM_CACHE_FUZZY,
+                 threshold: float = LLM_CACHE_SIMILARITY):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.fuzzy = fuzzy
+        self.threshold = threshold
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS answers (key TEXT PRIMARY KEY, namespace TEXT, provider TEXT, "
+            "model TEXT, text TEXT, numbers TEXT, signature BLOB, latency_ms REAL, created REAL, "
+            "expires REAL, last_used REAL, hits INTEGER DEFAULT 0)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS answers_last_used ON answers (last_used)")
+        conn.execute("CREATE TABLE IF NOT EXISTS answer_bands (band INTEGER, bucket TEXT, key TEXT)")
+        conn.execute("CREATE INDEX IF NOT EXISTS answer_bands_bucket ON answer_bands (band, bucket)")
+        conn.execute("CREATE INDEX IF NOT EXISTS answer_bands_key ON answer_bands (key)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def key(namespace: str, provider: str, model: str, prompt: str) -> str:
+        digest = hashlib.sha256(normalize_prompt(prompt).encode()).hexdigest()
+        return f"{namespace}:{provider}:{model}:{digest}"
+
+    def lookup(self, namespace: str, candidates: List[Tuple[str, str]], prompt: str,
+               match_text: Optional[str] = None) -> Optional[Dict]:
+        """Best stored answer for any (provider, model) candidate, or None."""
+        now = time.time()
+        conn = self._conn()
+        for provider, model in candidates:
+            key = self.key(namespace, provider, model, prompt)
+            row = conn.execute(
+                "SELECT provider, model, text, latency_ms FROM answers WHERE key = ? AND expires > ?", (key, now)
+            ).fetchone()
+            if row is not None:
+                return self._hit(key, row, "exact", 1.0)
+
+        if not (self.fuzzy and match_text):
+            return None
+        signature = minhash(match_text)
+        if not signature:
+            return None
+        numbers = _numbers(match_text)
+        clauses = " OR ".join("(b.band = ? AND b.bucket = ?)" for _ in range(LSH_BANDS))
+        params = [v for band in _bands(signature) for v in band]
+        rows = conn.execute(
+            f"SELECT DISTINCT a.key, a.provider, a.model, a.text, a.latency_ms, a.signature, a.numbers "
+            f"FROM answer_bands b JOIN answers a ON a.key = b.key "
+            f"WHERE ({clauses}) AND a.namespace = ? AND a.expires > ?",
+            params + [namespace, now]
+        ).fetchall()
+        allowed = set(candidates)
+        best = None
+        for key, provider, model, text, latency_ms, blob, row_numbers in rows:
+            if (provider, model) not in allowed or row_numbers != numbers:
+                continue
+            score = similarity(signature, _unpack(blob))
+            if score >= self.threshold and (best is None or score > best[0]):
+                best = (score, key, (provider, model, text, latency_ms))
+        if best is None:
+            return None
+        return self._hit(best[1], best[2], "near", best[0])
+
+    def _hit(self, key: str, row, kind: str, score: float) -> Dict:
+        self._conn().execute("UPDATE answers SET last_used = ?, hits = hits + 1 WHERE key = ?", (time.time(), key))
+        provider, model, text, latency_ms = row
+        return {"provider": provider, "model": model, "text": text, "latency_ms": latency_ms or 0.0,
+                "kind": kind, "similarity": round(score, 3)}
+
+    def store(self, namespace: str, provider: str, model: str, prompt: str, text: str,
+              latency_ms: float, match_text: Optional[str] = None, ttl: Optional[int] = None):
+        now = time.time()
+        key = self.key(namespace, provider, model, prompt)
+        signature = minhash(match_text) if (self.fuzzy and match_text) else ()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO answers (key, namespace, provider, model, text, numbers, signature, "
+                "latency_ms, created, expires, last_used, hits) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)",
+                (key, namespace, provider, model, text, _numbers(match_text or ""), _pack(signature),
+                 latency_ms, now, now + (self.ttl if ttl is None else ttl), now)
+            )
+            conn.execute("DELETE FROM answer_bands WHERE key = ?", (key,))
+            if signature:
+                conn.executemany("INSERT INTO answer_bands VALUES (?, ?, ?)",
+                                 [(band, bucket, key) for band, bucket in _bands(signature)])
+            self._evict(conn, now)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        stale = "SELECT key FROM answers WHERE expires <= ?"
+        conn.execute(f"DELETE FROM answer_bands WHERE key IN ({stale})", (now,))
+        conn.execute("DELETE FROM answers WHERE expires <= ?", (now,))
+        overflow = "SELECT key FROM answers ORDER BY last_used DESC LIMIT -1 OFFSET ?"
+        conn.execute(f"DELETE FROM answer_bands WHERE key IN ({overflow})", (self.max_entries,))
+        conn.execute(f"DELETE FROM answers WHERE key IN ({overflow})", (self.max_entries,))
+
+    def stats(self) -> Dict:
+        count, hits = self._conn().execute("SELECT COUNT(*), COALESCE(SUM(hits), 0) FROM answers").fetchone()
+        return {"entries": count, "hits": hits, "max_entries": self.max_entries}
+
+    def clear(self):
+        conn = self._conn()
+        conn.execute("DELETE FROM answer_bands")
+        conn.execute("DELETE FROM answers")
+
+
+_cache: Optional[LLMCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMCache()
+    return _cache
+
+
+def set_llm_cache(cache: Optional[LLMCache]):
+    global _cache
+    _cache = cache
+
+
+def _count(name: str, delta=1):
+    from security import incr_metric
+    incr_metric(name, delta)
+
+
+# ============================================================================
+# STREAMS
+# ============================================================================
+
+class CachedStream:
+    """Replays a stored answer with the LLMStream interface."""
+
+    def __init__(self, hit: Dict):
+        self.provider = hit["provider"]
+        self.model = hit["model"]
+        self.stats = {"cached": hit["kind"], "similarity": hit["similarity"], "saved_ms": hit["latency_ms"]}
+        self.closed = False
+        self._iter = iter([hit["text"]] if hit["text"] else [])
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        return next(self._iter)
+
+    def text(self) -> str:
+        return "".join(self)
+
+    def close(self):
+        self.closed = True
+
+
+class _RecordingStream:
+    """Wraps a live stream and stores the answer when it completes."""
+
+    def __init__(self, stream, store):
+        self._stream = stream
+        self._store = store
+        self._parts: List[str] = []
+        self._started = time.monotonic()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        try:
+            token = next(self._stream)
+        except StopIteration:
+            if self._store is not None and self._stream.provider:
+                store, self._store = self._store, None
+                try:
+                    store(self._stream, "".join(self._parts), (time.monotonic() - self._started) * 1000)
+                except Exception as e:
+                    print(f"[WARN] LLM cache store failed: {e}")
+            raise
+        self._parts.append(token)
+        return token
+
+    def text(self) -> str:
+        return "".join(self)
+
+    def close(self):
+        self._store = None
+        self._stream.close()
+
+
+def cached_completion_stream(namespace: str, prompt: str, match_text: Optional[str] = None,
+                             models: Optional[Dict[str, str]] = None, providers=None,
+                             ttl: Optional[int] = None, **kwargs):
+    """stream_completion() with an answer cache in front of it."""
+    if not LLM_CACHE_ENABLED:
+        return stream_completion(prompt=prompt, models=models, providers=providers, **kwargs)
+
+    if match_text is not None and not normalize_prompt(match_text):
+        # Nothing to key the question on (only punctuation or symbols); a
+        # cached answer could belong to anything
+        return stream_completion(prompt=prompt, models=models, providers=providers, **kwargs)
+
+    resolved = resolve_providers(providers)
+    candidates = [(p.name, (models or {}).get(p.name) or p.default_model()) for p in resolved]
+    cache = get_llm_cache()
+    try:
+        hit = cache.lookup(namespace, candidates, prompt, match_text)
+    except sqlite3.Error as e:
+        print(f"[WARN] LLM cache lookup failed: {e}")
+        hit = None
+    if hit is not None:
+        _count("llm_cache_hits_total" if hit["kind"] == "exact" else "llm_cache_near_hits_total")
+        _count("llm_cache_saved_ms_total", int(hit["latency_ms"]))
+        return CachedStream(hit)
+
+    _count("llm_cache_misses_total")
+
+    def store(stream, text, latency_ms):
+        if text:
+            cache.store(namespace, stream.provider, stream.model, prompt, text, latency_ms, match_text, ttl)
+
+    return _RecordingStream(stream_completion(prompt=prompt, models=models, providers=resolved, **kwargs), store)
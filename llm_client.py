@@ -0,0 +1,460 @@
+"""Shared LLM client for Groq and Ollama.
+
+One pooled keep-alive requests.Session per process for Ollama, one cached
+Groq client per API key, and token streaming for both:
+
+    stream = stream_completion(prompt="...", system="...")
+    for token in stream:          # stream.provider / stream.model once started
+        ...
+    stream.close()                # cancels the generation upstream
+
+complete() is the non-streaming form (same providers, pooling and fallback).
+
+Provider fallback is hedged: the first provider gets LLM_HEDGE_SECONDS to
+produce its first token; after that the next provider is started alongside
+it and whichever streams first wins, the loser is cancelled. A provider that
+fails outright hands over immediately. Cancelling (close(), or the client
+disconnecting from an SSE response) closes the upstream HTTP response so
+Ollama stops generating.
+
+sse_response(stream) turns a stream into a text/event-stream Flask response:
+    event: meta   {"provider", "model"}
+    data:         {"token": "..."}          (one per chunk)
+    event: done   {"provider", "model", "eval_count", ...done_extra(stream)}
+    event: error  {"error", "errors"}
+"""
+
+import json
+import os
+import queue
+import socket
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    from groq import Groq
+except ImportError:
+    Groq = None
+
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", os.getenv("OLLAMA_URL", "http://localhost:11434"))
+OLLAMA_DEFAULT_MODEL = os.getenv("OLLAMA_MODEL", "llama3.2")
+GROQ_DEFAULT_MODEL = os.getenv("GROQ_MODEL", "llama-3.1-70b-versatile")
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "10"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+# Longest silence allowed between two streamed chunks
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", os.getenv("OLLAMA_TIMEOUT", "120")))
+# Start the fallback provider if the first one has not streamed a token by then
+LLM_HEDGE_SECONDS = float(os.getenv("LLM_HEDGE_SECONDS", "3"))
+LLM_FIRST_TOKEN_TIMEOUT = float(os.getenv("LLM_FIRST_TOKEN_TIMEOUT", "60"))
+LLM_PROVIDERS = tuple(p.strip() for p in os.getenv("LLM_PROVIDERS", "groq,ollama").split(",") if p.strip())
+
+
+class LLMError(Exception):
+    """Every provider failed; errors maps provider name -> exception."""
+
+    def __init__(self, message: str, errors: Optional[Dict[str, Exception]] = None):
+        super().__init__(message)
+        self.errors = errors or {}
+
+    def messages(self) -> Dict[str, str]:
+        return {name: str(err) for name, err in self.errors.items()}
+
+
+class CancelToken:
+    """Cancellation flag that also closes whatever upstream response is open."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._closers = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def on_cancel(self, closer):
+        with self._lock:
+            if not self._event.is_set():
+                self._closers.append(closer)
+                return
+        closer()
+
+    def cancel(self):
+        with self._lock:
+            self._event.set()
+            closers, self._closers = self._closers, []
+        for closer in closers:
+            try:
+                closer()
+            except Exception:
+                pass
+
+
+# ============================================================================
+# PROVIDERS
+# ============================================================================
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """Process-wide keep-alive session (recreated after fork)."""
+    global _session, _session_pid
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=LLM_POOL_SIZE, max_retries=0)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session, _session_pid = session, os.getpid()
+        return _session
+
+
+def _abort_response(response: requests.Response):
+    """Close a streaming response, unblocking a thread that is reading it."""
+    sock = getattr(getattr(response.raw, "_connection", None), "sock", None)
+    if sock is not None:
+        try:
+            # close() alone waits for the reader's buffer lock
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+    response.close()
+
+
+class OllamaProvider:
+    name = "ollama"
+
+    def __init__(self, base_url: Optional[str] = None, name: Optional[str] = None):
+        self.base_url = (base_url or OLLAMA_BASE_URL).rstrip("/")
+        if name:
+            self.name = name
+
+    def available(self) -> Optional[str]:
+        return None
+
+    def default_model(self) -> str:
+        return OLLAMA_DEFAULT_MODEL
+
+    def stream(self, request: Dict, cancel: CancelToken) -> Iterator[Union[str, Dict]]:
+        """Yield text chunks, then a final dict of stats."""
+        options = {"temperature": request["temperature"], "num_predict": request["max_tokens"]}
+        if request.get("messages") is not None:
+            url = f"{self.base_url}/api/chat"
+            payload = {"model": request["model"], "messages": request["messages"],
+                       "stream": True, "options": options}
+        else:
+            url = f"{self.base_url}/api/generate"
+            payload = {"model": request["model"], "prompt": request["prompt"], "stream": True, "options": options}
+            if request.get("system"):
+                payload["system"] = request["system"]
+
+        response = get_http_session().post(url, json=payload, stream=True,
+                                           timeout=(LLM_CONNECT_TIMEOUT, request["read_timeout"]))
+        cancel.on_cancel(lambda: _abort_response(response))
+        stats = {}
+        with response:
+            if response.status_code != 200:
+                raise requests.HTTPError(f"Ollama returned status {response.status_code}", response=response)
+            # Read to the end of the body so the connection goes back to the pool
+            for line in response.iter_lines():
+                if cancel.cancelled:
+                    return
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise RuntimeError(f"Ollama error: {chunk['error']}")
+                text = chunk.get("response") if "response" in chunk else chunk.get("message", {}).get("content", "")
+                if text:
+                    yield text
+                if chunk.get("done"):
+                    stats = {"eval_count": chunk.get("eval_count", 0), "eval_duration": chunk.get("eval_duration", 0)}
+        yield stats
+
+    def get(self, path: str, timeout: float = 5):
+        return get_http_session().get(f"{self.base_url}{path}", timeout=timeout)
+
+    def post(self, path: str, payload: Dict, timeout: float):
+        return get_http_session().post(f"{self.base_url}{path}", json=payload, timeout=timeout)
+
+
+_groq_clients: Dict[str, object] = {}
+
+
+def get_groq_client(api_key: Optional[str] = None):
+    """One Groq client (and so one connection pool) per API key."""
+    api_key = api_key or os.getenv("GROQ_API_KEY")
+    if Groq is None or not api_key:
+        return None
+    with _session_lock:
+        client = _groq_clients.get(api_key)
+        if client is None:
+            client = Groq(api_key=api_key, max_retries=0,
+                          timeout=LLM_FIRST_TOKEN_TIMEOUT)
+            _groq_clients[api_key] = client
+        return client
+
+
+class GroqProvider:
+    name = "groq"
+
+    def available(self) -> Optional[str]:
+        if Groq is None:
+            return "groq package not installed"
+        if not os.getenv("GROQ_API_KEY"):
+            return "GROQ_API_KEY not set"
+        return None
+
+    def default_model(self) -> str:
+        return GROQ_DEFAULT_MODEL
+
+    def stream(self, request: Dict, cancel: CancelToken) -> Iterator[Union[str, Dict]]:
+        messages = request.get("messages")
+        if messages is None:
+            messages = ([{"role": "system", "content": request["system"]}] if request.get("system") else [])
+            messages.append({"role": "user", "content": request["prompt"]})
+        stream = get_groq_client().chat.completions.create(
+            messages=messages,
+            model=request["model"],
+            temperature=request["temperature"],
+            max_tokens=request["max_tokens"],
+            stream=True,
+        )
+        closer = getattr(stream, "close", None) or getattr(getattr(stream, "response", None), "close", None)
+        if closer is not None:
+            cancel.on_cancel(closer)
+        count = 0
+        for chunk in stream:
+            if cancel.cancelled:
+                return
+            text = chunk.choices[0].delta.content if chunk.choices else None
+            if text:
+                count += 1
+                yield text
+        yield {"eval_count": count}
+
+
+_PROVIDERS = {"ollama": OllamaProvider, "groq": GroqProvider}
+
+
+def resolve_providers(providers) -> List:
+    resolved = []
+    for provider in providers or LLM_PROVIDERS:
+        if isinstance(provider, str):
+            if provider not in _PROVIDERS:
+                raise ValueError(f"Unknown LLM provider: {provider}")
+            provider = _PROVIDERS[provider]()
+        resolved.append(provider)
+    return resolved
+
+
+# ============================================================================
+# HEDGED STREAMING
+# ============================================================================
+
+class _Attempt:
+    def __init__(self, provider, request: Dict, events: "queue.Queue"):
+        self.provider = provider
+        self.request = request
+        self.cancel = CancelToken()
+        self.thread = threading.Thread(target=self._run, args=(events,), daemon=True,
+                                       name=f"llm-{provider.name}")
+        self.thread.start()
+
+    def _run(self, events):
+        try:
+            for item in self.provider.stream(self.request, self.cancel):
+                if self.cancel.cancelled:
+                    return
+                events.put((self, "done" if isinstance(item, dict) else "token", item))
+                if isinstance(item, dict):
+                    return
+            if not self.cancel.cancelled:
+                events.put((self, "done", {}))
+        except Exception as e:
+            if not self.cancel.cancelled:
+                events.put((self, "error", e))
+
+
+class LLMStream:
+    """Iterator of text chunks from whichever provider answered first."""
+
+    def __init__(self, request: Dict, providers: List, hedge_seconds: float, first_token_timeout: float):
+        self.request = request
+        self.provider: Optional[str] = None
+        self.model: Optional[str] = None
+        self.stats: Dict = {}
+        self.errors: Dict[str, Exception] = {}
+        self.closed = False
+        self._pending = list(providers)
+        self._attempts: List[_Attempt] = []
+        self._events: "queue.Queue" = queue.Queue()
+        self._hedge_seconds = hedge_seconds
+        self._first_token_timeout = first_token_timeout
+        self._iter = self._generate()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        return next(self._iter)
+
+    def text(self) -> str:
+        return "".join(self)
+
+    def close(self):
+        """Stop reading and cancel every upstream generation."""
+        self._iter.close()
+
+    def _start_next(self) -> bool:
+        while self._pending:
+            provider = self._pending.pop(0)
+            reason = provider.available()
+            if reason:
+                self.errors[provider.name] = LLMError(reason)
+                continue
+            model = (self.request.get("models") or {}).get(provider.name) or provider.default_model()
+            self._attempts.append(_Attempt(provider, dict(self.request, model=model), self._events))
+            return True
+        return False
+
+    def _running(self) -> List[_Attempt]:
+        return [a for a in self._attempts if a.provider.name not in self.errors]
+
+    def _fail(self):
+        detail = "; ".join(f"{name}: {err}" for name, err in self.errors.items())
+        raise LLMError(f"All LLM providers failed ({detail})", self.errors)
+
+    def _generate(self) -> Iterator[str]:
+        winner = None
+        started = time.monotonic()
+        try:
+            if not self._start_next():
+                self._fail()
+            next_hedge = started + self._hedge_seconds
+            while True:
+                now = time.monotonic()
+                if winner is None:
+                    deadline = started + self._first_token_timeout
+                    if now >= deadline:
+                        for attempt in self._running():
+                            self.errors[attempt.provider.name] = TimeoutError("no response before first-token timeout")
+                        self._fail()
+                    wait = min(deadline, next_hedge) - now if self._pending else deadline - now
+                else:
+                    wait = self.request["read_timeout"]
+                try:
+                    attempt, kind, item = self._events.get(timeout=max(wait, 0.0))
+                except queue.Empty:
+                    if winner is not None:
+                        raise LLMError(f"{winner.provider.name} stopped streaming",
+                                       {winner.provider.name: TimeoutError("read timeout")})
+                    if self._pending and time.monotonic() >= next_hedge:
+                        # Hedge: run the next provider alongside the slow one
+                        self._start_next()
+                        next_hedge = time.monotonic() + self._hedge_seconds
+                    continue
+
+                if winner is not None and attempt is not winner:
+                    continue
+                if kind == "error":
+                    if attempt is winner:
+                        raise LLMError(f"{attempt.provider.name} failed mid-stream",
+                                       {attempt.provider.name: item})
+                    self.errors[attempt.provider.name] = item
+                    # A failed provider hands over at once instead of waiting for the hedge
+                    if not self._start_next() and not self._running():
+                        self._fail()
+                    next_hedge = time.monotonic() + self._hedge_seconds
+                    continue
+                if winner is None:
+                    winner = attempt
+                    self.provider, self.model = attempt.provider.name, attempt.request["model"]
+                    self.stats["first_token_ms"] = round((time.monotonic() - started) * 1000, 1)
+                    for other in self._attempts:
+                        if other is not winner:
+                            other.cancel.cancel()
+                if kind == "done":
+                    self.stats.update(item)
+                    return
+                yield item
+        finally:
+            self.closed = True
+            for attempt in self._attempts:
+                attempt.cancel.cancel()
+
+
+def stream_completion(prompt: Optional[str] = None, messages: Optional[List[Dict]] = None,
+                      system: Optional[str] = None, models: Optional[Dict[str, str]] = None,
+                      providers: Optional[Sequence] = None, max_tokens: int = 1024,
+                      temperature: float = 0.7, hedge_seconds: float = LLM_HEDGE_SECONDS,
+                      first_token_timeout: float = LLM_FIRST_TOKEN_TIMEOUT,
+                      read_timeout: float = LLM_READ_TIMEOUT) -> LLMStream:
+    """Stream a completion; models maps provider name -> model."""
+    if (prompt is None) == (messages is None):
+        raise ValueError("Pass exactly one of prompt or messages")
+    request = {"prompt": prompt, "messages": messages, "system": system, "models": models or {},
+               "max_tokens": max_tokens, "temperature": temperature, "read_timeout": read_timeout}
+    return LLMStream(request, resolve_providers(providers), hedge_seconds, first_token_timeout)
+
+
+def complete(**kwargs) -> Dict:
+    """Non-streaming completion: {"text", "provider", "model", "eval_count", ...}."""
+    stream = stream_completion(**kwargs)
+    text = stream.text()
+    return {"text": text, "provider": stream.provider, "model": stream.model, **stream.stats}
+
+
+# ============================================================================
+# SERVER-SENT EVENTS
+# ============================================================================
+
+def _sse(data: Dict, event: Optional[str] = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+def sse_events(stream: LLMStream, on_done=None, done_extra=None) -> Iterator[str]:
+    """
+    Format a stream as SSE; closing this generator cancels the stream.
+    done_extra(stream) may return fields to add to the done event (e.g.
+    citations a JSON response appends to the text).
+    """
+    try:
+        sent_meta = False
+        parts = []
+        for token in stream:
+            if not sent_meta:
+                yield _sse({"provider": stream.provider, "model": stream.model}, "meta")
+                sent_meta = True
+            parts.append(token)
+            yield _sse({"token": token})
+        if on_done is not None:
+            on_done(stream, "".join(parts))
+        extra = done_extra(stream) if done_extra is not None else {}
+        yield _sse({"provider": stream.provider, "model": stream.model, **stream.stats, **extra}, "done")
+    except LLMError as e:
+        yield _sse({"error": str(e), "errors": e.messages()}, "error")
+    finally:
+        stream.close()
+
+
+def sse_response(stream: LLMStream, on_done=None, done_extra=None):
+    """Flask response streaming tokens as Server-Sent Events."""
+    from flask import Response
+
+    return Response(sse_events(stream, on_done, done_extra), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+def wants_stream(request) -> bool:
+    """True when the caller asked for SSE (Accept header or ?stream=1)."""
+    return (request.args.get("stream") in ("1", "true")
+            or "text/event-stream" in request.headers.get("Accept", ""))
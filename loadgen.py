@@ -0,0 +1,530 @@
+"""
+Synthetic load generator for Semptify.
+
+Replays scripted tenant journeys (register -> verify -> upload evidence ->
+view dashboard -> build packet -> download) with a configurable number of
+concurrent workers, and reports throughput plus per-endpoint latency
+percentiles and error rates.
+
+Everything runs offline against a scratch workspace (see
+benchmarks.Workspace): uploads, users.json and the databases live on local
+disk, and R2 is never configured. The app is driven either
+
+- in-process, with one Flask test client per worker thread, or
+- over HTTP, against a local waitress started from run_prod.py in the
+  workspace (so worker threads can be sized with SEMPTIFY_THREADS).
+
+Journeys are named after TenantJourney stages. Returning tenants are seeded
+before the timed run: token users in users.json, vault uploads, and Context
+Ring rows (users, timeline_events, cases) laid out like test_seed_data.py.
+Fresh registrants get their Context Ring rows at verification, since the
+register flow itself does not write them.
+
+See scripts/loadgen.py for the command line.
+"""
+
+import io
+import json
+import os
+import random
+import re
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks import Workspace
+from tenant_journey import TenantJourney
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+LOADGEN_CONCURRENCY = int(os.getenv("LOADGEN_CONCURRENCY", "8"))
+LOADGEN_JOURNEYS = int(os.getenv("LOADGEN_JOURNEYS", "100"))
+LOADGEN_TIMEOUT = float(os.getenv("LOADGEN_TIMEOUT", "30"))
+LOADGEN_SEED = int(os.getenv("LOADGEN_SEED", "1234"))
+# Seconds to wait for a local waitress to report ready
+LOADGEN_SERVER_START_TIMEOUT = float(os.getenv("LOADGEN_SERVER_START_TIMEOUT", "60"))
+
+# Every synthetic tenant comes from the same address, so per-client limits
+# would throttle the whole run; override them unless asked not to.
+RATE_LIMIT_OVERRIDES = {
+    "RATE_LIMIT_VAULT_UPLOAD": "100000000/60",
+}
+
+_TOKEN_RE = re.compile(r'id="tokenValue">\s*(\d+)')
+
+
+class JourneyError(Exception):
+    """A step got a response the rest of the journey cannot continue from."""
+
+
+# ============================================================================
+# Transports
+# ============================================================================
+
+class InProcessTransport:
+    """Flask test client per worker thread."""
+
+    name = "inprocess"
+
+    def __init__(self, ws: Workspace):
+        self.app = ws.client.application
+        self._local = threading.local()
+        # The app's user database may already be initialized in another
+        # directory (e.g. earlier in a test session); create the workspace's
+        import user_database
+        user_database.init_database()
+
+    def request(self, method: str, path: str, data: Optional[Dict] = None, json_body: Optional[Dict] = None,
+                files: Optional[Dict[str, Tuple[str, bytes]]] = None) -> Tuple[int, bytes]:
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        kwargs = {}
+        if files:
+            form = dict(data or {})
+            form.update({field: (io.BytesIO(payload), filename) for field, (filename, payload) in files.items()})
+            kwargs.update(data=form, content_type="multipart/form-data")
+        elif data is not None:
+            kwargs["data"] = data
+        if json_body is not None:
+            kwargs["json"] = json_body
+        response = client.open(path, method=method, **kwargs)
+        return response.status_code, response.get_data()
+
+
+class HttpTransport:
+    """requests.Session per worker thread against base_url."""
+
+    name = "http"
+
+    def __init__(self, base_url: str, timeout: float = LOADGEN_TIMEOUT):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def request(self, method: str, path: str, data: Optional[Dict] = None, json_body: Optional[Dict] = None,
+                files: Optional[Dict[str, Tuple[str, bytes]]] = None) -> Tuple[int, bytes]:
+        import requests
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        response = session.request(method, self.base_url + path, data=data, json=json_body, files=files,
+                                   timeout=self.timeout, allow_redirects=False)
+        return response.status_code, response.content
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class LocalServer:
+    """run_prod.py (waitress) serving the workspace on a free local port."""
+
+    def __init__(self, ws: Workspace, threads: int = 8, port: Optional[int] = None,
+                 env: Optional[Dict[str, str]] = None):
+        self.ws = ws
+        self.threads = threads
+        self.port = port or _free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self.env = env or {}
+        self.process: Optional[subprocess.Popen] = None
+        self.log_path = os.path.join(ws.root, "logs", "loadgen_server.log")
+
+    def __enter__(self):
+        import requests
+        env = dict(os.environ, SEMPTIFY_HOST="127.0.0.1", SEMPTIFY_PORT=str(self.port),
+                   SEMPTIFY_THREADS=str(self.threads), SECURITY_MODE="open", PERSISTENCE_OVERRIDE="1",
+                   PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+        env.update(self.env)
+        self._log = open(self.log_path, "wb")
+        self.process = subprocess.Popen([sys.executable, os.path.join(ROOT, "run_prod.py")], cwd=self.ws.root,
+                                        env=env, stdout=self._log, stderr=subprocess.STDOUT)
+        deadline = time.monotonic() + LOADGEN_SERVER_START_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Server exited with {self.process.returncode}; see {self.log_path}")
+            try:
+                if requests.get(self.base_url + "/readyz", timeout=2).status_code == 200:
+                    return self
+            except requests.RequestException:
+                pass
+            time.sleep(0.2)
+        self.__exit__()
+        raise RuntimeError(f"Server not ready after {LOADGEN_SERVER_START_TIMEOUT:.0f}s; see {self.log_path}")
+
+    def __exit__(self, *exc):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self._log.close()
+
+
+# ============================================================================
+# Stats
+# ============================================================================
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(pct * len(ordered)))]
+
+
+class LoadStats:
+    """Latency, status and error counts per endpoint and per journey."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = {}
+        self.statuses: Dict[str, Counter] = {}
+        self.errors: Counter = Counter()
+        self.journeys: Dict[str, Counter] = {}
+        self.failures: Counter = Counter()  # "journey: reason" -> count
+
+    def record(self, endpoint: str, ms: float, status: Optional[int], error: bool):
+        with self._lock:
+            self.latencies.setdefault(endpoint, []).append(ms)
+            self.statuses.setdefault(endpoint, Counter())[str(status) if status else "exception"] += 1
+            if error:
+                self.errors[endpoint] += 1
+
+    def record_journey(self, name: str, ok: bool, reason: Optional[str] = None):
+        with self._lock:
+            self.journeys.setdefault(name, Counter())["completed" if ok else "failed"] += 1
+            if reason:
+                self.failures[f"{name}: {reason}"] += 1
+
+    def report(self, elapsed: float) -> Dict:
+        with self._lock:
+            endpoints = {}
+            for endpoint, timings in sorted(self.latencies.items()):
+                ordered = sorted(timings)
+                endpoints[endpoint] = {
+                    "requests": len(ordered),
+                    "rps": round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+                    "errors": self.errors[endpoint],
+                    "error_rate": round(self.errors[endpoint] / len(ordered), 4),
+                    "p50_ms": round(_percentile(ordered, 0.50), 2),
+                    "p95_ms": round(_percentile(ordered, 0.95), 2),
+                    "p99_ms": round(_percentile(ordered, 0.99), 2),
+                    "max_ms": round(ordered[-1], 2),
+                    "statuses": dict(self.statuses[endpoint]),
+                }
+            total = sum(e["requests"] for e in endpoints.values())
+            errors = sum(e["errors"] for e in endpoints.values())
+            completed = sum(c["completed"] for c in self.journeys.values())
+            return {
+                "elapsed_s": round(elapsed, 3),
+                "requests": total,
+                "rps": round(total / elapsed, 2) if elapsed else 0.0,
+                "errors": errors,
+                "error_rate": round(errors / total, 4) if total else 0.0,
+                "journeys_completed": completed,
+                "journeys_failed": sum(c["failed"] for c in self.journeys.values()),
+                "journeys_per_s": round(completed / elapsed, 2) if elapsed else 0.0,
+                "journeys": {name: dict(counts) for name, counts in sorted(self.journeys.items())},
+                "failures": dict(self.failures.most_common()),
+                "endpoints": endpoints,
+            }
+
+
+# ============================================================================
+# Context Ring seed data (same tables as test_seed_data.py)
+# ============================================================================
+
+CONTEXT_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS users (
+        id TEXT PRIMARY KEY, email TEXT, password_hash TEXT, created_at TEXT)""",
+    """CREATE TABLE IF NOT EXISTS timeline_events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT NOT NULL, event_date TEXT NOT NULL,
+        title TEXT NOT NULL, description TEXT, event_type TEXT NOT NULL,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP)""",
+    """CREATE TABLE IF NOT EXISTS cases (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT NOT NULL, status TEXT NOT NULL,
+        case_type TEXT, jurisdiction TEXT, created_at TEXT DEFAULT CURRENT_TIMESTAMP)""",
+)
+
+# (days ago, title, description, event type)
+TIMELINE_TEMPLATE = [
+    (90, "Moved into apartment", "Started tenancy", "move_in"),
+    (60, "First maintenance issue reported", "Heat not working, landlord notified", "maintenance_request"),
+    (45, "No response from landlord", "Sent follow-up email, still no repair", "communication"),
+    (30, "Received eviction notice", "Notice to vacate in 30 days", "notice_received"),
+    (15, "Documented property condition", "Took photos and videos of all issues", "evidence_collected"),
+]
+
+
+class ContextSeeder:
+    """Writes Context Ring rows for tenants into the workspace's users.db."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        with self._lock, sqlite3.connect(self.db_path) as conn:
+            for statement in CONTEXT_SCHEMA:
+                conn.execute(statement)
+
+    def seed(self, user_id: str, rng: random.Random, events: Optional[int] = None):
+        now = datetime.now()
+        timeline = TIMELINE_TEMPLATE[:events if events is not None else rng.randint(2, len(TIMELINE_TEMPLATE))]
+        with self._lock, sqlite3.connect(self.db_path, timeout=LOADGEN_TIMEOUT) as conn:
+            conn.execute("INSERT OR IGNORE INTO users (id, email, password_hash, created_at) VALUES (?, ?, ?, ?)",
+                         (user_id, f"{user_id}@example.test", "loadgen", now.isoformat()))
+            conn.executemany(
+                "INSERT INTO timeline_events (user_id, event_date, title, description, event_type) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(user_id, (now - timedelta(days=days)).date().isoformat(), title, description, event_type)
+                 for days, title, description, event_type in timeline])
+            conn.execute("INSERT INTO cases (user_id, status, case_type, jurisdiction) VALUES (?, ?, ?, ?)",
+                         (user_id, "assessment", "eviction_defense", "minnesota"))
+
+
+# ============================================================================
+# Journeys
+# ============================================================================
+
+EVIDENCE_FILES = [
+    ("lease.txt", "RESIDENTIAL LEASE AGREEMENT\nLandlord: Lakeside Property Management LLC\n"
+                  "Tenant agrees to pay monthly rent of $1,250.00 due on the 1st.\n"),
+    ("repair_request.txt", "To Lakeside Property Management: the heat has not worked since "
+                           "January 3. Please repair within 14 days as required by law.\n"),
+    ("notice_to_vacate.txt", "NOTICE TO VACATE\nYou are hereby notified to vacate the premises "
+                             "within 30 days. Unpaid rent: $2,500.00\n"),
+    ("rent_receipt.txt", "Rent payment receipt - Amount: $1,250.00 - Paid in full\n"),
+]
+
+
+class Tenant:
+    """One synthetic tenant's session: transport, stats and what it has so far."""
+
+    def __init__(self, transport, stats: LoadStats, seeder: ContextSeeder, rng: random.Random,
+                 token: Optional[str] = None, user_id: Optional[str] = None):
+        self.transport = transport
+        self.stats = stats
+        self.seeder = seeder
+        self.rng = rng
+        self.token = token
+        self.user_id = user_id
+        self.doc_ids: List[str] = []
+        self.errors: List[str] = []
+
+    def call(self, method: str, path: str, endpoint: str, expect: Tuple[int, ...] = (200,),
+             fatal: bool = False, **kwargs) -> Optional[bytes]:
+        """
+        Make one timed request. An unexpected status is recorded against the
+        journey; it raises JourneyError only if `fatal` (later steps need the
+        response), otherwise the tenant carries on like a user would.
+        """
+        start = time.perf_counter()
+        try:
+            status, body = self.transport.request(method, path, **kwargs)
+        except Exception as e:
+            status, body = None, None
+            reason = f"{endpoint}: {type(e).__name__}"
+        else:
+            reason = None if status in expect else f"{endpoint}: HTTP {status}"
+        self.stats.record(endpoint, (time.perf_counter() - start) * 1000, status, reason is not None)
+        if reason is None:
+            return body
+        if fatal:
+            raise JourneyError(reason)
+        self.errors.append(reason)
+        return None
+
+    # -- steps ----------------------------------------------------------
+
+    def register(self):
+        body = self.call("GET", "/register", "GET /register")
+        body = self.call("POST", "/register", "POST /register", expect=(200, 302), fatal=True, data={
+            "first_name": "Load", "last_name": f"Tenant{self.rng.randrange(10 ** 6)}",
+            "email": f"tenant{self.rng.randrange(10 ** 9)}@example.test", "phone": "555-0100",
+            "address": f"{self.rng.randint(1, 9999)} Lake St", "city": "Minneapolis",
+            "county": "Hennepin", "state": "MN", "zip": "55401", "verify_method": "email"})
+        match = _TOKEN_RE.search(body.decode("utf-8", errors="replace"))
+        if not match:
+            raise JourneyError("POST /register: no token in response")
+        self.token = match.group(1)
+
+    def verify(self):
+        self.call("GET", "/verify", "GET /verify")
+        self.call("POST", "/verify", "POST /verify", expect=(200, 302))
+        from security import validate_user_token
+        self.user_id = validate_user_token(self.token)
+        if not self.user_id:
+            raise JourneyError("verify: token not in users.json")
+        self.seeder.seed(self.user_id, self.rng)
+
+    def upload(self, filename: Optional[str] = None):
+        name, text = (next(f for f in EVIDENCE_FILES if f[0] == filename) if filename
+                      else self.rng.choice(EVIDENCE_FILES))
+        body = self.call("POST", "/vault/upload", "POST /vault/upload", fatal=True, data={"user_token": self.token},
+                         files={"file": (name, text.encode() * self.rng.randint(1, 40))})
+        self.doc_ids.append(json.loads(body)["doc_id"])
+        self.call("POST", "/journey/api/check-progress", "POST /journey/api/check-progress",
+                  json_body={"user_token": self.token, "action_type": "upload"})
+
+    def dashboard(self):
+        self.call("GET", "/dashboard", "GET /dashboard")
+        self.call("GET", f"/api/learning/dashboard?user_id={self.user_id}", "GET /api/learning/dashboard")
+
+    def journey_page(self):
+        self.call("GET", f"/journey/?user_token={self.token}", "GET /journey/")
+
+    def vault_list(self):
+        self.call("GET", f"/vault/list?user_token={self.token}", "GET /vault/list")
+
+    def build_packet(self):
+        self.call("GET", f"/api/complaint/{self.user_id}/packet", "GET /api/complaint/<user_id>/packet")
+
+    def download(self):
+        doc_id = self.rng.choice(self.doc_ids)
+        self.call("GET", f"/vault/download?doc_id={doc_id}&user_token={self.token}", "GET /vault/download")
+
+
+# journey name (a TenantJourney stage) -> steps; "returning" tenants are
+# seeded before the run instead of registering
+JOURNEYS: Dict[str, Dict] = {
+    "searching": {"returning": False, "steps": [
+        Tenant.register, Tenant.verify, Tenant.journey_page, Tenant.dashboard]},
+    "signing": {"returning": False, "steps": [
+        Tenant.register, Tenant.verify, lambda t: t.upload("lease.txt"), Tenant.dashboard,
+        Tenant.vault_list, Tenant.download]},
+    "issue": {"returning": False, "steps": [
+        Tenant.register, Tenant.verify, Tenant.upload, Tenant.upload, Tenant.dashboard,
+        Tenant.build_packet, Tenant.download]},
+    "dispute": {"returning": True, "steps": [
+        Tenant.dashboard, Tenant.vault_list, Tenant.upload, Tenant.build_packet, Tenant.download]},
+}
+assert set(JOURNEYS) <= set(TenantJourney.JOURNEY_STAGES)
+
+DEFAULT_MIX = {"issue": 5, "signing": 3, "searching": 1, "dispute": 1}
+
+
+def parse_mix(spec: str) -> Dict[str, int]:
+    """"issue=5,signing=3" -> {"issue": 5, "signing": 3}."""
+    mix = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, weight = part.partition("=")
+        if name not in JOURNEYS:
+            raise ValueError(f"Unknown journey {name!r}; choose from {', '.join(JOURNEYS)}")
+        mix[name] = int(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("Journey mix needs at least one positive weight")
+    return mix
+
+
+# ============================================================================
+# Runner
+# ============================================================================
+
+class LoadGenerator:
+    """
+    Runs `journeys` journeys drawn from `mix` (or keeps going until
+    `duration` seconds have passed) with `concurrency` worker threads.
+    """
+
+    def __init__(self, transport, ws: Workspace, mix: Optional[Dict[str, int]] = None,
+                 concurrency: int = LOADGEN_CONCURRENCY, seed: int = LOADGEN_SEED, returning_tenants: int = 20):
+        self.transport = transport
+        self.ws = ws
+        self.mix = mix or dict(DEFAULT_MIX)
+        self.concurrency = max(1, concurrency)
+        self.seed = seed
+        self.returning_tenants = returning_tenants
+        self.seeder = ContextSeeder(os.path.join(ws.root, "users.db"))
+        self.stats = LoadStats()
+        self._returning: List[Tenant] = []
+        self._issued = 0
+        self._issue_lock = threading.Lock()
+
+    def seed_tenants(self):
+        """Returning tenants: users.json tokens, Context Ring rows and two uploads each (untimed)."""
+        if not any(JOURNEYS[name]["returning"] for name in self.mix):
+            return
+        rng = self.ws.rng("loadgen-tenants")
+        untimed = LoadStats()
+        for user in self.ws.users[:self.returning_tenants]:
+            tenant = Tenant(self.transport, untimed, self.seeder, rng, token=user["token"], user_id=user["id"])
+            self.seeder.seed(user["id"], rng, events=len(TIMELINE_TEMPLATE))
+            tenant.upload("lease.txt")
+            tenant.upload()
+            self._returning.append(tenant)
+        if not self._returning:
+            raise RuntimeError("No returning tenants could be seeded")
+
+    def _next(self, limit: Optional[int], deadline: Optional[float]) -> bool:
+        with self._issue_lock:
+            if limit is not None and self._issued >= limit:
+                return False
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            self._issued += 1
+            return True
+
+    def _worker(self, index: int, limit: Optional[int], deadline: Optional[float]):
+        rng = random.Random(f"{self.seed}:worker:{index}")
+        names, weights = list(self.mix), list(self.mix.values())
+        while self._next(limit, deadline):
+            name = rng.choices(names, weights)[0]
+            journey = JOURNEYS[name]
+            if journey["returning"]:
+                seeded = rng.choice(self._returning)
+                tenant = Tenant(self.transport, self.stats, self.seeder, rng, token=seeded.token,
+                                user_id=seeded.user_id)
+                tenant.doc_ids = list(seeded.doc_ids)
+            else:
+                tenant = Tenant(self.transport, self.stats, self.seeder, rng)
+            try:
+                for step in journey["steps"]:
+                    step(tenant)
+            except JourneyError as e:
+                self.stats.record_journey(name, False, str(e))
+            except Exception as e:
+                self.stats.record_journey(name, False, f"{type(e).__name__}: {e}")
+            else:
+                self.stats.record_journey(name, not tenant.errors, tenant.errors[0] if tenant.errors else None)
+
+    def run(self, journeys: Optional[int] = LOADGEN_JOURNEYS, duration: Optional[float] = None) -> Dict:
+        self.seed_tenants()
+        deadline = time.monotonic() + duration if duration else None
+        limit = None if duration and not journeys else journeys
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="loadgen") as pool:
+            for future in [pool.submit(self._worker, i, limit, deadline) for i in range(self.concurrency)]:
+                future.result()
+        report = self.stats.report(time.perf_counter() - start)
+        report["config"] = {"transport": self.transport.name, "concurrency": self.concurrency,
+                            "mix": self.mix, "seed": self.seed, "scale": self.ws.scale,
+                            "returning_tenants": len(self._returning)}
+        return report
+
+
+def format_report(report: Dict) -> str:
+    config = report["config"]
+    lines = [
+        f"{config['transport']} x{config['concurrency']}: {report['journeys_completed']} journeys completed, "
+        f"{report['journeys_failed']} failed in {report['elapsed_s']:.1f}s "
+        f"({report['journeys_per_s']:.2f} journeys/s, {report['rps']:.1f} req/s, "
+        f"{report['error_rate'] * 100:.1f}% errors)",
+        "",
+        f"{'endpoint':40} {'reqs':>6} {'req/s':>7} {'err%':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}",
+    ]
+    for endpoint, row in report["endpoints"].items():
+        lines.append(f"{endpoint:40} {row['requests']:>6} {row['rps']:>7.1f} {row['error_rate'] * 100:>6.1f} "
+                     f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['max_ms']:>8.1f}")
+    if report["failures"]:
+        lines.append("")
+        lines.append("journey failures:")
+        lines.extend(f"  {count:>5}  {reason}" for reason, count in report["failures"].items())
+    return "\n".join(lines)
@@ -3,18 +3,21 @@ Local AI Configuration - Ollama setup for self-hosted AI
 Use your PC as AI backend instead of external APIs
 """
 import os
-import requests
 from flask import current_app
 
+from llm_client import OLLAMA_BASE_URL, OLLAMA_DEFAULT_MODEL, OllamaProvider, stream_completion
+
 # Ollama Configuration
-OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
-OLLAMA_DEFAULT_MODEL = os.getenv("OLLAMA_MODEL", "llama3.2")
 OLLAMA_TIMEOUT = int(os.getenv("OLLAMA_TIMEOUT", "120"))
 
+
+def _ollama():
+    return OllamaProvider(OLLAMA_BASE_URL)
+
 def check_ollama_status():
     """Check if Ollama is running and accessible"""
     try:
-        response = requests.get(f"{OLLAMA_BASE_URL}/api/tags", timeout=5)
+        response = _ollama().get("/api/tags", timeout=5)
         if response.status_code == 200:
             models = response.json().get("models", [])
             return {
@@ -32,38 +35,26 @@ def check_ollama_status():
     
     return {"status": "unknown"}
 
-def ollama_generate(prompt, model=None, system_prompt=None, max_tokens=2000):
-    """Generate text using local Ollama"""
+def ollama_generate(prompt, model=None, system_prompt=None, max_tokens=2000, stream=False):
+    """Generate text using local Ollama
+
+    stream=True returns an llm_client.LLMStream of tokens instead.
+    """
     model = model or OLLAMA_DEFAULT_MODEL
-    
-    payload = {
-        "model": model,
-        "prompt": prompt,
-        "stream": False,
-        "options": {
-            "num_predict": max_tokens,
-            "temperature": 0.7
-        }
-    }
-    
-    if system_prompt:
-        payload["system"] = system_prompt
-    
+    tokens = stream_completion(prompt=prompt, system=system_prompt, models={"ollama": model},
+                               providers=[_ollama()], max_tokens=max_tokens,
+                               first_token_timeout=OLLAMA_TIMEOUT)
+    if stream:
+        return tokens
+
     try:
-        response = requests.post(
-            f"{OLLAMA_BASE_URL}/api/generate",
-            json=payload,
-            timeout=OLLAMA_TIMEOUT
-        )
-        response.raise_for_status()
-        
-        result = response.json()
+        text = tokens.text()
         return {
             "success": True,
-            "response": result.get("response", ""),
+            "response": text,
             "model": model,
-            "eval_count": result.get("eval_count", 0),
-            "eval_duration": result.get("eval_duration", 0)
+            "eval_count": tokens.stats.get("eval_count", 0),
+            "eval_duration": tokens.stats.get("eval_duration", 0)
         }
     except Exception as e:
         return {
@@ -72,34 +63,25 @@ def ollama_generate(prompt, model=None, system_prompt=None, max_tokens=2000):
             "model": model
         }
 
-def ollama_chat(messages, model=None, max_tokens=2000):
-    """Chat completion using local Ollama"""
+def ollama_chat(messages, model=None, max_tokens=2000, stream=False):
+    """Chat completion using local Ollama
+
+    stream=True returns an llm_client.LLMStream of tokens instead.
+    """
     model = model or OLLAMA_DEFAULT_MODEL
-    
-    payload = {
-        "model": model,
-        "messages": messages,
-        "stream": False,
-        "options": {
-            "num_predict": max_tokens,
-            "temperature": 0.7
-        }
-    }
-    
+    tokens = stream_completion(messages=messages, models={"ollama": model},
+                               providers=[_ollama()], max_tokens=max_tokens,
+                               first_token_timeout=OLLAMA_TIMEOUT)
+    if stream:
+        return tokens
+
     try:
-        response = requests.post(
-            f"{OLLAMA_BASE_URL}/api/chat",
-            json=payload,
-            timeout=OLLAMA_TIMEOUT
-        )
-        response.raise_for_status()
-        
-        result = response.json()
+        text = tokens.text()
         return {
             "success": True,
-            "message": result.get("message", {}),
+            "message": {"role": "assistant", "content": text},
             "model": model,
-            "eval_count": result.get("eval_count", 0)
+            "eval_count": tokens.stats.get("eval_count", 0)
         }
     except Exception as e:
         return {
@@ -111,7 +93,7 @@ def ollama_chat(messages, model=None, max_tokens=2000):
 def list_ollama_models():
     """Get all available Ollama models"""
     try:
-        response = requests.get(f"{OLLAMA_BASE_URL}/api/tags", timeout=5)
+        response = _ollama().get("/api/tags", timeout=5)
         response.raise_for_status()
         
         data = response.json()
@@ -138,9 +120,9 @@ def list_ollama_models():
 def pull_ollama_model(model_name):
     """Pull/download a model from Ollama registry"""
     try:
-        response = requests.post(
-            f"{OLLAMA_BASE_URL}/api/pull",
-            json={"name": model_name},
+        response = _ollama().post(
+            "/api/pull",
+            {"name": model_name},
             timeout=300  # 5 min timeout for large models
         )
         response.raise_for_status()
@@ -10,6 +10,9 @@ import requests
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 
+from jurisdiction_detector import normalize_state
+from response_cache import invalidate_tags
+
 
 class LocationIntelligence:
     """
@@ -21,6 +24,17 @@ class LocationIntelligence:
         self.data_dir = data_dir
         self.locations_file = os.path.join(data_dir, "learned_locations.json")
         self.locations = self._load_locations()
+        # Learned-law version per state, bumped when that state's learned
+        # laws change so law lookups can be memoized
+        self._laws_versions: Dict[str, int] = {}
+
+    @staticmethod
+    def _state_key(state: Optional[str]) -> str:
+        return normalize_state(state) or str(state or "").strip().lower()
+
+    def laws_version(self, state: Optional[str]) -> int:
+        """Version of the laws learned for a state ("MN", "mn" or "Minnesota")."""
+        return self._laws_versions.get(self._state_key(state), 0)
 
     def _load_locations(self) -> Dict:
         """Load learned location data."""
@@ -445,10 +459,14 @@ class LocationIntelligence:
             location_data["laws"][jurisdiction][data.get("category")] = {
                 "statute": data.get("statute"),
                 "requirement": data.get("requirement"),
+                "category": data.get("category"),
                 "source": data.get("source"),
                 "verified_by": "user",
                 "verified_at": datetime.now().isoformat()
             }
+            state = self._state_key(location_data.get("state"))
+            self._laws_versions[state] = self._laws_versions.get(state, 0) + 1
+            invalidate_tags("laws")
 
     # ========================================================================
     # METADATA PROCESSING (Discovers patterns)
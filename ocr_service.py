@@ -11,6 +11,8 @@ from typing import Dict, List, Optional, Tuple
 import subprocess
 import json
 
+from security import timed_operation
+
 try:
     from PIL import Image
     import pytesseract
@@ -147,6 +149,7 @@ class OCRService:
         
         raise RuntimeError("Cannot extract text from PDF: no extraction method available")
     
+    @timed_operation("ocr", "extract_text")
     def extract_text(self, file_path: str) -> str:
         """
         Extract text from file (auto-detects format).
@@ -3,9 +3,11 @@ AI integration routes for Semptify - Groq (primary) with Ollama fallback
 Provides AI-powered summarization of legal and housing data sources
 """
 from flask import Blueprint, jsonify, request
-import requests
 import json
 import os
+from security import rate_limited
+from llm_cache import cached_completion_stream
+from llm_client import LLMError, sse_response, wants_stream
 
 ollama_bp = Blueprint('ollama', __name__, url_prefix='/api/ollama')
 
@@ -20,18 +22,13 @@ def _load_sources():
         print(f"[WARN] Could not load data sources: {e}")
         return []
 
-def _summarize_with_groq(source, model='llama-3.1-70b-versatile'):
-    """Use Groq API for fast, free AI summarization"""
-    try:
-        from groq import Groq
-        
-        api_key = os.getenv('GROQ_API_KEY')
-        if not api_key:
-            return None, "GROQ_API_KEY not set"
-        
-        client = Groq(api_key=api_key)
-        
-        prompt = f"""Provide a detailed summary of {source['name']} ({source['url']}) focusing on:
+SUMMARY_MODELS = {"groq": "llama-3.1-70b-versatile", "ollama": "llama3"}
+# Sources are fixed pages; their summaries are reused for a day
+SUMMARY_CACHE_TTL = int(os.getenv("SUMMARY_CACHE_TTL", str(24 * 60 * 60)))
+
+
+def _summary_prompt(source):
+    return f"""Provide a detailed summary of {source['name']} ({source['url']}) focusing on:
 
 1. What this resource provides for tenants and landlords
 2. Key legal information available
@@ -48,59 +45,18 @@ Format your response with:
 
 Be specific and detailed."""
 
-        chat_completion = client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt}],
-            model=model,
-            temperature=0.7,
-            max_tokens=1024
-        )
-        
-        response_text = chat_completion.choices[0].message.content
-        citation = f"\n\n---\n**Source:** [{source['name']}]({source['url']})\n**Type:** {source.get('type', 'N/A')}\n**URL:** {source['url']}\n**Powered by:** Groq AI"
-        
-        return response_text + citation, None
-        
-    except Exception as e:
-        return None, f"Groq error: {str(e)}"
-
-def _summarize_with_ollama(source, model='llama3'):
-    """Fallback to Ollama for summarization"""
-    ollama_url = os.getenv('OLLAMA_URL', 'http://localhost:11434')
-    
-    prompt = f"""Provide a detailed summary of {source['name']} ({source['url']}) focusing on:
 
-1. What this resource provides for tenants and landlords
-2. Key legal information available
-3. How to access and use this resource
-4. Most important sections or topics covered
+def _citation(source, provider, model):
+    powered_by = "Groq AI" if provider == "groq" else f"Ollama ({model})"
+    return f"\n\n---\n**Source:** [{source['name']}]({source['url']})\n**Type:** {source.get('type', 'N/A')}\n**URL:** {source['url']}\n**Powered by:** {powered_by}"
 
-Include specific examples and cite the source URL: {source['url']}
 
-Format your response with:
-- Overview paragraph
-- Key Features (bullet points)
-- How to Use (step-by-step if applicable)
-- Citation with full URL
+def _summary_stream(source):
+    """Groq first, hedged fallback to Ollama (see llm_client); cached per source"""
+    return cached_completion_stream("summarize", prompt=_summary_prompt(source), models=SUMMARY_MODELS,
+                                    providers=("groq", "ollama"), max_tokens=1024,
+                                    ttl=SUMMARY_CACHE_TTL)
 
-Be specific and detailed."""
-    
-    try:
-        response = requests.post(
-            f"{ollama_url}/api/generate",
-            json={"model": model, "prompt": prompt, "stream": False},
-            timeout=60
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            summary_text = result.get('response', 'No summary generated.')
-            citation = f"\n\n---\n**Source:** [{source['name']}]({source['url']})\n**Type:** {source.get('type', 'N/A')}\n**URL:** {source['url']}\n**Powered by:** Ollama ({model})"
-            return summary_text + citation, None
-        else:
-            return None, f"Ollama returned status {response.status_code}"
-            
-    except Exception as e:
-        return None, f"Ollama error: {str(e)}"
 
 @ollama_bp.route('/sources', methods=['GET'])
 def list_sources():
@@ -112,8 +68,13 @@ def list_sources():
     })
 
 @ollama_bp.route('/summarize', methods=['POST'])
+@rate_limited('ai', 10)
 def summarize_source():
-    """Generate AI summary with citations - tries Groq first, falls back to Ollama"""
+    """Generate AI summary with citations - tries Groq first, falls back to Ollama
+
+    Send Accept: text/event-stream (or ?stream=1) to receive tokens as SSE;
+    the done event carries the citation and source.
+    """
     data = request.get_json()
     source_name = data.get('name')
     
@@ -126,33 +87,31 @@ def summarize_source():
     if not source:
         return jsonify({"error": f"Source '{source_name}' not found"}), 400
     
-    # Try Groq first (fast & free)
-    response_text, groq_error = _summarize_with_groq(source)
-    
-    if response_text:
-        return jsonify({
-            "response": response_text,
-            "source": {"name": source['name'], "url": source['url'], "type": source.get('type')},
-            "provider": "groq",
-            "model": "llama-3.1-70b-versatile"
+    source_info = {"name": source['name'], "url": source['url'], "type": source.get('type')}
+    stream = _summary_stream(source)
+
+    if wants_stream(request):
+        # Same citation the JSON response appends, sent with the done event
+        return sse_response(stream, done_extra=lambda s: {
+            "citation": _citation(source, s.provider, s.model),
+            "source": source_info,
         })
-    
-    # Fallback to Ollama
-    print(f"[INFO] Groq failed ({groq_error}), falling back to Ollama")
-    response_text, ollama_error = _summarize_with_ollama(source)
-    
-    if response_text:
+
+    try:
+        text = stream.text()
+    except LLMError as e:
+        errors = e.messages()
         return jsonify({
-            "response": response_text,
-            "source": {"name": source['name'], "url": source['url'], "type": source.get('type')},
-            "provider": "ollama",
-            "model": "llama3"
-        })
-    
-    # Both failed
+            "error": "All AI providers failed",
+            "groq_error": errors.get("groq"),
+            "ollama_error": errors.get("ollama"),
+            "help": "Set GROQ_API_KEY or ensure Ollama is running"
+        }), 502
+
     return jsonify({
-        "error": "All AI providers failed",
-        "groq_error": groq_error,
-        "ollama_error": ollama_error,
-        "help": "Set GROQ_API_KEY or ensure Ollama is running"
-    }), 502
+        "response": text + _citation(source, stream.provider, stream.model),
+        "source": source_info,
+        "provider": stream.provider,
+        "model": stream.model,
+        "cached": stream.stats.get("cached", False)
+    })
@@ -0,0 +1,261 @@
+"""Opt-in profiling: a stack-sampling profiler and a per-request span tracer.
+
+The sampler walks every thread's stack (waitress workers included) at a
+fixed rate for a bounded window and aggregates the samples into collapsed
+stacks ("frame;frame;frame count"), the input format of flamegraph.pl and
+speedscope.
+
+The tracer records nested span timings for the current request (vault
+crypto, storage calls, engine _save/_load, SQLite queries). Finished
+request traces go into a ring buffer that /admin/status shows. Outside a
+traced request span() costs one thread-local lookup.
+"""
+
+import functools
+import inspect
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+PROFILE_MAX_SECONDS = int(os.getenv("PROFILE_MAX_SECONDS", "60"))
+PROFILE_MAX_HZ = int(os.getenv("PROFILE_MAX_HZ", "250"))
+TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", "200"))
+TRACE_MAX_SPANS = int(os.getenv("TRACE_MAX_SPANS", "500"))
+
+
+# ============================================================================
+# SAMPLING PROFILER
+# ============================================================================
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Samples all thread stacks at `hz` from a background thread."""
+
+    def __init__(self, hz: int = 100):
+        self.hz = max(1, min(int(hz), PROFILE_MAX_HZ))
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._ignore = set()
+
+    def start(self, ignore_threads=()):
+        """Begin sampling; threads in ignore_threads (idents) are skipped."""
+        self._ignore = set(ignore_threads)
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        interval = 1.0 / self.hz
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(interval):
+            names.update({t.ident: t.name for t in threading.enumerate()})
+            for ident, frame in sys._current_frames().items():
+                if ident == own or ident in self._ignore:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                self.samples[";".join(reversed(stack))] += 1
+            self.sample_count += 1
+
+    def collapsed(self) -> str:
+        """Samples in collapsed-stack format, heaviest stacks first."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+_profile_lock = threading.Lock()
+
+
+def profile_for(seconds: float, hz: int = 100) -> Optional[SamplingProfiler]:
+    """
+    Sample all other threads for `seconds` (capped by PROFILE_MAX_SECONDS)
+    and return the finished profiler. Returns None when a profile is
+    already running, so concurrent admin requests cannot stack samplers.
+    """
+    if not _profile_lock.acquire(blocking=False):
+        return None
+    try:
+        profiler = SamplingProfiler(hz).start(ignore_threads=[threading.get_ident()])
+        time.sleep(max(0.0, min(float(seconds), PROFILE_MAX_SECONDS)))
+        profiler.stop()
+        return profiler
+    finally:
+        _profile_lock.release()
+
+
+# ============================================================================
+# SPAN TRACER
+# ============================================================================
+
+_local = threading.local()
+_traces: deque = deque(maxlen=TRACE_BUFFER_SIZE)
+_traces_lock = threading.Lock()
+
+
+def start_trace(name: str, **attrs):
+    """Begin collecting spans for the current thread (one request)."""
+    _local.trace = {
+        "name": name,
+        "attrs": attrs,
+        "start": time.perf_counter(),
+        "spans": [],
+        "depth": 0,
+        "dropped": 0,
+    }
+
+
+def end_trace(**attrs) -> Optional[Dict]:
+    """Finish the current thread's trace and push it into the ring buffer."""
+    trace = getattr(_local, "trace", None)
+    if trace is None:
+        return None
+    _local.trace = None
+    start = trace["start"]
+    record = {
+        "name": trace["name"],
+        **trace["attrs"],
+        **attrs,
+        "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+        "spans": [
+            {
+                "name": name,
+                "depth": depth,
+                "start_ms": round((span_start - start) * 1000, 3),
+                "duration_ms": round(duration * 1000, 3),
+            }
+            for name, depth, span_start, duration in trace["spans"]
+        ],
+    }
+    if trace["dropped"]:
+        record["dropped_spans"] = trace["dropped"]
+    with _traces_lock:
+        _traces.append(record)
+    return record
+
+
+@contextmanager
+def span(name: str):
+    """Time a block as a nested span of the current request trace."""
+    trace = getattr(_local, "trace", None)
+    if trace is None:
+        yield
+        return
+    depth = trace["depth"]
+    trace["depth"] = depth + 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace["depth"] = depth
+        if len(trace["spans"]) < TRACE_MAX_SPANS:
+            trace["spans"].append((name, depth, start, time.perf_counter() - start))
+        else:
+            trace["dropped"] += 1
+
+
+def traced(name: str):
+    """Decorator form of span()."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if getattr(_local, "trace", None) is None:
+                return fn(*args, **kwargs)
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def trace_persistence(cls):
+    """Class decorator: trace every _save*/_load* method as `Class._method`."""
+    for attr, value in list(vars(cls).items()):
+        if inspect.isfunction(value) and attr.startswith(("_save", "_load")):
+            setattr(cls, attr, traced(f"{cls.__name__}.{attr}")(value))
+    return cls
+
+
+def recent_traces(limit: int = 20) -> List[Dict]:
+    """Most recent request traces, newest first."""
+    with _traces_lock:
+        traces = list(_traces)
+    return traces[::-1][:limit]
+
+
+def install_request_tracing(app):
+    """Trace each request through before/after-request hooks."""
+    from flask import request
+
+    @app.before_request
+    def _start_request_trace():
+        start_trace(request.endpoint or "unmatched", method=request.method, path=request.path)
+
+    @app.teardown_request
+    def _end_request_trace(exc=None):
+        if exc is not None:
+            end_trace(error=type(exc).__name__)
+        else:
+            end_trace()
+
+    @app.after_request
+    def _tag_request_trace(response):
+        trace = getattr(_local, "trace", None)
+        if trace is not None:
+            trace["attrs"]["status"] = response.status_code
+        return response
+
+    return app
+
+
+# ============================================================================
+# SQLITE
+# ============================================================================
+
+class TracedCursor(sqlite3.Cursor):
+    """Cursor whose execute calls show up as sqlite spans."""
+
+    def execute(self, sql, parameters=()):
+        with span("sqlite.execute"):
+            return super().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        with span("sqlite.executemany"):
+            return super().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        with span("sqlite.executescript"):
+            return super().executescript(sql_script)
+
+
+class TracedConnection(sqlite3.Connection):
+    """Pass as sqlite3.connect(..., factory=TracedConnection)."""
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
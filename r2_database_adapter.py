@@ -10,18 +10,15 @@ Instead of storing users.db locally (ephemeral on Render free tier), this adapte
 This gives you persistent user data without needing Render Persistent Disk.
 """
 
+import importlib.util
 import os
 import sqlite3
 import time
 import atexit
 from pathlib import Path
 
-# Try to import boto3 for R2 support
-try:
-    import boto3
-    HAS_BOTO3 = True
-except ImportError:
-    HAS_BOTO3 = False
+# boto3 is only imported once R2 is actually configured (it is slow to import)
+HAS_BOTO3 = importlib.util.find_spec("boto3") is not None
 
 DB_PATH = "security/users.db"
 R2_DB_KEY = "database/users.db"  # Path in R2 bucket
@@ -55,6 +52,7 @@ class R2DatabaseAdapter:
             return False
         
         try:
+            import boto3
             account_id = os.getenv('R2_ACCOUNT_ID')
             self.s3_client = boto3.client(
                 's3',
@@ -0,0 +1,173 @@
+"""GCRA rate limiting with pluggable shared-state backends.
+
+Each key stores a single number, its theoretical arrival time (TAT): the
+moment its bucket will be completely refilled. A check with a limit of N
+requests per W seconds is O(1):
+
+    interval = W / N
+    tat      = max(stored_tat, now) + interval
+    allowed  = tat - now <= W         (store tat only when allowed)
+
+This lets a burst of N through and then one request per interval after
+that. A key whose TAT is in the past is indistinguishable from a new
+key, so idle keys can be evicted without losing anything. Eviction runs
+every RATE_LIMIT_EVICT_SECONDS.
+
+Backends:
+    memory  per-process dict (default; fine for a single waitress process)
+    sqlite  one table in RATE_LIMIT_DB, shared by every worker process
+            (gunicorn/multiple waitress processes) on the same host
+
+Select with RATE_LIMIT_BACKEND=memory|sqlite.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple
+
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_DB = os.getenv("RATE_LIMIT_DB", "security/rate_limits.db")
+RATE_LIMIT_EVICT_SECONDS = int(os.getenv("RATE_LIMIT_EVICT_SECONDS", "300"))
+
+
+def _gcra(stored_tat: Optional[float], now: float, limit: int, window: float) -> Tuple[bool, float, float]:
+    """Returns (allowed, new_tat, retry_after_seconds)."""
+    interval = window / max(1, limit)
+    tat = max(stored_tat or now, now) + interval
+    excess = tat - now - window
+    if excess > 0:
+        return False, stored_tat, excess
+    return True, tat, 0.0
+
+
+# ============================================================================
+# BACKENDS
+# ============================================================================
+
+class MemoryBackend:
+    """Per-process TAT table guarded by a lock."""
+
+    def __init__(self, evict_seconds: int = RATE_LIMIT_EVICT_SECONDS):
+        self.evict_seconds = evict_seconds
+        self._tats = {}
+        self._lock = threading.Lock()
+        self._last_evict = time.monotonic()
+
+    def hit(self, key: str, limit: int, window: float, now: Optional[float] = None) -> Tuple[bool, float]:
+        now = time.time() if now is None else now
+        with self._lock:
+            allowed, tat, retry_after = _gcra(self._tats.get(key), now, limit, window)
+            if allowed:
+                self._tats[key] = tat
+            if time.monotonic() - self._last_evict >= self.evict_seconds:
+                self._evict_locked(now)
+        return allowed, retry_after
+
+    def _evict_locked(self, now: float):
+        self._tats = {key: tat for key, tat in self._tats.items() if tat > now}
+        self._last_evict = time.monotonic()
+
+    def evict(self, now: Optional[float] = None):
+        with self._lock:
+            self._evict_locked(time.time() if now is None else now)
+
+    def clear(self):
+        with self._lock:
+            self._tats.clear()
+
+    def __len__(self):
+        return len(self._tats)
+
+
+class SQLiteBackend:
+    """TAT table in a SQLite file, shared by all processes on the host."""
+
+    def __init__(self, path: str = RATE_LIMIT_DB, evict_seconds: int = RATE_LIMIT_EVICT_SECONDS):
+        self.path = path
+        self.evict_seconds = evict_seconds
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY, tat REAL NOT NULL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS rate_limit_meta (name TEXT PRIMARY KEY, value REAL NOT NULL)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit; hit() opens its own IMMEDIATE transaction
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            self._local.conn = conn
+        return conn
+
+    def hit(self, key: str, limit: int, window: float, now: Optional[float] = None) -> Tuple[bool, float]:
+        now = time.time() if now is None else now
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tat FROM rate_limits WHERE key = ?", (key,)).fetchone()
+            allowed, tat, retry_after = _gcra(row[0] if row else None, now, limit, window)
+            if allowed:
+                conn.execute("INSERT OR REPLACE INTO rate_limits (key, tat) VALUES (?, ?)", (key, tat))
+            last = conn.execute("SELECT value FROM rate_limit_meta WHERE name = 'last_evict'").fetchone()
+            if last is None or now - last[0] >= self.evict_seconds:
+                self._evict(conn, now)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return allowed, retry_after
+
+    @staticmethod
+    def _evict(conn: sqlite3.Connection, now: float):
+        conn.execute("DELETE FROM rate_limits WHERE tat <= ?", (now,))
+        conn.execute("INSERT OR REPLACE INTO rate_limit_meta (name, value) VALUES ('last_evict', ?)", (now,))
+
+    def evict(self, now: Optional[float] = None):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        self._evict(conn, time.time() if now is None else now)
+        conn.execute("COMMIT")
+
+    def clear(self):
+        self._conn().execute("DELETE FROM rate_limits")
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0]
+
+
+# ============================================================================
+# GLOBAL BACKEND
+# ============================================================================
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_rate_limit_backend():
+    """Get the process-wide backend selected by RATE_LIMIT_BACKEND."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if RATE_LIMIT_BACKEND == "sqlite":
+                    _backend = SQLiteBackend(RATE_LIMIT_DB)
+                else:
+                    _backend = MemoryBackend()
+    return _backend
+
+
+def set_rate_limit_backend(backend):
+    """Swap the backend (tests, or an app factory choosing at runtime)."""
+    global _backend
+    _backend = backend
+    return backend
+
+
+def hit(key: str, limit: int, window: float) -> Tuple[bool, float]:
+    """Count one request for key; returns (allowed, retry_after_seconds)."""
+    return get_rate_limit_backend().hit(key, limit, window)
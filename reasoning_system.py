@@ -6,6 +6,8 @@ from typing import Dict, List, Any
 from datetime import datetime, timedelta
 import json
 
+from jurisdiction_detector import normalize_state
+
 class ReasoningSystem:
     def __init__(self):
         # MN-specific legal resources
@@ -432,6 +434,8 @@ class ReasoningSystem:
     def _resolve_jurisdiction(self, facts: Dict) -> Dict:
         """Step 1.5: Resolve jurisdiction assumption and confirmation."""
         cand = facts.get('jurisdiction_candidate')
+        # Same state codes the jurisdiction graph keys laws by ("Minnesota" -> "MN")
+        cand = normalize_state(cand) or cand
         conf = float(facts.get('jurisdiction_confidence') or 0.0)
         confirmed = bool(facts.get('jurisdiction_confirmed'))
         sources = facts.get('jurisdiction_sources') or []
@@ -0,0 +1,286 @@
+"""Response caching for expensive read-only JSON endpoints.
+
+    @bp.route('/api/programs/category/<category>')
+    @cached_response(ttl=300, tags=("housing_programs",))
+    def get_programs_by_category(category): ...
+
+The cache key is the endpoint, its view args, the normalized query string
+(sorted, values stripped), the JSON body for POST routes, and - for
+scope="user" - a hash of the caller's user token. Only 200 responses are
+stored. Every response carries an ETag; a matching If-None-Match gets a
+304 without a body, whether the response came from the cache or not.
+
+Entries live in an in-process LRU (RESPONSE_CACHE_SIZE entries). Setting
+RESPONSE_CACHE_DB adds a SQLite tier shared by all worker processes.
+
+Invalidation is by tag: each tag has a version number that is part of the
+key, so invalidate_tags("laws") makes every entry tagged "laws"
+unreachable at once (stale entries age out of the LRU / TTL). With the
+SQLite tier the versions live in SQLite, so one worker's invalidation is
+seen by all of them.
+"""
+
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "512"))
+RESPONSE_CACHE_DB = os.getenv("RESPONSE_CACHE_DB", "")
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "1") == "1"
+
+# (status, content_type, etag, body, expires_at)
+Entry = Tuple[int, str, str, bytes, float]
+
+
+# ============================================================================
+# STORAGE
+# ============================================================================
+
+class _SQLiteTier:
+    """Responses and tag versions in one SQLite file shared across processes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, status INTEGER, "
+            "content_type TEXT, etag TEXT, body BLOB, expires REAL)"
+        )
+        conn.execute("CREATE TABLE IF NOT EXISTS tag_versions (tag TEXT PRIMARY KEY, version INTEGER NOT NULL)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str, now: float) -> Optional[Entry]:
+        row = self._conn().execute(
+            "SELECT status, content_type, etag, body, expires FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[4] <= now:
+            return None
+        return row[0], row[1], row[2], bytes(row[3]), row[4]
+
+    def set(self, key: str, entry: Entry):
+        conn = self._conn()
+        conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)", (key, *entry))
+        conn.execute("DELETE FROM responses WHERE expires <= ?", (time.time(),))
+
+    def versions(self, tags: Iterable[str]) -> Dict[str, int]:
+        tags = list(tags)
+        placeholders = ",".join("?" * len(tags))
+        rows = self._conn().execute(
+            f"SELECT tag, version FROM tag_versions WHERE tag IN ({placeholders})", tags
+        ).fetchall()
+        return dict(rows)
+
+    def bump(self, tags: Iterable[str]):
+        conn = self._conn()
+        for tag in tags:
+            conn.execute(
+                "INSERT INTO tag_versions (tag, version) VALUES (?, 1) "
+                "ON CONFLICT(tag) DO UPDATE SET version = version + 1", (tag,)
+            )
+
+    def clear(self):
+        self._conn().execute("DELETE FROM responses")
+
+
+class ResponseCache:
+    """In-process LRU with an optional shared SQLite tier."""
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_SIZE, db_path: str = RESPONSE_CACHE_DB):
+        self.max_entries = max_entries
+        self.shared = _SQLiteTier(db_path) if db_path else None
+        self._entries: "OrderedDict[str, Entry]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.stats: Counter = Counter()  # (route, result) -> count
+
+    def tag_versions(self, tags: Tuple[str, ...]) -> str:
+        if not tags:
+            return ""
+        if self.shared is not None:
+            versions = self.shared.versions(tags)
+        else:
+            with self._lock:
+                versions = {tag: self._versions.get(tag, 0) for tag in tags}
+        return ",".join(f"{tag}:{versions.get(tag, 0)}" for tag in tags)
+
+    def get(self, key: str) -> Optional[Entry]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[4] > now:
+                    self._entries.move_to_end(key)
+                    return entry
+                del self._entries[key]
+        if self.shared is not None:
+            entry = self.shared.get(key, now)
+            if entry is not None:
+                self._store_local(key, entry)
+            return entry
+        return None
+
+    def set(self, key: str, entry: Entry):
+        self._store_local(key, entry)
+        if self.shared is not None:
+            self.shared.set(key, entry)
+
+    def _store_local(self, key: str, entry: Entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, tags: Iterable[str]):
+        tags = list(tags)
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+        if self.shared is not None:
+            self.shared.bump(tags)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.shared is not None:
+            self.shared.clear()
+
+    def record(self, route: str, result: str):
+        with self._lock:
+            self.stats[(route, result)] += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache()
+    return _cache
+
+
+def invalidate_tags(*tags: str):
+    """Make every cached response tagged with any of `tags` stale."""
+    get_response_cache().invalidate(tags)
+
+
+def cache_stats() -> Dict:
+    """Totals plus per-route hit/miss/not_modified counts."""
+    with get_response_cache()._lock:
+        stats = dict(get_response_cache().stats)
+    totals = Counter()
+    by_route: Dict[str, Dict[str, int]] = {}
+    for (route, result), count in stats.items():
+        totals[result] += count
+        by_route.setdefault(route, {})[result] = count
+    lookups = totals["hit"] + totals["miss"]
+    return {
+        "hits": totals["hit"],
+        "misses": totals["miss"],
+        "not_modified": totals["not_modified"],
+        "hit_ratio": round(totals["hit"] / lookups, 4) if lookups else 0.0,
+        "by_route": by_route,
+    }
+
+
+# ============================================================================
+# DECORATOR
+# ============================================================================
+
+def _user_scope(request) -> str:
+    from security import get_token_from_request
+    token = get_token_from_request(request) or ""
+    return hashlib.sha256(token.encode()).hexdigest()[:16]
+
+
+def _request_key(request, scope: str, vary_on_body: bool) -> str:
+    args = sorted((key, value.strip()) for key, value in request.args.items(multi=True))
+    parts = [
+        request.endpoint or request.path,
+        request.method,
+        json.dumps(request.view_args or {}, sort_keys=True, default=str),
+        json.dumps(args),
+    ]
+    if vary_on_body:
+        body = request.get_json(silent=True)
+        parts.append(json.dumps(body, sort_keys=True, default=str) if body is not None else request.get_data(as_text=True))
+    if scope == "user":
+        parts.append(_user_scope(request))
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+def cached_response(ttl: int = 60, tags: Iterable[str] = (), scope: str = "public",
+                    vary_on_body: bool = False):
+    """
+    Cache a view's 200 responses for `ttl` seconds.
+
+    scope="user" keys entries by the caller's user token and marks them
+    Cache-Control: private. vary_on_body=True makes POST routes cacheable
+    by their JSON body (for read-only searches sent as POST).
+    """
+    tags = tuple(tags)
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            from flask import make_response, request
+
+            if not RESPONSE_CACHE_ENABLED or (request.method != "GET" and not vary_on_body):
+                return fn(*args, **kwargs)
+
+            cache = get_response_cache()
+            route = request.endpoint or request.path
+            key = f"{_request_key(request, scope, vary_on_body)}|{cache.tag_versions(tags)}"
+            entry = cache.get(key)
+            if entry is not None:
+                cache.record(route, "hit")
+                status, content_type, etag, body, _ = entry
+                response = make_response(body, status)
+                response.headers["Content-Type"] = content_type
+                response.headers["X-Cache"] = "HIT"
+            else:
+                cache.record(route, "miss")
+                response = make_response(fn(*args, **kwargs))
+                if response.status_code != 200 or response.direct_passthrough:
+                    return response
+                body = response.get_data()
+                etag = hashlib.sha256(body).hexdigest()[:32]
+                cache.set(key, (200, response.headers.get("Content-Type", "application/json"),
+                                etag, body, time.time() + ttl))
+                response.headers["X-Cache"] = "MISS"
+
+            response.set_etag(etag)
+            response.headers["Cache-Control"] = f"{'private' if scope == 'user' else 'public'}, max-age={ttl}"
+            response.make_conditional(request)
+            if response.status_code == 304:
+                cache.record(route, "not_modified")
+            return response
+
+        wrapper.cache_tags = tags
+        return wrapper
+
+    return decorator
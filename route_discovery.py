@@ -5,13 +5,25 @@ Allows Semptify to automatically discover and wire in information routes
 
 import json
 import os
+import sqlite3
+import threading
+import time
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 import logging
 
+from deadline_calls import DeadlineCalls
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+ROUTE_HEALTH_WORKERS = int(os.getenv("ROUTE_HEALTH_WORKERS", "8"))
+ROUTE_HEALTH_TIMEOUT = float(os.getenv("ROUTE_HEALTH_TIMEOUT", "10"))
+ROUTE_HEALTH_SAMPLES = int(os.getenv("ROUTE_HEALTH_SAMPLES", "3"))
+# A route regressed when its p50 grew by this factor and by at least MIN_MS
+ROUTE_HEALTH_REGRESSION_RATIO = float(os.getenv("ROUTE_HEALTH_REGRESSION_RATIO", "1.5"))
+ROUTE_HEALTH_REGRESSION_MIN_MS = float(os.getenv("ROUTE_HEALTH_REGRESSION_MIN_MS", "20"))
+
 
 class RouteDiscovery:
     """
@@ -453,6 +465,241 @@ class DataSourceRegistry:
         }
 
 
+class RouteHealthScanner:
+    """
+    Probes routes concurrently and keeps the results of every scan.
+
+    Probes go to the WSGI app in-process (one test client per worker
+    thread) or, with base_url, to a running server over HTTP. Only GET
+    routes without URL parameters are probed. Each route is requested
+    `samples` times; latency percentiles, payload size and status are
+    written to SQLite (data/route_health.db) as each route finishes, so a
+    partial scan is still visible. diff() compares two scans and flags
+    routes whose latency regressed or that started failing. Only one
+    background scan runs at a time, and probes stuck past their deadline
+    keep one of the `workers` slots until they return.
+    """
+
+    def __init__(self, app=None, data_dir: str = "data", base_url: Optional[str] = None,
+                 workers: int = ROUTE_HEALTH_WORKERS, timeout: float = ROUTE_HEALTH_TIMEOUT,
+                 samples: int = ROUTE_HEALTH_SAMPLES):
+        self.app = app
+        self.base_url = base_url.rstrip("/") if base_url else None
+        self.workers = workers
+        self.timeout = timeout
+        self.samples = max(1, samples)
+        self.db_path = os.path.join(data_dir, "route_health.db")
+        self._local = threading.local()
+        self._slots = threading.BoundedSemaphore(max(1, workers))
+        self._scan_lock = threading.Lock()
+        self.running_scan_id: Optional[int] = None
+        os.makedirs(data_dir, exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS scans (id INTEGER PRIMARY KEY AUTOINCREMENT, started TEXT, "
+            "finished TEXT, target TEXT, routes INTEGER, status TEXT)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS probes (scan_id INTEGER, path TEXT, status INTEGER, ok INTEGER, "
+            "p50_ms REAL, p95_ms REAL, max_ms REAL, bytes INTEGER, error TEXT, PRIMARY KEY (scan_id, path))"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def targets(self) -> List[str]:
+        """GET routes without URL parameters."""
+        if not self.app:
+            return []
+        paths = set()
+        for rule in self.app.url_map.iter_rules():
+            if rule.endpoint != "static" and "GET" in rule.methods and not rule.arguments:
+                paths.add(str(rule))
+        return sorted(paths)
+
+    # ------------------------------------------------------------------
+    # Probing
+    # ------------------------------------------------------------------
+
+    def _request(self, path: str) -> Tuple[int, int]:
+        if self.base_url:
+            import requests
+            session = getattr(self._local, "session", None)
+            if session is None:
+                session = self._local.session = requests.Session()
+            response = session.get(self.base_url + path, timeout=self.timeout)
+            return response.status_code, len(response.content)
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.get(path)
+        return response.status_code, len(response.get_data())
+
+    def _probe(self, path: str) -> Dict:
+        timings, status, size = [], None, 0
+        try:
+            for _ in range(self.samples):
+                start = time.perf_counter()
+                status, size = self._request(path)
+                timings.append((time.perf_counter() - start) * 1000)
+        except Exception as e:
+            return {"path": path, "status": status, "ok": False, "error": str(e), **_percentiles(timings), "bytes": size}
+        return {"path": path, "status": status, "ok": status is not None and status < 400,
+                "error": None, **_percentiles(timings), "bytes": size}
+
+    def run(self, routes: Optional[List[str]] = None, scan_id: Optional[int] = None) -> int:
+        """Scan routes (default: all targets) and return the scan id."""
+        routes = self.targets() if routes is None else routes
+        if scan_id is None:
+            scan_id = self._create_scan(len(routes))
+        conn = self._conn()
+        calls = DeadlineCalls(name="route-health", slots=self._slots)
+
+        try:
+            # Queue time counts: a scan of N routes takes at most about
+            # N / workers probe deadlines, however many routes hang
+            for i, path in enumerate(routes):
+                slot = i // max(1, self.workers) + 1
+                calls.submit(path, self._probe, path, timeout=self.timeout * self.samples * slot)
+            while calls:
+                path, status, value = calls.next()
+                if status == "ok":
+                    self._save_probe(conn, scan_id, value)
+                elif status == "timeout":
+                    self._save_probe(conn, scan_id, {"path": path, "status": None, "ok": False,
+                                                     "error": "timeout", **_percentiles([]), "bytes": 0})
+                else:
+                    raise value
+            conn.execute("UPDATE scans SET finished = ?, status = 'finished' WHERE id = ?",
+                         (datetime.now().isoformat(), scan_id))
+        except Exception as e:
+            conn.execute("UPDATE scans SET finished = ?, status = ? WHERE id = ?",
+                         (datetime.now().isoformat(), f"failed: {e}", scan_id))
+            raise
+        return scan_id
+
+    def start(self, routes: Optional[List[str]] = None) -> Optional[int]:
+        """
+        Run a scan in a background thread; returns its id immediately, or
+        None if a scan is already running (see running_scan_id).
+        """
+        routes = self.targets() if routes is None else routes
+        with self._scan_lock:
+            if self.running_scan_id is not None:
+                return None
+            scan_id = self.running_scan_id = self._create_scan(len(routes))
+        threading.Thread(target=self._run_background, args=(routes, scan_id), daemon=True,
+                         name=f"route-health-scan-{scan_id}").start()
+        return scan_id
+
+    def _run_background(self, routes: List[str], scan_id: int):
+        try:
+            self.run(routes, scan_id)
+        except Exception as e:
+            logger.error(f"Route health scan {scan_id} failed: {e}")
+        finally:
+            with self._scan_lock:
+                self.running_scan_id = None
+
+    def _create_scan(self, count: int) -> int:
+        cursor = self._conn().execute(
+            "INSERT INTO scans (started, target, routes, status) VALUES (?, ?, ?, 'running')",
+            (datetime.now().isoformat(), self.base_url or "wsgi", count)
+        )
+        return cursor.lastrowid
+
+    @staticmethod
+    def _save_probe(conn: sqlite3.Connection, scan_id: int, result: Dict):
+        conn.execute(
+            "INSERT OR REPLACE INTO probes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (scan_id, result["path"], result["status"], int(result["ok"]), result["p50_ms"],
+             result["p95_ms"], result["max_ms"], result["bytes"], result["error"])
+        )
+
+    # ------------------------------------------------------------------
+    # Reports
+    # ------------------------------------------------------------------
+
+    def _scan_ids(self) -> List[int]:
+        return [row[0] for row in self._conn().execute("SELECT id FROM scans ORDER BY id DESC")]
+
+    def get_scan(self, scan_id: Optional[int] = None) -> Optional[Dict]:
+        """Scan summary and per-route results (default: latest scan)."""
+        if scan_id is None:
+            ids = self._scan_ids()
+            if not ids:
+                return None
+            scan_id = ids[0]
+        conn = self._conn()
+        scan = conn.execute("SELECT * FROM scans WHERE id = ?", (scan_id,)).fetchone()
+        if scan is None:
+            return None
+        probes = [dict(row) for row in conn.execute(
+            "SELECT path, status, ok, p50_ms, p95_ms, max_ms, bytes, error FROM probes "
+            "WHERE scan_id = ? ORDER BY p50_ms DESC", (scan_id,))]
+        for probe in probes:
+            probe["ok"] = bool(probe["ok"])
+        return {**dict(scan), "probed": len(probes), "failing": sum(not p["ok"] for p in probes),
+                "results": probes}
+
+    def diff(self, scan_id: Optional[int] = None, previous_id: Optional[int] = None) -> Dict:
+        """Compare a scan with the one before it (default: the two latest)."""
+        ids = self._scan_ids()
+        if scan_id is None:
+            scan_id = ids[0] if ids else None
+        if previous_id is None:
+            older = [i for i in ids if scan_id is not None and i < scan_id]
+            previous_id = older[0] if older else None
+        report = {"scan_id": scan_id, "previous_id": previous_id, "regressed": [], "improved": [],
+                  "newly_failing": [], "fixed": [], "added": [], "removed": []}
+        if scan_id is None or previous_id is None:
+            return report
+
+        current = {p["path"]: p for p in self.get_scan(scan_id)["results"]}
+        previous = {p["path"]: p for p in self.get_scan(previous_id)["results"]}
+        for path, now in current.items():
+            before = previous.get(path)
+            if before is None:
+                report["added"].append(path)
+                continue
+            if before["ok"] and not now["ok"]:
+                report["newly_failing"].append({"path": path, "status": now["status"], "error": now["error"]})
+            elif not before["ok"] and now["ok"]:
+                report["fixed"].append(path)
+            elif now["ok"] and now["p50_ms"] is not None and before["p50_ms"] is not None:
+                change = {"path": path, "p50_ms": now["p50_ms"], "previous_p50_ms": before["p50_ms"],
+                          "p95_ms": now["p95_ms"], "previous_p95_ms": before["p95_ms"]}
+                if _slower(now["p50_ms"], before["p50_ms"]):
+                    report["regressed"].append(change)
+                elif _slower(before["p50_ms"], now["p50_ms"]):
+                    report["improved"].append(change)
+        report["removed"] = sorted(set(previous) - set(current))
+        report["regressed"].sort(key=lambda c: c["p50_ms"] - c["previous_p50_ms"], reverse=True)
+        return report
+
+
+def _percentiles(timings: List[float]) -> Dict:
+    if not timings:
+        return {"p50_ms": None, "p95_ms": None, "max_ms": None}
+    ordered = sorted(timings)
+
+    def pick(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 2)
+
+    return {"p50_ms": pick(0.5), "p95_ms": pick(0.95), "max_ms": round(ordered[-1], 2)}
+
+
+def _slower(now_ms: float, before_ms: float) -> bool:
+    return (now_ms >= before_ms * ROUTE_HEALTH_REGRESSION_RATIO
+            and now_ms - before_ms >= ROUTE_HEALTH_REGRESSION_MIN_MS)
+
+
 # Integration Hook for Flask App
 def init_route_discovery(app, data_dir: str = "data"):
     """
@@ -5,13 +5,80 @@ Connects discovered routes to learning modules and data flow engine
 
 import json
 import os
-from typing import Dict, List, Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional
 from datetime import datetime
 import logging
 
+from deadline_calls import DeadlineCalls
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Sources queried at once by query_all_sources(), across all queries; a
+# fetch that is stuck past its timeout keeps its slot until it returns
+BRIDGE_MAX_WORKERS = int(os.getenv("BRIDGE_MAX_WORKERS", "8"))
+# Seconds one source may take before it is reported as timed out
+BRIDGE_SOURCE_TIMEOUT = float(os.getenv("BRIDGE_SOURCE_TIMEOUT", "5"))
+BRIDGE_CACHE_SIZE = int(os.getenv("BRIDGE_CACHE_SIZE", "256"))
+
+
+class SourceCache:
+    """Per-source response cache: LRU-bounded, entries expire after ttl seconds."""
+
+    def __init__(self, ttl: float, max_entries: int = BRIDGE_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires, data)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(method: str, endpoint: str, params: Optional[Dict]) -> str:
+        return f"{method} {endpoint} {json.dumps(params or {}, sort_keys=True, default=str)}"
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, data):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_thread_clients = threading.local()
+
+
+def _client_for_thread(client):
+    """Flask test clients keep per-client state; give each worker thread its own."""
+    app = getattr(client, "application", None)
+    if app is None:
+        return client
+    clients = getattr(_thread_clients, "clients", None)
+    if clients is None:
+        clients = _thread_clients.clients = {}
+    if id(app) not in clients:
+        clients[id(app)] = app.test_client()
+    return clients[id(app)]
+
 
 class DiscoveredDataSource:
     """
@@ -27,12 +94,25 @@ class DiscoveredDataSource:
         self.source_id = route_info.get("source_id", "")
         self.name = route_info.get("name", "")
         self.category = route_info.get("category", "")
-        self.cache = {}
-        self.cache_ttl = 3600  # 1 hour
-
-    def fetch(self, params: Optional[Dict] = None) -> Optional[Dict]:
+        self.cache_ttl = route_info.get("cache_ttl", 3600)  # 1 hour
+        self.cache = SourceCache(self.cache_ttl)
+        self.stats = {"calls": 0, "cache_hits": 0, "errors": 0, "timeouts": 0,
+                      "total_ms": 0.0, "max_ms": 0.0, "last_ms": None}
+        self._stats_lock = threading.Lock()
+
+    def _record(self, outcome: str, ms: float = None):
+        with self._stats_lock:
+            self.stats["calls"] += 1
+            if outcome != "ok":
+                self.stats[outcome] += 1
+            if ms is not None:
+                self.stats["total_ms"] += ms
+                self.stats["max_ms"] = max(self.stats["max_ms"], ms)
+                self.stats["last_ms"] = round(ms, 2)
+
+    def fetch(self, params: Optional[Dict] = None, use_cache: bool = True) -> Optional[Dict]:
         """
-        Fetch data from discovered route.
+        Fetch data from discovered route (cached for cache_ttl seconds).
 
         Returns:
             Dict: Response data or None if error
@@ -41,26 +121,48 @@ class DiscoveredDataSource:
             logger.error(f"No client available for {self.name}")
             return None
 
+        key = SourceCache.key(self.method, self.endpoint, params)
+        if use_cache:
+            data = self.cache.get(key)
+            if data is not None:
+                self._record("cache_hits")
+                return data
+
+        start = time.perf_counter()
         try:
+            client = _client_for_thread(self.client)
             if self.method == "GET":
-                response = self.client.get(self.endpoint, query_string=params or {})
+                response = client.get(self.endpoint, query_string=params or {})
             elif self.method == "POST":
-                response = self.client.post(self.endpoint, json=params or {})
+                response = client.post(self.endpoint, json=params or {})
             else:
                 return None
 
             if response.status_code == 200:
                 data = response.get_json()
-                self.cache[str(params)] = data
+                self._record("ok", (time.perf_counter() - start) * 1000)
+                if data is not None:
+                    self.cache.set(key, data)
                 return data
             else:
+                self._record("errors", (time.perf_counter() - start) * 1000)
                 logger.warning(f"HTTP {response.status_code} from {self.endpoint}")
                 return None
 
         except Exception as e:
+            self._record("errors", (time.perf_counter() - start) * 1000)
             logger.error(f"Error fetching from {self.name}: {e}")
             return None
 
+    def get_stats(self) -> Dict:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        fetched = stats["calls"] - stats["cache_hits"] - stats["timeouts"]
+        stats["avg_ms"] = round(stats["total_ms"] / fetched, 2) if fetched > 0 else None
+        stats["total_ms"] = round(stats["total_ms"], 2)
+        stats["max_ms"] = round(stats["max_ms"], 2)
+        return stats
+
     def query(self, query_type: str, params: Optional[Dict] = None) -> Optional[Dict]:
         """
         Query the discovered data source.
@@ -107,6 +209,7 @@ class IntegrationBridge:
         self.client = client
         self.discovered_sources: Dict[str, DiscoveredDataSource] = {}
         self.integration_map = {}  # Map learning categories to data sources
+        self._fetch_slots = threading.BoundedSemaphore(BRIDGE_MAX_WORKERS)
         self.load_discovered_sources()
 
     def load_discovered_sources(self):
@@ -154,40 +257,84 @@ class IntegrationBridge:
 
         return sources
 
-    def query_all_sources(self, query: str, learning_category: Optional[str] = None) -> Dict:
+    def _select_sources(self, learning_category: Optional[str]) -> List[DiscoveredDataSource]:
+        if learning_category:
+            return self.get_sources_by_learning_category(learning_category)
+        return list(self.discovered_sources.values())
+
+    def iter_query_results(self, query: str, learning_category: Optional[str] = None,
+                           timeout: float = BRIDGE_SOURCE_TIMEOUT) -> Iterator[Dict]:
+        """
+        Query matching sources concurrently, yielding each result as it completes.
+
+        Yields {"source": metadata, "data": ...} on success, or
+        {"source": metadata, "error": "no_data" | "timeout" | message}.
+        Each source gets timeout seconds of its own: sources queued behind
+        the first BRIDGE_MAX_WORKERS get one more timeout per batch ahead
+        of them. A source that misses its deadline is reported as timed out
+        and left to finish in the background (its result still lands in the
+        cache for the next query).
+        """
+        params = {"query": query}
+        sources = self._select_sources(learning_category)
+        if not sources:
+            return
+        calls = DeadlineCalls(name="bridge", slots=self._fetch_slots)
+        by_id = {source.source_id: source for source in sources}
+        for i, source in enumerate(sources):
+            slot = i // BRIDGE_MAX_WORKERS + 1
+            calls.submit(source.source_id, source.fetch, params, timeout=timeout * slot)
+        while calls:
+            source_id, status, value = calls.next()
+            source = by_id[source_id]
+            if status == "timeout":
+                source._record("timeouts")
+                logger.warning(f"Timed out querying {source.name}")
+                yield {"source": source.get_metadata(), "error": "timeout"}
+            elif status == "error":
+                logger.warning(f"Error querying {source.name}: {value}")
+                yield {"source": source.get_metadata(), "error": str(value)}
+            elif value:
+                yield {"source": source.get_metadata(), "data": value}
+            else:
+                yield {"source": source.get_metadata(), "error": "no_data"}
+
+    def query_all_sources(self, query: str, learning_category: Optional[str] = None,
+                          timeout: float = BRIDGE_SOURCE_TIMEOUT) -> Dict:
         """
         Query all discovered sources for information.
 
-        Returns aggregated results from all matching sources.
+        Returns aggregated results from all matching sources. Sources are
+        queried concurrently (BRIDGE_MAX_WORKERS at a time), so the call
+        costs about as much as the slowest source.
         """
+        start = time.perf_counter()
         results = {
             "query": query,
             "timestamp": datetime.now().isoformat(),
             "sources_queried": 0,
-            "results": []
+            "results": [],
+            "errors": []
         }
 
-        # Determine which sources to query
-        if learning_category:
-            sources = self.get_sources_by_learning_category(learning_category)
-        else:
-            sources = list(self.discovered_sources.values())
-
-        # Query each source
-        for source in sources:
-            try:
-                data = source.fetch({"query": query})
-                if data:
-                    results["results"].append({
-                        "source": source.get_metadata(),
-                        "data": data
-                    })
-                    results["sources_queried"] += 1
-            except Exception as e:
-                logger.warning(f"Error querying {source.name}: {e}")
-
+        for item in self.iter_query_results(query, learning_category, timeout):
+            if "data" in item:
+                results["results"].append(item)
+                results["sources_queried"] += 1
+            elif item["error"] != "no_data":
+                results["errors"].append({"source_id": item["source"]["source_id"], "error": item["error"]})
+
+        # Stable order regardless of completion order
+        order = {source_id: i for i, source_id in enumerate(self.discovered_sources)}
+        results["results"].sort(key=lambda r: order.get(r["source"]["source_id"], 0))
+        results["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
         return results
 
+    def get_source_statistics(self) -> Dict[str, Dict]:
+        """Per-source call, cache and latency statistics."""
+        return {source_id: source.get_stats() for source_id, source in self.discovered_sources.items()
+                if source.stats["calls"]}
+
     def map_learning_category_to_sources(self, learning_category: str, endpoint_patterns: List[str]) -> Dict:
         """
         Create mapping from learning category to data sources.
@@ -303,7 +450,8 @@ class LearningModuleDataSourceAdapter:
             "timestamp": datetime.now().isoformat(),
             "module": module_name,
             "query": query,
-            "results_found": len(result["discovered_results"])
+            "results_found": len(result["discovered_results"]),
+            "elapsed_ms": discovered_results.get("elapsed_ms")
         })
 
         result["total_results"] = len(result["discovered_results"])
@@ -315,6 +463,7 @@ class LearningModuleDataSourceAdapter:
             return {"queries": 0}
 
         modules = set(q.get("module") for q in self.query_history)
+        elapsed = sorted(q["elapsed_ms"] for q in self.query_history if q.get("elapsed_ms") is not None)
 
         return {
             "total_queries": len(self.query_history),
@@ -323,5 +472,10 @@ class LearningModuleDataSourceAdapter:
                 m: len([q for q in self.query_history if q.get("module") == m])
                 for m in modules
             },
-            "recent_queries": self.query_history[-10:]
+            "recent_queries": self.query_history[-10:],
+            "query_latency_ms": {
+                "avg": round(sum(elapsed) / len(elapsed), 2) if elapsed else None,
+                "max": elapsed[-1] if elapsed else None
+            },
+            "source_latency": self.bridge.get_source_statistics()
         }
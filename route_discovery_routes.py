@@ -3,18 +3,23 @@ Route Discovery & Dynamic Data Source Flask Endpoints
 Exposes route discovery and integration capabilities via API
 """
 
-from flask import Blueprint, jsonify, request, current_app
+from flask import Blueprint, Response, jsonify, request, current_app
 from typing import Dict, Optional
+import json
 import logging
 from datetime import datetime
 
+from response_cache import cached_response, invalidate_tags
+from security import _require_admin_or_401, rate_limited
+
 # Import discovery modules
 try:
-    from route_discovery import RouteDiscovery, DataSourceRegistry, init_route_discovery
+    from route_discovery import RouteDiscovery, DataSourceRegistry, RouteHealthScanner, init_route_discovery
     from route_discovery_bridge import IntegrationBridge, LearningModuleDataSourceAdapter
 except ImportError:
     RouteDiscovery = None
     DataSourceRegistry = None
+    RouteHealthScanner = None
     IntegrationBridge = None
     LearningModuleDataSourceAdapter = None
 
@@ -27,11 +32,12 @@ _discovery_instance = None
 _registry_instance = None
 _bridge_instance = None
 _adapter_instance = None
+_health_scanner = None
 
 
 def init_route_discovery_api(app, data_dir: str = "data"):
     """Initialize route discovery API."""
-    global _discovery_instance, _registry_instance, _bridge_instance, _adapter_instance
+    global _discovery_instance, _registry_instance, _bridge_instance, _adapter_instance, _health_scanner
 
     if RouteDiscovery is None:
         logger.error("Route discovery module not available")
@@ -51,6 +57,9 @@ def init_route_discovery_api(app, data_dir: str = "data"):
         # Initialize adapter
         _adapter_instance = LearningModuleDataSourceAdapter(_bridge_instance)
 
+        # Health scanner (scans run on demand via /health-scan)
+        _health_scanner = RouteHealthScanner(app, data_dir)
+
         logger.info("✓ Route discovery API initialized")
         logger.info(f"  - Discovery: {len(_discovery_instance.discovered_routes)} routes scanned")
         logger.info(f"  - Registry: {len(_registry_instance.get_all_sources())} sources registered")
@@ -78,6 +87,7 @@ def scan_routes():
 
     try:
         results = _discovery_instance.scan_app()
+        invalidate_tags("route_catalog")
 
         return jsonify({
             "status": "success",
@@ -102,6 +112,7 @@ def scan_routes():
 
 
 @route_discovery_bp.route('/qualified-routes', methods=['GET'])
+@cached_response(ttl=60, tags=("route_catalog",))
 def get_qualified_routes():
     """
     Get all qualified informational routes.
@@ -127,6 +138,7 @@ def get_qualified_routes():
 
 
 @route_discovery_bp.route('/routes-by-category/<category>', methods=['GET'])
+@cached_response(ttl=60, tags=("route_catalog",))
 def get_routes_by_category(category: str):
     """
     Get qualified routes by category.
@@ -182,6 +194,7 @@ def register_sources():
 
         # Register all sources
         count = _registry_instance.register_bulk(config.get("data_sources", []))
+        invalidate_tags("route_catalog")
 
         # Add to bridge
         for source_config in config.get("data_sources", []):
@@ -200,6 +213,7 @@ def register_sources():
 
 
 @route_discovery_bp.route('/registry', methods=['GET'])
+@cached_response(ttl=60, tags=("route_catalog",))
 def get_registry():
     """
     Get complete data source registry.
@@ -227,6 +241,7 @@ def get_registry():
 
 
 @route_discovery_bp.route('/registry/by-category/<category>', methods=['GET'])
+@cached_response(ttl=60, tags=("route_catalog",))
 def get_registry_by_category(category: str):
     """
     Get data sources by category from registry.
@@ -300,7 +315,8 @@ def query_all_sources():
         }
 
     Returns:
-        JSON with aggregated results from all sources
+        JSON with aggregated results from all sources, or with ?stream=1
+        newline-delimited JSON: one line per source as it completes
     """
     if not _bridge_instance:
         return jsonify({"error": "Bridge not initialized"}), 503
@@ -313,6 +329,12 @@ def query_all_sources():
         if not query:
             return jsonify({"error": "query parameter required"}), 400
 
+        if request.args.get("stream") in ("1", "true"):
+            def generate():
+                for item in _bridge_instance.iter_query_results(query, category):
+                    yield json.dumps(item, default=str) + "\n"
+            return Response(generate(), mimetype="application/x-ndjson")
+
         results = _bridge_instance.query_all_sources(query, category)
 
         return jsonify({
@@ -498,3 +520,100 @@ def get_query_statistics():
     except Exception as e:
         logger.error(f"Error getting query statistics: {e}")
         return jsonify({"error": str(e)}), 500
+
+
+# ============================================================================
+# Route Health Scans
+# ============================================================================
+
+def _get_health_scanner():
+    """The scanner from init_route_discovery_api, or one for the serving app.
+
+    Scans only need the app's URL map, so they work even when the rest of
+    the discovery API was never initialized.
+    """
+    global _health_scanner
+    if _health_scanner is None and RouteHealthScanner is not None:
+        _health_scanner = RouteHealthScanner(current_app._get_current_object())
+    return _health_scanner
+
+
+@route_discovery_bp.route('/health-scan', methods=['POST'])
+@rate_limited('health_scan', 5)
+def start_health_scan():
+    """
+    Start a concurrent latency/health scan of all GET routes (admin only).
+
+    Request body (optional):
+    {
+        "routes": ["/api/health", ...]   # default: every parameterless GET route
+    }
+
+    Returns:
+        202 with the scan id; poll GET /health-scan?scan_id=<id> for progress.
+        409 with the running scan's id if a scan is already in progress.
+    """
+    if not _require_admin_or_401():
+        return jsonify({"error": "Unauthorized"}), 401
+
+    scanner = _get_health_scanner()
+    if not scanner:
+        return jsonify({"error": "Health scanner not available"}), 503
+
+    try:
+        data = request.get_json(silent=True) or {}
+        routes = data.get("routes")
+        if routes is not None:
+            if not isinstance(routes, list):
+                return jsonify({"error": "'routes' must be a list of paths"}), 400
+            unknown = sorted(set(map(str, routes)) - set(scanner.targets()))
+            if unknown:
+                return jsonify({"error": "Not scannable GET routes", "routes": unknown}), 400
+
+        scan_id = scanner.start(routes)
+        if scan_id is None:
+            return jsonify({"error": "A health scan is already running",
+                            "scan_id": scanner.running_scan_id}), 409
+        return jsonify({
+            "status": "started",
+            "scan_id": scan_id,
+            "timestamp": datetime.now().isoformat()
+        }), 202
+
+    except Exception as e:
+        logger.error(f"Error starting health scan: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+@route_discovery_bp.route('/health-scan', methods=['GET'])
+def get_health_scan():
+    """
+    Get a health scan's results and its diff against the previous scan.
+
+    Query params:
+        scan_id: Scan to report (default: latest)
+        previous_id: Scan to compare against (default: the one before)
+
+    Returns:
+        JSON with per-route p50/p95/max latency, payload size, status and
+        the routes that regressed, improved, started failing or were fixed
+    """
+    scanner = _get_health_scanner()
+    if not scanner:
+        return jsonify({"error": "Health scanner not available"}), 503
+
+    try:
+        scan_id = request.args.get("scan_id", type=int)
+        scan = scanner.get_scan(scan_id)
+        if scan is None:
+            return jsonify({"error": "No health scans yet"}), 404
+
+        return jsonify({
+            "status": "success",
+            "scan": scan,
+            "diff": scanner.diff(scan["id"], request.args.get("previous_id", type=int))
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Error getting health scan: {e}")
+        return jsonify({"error": str(e)}), 500
@@ -1,6 +1,7 @@
 import os
 from waitress import serve
 from Semptify import app
+from startup import start_startup
 from datetime import datetime, timedelta
 import hashlib
 import secrets
@@ -63,6 +64,7 @@ if __name__ == '__main__':
 
     threads = int(os.environ.get('SEMPTIFY_THREADS', '8'))
     backlog = int(os.environ.get('SEMPTIFY_BACKLOG', '1024'))
+    start_startup()  # R2 restore, schema, engine warm-up; /readyz is 503 until done
     print(f"Starting Semptify (production) on {host}:{port} threads={threads} backlog={backlog} (PORT env fallback supported)")
     serve(app, host=host, port=port, threads=threads, backlog=backlog)
 
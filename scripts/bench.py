@@ -0,0 +1,85 @@
+"""Run the hot-path benchmark suite and compare results
+
+Benchmarks and datasets live in benchmarks.py. `run` writes a JSON results
+file; `compare` exits 1 when a benchmark's median got slower than the
+baseline by more than the threshold, so it can gate CI.
+
+Usage:
+    python scripts/bench.py list
+    python scripts/bench.py run [-o bench/results.json] [--scale 1.0] [--rounds N] [--only NAME ...]
+    python scripts/bench.py compare BASELINE.json CURRENT.json [--threshold 0.25] [--metric median_ms]
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import benchmarks  # noqa: E402
+
+
+def cmd_list(args):
+    for bench in benchmarks.list_benchmarks():
+        params = ", ".join(str(p) for p in bench.params if p is not None)
+        print(f"{bench.name:28} {bench.description}" + (f"  [{params}]" if params else ""))
+    return 0
+
+
+def cmd_run(args):
+    def progress(key, result):
+        if "error" in result:
+            print(f"{key:40} [WARN] {result['error']}")
+        else:
+            print(f"{key:40} median {result['median_ms']:10.3f} ms   p95 {result['p95_ms']:10.3f} ms")
+
+    output = os.path.abspath(args.output)
+    results = benchmarks.run_benchmarks(args.only, scale=args.scale, seed=args.seed,
+                                        rounds=args.rounds, progress=progress)
+    benchmarks.write_results(results, output)
+    print(f"\n[OK] Wrote {len(results['results'])} results to {output}")
+    return 1 if any("error" in r for r in results['results'].values()) else 0
+
+
+def cmd_compare(args):
+    report = benchmarks.compare_results(benchmarks.load_results(args.baseline),
+                                        benchmarks.load_results(args.current),
+                                        threshold=args.threshold, metric=args.metric)
+    print(benchmarks.format_comparison(report))
+    if report["regressions"]:
+        print(f"\n[WARN] {len(report['regressions'])} benchmark(s) regressed by more than "
+              f"{args.threshold * 100:.0f}% on {args.metric}")
+        return 1
+    print("\n[OK] No regressions")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("list", help="List benchmarks").set_defaults(fn=cmd_list)
+
+    run = sub.add_parser("run", help="Run benchmarks and write results JSON")
+    run.add_argument("-o", "--output", default=os.path.join("bench", "results.json"))
+    run.add_argument("--scale", type=float, default=1.0, help="Multiply dataset sizes")
+    run.add_argument("--seed", type=int, default=benchmarks.BENCH_SEED)
+    run.add_argument("--rounds", type=int, help="Override timed rounds per benchmark")
+    run.add_argument("--only", nargs="+", metavar="NAME", help="Benchmarks to run (default: all)")
+    run.set_defaults(fn=cmd_run)
+
+    compare = sub.add_parser("compare", help="Fail if CURRENT regressed against BASELINE")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=benchmarks.BENCH_REGRESSION_THRESHOLD,
+                         help="Allowed slowdown as a fraction (0.25 = 25%%)")
+    compare.add_argument("--metric", default=benchmarks.TRACKED_METRIC)
+    compare.set_defaults(fn=cmd_compare)
+
+    args = parser.parse_args()
+    sys.exit(args.fn(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""Smart inbox scoring benchmark
+
+Compares the per-message reference scorer (`score_message` in a loop, the
+way scan_messages used to work) against the compiled batch scorer, serial
+and with a process pool, on a synthetic mailbox export. Also times writing
+the accepted messages to the append-only inbox log.
+
+Usage:
+    python scripts/bench_smart_inbox.py [--messages 50000] [--workers 4]
+
+Runs offline; the inbox is written to a temporary directory.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import smart_inbox  # noqa: E402
+
+RENTAL_LINES = [
+    "Your rent payment for Unit 4B is late; a late fee applies.",
+    "Notice of inspection scheduled for your apartment next week.",
+    "We received your maintenance request and will repair the heater.",
+    "This is a notice of eviction. Legal action may follow.",
+    "Your security deposit statement is attached.",
+]
+OTHER_LINES = [
+    "Want to grab dinner this weekend?",
+    "Your order has shipped and will arrive Tuesday.",
+    "Meeting notes from today are attached.",
+    "Happy birthday! Hope you have a great day.",
+    "Reminder: dentist appointment on Friday.",
+]
+SENDERS = ["landlord@property.com", "friend@example.com", "store@shop.com",
+           "office@acme-mgmt.com", "news@daily.example"]
+
+
+def make_messages(n: int, seed: int = 42):
+    rng = random.Random(seed)
+    messages = []
+    for i in range(n):
+        rental = rng.random() < 0.2
+        lines = RENTAL_LINES if rental else OTHER_LINES
+        body = " ".join(rng.choice(lines) for _ in range(rng.randint(3, 12)))
+        messages.append({
+            "subject": rng.choice(lines)[:40],
+            "body": body,
+            "sender": rng.choice(SENDERS),
+            "date": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "type": "email",
+            "seq": i,
+        })
+    return messages
+
+
+def legacy_scan(messages, threshold=30):
+    scored = []
+    for msg in messages:
+        score = smart_inbox.score_message(msg.get('subject', ''), msg.get('body', ''), msg.get('sender', ''))
+        if score >= threshold:
+            msg['relevance_score'] = score
+            scored.append(msg)
+    return sorted(scored, key=lambda m: m['relevance_score'], reverse=True)
+
+
+def legacy_save(user_id, messages, data_dir):
+    """One pretty-printed JSON file per message, as save_to_inbox used to do."""
+    inbox_dir = os.path.join(data_dir, 'smart_inbox', user_id)
+    os.makedirs(inbox_dir, exist_ok=True)
+    for message in messages:
+        msg_id = smart_inbox._message_id(message)
+        with open(os.path.join(inbox_dir, f"{msg_id}-{message['seq']}.json"), 'w') as f:
+            json.dump(message, f, indent=2)
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:32} {elapsed * 1000:9.1f} ms")
+    return result, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=50000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+
+    print(f"Smart inbox benchmark: {args.messages} messages\n")
+    messages = make_messages(args.messages)
+    legacy, t_legacy = timed("reference loop", lambda: legacy_scan(messages))
+    batch, t_batch = timed("batch (serial)", lambda: smart_inbox.scan_messages(messages))
+    pooled, _ = timed(f"batch ({args.workers} processes)", lambda: list(
+        smart_inbox.iter_scan_messages(messages, workers=args.workers)))
+
+    assert [m['seq'] for m in legacy] == [m['seq'] for m in batch], "batch scores differ from reference"
+    assert len(pooled) == len(batch)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        timed(f"per-file save of {len(batch)}", lambda: legacy_save('legacy', batch, data_dir))
+        timed(f"append {len(batch)} to inbox log",
+              lambda: smart_inbox.save_many_to_inbox('bench', batch, data_dir=data_dir))
+        timed("read inbox back", lambda: smart_inbox.get_inbox_messages('bench', data_dir=data_dir))
+
+    print(f"\nAccepted {len(batch)} messages; serial batch speedup {t_legacy / t_batch:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""Build fingerprinted, minified and precompressed static assets
+
+Writes static/dist/ and static/dist/manifest.json (see static_assets.py).
+Run on every deploy; the output is not committed.
+
+Usage:
+    python scripts/build_assets.py [--static-dir static]
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import static_assets  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--static-dir', default=static_assets.STATIC_DIR)
+    args = parser.parse_args()
+
+    result = static_assets.build_assets(args.static_dir)
+    raw = sum(s['raw'] for s in result['sizes'].values())
+    best = sum(min(s.values()) for s in result['sizes'].values())
+    print(f"{'asset':50} {'raw':>9} {'gzip':>9} {'br':>9}")
+    for name, sizes in sorted(result['sizes'].items()):
+        print(f"{name:50} {sizes['raw']:>9} {sizes.get('gzip', '-'):>9} {sizes.get('br', '-'):>9}")
+    print(f"[OK] {len(result['assets'])} assets -> {os.path.join(args.static_dir, static_assets.DIST_NAME)} "
+          f"({raw} bytes, {best} bytes best-compressed)")
+    if static_assets.brotli is None:
+        print('[SKIP] brotli not installed; only .gz variants written')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Regenerate blueprint_manifest.json
+
+Semptify registers feature blueprints lazily from this manifest (see
+lazy_blueprints.py), so it must be rebuilt whenever a blueprint's routes
+change. Imports every module in Semptify.blueprints_to_register.
+
+Usage:
+    python scripts/build_blueprint_manifest.py [--check]
+
+--check exits non-zero if the committed manifest is out of date.
+"""
+import argparse
+import json
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Import Semptify with eager registration so nothing depends on the old manifest
+os.environ['SEMPTIFY_LAZY_BLUEPRINTS'] = '0'
+
+import lazy_blueprints  # noqa: E402
+
+
+def render(manifest) -> str:
+    return json.dumps(manifest, indent=2, sort_keys=True) + '\n'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--check', action='store_true')
+    args = parser.parse_args()
+
+    from Semptify import blueprints_to_register
+    text = render(lazy_blueprints.build_manifest(blueprints_to_register))
+
+    if args.check:
+        try:
+            with open(lazy_blueprints.MANIFEST_FILE, 'r', encoding='utf-8') as f:
+                current = f.read()
+        except OSError:
+            current = ''
+        if current != text:
+            print('blueprint_manifest.json is out of date; run scripts/build_blueprint_manifest.py')
+            sys.exit(1)
+        print('blueprint_manifest.json is up to date')
+        return
+
+    with open(lazy_blueprints.MANIFEST_FILE, 'w', encoding='utf-8') as f:
+        f.write(text)
+    print(f'Wrote {lazy_blueprints.MANIFEST_FILE}')
+
+
+if __name__ == '__main__':
+    main()
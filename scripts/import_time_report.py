@@ -0,0 +1,64 @@
+"""Import-time report for Semptify startup
+
+Runs `python -X importtime -c "import Semptify"` in a fresh interpreter
+and prints the slowest modules by self and cumulative time, so new
+import-time work (SQLite, R2, big JSON loads) is easy to spot.
+
+Usage:
+    python scripts/import_time_report.py [--top 25] [--module Semptify] [--eager]
+
+--eager disables lazy blueprint registration for comparison.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def import_times(module: str, env=None):
+    """[(module, self_us, cumulative_us)] as reported by -X importtime."""
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    if proc.returncode != 0:
+        print(proc.stderr[-2000:], file=sys.stderr)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--top', type=int, default=25)
+    parser.add_argument('--module', default='Semptify')
+    parser.add_argument('--eager', action='store_true')
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if args.eager:
+        env['SEMPTIFY_LAZY_BLUEPRINTS'] = '0'
+    rows = import_times(args.module, env)
+    if not rows:
+        sys.exit(1)
+
+    total = next((cum for name, _, cum in rows if name == args.module), max(r[2] for r in rows))
+    print(f"import {args.module}: {total / 1000:.1f} ms total, {len(rows)} modules\n")
+
+    print(f"{'self ms':>9} {'cum ms':>9}  module (by cumulative)")
+    for name, self_us, cum_us in sorted(rows, key=lambda r: r[2], reverse=True)[:args.top]:
+        print(f"{self_us / 1000:9.1f} {cum_us / 1000:9.1f}  {name}")
+
+    print(f"\n{'self ms':>9}  module (by self time)")
+    for name, self_us, _ in sorted(rows, key=lambda r: r[1], reverse=True)[:args.top]:
+        print(f"{self_us / 1000:9.1f}  {name}")
+
+
+if __name__ == '__main__':
+    main()
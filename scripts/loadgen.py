@@ -0,0 +1,80 @@
+"""Drive the app with concurrent synthetic tenant journeys
+
+Journeys (register -> verify -> upload -> dashboard -> packet -> download and
+variants, named after TenantJourney stages) run against a scratch workspace
+on local disk, either in-process or over HTTP to a local waitress started
+from run_prod.py. Prints throughput, per-endpoint latency percentiles and
+error rates; --output also writes them as JSON.
+
+Usage:
+    python scripts/loadgen.py [--transport inprocess|http] [--concurrency 8]
+                              [--journeys 100 | --duration SECONDS]
+                              [--mix issue=5,signing=3,searching=1,dispute=1]
+                              [--server-threads 8] [--scale 0.1] [-o loadgen.json]
+"""
+import argparse
+import json
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import loadgen  # noqa: E402
+from benchmarks import Workspace  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transport", choices=["inprocess", "http"], default="inprocess")
+    parser.add_argument("--concurrency", type=int, default=loadgen.LOADGEN_CONCURRENCY,
+                        help="Concurrent synthetic tenants")
+    parser.add_argument("--journeys", type=int, help=f"Journeys to run (default {loadgen.LOADGEN_JOURNEYS})")
+    parser.add_argument("--duration", type=float, help="Run for this many seconds instead of a journey count")
+    parser.add_argument("--mix", default=",".join(f"{k}={v}" for k, v in loadgen.DEFAULT_MIX.items()),
+                        help=f"Weighted journeys; choose from {', '.join(loadgen.JOURNEYS)}")
+    parser.add_argument("--server-threads", type=int, default=8, help="waitress threads (http transport)")
+    parser.add_argument("--returning-tenants", type=int, default=20, help="Seeded tenants for returning journeys")
+    parser.add_argument("--scale", type=float, default=0.1, help="Size of the seeded user base (1.0 = 10k users)")
+    parser.add_argument("--seed", type=int, default=loadgen.LOADGEN_SEED)
+    parser.add_argument("--keep-rate-limits", action="store_true",
+                        help="Do not lift per-client rate limits (all tenants share one address)")
+    parser.add_argument("-o", "--output", help="Write the report as JSON")
+    args = parser.parse_args()
+
+    try:
+        mix = loadgen.parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    journeys = args.journeys if args.journeys or args.duration else loadgen.LOADGEN_JOURNEYS
+    overrides = {} if args.keep_rate_limits else loadgen.RATE_LIMIT_OVERRIDES
+    output = os.path.abspath(args.output) if args.output else None
+
+    with Workspace(scale=args.scale, seed=args.seed) as ws:
+        ws.users  # noqa: B018 - write users.json before the app starts
+        if args.transport == "http":
+            with loadgen.LocalServer(ws, threads=args.server_threads, env=overrides) as server:
+                print(f"[OK] waitress ({args.server_threads} threads) ready at {server.base_url}")
+                generator = loadgen.LoadGenerator(loadgen.HttpTransport(server.base_url), ws, mix,
+                                                  args.concurrency, args.seed, args.returning_tenants)
+                report = generator.run(journeys, args.duration)
+        else:
+            for name, value in overrides.items():
+                ws.setenv(name, value)
+            generator = loadgen.LoadGenerator(loadgen.InProcessTransport(ws), ws, mix,
+                                              args.concurrency, args.seed, args.returning_tenants)
+            report = generator.run(journeys, args.duration)
+
+    print()
+    print(loadgen.format_report(report))
+    if output:
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n[OK] Wrote report to {output}")
+    sys.exit(1 if report["journeys_failed"] else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,23 @@
 """Security and token helpers used by Semptify and tests."""
 
+import functools
 import os
 import json
 import hashlib
 import secrets
 import uuid
 import time
-from datetime import datetime, timezone
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime
 from typing import Any, Optional
-from flask import session, request
+from flask import g, session, request, jsonify
+
+import rate_limit
+from event_log import get_event_log
+from response_cache import cache_stats
+from profiling import span
 
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -38,6 +47,9 @@ ADMIN_FILE = get_admin_tokens_file()
 # Metrics & Logging
 # ============================================================================
 
+_START_TIME = time.time()
+_metrics_lock = threading.Lock()
+
 _metrics = {
     'requests_total': 0,
     'admin_requests_total': 0,
@@ -49,33 +61,259 @@ _metrics = {
     'token_rotations_total': 0,
 }
 
+# Histogram upper bounds in seconds (Prometheus "le" buckets)
+LATENCY_BUCKETS = tuple(
+    float(b) for b in os.getenv(
+        "METRICS_LATENCY_BUCKETS", "0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10"
+    ).split(",")
+)
+
+REQUEST_LABELS = ("blueprint", "endpoint", "method", "status")
+OPERATION_LABELS = ("kind", "operation")
+
+# name -> (type, help, label names); unlisted counters are unlabeled
+_METRIC_HELP = {
+    'semptify_request_duration_seconds': (
+        'histogram', 'Request latency by blueprint, endpoint, method and status.', REQUEST_LABELS),
+    'semptify_operation_duration_seconds': (
+        'histogram', 'Latency of storage, KDF and OCR calls.', OPERATION_LABELS),
+    'semptify_template_render_seconds': (
+        'histogram', 'Jinja render time by template.', ('template',)),
+}
+
+
+class _Histogram:
+    """Fixed-bucket histogram; callers hold _metrics_lock."""
+
+    __slots__ = ('counts', 'sum', 'count', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by interpolating inside its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = LATENCY_BUCKETS[i - 1] if i else 0.0
+                upper = LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else self.max
+                estimate = lower + (upper - lower) * (rank - seen) / bucket_count
+                return min(estimate, self.max)
+            seen += bucket_count
+        return self.max
+
+
+_gauges = {}        # name -> {label values: value}
+_histograms = {}    # name -> {label values: _Histogram}
+_request_latency = _Histogram()  # all requests, for get_latency_stats()
+
+
 def incr_metric(name: str, delta: int = 1):
     """Increment a counter metric."""
-    if name in _metrics:
-        _metrics[name] += delta
+    with _metrics_lock:
+        _metrics[name] = _metrics.get(name, 0) + delta
+
+
+def _observe_locked(name: str, labels: tuple, seconds: float):
+    series = _histograms.setdefault(name, {})
+    histogram = series.get(labels)
+    if histogram is None:
+        histogram = series[labels] = _Histogram()
+    histogram.observe(seconds)
+
+
+def set_gauge(name: str, value: float, **labels):
+    """Set a gauge metric, optionally labeled."""
+    with _metrics_lock:
+        _gauges.setdefault(name, {})[tuple(sorted(labels.items()))] = value
+
+
+def observe_histogram(name: str, seconds: float, labels: tuple = ()):
+    """Record one observation (in seconds) into a histogram.
+
+    labels are values in the order declared for the metric in _METRIC_HELP.
+    """
+    with _metrics_lock:
+        _observe_locked(name, labels, seconds)
+
 
 def get_metrics() -> dict:
     """Get all metrics."""
-    return dict(_metrics)
+    with _metrics_lock:
+        metrics = dict(_metrics)
+    log_stats = get_event_log(_events_log_path).stats()
+    for key in ('events_logged_total', 'events_dropped_total', 'event_log_errors_total'):
+        metrics[key] = log_stats[key]
+    response_stats = cache_stats()
+    metrics['response_cache_hits_total'] = response_stats['hits']
+    metrics['response_cache_misses_total'] = response_stats['misses']
+    metrics['response_cache_not_modified_total'] = response_stats['not_modified']
+    metrics['uptime_seconds'] = int(time.time() - _START_TIME)
+    return metrics
+
+def _events_log_path() -> str:
+    return _resolve_paths()[4]
+
 
 def log_event(event_type: str, details: dict = None):
-    """Log an event to events.log (JSON format)."""
+    """Log an event to events.log (JSON format).
+
+    Only enqueues: event_log.py's writer thread does the file I/O.
+    """
+    get_event_log(_events_log_path).emit(event_type, details)
+
+
+def recent_events(limit: int = 50) -> list:
+    """Events logged by this process, oldest first (in-memory ring)."""
+    return get_event_log(_events_log_path).recent_events(limit)
+
+def record_request_latency(latency: float, blueprint: str = "", endpoint: str = "",
+                           method: str = "", status: str = ""):
+    """Record request latency in milliseconds (for metrics)."""
+    seconds = latency / 1000.0
+    labels = (blueprint or "app", endpoint or "unmatched", method, str(status))
+    with _metrics_lock:
+        _request_latency.observe(seconds)
+        _observe_locked('semptify_request_duration_seconds', labels, seconds)
+
+
+def get_latency_stats() -> dict:
+    """Request latency summary in milliseconds, estimated from the histogram."""
+    with _metrics_lock:
+        h = _request_latency
+        return {
+            'count': h.count,
+            'mean_ms': round(h.sum / h.count * 1000, 3) if h.count else 0.0,
+            'p50_ms': round(h.quantile(0.50) * 1000, 3),
+            'p95_ms': round(h.quantile(0.95) * 1000, 3),
+            'p99_ms': round(h.quantile(0.99) * 1000, 3),
+            'max_ms': round(h.max * 1000, 3),
+        }
+
+
+@contextmanager
+def timed_operation(kind: str, operation: str):
+    """Time a storage/KDF/OCR call into semptify_operation_duration_seconds.
+
+    Also shows up as a `kind.operation` span in the current request trace.
+    """
+    start = time.perf_counter()
     try:
-        _, _, _, logs_dir, events_log = _resolve_paths()
-        os.makedirs(logs_dir, exist_ok=True)
-        event = {
-            'timestamp': datetime.now(timezone.utc).isoformat(),
-            'type': event_type,
-            'details': details or {}
+        with span(f"{kind}.{operation}"):
+            yield
+    finally:
+        observe_histogram('semptify_operation_duration_seconds',
+                          time.perf_counter() - start, (kind, operation))
+
+
+def install_request_metrics(app):
+    """Count and time every request through before/after-request hooks."""
+
+    @app.before_request
+    def _start_request_timer():
+        g._metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _record_request_metrics(response):
+        start = g.pop('_metrics_start', None)
+        incr_metric('requests_total')
+        if response.status_code >= 500:
+            incr_metric('errors_total')
+        if start is not None:
+            record_request_latency(
+                (time.perf_counter() - start) * 1000,
+                blueprint=request.blueprint or "app",
+                endpoint=request.endpoint or "unmatched",
+                method=request.method,
+                status=str(response.status_code),
+            )
+        return response
+
+    return app
+
+
+def _escape_label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra: str = "") -> str:
+    parts = [f'{n}="{_escape_label(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def render_prometheus() -> str:
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    metrics = get_metrics()
+    stats = get_latency_stats()
+    with _metrics_lock:
+        gauges = {name: dict(series) for name, series in _gauges.items()}
+        histograms = {
+            name: [(labels, list(h.counts), h.sum, h.count) for labels, h in sorted(series.items())]
+            for name, series in _histograms.items()
         }
-        with open(events_log, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(event) + '\n')
-    except Exception:
-        pass
 
-def record_request_latency(latency: float):
-    """Record request latency (for metrics)."""
-    pass
+    lines = []
+    for key, value in sorted(metrics.items()):
+        if key == 'uptime_seconds' or not isinstance(value, (int, float)):
+            continue
+        name = f"semptify_{key}"
+        lines.append(f"# HELP {name} Total count of {key[:-6] if key.endswith('_total') else key}.")
+        lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name} {value}")
+
+    lines.append("# HELP semptify_uptime_seconds Seconds since the process started.")
+    lines.append("# TYPE semptify_uptime_seconds gauge")
+    lines.append(f"semptify_uptime_seconds {metrics['uptime_seconds']}")
+
+    for key in ('p50_ms', 'p95_ms', 'p99_ms', 'mean_ms', 'max_ms'):
+        name = f"semptify_request_latency_{key}"
+        lines.append(f"# HELP {name} Request latency {key[:-3]} in milliseconds (histogram estimate).")
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {stats[key]}")
+
+    by_route = cache_stats()['by_route']
+    if by_route:
+        name = "semptify_response_cache_requests_total"
+        lines.append(f"# HELP {name} Cached endpoint lookups by route and result (hit, miss, not_modified).")
+        lines.append(f"# TYPE {name} counter")
+        for route, results in sorted(by_route.items()):
+            for result, count in sorted(results.items()):
+                lines.append(f"{name}{_format_labels(('route', 'result'), (route, result))} {count}")
+
+    for name, series in sorted(gauges.items()):
+        lines.append(f"# TYPE {name} gauge")
+        for labels, value in sorted(series.items()):
+            lines.append(f"{name}{_format_labels([k for k, _ in labels], [v for _, v in labels])} {value}")
+
+    for name, series in sorted(histograms.items()):
+        _, help_text, label_names = _METRIC_HELP.get(name, ('histogram', name, ()))
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for labels, counts, total, count in series:
+            cumulative = 0
+            for bound, bucket_count in zip(LATENCY_BUCKETS + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == float('inf') else f'le="{bound!r}"'
+                lines.append(f"{name}_bucket{_format_labels(label_names, labels, le)} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(label_names, labels)} {total}")
+            lines.append(f"{name}_count{_format_labels(label_names, labels)} {count}")
+
+    return "\n".join(lines) + "\n"
 
 # ============================================================================
 # CSRF Token Handling
@@ -162,6 +400,9 @@ def validate_user_token(token: Optional[str]) -> Optional[str]:
 
     return None
 
+_users_lock = threading.Lock()
+
+
 def save_user_token() -> str:
     """
     Generate a new user token, save its hash to users.json, and return the plain token.
@@ -176,19 +417,19 @@ def save_user_token() -> str:
     user_id = f"user_{secrets.token_hex(8)}"
 
     users_file = get_users_file()
-    users_data = _load_json(users_file, {})
+    # Concurrent registrations would otherwise overwrite each other's users,
+    # and readers could see a half-written file
+    with _users_lock:
+        users_data = _load_json(users_file, {})
 
-    # Store hash with metadata
-    users_data[user_id] = {
-        'hash': _hash_token(token),
-        'created': datetime.now().isoformat(),
-        'type': 'vault_user'
-    }
+        # Store hash with metadata
+        users_data[user_id] = {
+            'hash': _hash_token(token),
+            'created': datetime.now().isoformat(),
+            'type': 'vault_user'
+        }
 
-    # Save to file
-    os.makedirs(os.path.dirname(users_file), exist_ok=True)
-    with open(users_file, 'w', encoding='utf-8') as f:
-        json.dump(users_data, f, indent=2)
+        _atomic_write_json(users_file, users_data)
 
     log_event('user_registered', {'user_id': user_id})
     return token
@@ -265,30 +506,73 @@ def validate_admin_token(token: Optional[str]) -> Optional[str]:
 # Rate Limiting
 # ============================================================================
 
-_rate_limit_buckets = {}
+def _rate_limit_override(scope: str, limit: int, window: int):
+    """RATE_LIMIT_<SCOPE>="N/seconds" overrides a route's limit."""
+    value = os.getenv(f"RATE_LIMIT_{scope.upper()}")
+    if not value:
+        return limit, window
+    count, _, seconds = value.partition("/")
+    return int(count), int(seconds or window)
+
 
 def check_rate_limit(key: str) -> bool:
     """Check if a rate limit key is within acceptable limits.
     Returns True if request is allowed, False if rate limited.
-    Uses sliding window with env vars: ADMIN_RATE_WINDOW (seconds), ADMIN_RATE_MAX (count).
+    Allows ADMIN_RATE_MAX requests per ADMIN_RATE_WINDOW seconds (GCRA, see
+    rate_limit.py; shared across workers with RATE_LIMIT_BACKEND=sqlite).
     """
     window = int(os.getenv("ADMIN_RATE_WINDOW", "60"))
     max_requests = int(os.getenv("ADMIN_RATE_MAX", "60"))
 
-    now = time.time()
-    bucket = _rate_limit_buckets.get(key, [])
-
-    # Remove old entries outside the window
-    bucket = [ts for ts in bucket if now - ts < window]
-
-    if len(bucket) >= max_requests:
+    allowed, _ = rate_limit.hit(key, max_requests, window)
+    if not allowed:
         incr_metric("rate_limited_total", 1)
         log_event("rate_limited", {"key": key})
-        return False
+    return allowed
+
+
+def _rate_limit_client() -> str:
+    """Rate limit key for the current request: the user if known, else the client IP.
 
-    bucket.append(now)
-    _rate_limit_buckets[key] = bucket
-    return True
+    Behind a proxy remote_addr is only correct with ProxyFix installed
+    (see TRUSTED_PROXY_HOPS in Semptify.py); keying signed-in users by
+    account keeps tenants behind one NAT or proxy from sharing a bucket.
+    """
+    user_id = validate_user_token(get_token_from_request(request)) or session.get('user_id')
+    if user_id:
+        return f"user:{user_id}"
+    return request.remote_addr or "unknown"
+
+
+def rate_limited(scope: str, limit: int, window: int = 60, key_func=None):
+    """Route decorator: allow `limit` requests per `window` seconds per client.
+
+    Clients are keyed by user (valid user token or session) or remote
+    address unless key_func(request) returns a key. Over the limit the
+    view is not called and a 429 with Retry-After is returned.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            max_requests, seconds = _rate_limit_override(scope, limit, window)
+            client = (key_func(request) if key_func else None) or _rate_limit_client()
+            allowed, retry_after = rate_limit.hit(f"{scope}:{client}", max_requests, seconds)
+            if not allowed:
+                incr_metric("rate_limited_total", 1)
+                log_event("rate_limited", {"scope": scope, "path": request.path})
+                retry = max(1, int(retry_after + 0.999))
+                resp = jsonify({"error": "rate_limited", "retry_after": retry})
+                resp.status_code = 429
+                resp.headers["Retry-After"] = str(retry)
+                return resp
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _clear_rate_history():
+    """Forget all rate limit state (tests)."""
+    rate_limit.get_rate_limit_backend().clear()
 
 # ============================================================================
 # Breakglass Access
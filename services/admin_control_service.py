@@ -2,9 +2,11 @@
 Enhanced Admin Control service - discovers registered modules.
 """
 import os
-import json
+import threading
 from pathlib import Path
 
+from services.admin_stats_service import count_admin_tokens, get_admin_stats, tail_events
+
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 ENGINES_DIR = PROJECT_ROOT / 'engines'
 BLUEPRINTS_DIR = PROJECT_ROOT / 'blueprints'
@@ -81,6 +83,25 @@ def discover_all_modules():
     }
 
 
+_modules_cache = None
+_modules_lock = threading.Lock()
+
+
+def get_modules(refresh: bool = False):
+    """discover_all_modules(), scanned once and then served from memory."""
+    global _modules_cache
+    with _modules_lock:
+        if _modules_cache is None or refresh:
+            _modules_cache = discover_all_modules()
+        return _modules_cache
+
+
+def warm_admin_overview():
+    """Startup task: scan modules and seed the admin counters."""
+    get_modules(refresh=True)
+    get_admin_stats().resync()
+
+
 def get_admin_panels():
     """Return enhanced admin panel configurations."""
     return [
@@ -152,64 +173,24 @@ def get_admin_panels():
 
 def get_system_overview():
     """Enhanced system overview with module counts."""
-    modules = discover_all_modules()
-
-    admin_tokens = 0
-    try:
-        with open('security/admin_tokens.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            if 'tokens' in data:
-                admin_tokens = len(data['tokens'])
-    except Exception:
-        pass
-
-    total_users = 0
-    try:
-        import sqlite3
-        conn = sqlite3.connect('users.db')
-        cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(*) FROM users')
-        total_users = cursor.fetchone()[0]
-        conn.close()
-    except Exception:
-        pass
-
-    timeline_events = 0
-    try:
-        import sqlite3
-        conn = sqlite3.connect('users.db')
-        cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(*) FROM timeline_events')
-        timeline_events = cursor.fetchone()[0]
-        conn.close()
-    except Exception:
-        pass
-
+    counts = get_admin_stats().counts()
     return {
         'security_mode': os.environ.get('SECURITY_MODE', 'open'),
         'ai_provider': os.environ.get('AI_PROVIDER', 'openai'),
-        'admin_tokens': admin_tokens,
-        'total_users': total_users,
-        'timeline_events': timeline_events,
-        'modules': modules
+        'admin_tokens': count_admin_tokens(),
+        'total_users': counts['total_users'],
+        'modules': get_modules()
     }
 
 
 def get_recent_events(limit=6):
     """Get recent log events."""
-    events = []
-    try:
-        with open('logs/events.log', 'r', encoding='utf-8') as f:
-            lines = f.readlines()[-limit:]
-            for line in lines:
-                try:
-                    event = json.loads(line.strip())
-                    events.append(event)
-                except Exception:
-                    pass
-    except Exception:
-        pass
-    return events
+    from security import recent_events, _events_log_path
+    events = recent_events(limit)
+    if events:
+        return events
+    # Nothing logged since this process started; fall back to the file tail
+    return tail_events(_events_log_path(), limit)
 
 
 def build_admin_context():
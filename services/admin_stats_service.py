@@ -0,0 +1,166 @@
+"""Admin stats service - cached counters and log tail for the admin overview.
+
+The control panel used to glob five directories, run two COUNT(*) queries
+and read the whole events.log on every page load. Instead:
+
+- module discovery runs once (at startup) and is cached;
+- the user count is a counter, seeded from the database and bumped by
+  the code that creates users; a background resync every
+  ADMIN_STATS_RESYNC_SECONDS picks up rows written elsewhere (seed
+  scripts, an R2 restore);
+- recent events are read by seeking backwards from the end of the log.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+ADMIN_STATS_RESYNC_SECONDS = float(os.getenv("ADMIN_STATS_RESYNC_SECONDS", "300"))
+TAIL_BLOCK_SIZE = 8192
+
+# counter name -> table it counts
+COUNTED_TABLES = {
+    "total_users": "users",
+}
+
+
+class AdminStats:
+    """Maintained row counts for the admin overview."""
+
+    def __init__(self, db_path: Optional[str] = None,
+                 resync_seconds: float = ADMIN_STATS_RESYNC_SECONDS):
+        if db_path is None:
+            from user_database import DB_PATH
+            db_path = DB_PATH
+        self.db_path = db_path
+        self.resync_seconds = resync_seconds
+        self._lock = threading.Lock()
+        self._counts = {name: 0 for name in COUNTED_TABLES}
+        self._synced_at: Optional[float] = None
+        self._resyncing = False
+
+    def resync(self) -> Dict[str, int]:
+        """Recount every table (O(rows)); run at startup and in the background."""
+        counts = {}
+        try:
+            conn = sqlite3.connect(self.db_path)
+            try:
+                for name, table in COUNTED_TABLES.items():
+                    try:
+                        counts[name] = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                    except sqlite3.Error:
+                        counts[name] = 0
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            counts = {name: 0 for name in COUNTED_TABLES}
+        # Rows written while counting may be counted twice or missed until
+        # the next resync; these are dashboard numbers.
+        with self._lock:
+            self._counts.update(counts)
+            self._synced_at = time.monotonic()
+            self._resyncing = False
+        return counts
+
+    def _resync_in_background(self):
+        with self._lock:
+            if self._resyncing:
+                return
+            self._resyncing = True
+        threading.Thread(target=self.resync, daemon=True, name="admin-stats-resync").start()
+
+    def incr(self, name: str, delta: int = 1):
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + delta
+
+    def counts(self) -> Dict[str, int]:
+        """Current counts; never blocks on the database."""
+        with self._lock:
+            counts = dict(self._counts)
+            stale = self._synced_at is None or time.monotonic() - self._synced_at >= self.resync_seconds
+        if stale:
+            self._resync_in_background()
+        return counts
+
+
+_admin_stats: Optional[AdminStats] = None
+_admin_stats_lock = threading.Lock()
+
+
+def get_admin_stats() -> AdminStats:
+    """Get global admin stats instance."""
+    global _admin_stats
+    if _admin_stats is None:
+        with _admin_stats_lock:
+            if _admin_stats is None:
+                _admin_stats = AdminStats()
+    return _admin_stats
+
+
+def record_user_created(count: int = 1):
+    """Call after inserting rows into users."""
+    get_admin_stats().incr("total_users", count)
+
+
+# ============================================================================
+# Admin tokens (re-read only when the file changes)
+# ============================================================================
+
+_token_count_cache: Dict[str, Any] = {}
+
+
+def count_admin_tokens(path: str = "security/admin_tokens.json") -> int:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return 0
+    signature = (path, stat.st_mtime_ns, stat.st_size)
+    if _token_count_cache.get("signature") != signature:
+        count = 0
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                count = len(json.load(f).get("tokens", []))
+        except Exception:
+            pass
+        _token_count_cache.update(signature=signature, count=count)
+    return _token_count_cache["count"]
+
+
+# ============================================================================
+# Log tail
+# ============================================================================
+
+def tail_lines(path: str, limit: int, block_size: int = TAIL_BLOCK_SIZE) -> List[str]:
+    """Last `limit` lines of a file, reading backwards from the end."""
+    if limit <= 0:
+        return []
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b""
+        # limit + 1 newlines guarantee `limit` complete lines
+        while position > 0 and data.count(b"\n") <= limit:
+            read = min(block_size, position)
+            position -= read
+            f.seek(position)
+            data = f.read(read) + data
+    lines = data.decode("utf-8", errors="replace").splitlines()
+    return lines[-limit:]
+
+
+def tail_events(path: str, limit: int) -> List[Dict[str, Any]]:
+    """Last `limit` JSON events in a log file, oldest first."""
+    events = []
+    try:
+        for line in tail_lines(path, limit):
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                pass
+    except OSError:
+        pass
+    return events
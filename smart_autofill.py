@@ -2,19 +2,154 @@
 smart_autofill.py - Intelligent form auto-fill for Semptify
 Learns from user input patterns and suggests contextual completions
 Max 3 choices per field based on frequency and relevance
+
+Suggestions are served from per-field radix tries whose nodes keep the
+weighted top-k values below them, so a lookup costs O(prefix length)
+instead of a scan of every stored value. Recorded inputs are batched in
+memory and snapshotted to disk periodically (see flush()).
 """
+import atexit
 import json
+import os
+import tempfile
+import threading
+import time
 from pathlib import Path
 from collections import defaultdict, Counter
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 
 AUTOFILL_DATA_FILE = Path("data/autofill_patterns.json")
 AUTOFILL_DATA_FILE.parent.mkdir(parents=True, exist_ok=True)
 
+# Values kept at each trie node; suggestions beyond this fall back to a scan
+AUTOFILL_TOP_K = int(os.getenv("AUTOFILL_TOP_K", "10"))
+# Snapshot after this many recorded inputs or this many seconds, whichever first
+AUTOFILL_SNAPSHOT_EVERY = int(os.getenv("AUTOFILL_SNAPSHOT_EVERY", "1000"))
+AUTOFILL_SNAPSHOT_INTERVAL = float(os.getenv("AUTOFILL_SNAPSHOT_INTERVAL", "30"))
+# Only the first few words of a value get their own word-start key
+_MAX_WORD_KEYS = 6
+
+
+class _TrieNode:
+    __slots__ = ("label", "children", "top")
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.top: List[Tuple[int, str]] = []  # (-count, value), best first
+
+    def offer(self, value: str, count: int, k: int):
+        """Update this node's top-k with the new total count for value."""
+        top = self.top
+        if len(top) >= k and count <= -top[-1][0]:
+            # Counts only grow, so a value this small was not in the list either
+            return
+        for i, (_, v) in enumerate(top):
+            if v == value:
+                top[i] = (-count, value)
+                top.sort()
+                return
+        if len(top) < k:
+            top.append((-count, value))
+            top.sort()
+        elif -count < top[-1][0]:
+            top[-1] = (-count, value)
+            top.sort()
+
+
+class PrefixIndex:
+    """Compressed trie mapping lowercase prefixes to their top-k values.
+
+    Counts only grow while indexed, so each node's top-k stays exact for
+    the values stored below it. Every value is indexed under its full
+    text and under the start of each of its first few words, so "main"
+    also completes "123 Main St".
+    """
+
+    def __init__(self, k: int = AUTOFILL_TOP_K):
+        self.k = k
+        self.root = _TrieNode()
+
+    @staticmethod
+    def keys_for(value: str) -> List[str]:
+        lowered = value.lower()
+        keys = [lowered]
+        pos = 0
+        for _ in range(_MAX_WORD_KEYS):
+            pos = lowered.find(" ", pos)
+            if pos < 0:
+                break
+            pos += 1
+            if pos < len(lowered) and lowered[pos] != " ":
+                keys.append(lowered[pos:])
+        return keys
+
+    def add(self, value: str, count: int):
+        """Record that value now has the given total count."""
+        for key in self.keys_for(value):
+            self._insert(key, value, count)
+
+    def _insert(self, key: str, value: str, count: int):
+        k = self.k
+        node = self.root
+        node.offer(value, count, k)
+        i = 0
+        while i < len(key):
+            child = node.children.get(key[i])
+            if child is None:
+                leaf = _TrieNode(key[i:])
+                leaf.top.append((-count, value))
+                node.children[key[i]] = leaf
+                return
+            label = child.label
+            if key.startswith(label, i):
+                common = len(label)
+            else:
+                common = 1
+                limit = min(len(label), len(key) - i)
+                while common < limit and label[common] == key[i + common]:
+                    common += 1
+            if common < len(label):
+                # Split the edge; the new middle node covers the same values
+                mid = _TrieNode(label[:common])
+                mid.top = list(child.top)
+                child.label = label[common:]
+                mid.children[child.label[0]] = child
+                node.children[key[i]] = mid
+                child = mid
+            child.offer(value, count, k)
+            node = child
+            i += common
+
+    def top(self, prefix: str) -> List[Tuple[int, str]]:
+        """Return the (-count, value) top-k list for a prefix."""
+        node = self.root
+        prefix = prefix.lower()
+        i = 0
+        while i < len(prefix):
+            child = node.children.get(prefix[i])
+            if child is None:
+                return []
+            rest = prefix[i:]
+            label = child.label
+            if rest.startswith(label):
+                i += len(label)
+            elif label.startswith(rest):
+                return child.top
+            else:
+                return []
+            node = child
+        return node.top
+
+
 class SmartAutofill:
     def __init__(self):
+        self._lock = threading.RLock()
+        self._pending = 0
+        self._last_save = time.time()
         self.patterns = self._load_patterns()
+        self._build_indexes()
     
     def _load_patterns(self) -> Dict:
         """Load historical input patterns"""
@@ -29,12 +164,51 @@ class SmartAutofill:
             "profiles": {}  # profile_id -> field preferences
         }
     
+    def _build_indexes(self):
+        """Rebuild the prefix tries from self.patterns"""
+        self._field_index: Dict[str, PrefixIndex] = {}
+        self._context_index: Dict[Tuple[str, str], PrefixIndex] = {}
+        self._profile_index: Dict[Tuple[str, str], PrefixIndex] = {}
+        for field_name, values in self.patterns["fields"].items():
+            index = self._field_index[field_name] = PrefixIndex()
+            for value, data in values.items():
+                index.add(value, data["count"])
+        for context, fields in self.patterns["contexts"].items():
+            for field_name, values in fields.items():
+                index = self._context_index[(context, field_name)] = PrefixIndex()
+                for value, count in values.items():
+                    index.add(value, count)
+        for profile_id, fields in self.patterns["profiles"].items():
+            for field_name, values in fields.items():
+                index = self._profile_index[(profile_id, field_name)] = PrefixIndex()
+                for value, count in values.items():
+                    index.add(value, count)
+    
     def _save_patterns(self):
         """Persist patterns to disk"""
-        try:
-            AUTOFILL_DATA_FILE.write_text(json.dumps(self.patterns, indent=2))
-        except Exception as e:
-            print(f"[WARN] Failed to save autofill patterns: {e}")
+        with self._lock:
+            try:
+                AUTOFILL_DATA_FILE.parent.mkdir(parents=True, exist_ok=True)
+                fd, tmp = tempfile.mkstemp(dir=str(AUTOFILL_DATA_FILE.parent), suffix=".json.tmp")
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(self.patterns, f, separators=(",", ":"))
+                os.replace(tmp, AUTOFILL_DATA_FILE)
+                self._pending = 0
+                self._last_save = time.time()
+            except Exception as e:
+                print(f"[WARN] Failed to save autofill patterns: {e}")
+    
+    def flush(self):
+        """Write any batched inputs to disk"""
+        with self._lock:
+            if self._pending:
+                self._save_patterns()
+    
+    def _maybe_snapshot(self):
+        self._pending += 1
+        if (self._pending >= AUTOFILL_SNAPSHOT_EVERY
+                or time.time() - self._last_save >= AUTOFILL_SNAPSHOT_INTERVAL):
+            self._save_patterns()
     
     def record_input(self, field_name: str, value: str, profile_id: str = "default", context: str = "general"):
         """Record user input for learning"""
@@ -43,79 +217,95 @@ class SmartAutofill:
         
         value = value.strip()
         
-        # Update field history
-        if field_name not in self.patterns["fields"]:
-            self.patterns["fields"][field_name] = {}
-        
-        if value not in self.patterns["fields"][field_name]:
-            self.patterns["fields"][field_name][value] = {"count": 0, "last_used": None}
-        
-        self.patterns["fields"][field_name][value]["count"] += 1
-        self.patterns["fields"][field_name][value]["last_used"] = datetime.now().isoformat()
-        
-        # Update context patterns
-        if context not in self.patterns["contexts"]:
-            self.patterns["contexts"][context] = {}
-        if field_name not in self.patterns["contexts"][context]:
-            self.patterns["contexts"][context][field_name] = {}
-        
-        if value not in self.patterns["contexts"][context][field_name]:
-            self.patterns["contexts"][context][field_name][value] = 0
-        self.patterns["contexts"][context][field_name][value] += 1
-        
-        # Update profile preferences
-        if profile_id not in self.patterns["profiles"]:
-            self.patterns["profiles"][profile_id] = {}
-        if field_name not in self.patterns["profiles"][profile_id]:
-            self.patterns["profiles"][profile_id][field_name] = {}
-        
-        if value not in self.patterns["profiles"][profile_id][field_name]:
-            self.patterns["profiles"][profile_id][field_name][value] = 0
-        self.patterns["profiles"][profile_id][field_name][value] += 1
-        
-        self._save_patterns()
+        with self._lock:
+            # Update field history
+            field_values = self.patterns["fields"].setdefault(field_name, {})
+            entry = field_values.setdefault(value, {"count": 0, "last_used": None})
+            entry["count"] += 1
+            entry["last_used"] = datetime.now().isoformat()
+            index = self._field_index.get(field_name)
+            if index is None:
+                index = self._field_index[field_name] = PrefixIndex()
+            index.add(value, entry["count"])
+            
+            # Update context patterns
+            context_values = self.patterns["contexts"].setdefault(context, {}).setdefault(field_name, {})
+            context_values[value] = context_values.get(value, 0) + 1
+            index = self._context_index.get((context, field_name))
+            if index is None:
+                index = self._context_index[(context, field_name)] = PrefixIndex()
+            index.add(value, context_values[value])
+            
+            # Update profile preferences
+            profile_values = self.patterns["profiles"].setdefault(profile_id, {}).setdefault(field_name, {})
+            profile_values[value] = profile_values.get(value, 0) + 1
+            index = self._profile_index.get((profile_id, field_name))
+            if index is None:
+                index = self._profile_index[(profile_id, field_name)] = PrefixIndex()
+            index.add(value, profile_values[value])
+            
+            self._maybe_snapshot()
+    
+    def _score(self, value: str, field_name: str, profile_id: str, context: str) -> int:
+        profile_counts = self.patterns["profiles"].get(profile_id, {}).get(field_name, {})
+        context_counts = self.patterns["contexts"].get(context, {}).get(field_name, {})
+        field_data = self.patterns["fields"].get(field_name, {}).get(value)
+        return (profile_counts.get(value, 0) * 3  # 3x weight
+                + context_counts.get(value, 0) * 2  # 2x weight
+                + (field_data["count"] if field_data else 0))
+    
+    def _scan_candidates(self, field_name: str, partial_value: str,
+                         profile_id: str, context: str) -> set:
+        """Linear fallback used when more results are asked for than a node keeps"""
+        needle = partial_value.lower()
+        candidates = set()
+        sources = (
+            self.patterns["profiles"].get(profile_id, {}).get(field_name, {}),
+            self.patterns["contexts"].get(context, {}).get(field_name, {}),
+            self.patterns["fields"].get(field_name, {}),
+        )
+        for values in sources:
+            for value in values:
+                if not needle or any(key.startswith(needle) for key in PrefixIndex.keys_for(value)):
+                    candidates.add(value)
+        return candidates
     
     def get_suggestions(self, field_name: str, partial_value: str = "", 
                        profile_id: str = "default", context: str = "general",
                        max_results: int = 3) -> List[Dict]:
-        """Get top suggestions for a field (max 3 by default)"""
+        """Get top suggestions for a field (max 3 by default)
+
+        Matches values that start with partial_value, or have a word that
+        does (case-insensitive). Candidates come from the top-k of the
+        profile, context and field tries, then get the exact weighted score.
+        """
         suggestions = []
+        partial_value = (partial_value or "").strip()
         
-        # Gather candidates from different sources
-        candidates = {}
-        
-        # 1. Profile-specific preferences (highest priority)
-        if profile_id in self.patterns["profiles"]:
-            if field_name in self.patterns["profiles"][profile_id]:
-                for value, count in self.patterns["profiles"][profile_id][field_name].items():
-                    if not partial_value or partial_value.lower() in value.lower():
-                        candidates[value] = candidates.get(value, 0) + (count * 3)  # 3x weight
-        
-        # 2. Context-specific patterns (medium priority)
-        if context in self.patterns["contexts"]:
-            if field_name in self.patterns["contexts"][context]:
-                for value, count in self.patterns["contexts"][context][field_name].items():
-                    if not partial_value or partial_value.lower() in value.lower():
-                        candidates[value] = candidates.get(value, 0) + (count * 2)  # 2x weight
-        
-        # 3. General field history (base priority)
-        if field_name in self.patterns["fields"]:
-            for value, data in self.patterns["fields"][field_name].items():
-                if not partial_value or partial_value.lower() in value.lower():
-                    candidates[value] = candidates.get(value, 0) + data["count"]
-        
-        # Sort by weighted score and return top N
-        sorted_candidates = sorted(candidates.items(), key=lambda x: x[1], reverse=True)
-        
-        for value, score in sorted_candidates[:max_results]:
-            # Get metadata
-            metadata = self.patterns["fields"].get(field_name, {}).get(value, {})
-            suggestions.append({
-                "value": value,
-                "score": score,
-                "count": metadata.get("count", 0),
-                "last_used": metadata.get("last_used")
-            })
+        with self._lock:
+            if max_results > AUTOFILL_TOP_K:
+                candidates = self._scan_candidates(field_name, partial_value, profile_id, context)
+            else:
+                candidates = set()
+                for index in (self._profile_index.get((profile_id, field_name)),
+                              self._context_index.get((context, field_name)),
+                              self._field_index.get(field_name)):
+                    if index is not None:
+                        candidates.update(v for _, v in index.top(partial_value))
+            
+            scored = [(self._score(v, field_name, profile_id, context), v) for v in candidates]
+            # Sort by weighted score and return top N
+            scored.sort(key=lambda x: (-x[0], x[1]))
+            
+            for score, value in scored[:max_results]:
+                # Get metadata
+                metadata = self.patterns["fields"].get(field_name, {}).get(value, {})
+                suggestions.append({
+                    "value": value,
+                    "score": score,
+                    "count": metadata.get("count", 0),
+                    "last_used": metadata.get("last_used")
+                })
         
         return suggestions
     
@@ -134,9 +324,11 @@ class SmartAutofill:
     
     def clear_field_history(self, field_name: str):
         """Clear history for specific field"""
-        if field_name in self.patterns["fields"]:
-            del self.patterns["fields"][field_name]
-        self._save_patterns()
+        with self._lock:
+            if field_name in self.patterns["fields"]:
+                del self.patterns["fields"][field_name]
+            self._field_index.pop(field_name, None)
+            self._save_patterns()
     
     def export_patterns(self) -> Dict:
         """Export all patterns for backup"""
@@ -144,11 +336,14 @@ class SmartAutofill:
     
     def import_patterns(self, patterns: Dict):
         """Import patterns from backup"""
-        self.patterns = patterns
-        self._save_patterns()
+        with self._lock:
+            self.patterns = patterns
+            self._build_indexes()
+            self._save_patterns()
 
 # Global instance
 _autofill = SmartAutofill()
+atexit.register(_autofill.flush)
 
 def record(field_name: str, value: str, profile_id: str = "default", context: str = "general"):
     """Record user input"""
@@ -163,3 +358,7 @@ def predict(source_field: str, source_value: str, target_field: str,
            profile_id: str = "default") -> Optional[str]:
     """Predict related field value"""
     return _autofill.get_related_fields(source_field, source_value, target_field, profile_id)
+
+def flush():
+    """Persist batched inputs now"""
+    _autofill.flush()
@@ -1,17 +1,181 @@
 """
 Smart Inbox - Auto-capture emails, texts, and voicemails related to rental issues.
 Uses keyword matching and user preferences to suggest items for the vault.
+
+Large imports (mailbox exports) go through the batch scorer: messages are
+scored a chunk at a time (optionally across a process pool), one keyword
+scan per chunk, and results are streamed back. Each
+user's inbox is a single append-only JSONL log.
 """
 import os
 import json
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Any
+from itertools import islice
+from typing import List, Dict, Any, Iterable, Iterator
 import hashlib
-ary up to da
-    
+
+RENTAL_KEYWORDS = [
+    'rent', 'lease', 'landlord', 'tenant', 'eviction', 'evict', 'repair',
+    'maintenance', 'deposit', 'notice', 'apartment', 'unit', 'property',
+    'late fee', 'inspection', 'lawsuit', 'violation', 'emergency',
+]
+
+# Critical keywords get an extra bonus on top of the regular keyword score
+URGENT_KEYWORDS = ['eviction', 'lawsuit', 'violation', 'emergency']
+
+# Sender address fragments that usually mean the landlord or management
+SENDER_HINTS = ['landlord', 'property', 'management', 'mgmt', 'leasing', 'realty', 'apartments']
+
+KEYWORD_POINTS = 10
+SUBJECT_BONUS = 5
+URGENT_BONUS = 20
+SENDER_BONUS = 15
+
+INBOX_LOG = 'inbox.jsonl'
+
+
+def score_message(subject: str, body: str, sender: str = '') -> int:
+    """
+    Score a message 0-100 for rental relevance.
+
+    Every rental keyword found in the subject or body adds points, with a
+    bonus when it is in the subject; urgent keywords and landlord-looking
+    senders add more. This is the reference scorer; batch imports use
+    score_messages_batch(), which returns the same scores.
+    """
+    subject_l = (subject or '').lower()
+    text = f"{subject_l} {(body or '').lower()}"
+    sender_l = (sender or '').lower()
+    score = 0
+
+    for keyword in RENTAL_KEYWORDS:
+        if keyword in text:
+            score += KEYWORD_POINTS
+            if keyword in subject_l:
+                score += SUBJECT_BONUS
+
+    for keyword in URGENT_KEYWORDS:
+        if keyword in text:
+            score += URGENT_BONUS
+
+    if any(hint in sender_l for hint in SENDER_HINTS):
+        score += SENDER_BONUS
+
     return min(score, 100)
 
 
+# Points each keyword adds when it appears anywhere in subject + body
+_TEXT_POINTS = {}
+for _keyword in RENTAL_KEYWORDS:
+    _TEXT_POINTS[_keyword] = _TEXT_POINTS.get(_keyword, 0) + KEYWORD_POINTS
+for _keyword in URGENT_KEYWORDS:
+    _TEXT_POINTS[_keyword] = _TEXT_POINTS.get(_keyword, 0) + URGENT_BONUS
+_SUBJECT_KEYWORDS = list(dict.fromkeys(RENTAL_KEYWORDS))
+_SEP = '\x00'  # never part of a keyword, so matches cannot straddle messages
+
+
+def _hits(haystack: str, starts: List[int], needle: str) -> Iterator[int]:
+    """Yield the index of every message (segment) in haystack containing needle."""
+    pos = haystack.find(needle)
+    last = len(starts) - 1
+    while pos != -1:
+        i = bisect_right(starts, pos) - 1
+        yield i
+        if i == last:
+            return
+        pos = haystack.find(needle, starts[i + 1])
+
+
+def _join(parts: List[str]):
+    starts = []
+    offset = 0
+    for part in parts:
+        starts.append(offset)
+        offset += len(part) + 1
+    return _SEP.join(parts), starts
+
+
+def score_messages_batch(messages: List[Dict[str, Any]]) -> List[int]:
+    """
+    Score a chunk of messages; returns the same scores as score_message().
+
+    Instead of checking every keyword against every message, the chunk is
+    joined into one string and each keyword is searched across the whole
+    chunk, jumping to the next message after a hit. Messages without a
+    keyword cost nothing for it.
+    """
+    subjects = [(msg.get('subject') or '').lower() for msg in messages]
+    texts = [f"{subject} {(msg.get('body') or '').lower()}" for subject, msg in zip(subjects, messages)]
+    senders = [(msg.get('sender') or '').lower() for msg in messages]
+    scores = [0] * len(messages)
+    if not messages:
+        return scores
+
+    text_blob, text_starts = _join(texts)
+    for keyword, points in _TEXT_POINTS.items():
+        for i in _hits(text_blob, text_starts, keyword):
+            scores[i] += points
+
+    subject_blob, subject_starts = _join(subjects)
+    for keyword in _SUBJECT_KEYWORDS:
+        for i in _hits(subject_blob, subject_starts, keyword):
+            scores[i] += SUBJECT_BONUS
+
+    sender_blob, sender_starts = _join(senders)
+    from_landlord = set()
+    for hint in SENDER_HINTS:
+        from_landlord.update(_hits(sender_blob, sender_starts, hint))
+    for i in from_landlord:
+        scores[i] += SENDER_BONUS
+
+    return [min(score, 100) for score in scores]
+
+
+def _chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_scan_messages(messages: Iterable[Dict[str, Any]], threshold: int = 30,
+                       chunk_size: int = 1000, workers: int = 0) -> Iterator[Dict[str, Any]]:
+    """
+    Stream relevant messages from a (possibly huge) iterable.
+
+    Messages are scored chunk by chunk; with workers > 1 the chunks are
+    scored in a process pool. Results come back in input order, without
+    the relevance sort that scan_messages() applies.
+    """
+    chunks = _chunked(messages, chunk_size)
+
+    def _emit(chunk, scores):
+        for msg, score in zip(chunk, scores):
+            if score >= threshold:
+                msg['relevance_score'] = score
+                msg['suggested'] = True
+                yield msg
+
+    if workers and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = []
+            for chunk in chunks:
+                pending.append((chunk, pool.submit(score_messages_batch, chunk)))
+                # Keep a bounded window in flight so the input can stream
+                if len(pending) >= workers * 2:
+                    chunk, future = pending.pop(0)
+                    yield from _emit(chunk, future.result())
+            for chunk, future in pending:
+                yield from _emit(chunk, future.result())
+    else:
+        for chunk in chunks:
+            yield from _emit(chunk, score_messages_batch(chunk))
+
+
 def scan_messages(messages: List[Dict[str, Any]], threshold: int = 30) -> List[Dict[str, Any]]:
     """
     Scan messages and return those above relevance threshold.
@@ -23,78 +187,129 @@ def scan_messages(messages: List[Dict[str, Any]], threshold: int = 30) -> List[D
     Returns:
         List of messages with scores, sorted by relevance
     """
-    scored = []
-    for msg in messages:
-        score = score_message(
-            msg.get('subject', ''),
-            msg.get('body', ''),
-            msg.get('sender', '')
-        )
-        if score >= threshold:
-            msg['relevance_score'] = score
-            msg['suggested'] = True
-            scored.append(msg)
-    
+    scored = list(iter_scan_messages(messages, threshold))
     return sorted(scored, key=lambda m: m['relevance_score'], reverse=True)
 
 
-def save_to_inbox(user_id: str, message: Dict[str, Any], data_dir: str = 'data') -> str:
-    """Save a captured message to user's smart inbox."""
-    inbox_dir = os.path.join(data_dir, 'smart_inbox', user_id)
-    os.makedirs(inbox_dir, exist_ok=True)
-    
-    msg_id = hashlib.sha256(
+def _message_id(message: Dict[str, Any]) -> str:
+    return hashlib.sha256(
         f"{message.get('date')}{message.get('sender')}{message.get('subject')}".encode()
     ).hexdigest()[:12]
-    
-    message['message_id'] = msg_id
-    message['captured_at'] = datetime.now().isoformat()
-    message['status'] = 'pending'  # pending, saved, dismissed
-    
-    filepath = os.path.join(inbox_dir, f"{msg_id}.json")
-    with open(filepath, 'w') as f:
-        json.dump(message, f, indent=2)
-    
-    return msg_id
 
 
-def get_inbox_messages(user_id: str, status: str = None, data_dir: str = 'data') -> List[Dict[str, Any]]:
-    """Get all messages from user's smart inbox."""
-    inbox_dir = os.path.join(data_dir, 'smart_inbox', user_id)
-    if not os.path.exists(inbox_dir):
-        return []
-    
-    messages = []
+def _inbox_dir(user_id: str, data_dir: str) -> str:
+    return os.path.join(data_dir, 'smart_inbox', user_id)
+
+
+def save_many_to_inbox(user_id: str, messages: Iterable[Dict[str, Any]], data_dir: str = 'data') -> List[str]:
+    """Append captured messages to the user's inbox log in one write."""
+    inbox_dir = _inbox_dir(user_id, data_dir)
+    os.makedirs(inbox_dir, exist_ok=True)
+    captured_at = datetime.now().isoformat()
+
+    ids = []
+    lines = []
+    for message in messages:
+        msg_id = _message_id(message)
+        message['message_id'] = msg_id
+        message['captured_at'] = captured_at
+        message['status'] = 'pending'  # pending, saved, dismissed
+        ids.append(msg_id)
+        lines.append(json.dumps(message))
+
+    if lines:
+        with open(os.path.join(inbox_dir, INBOX_LOG), 'a', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+    return ids
+
+
+def save_to_inbox(user_id: str, message: Dict[str, Any], data_dir: str = 'data') -> str:
+    """Save a captured message to user's smart inbox."""
+    return save_many_to_inbox(user_id, [message], data_dir)[0]
+
+
+def _read_inbox(inbox_dir: str) -> Dict[str, Dict[str, Any]]:
+    """Replay the inbox log (and any legacy per-message files) into id -> message."""
+    messages: Dict[str, Dict[str, Any]] = {}
+
+    # Inboxes written before the log existed kept one JSON file per message
     for filename in os.listdir(inbox_dir):
         if filename.endswith('.json'):
             with open(os.path.join(inbox_dir, filename), 'r') as f:
                 msg = json.load(f)
-                if status is None or msg.get('status') == status:
-                    messages.append(msg)
+            messages[msg.get('message_id') or filename[:-5]] = msg
+
+    log_path = os.path.join(inbox_dir, INBOX_LOG)
+    if os.path.exists(log_path):
+        with open(log_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # torn final line from an interrupted append
+                msg_id = record.get('message_id')
+                if not msg_id:
+                    continue
+                if record.get('_update'):
+                    if msg_id in messages:
+                        messages[msg_id].update(record.get('fields', {}))
+                else:
+                    messages[msg_id] = record
+    return messages
+
+
+def get_inbox_messages(user_id: str, status: str = None, data_dir: str = 'data') -> List[Dict[str, Any]]:
+    """Get all messages from user's smart inbox."""
+    inbox_dir = _inbox_dir(user_id, data_dir)
+    if not os.path.exists(inbox_dir):
+        return []
     
+    messages = [
+        msg for msg in _read_inbox(inbox_dir).values()
+        if status is None or msg.get('status') == status
+    ]
     return sorted(messages, key=lambda m: m.get('captured_at', ''), reverse=True)
 
 
 def update_message_status(user_id: str, message_id: str, status: str, data_dir: str = 'data') -> bool:
     """Update the status of a message (saved to vault, dismissed, etc.)."""
-    inbox_dir = os.path.join(data_dir, 'smart_inbox', user_id)
-    filepath = os.path.join(inbox_dir, f"{message_id}.json")
-    
-    if not os.path.exists(filepath):
+    inbox_dir = _inbox_dir(user_id, data_dir)
+    if not os.path.exists(inbox_dir) or message_id not in _read_inbox(inbox_dir):
         return False
     
-    with open(filepath, 'r') as f:
-        message = json.load(f)
-    
-    message['status'] = status
-    message['updated_at'] = datetime.now().isoformat()
-    
-    with open(filepath, 'w') as f:
-        json.dump(message, f, indent=2)
+    record = {
+        '_update': True,
+        'message_id': message_id,
+        'fields': {'status': status, 'updated_at': datetime.now().isoformat()},
+    }
+    with open(os.path.join(inbox_dir, INBOX_LOG), 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + '\n')
     
     return True
 
 
+def compact_inbox(user_id: str, data_dir: str = 'data') -> int:
+    """Rewrite the inbox log with one line per message; returns the message count."""
+    inbox_dir = _inbox_dir(user_id, data_dir)
+    if not os.path.exists(inbox_dir):
+        return 0
+
+    messages = _read_inbox(inbox_dir)
+    log_path = os.path.join(inbox_dir, INBOX_LOG)
+    tmp_path = log_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for msg in messages.values():
+            f.write(json.dumps(msg) + '\n')
+    os.replace(tmp_path, log_path)
+    for filename in os.listdir(inbox_dir):
+        if filename.endswith('.json'):
+            os.remove(os.path.join(inbox_dir, filename))
+    return len(messages)
+
+
 # Demo/test function
 if __name__ == "__main__":
     test_messages = [
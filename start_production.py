@@ -12,6 +12,7 @@ from datetime import datetime
 from pathlib import Path
 from waitress import serve
 from Semptify import app
+from startup import run_startup, failed_tasks
 
 # ============================================================
 # CONFIGURATION
@@ -97,7 +98,11 @@ def check_database():
     """Check if database connection is working"""
     logger.info("Checking database connectivity...")
     try:
-        # Add any database checks here
+        # Startup phase: R2 restore, schema, engine warm-up (in parallel)
+        run_startup()
+        failed = failed_tasks()
+        if failed:
+            raise RuntimeError(f"startup tasks failed: {', '.join(failed)}")
         logger.info("✓ Database check passed")
         return True
     except Exception as e:
@@ -0,0 +1,197 @@
+"""Explicit, dependency-aware startup phase.
+
+Work that used to happen as a side effect of importing modules (SQLite
+schema creation, R2 database restore, loading engine JSON) is registered
+here as named tasks. Each task lists the tasks it depends on; independent
+tasks run concurrently on a thread pool, and a task starts as soon as its
+dependencies have finished:
+
+    add_startup_task("user_database", init_db)
+    add_startup_task("cards", seed_cards, requires=["user_database"])
+    add_startup_task("jurisdiction", warm_laws, required=False)
+
+    run_startup()      # block until every task has finished
+    start_startup()    # or run in the background and serve meanwhile
+
+The app is ready once every *required* task has succeeded; optional tasks
+(cache warm-ups) may still be running. readiness() reports per-task status
+and timings for /readyz and /admin/status. Tasks whose dependency failed
+are skipped. Tasks should be idempotent.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Optional
+
+STARTUP_WORKERS = int(os.getenv("STARTUP_WORKERS", "4"))
+
+# Requests to these paths never wait for a background startup phase
+PROBE_PATHS = ("/readyz", "/health", "/healthz")
+
+# name -> {"fn", "requires", "required"}, in registration order
+_tasks: Dict[str, Dict] = {}
+# name -> {"status", "required", "requires", "ms", "error"}; None until started
+_results: Optional[Dict[str, Dict]] = None
+_lock = threading.Lock()
+_done = threading.Event()
+_started_at: Optional[float] = None
+_finished_ms: Optional[float] = None
+
+
+def add_startup_task(name: str, fn: Callable[[], None], requires: Iterable[str] = (),
+                     required: bool = True):
+    """
+    Register fn to run during the startup phase after the tasks named in
+    `requires`. Optional tasks (required=False) do not gate readiness.
+    """
+    _tasks[name] = {"fn": fn, "requires": tuple(requires), "required": required}
+    return fn
+
+
+# ============================================================================
+# SCHEDULER
+# ============================================================================
+
+def _run_task(name: str, fn: Callable[[], None]):
+    _results[name]["status"] = "running"
+    start = time.perf_counter()
+    try:
+        fn()
+        status, error = "ok", None
+    except Exception as e:
+        print(f"[WARN] Startup task {name} failed: {e}")
+        status, error = "failed", str(e)
+    _results[name]["ms"] = round((time.perf_counter() - start) * 1000, 1)
+    if error:
+        _results[name]["error"] = error
+    _results[name]["status"] = status
+
+
+def _blocked_by(name: str) -> Optional[str]:
+    """First dependency that failed, was skipped or does not exist."""
+    for dep in _tasks[name]["requires"]:
+        if dep not in _results or _results[dep]["status"] in ("failed", "skipped"):
+            return dep
+    return None
+
+
+def _schedule(workers: int):
+    pending = list(_tasks)
+    running = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="startup") as pool:
+        while pending or running:
+            progressed = False
+            for name in list(pending):
+                blocker = _blocked_by(name)
+                if blocker:
+                    _results[name].update(status="skipped", error=f"dependency {blocker} did not succeed")
+                elif all(_results[dep]["status"] == "ok" for dep in _tasks[name]["requires"]):
+                    running[pool.submit(_run_task, name, _tasks[name]["fn"])] = name
+                else:
+                    continue
+                pending.remove(name)
+                progressed = True
+            if running:
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    running.pop(future)
+                    future.result()
+            elif not progressed:
+                break
+    for name in pending:
+        _results[name].update(status="skipped", error="dependency cycle")
+
+
+def _run(workers: int):
+    global _finished_ms
+    try:
+        _schedule(workers)
+    finally:
+        _finished_ms = round((time.perf_counter() - _started_at) * 1000, 1)
+        summary = ", ".join(f"{name} {r['ms']:.0f}ms" for name, r in _results.items() if r["ms"] is not None)
+        print(f"[OK] Startup phase finished in {_finished_ms:.0f}ms ({summary})")
+        _done.set()
+
+
+def _begin() -> bool:
+    """Claim the startup phase; False if it has already been started."""
+    global _results, _started_at
+    with _lock:
+        if _results is not None:
+            return False
+        _started_at = time.perf_counter()
+        _results = {
+            name: {"status": "pending", "required": task["required"],
+                   "requires": list(task["requires"]), "ms": None}
+            for name, task in _tasks.items()
+        }
+        return True
+
+
+# ============================================================================
+# ENTRY POINTS
+# ============================================================================
+
+def run_startup(workers: int = STARTUP_WORKERS) -> Dict[str, Dict]:
+    """Run every registered task once, blocking until all have finished."""
+    if _begin():
+        _run(workers)
+    _done.wait()
+    return startup_report()
+
+
+def start_startup(workers: int = STARTUP_WORKERS) -> threading.Thread:
+    """Run the startup phase in a background thread and return at once."""
+    thread = threading.Thread(target=run_startup, args=(workers,), name="startup", daemon=True)
+    thread.start()
+    return thread
+
+
+def ensure_startup():
+    """
+    before_request hook. Runs the startup phase inline if no entry point
+    started it (flask run, tests); otherwise requests wait for it to
+    finish, except health/readiness probes.
+    """
+    if _done.is_set():
+        return
+    if _results is not None:
+        from flask import request
+        if request.path in PROBE_PATHS:
+            return
+    run_startup()
+
+
+def failed_tasks() -> list:
+    """Required tasks that failed or were skipped."""
+    return [name for name, r in (_results or {}).items()
+            if r["required"] and r["status"] in ("failed", "skipped")]
+
+
+def is_ready() -> bool:
+    """True once every required task has succeeded."""
+    if _results is None:
+        return False
+    return all(r["status"] == "ok" for r in _results.values() if r["required"])
+
+
+def readiness() -> Dict:
+    """Readiness summary for /readyz: status, elapsed time and per-task timings."""
+    if is_ready():
+        status = "ready"
+    elif failed_tasks():
+        status = "degraded"
+    else:
+        status = "starting"
+    elapsed = None
+    if _started_at is not None:
+        elapsed = _finished_ms if _finished_ms is not None else round((time.perf_counter() - _started_at) * 1000, 1)
+    return {"status": status, "elapsed_ms": elapsed, "finished": _done.is_set(), "tasks": startup_report() or {}}
+
+
+def startup_report() -> Optional[Dict[str, Dict]]:
+    if _results is None:
+        return None
+    return {name: dict(result) for name, result in _results.items()}
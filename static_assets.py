@@ -0,0 +1,233 @@
+"""Fingerprinted static assets.
+
+Build step (run at deploy time, see render.yaml / Dockerfile):
+
+    python scripts/build_assets.py
+
+copies every file under static/ into static/dist/ with a content hash in
+its name (css/base.css -> dist/css/base.3f9a0c1b2d.css). CSS is minified,
+and so is JS when rjsmin is installed. Text assets also get precompressed
+.gz and, when a brotli module is installed, .br siblings.
+static/dist/manifest.json maps logical names to built ones.
+
+At runtime, init_static_assets(app):
+  - rewrites url_for('static', filename=...) to the fingerprinted file when
+    the manifest has it (outside dev mode), so templates need no changes;
+  - serves static/dist/* with one-year immutable caching, picking the .br
+    or .gz variant the client accepts;
+  - turns on TEMPLATES_AUTO_RELOAD and uncached static files only in dev.
+
+Dev mode is FLASK_ENV != "production"; STATIC_FINGERPRINT=1 forces
+fingerprinted URLs in dev (to test a build locally).
+"""
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import re
+import shutil
+from typing import Dict, Optional
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+try:
+    import rcssmin
+except ImportError:
+    rcssmin = None
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(ROOT_DIR, "static")
+DIST_NAME = "dist"
+MANIFEST_NAME = "manifest.json"
+ASSET_MAX_AGE = int(os.getenv("ASSET_MAX_AGE", str(365 * 24 * 60 * 60)))
+DEV_MODE = os.getenv("FLASK_ENV", "development") != "production"
+STATIC_FINGERPRINT = os.getenv("STATIC_FINGERPRINT", "0" if DEV_MODE else "1") == "1"
+
+# Fetched by fixed URL (service worker scope, web app manifests)
+UNFINGERPRINTED = ("js/service-worker.js",)
+UNFINGERPRINTED_SUFFIXES = (".webmanifest",)
+COMPRESSIBLE = (".css", ".js", ".svg", ".json", ".html", ".txt", ".map", ".xml")
+MIN_COMPRESS_BYTES = 512
+HASH_LENGTH = 10
+
+
+# ============================================================================
+# MINIFICATION
+# ============================================================================
+
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_CSS_SPACE = re.compile(r"\s+")
+_CSS_PUNCT = re.compile(r"\s*([{};,>])\s*")
+_CSS_URL = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+
+
+def minify_css(text: str) -> str:
+    if rcssmin is not None:
+        return rcssmin.cssmin(text)
+    text = _CSS_COMMENT.sub("", text)
+    text = _CSS_SPACE.sub(" ", text)
+    text = _CSS_PUNCT.sub(r"\1", text)
+    return text.replace(";}", "}").strip()
+
+
+def minify_js(text: str) -> str:
+    # Regex JS minification breaks template literals and regex literals;
+    # without rjsmin, rely on compression alone
+    return rjsmin.jsmin(text) if rjsmin is not None else text
+
+
+# ============================================================================
+# BUILD
+# ============================================================================
+
+def _fingerprinted(name: str, data: bytes) -> str:
+    digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+    stem, ext = posixpath.splitext(name)
+    return f"{stem}.{digest}{ext}"
+
+
+def _rewrite_css_urls(css: str, name: str, manifest: Dict[str, str]) -> str:
+    """Point relative url(...) references at fingerprinted files."""
+    base = posixpath.dirname(name)
+    built_dir = posixpath.dirname(f"{DIST_NAME}/{name}")
+
+    def replace(match):
+        ref = match.group(2).strip()
+        if ref.startswith(("data:", "http:", "https:", "//", "/", "#")):
+            return match.group(0)
+        path, sep, suffix = ref.partition("?")
+        target = posixpath.normpath(posixpath.join(base, path))
+        if target not in manifest:
+            return match.group(0)
+        return f"url({posixpath.relpath(manifest[target], built_dir)}{sep}{suffix})"
+
+    return _CSS_URL.sub(replace, css)
+
+
+def _write_variants(path: str, data: bytes) -> Dict[str, int]:
+    sizes = {"raw": len(data)}
+    with open(path, "wb") as f:
+        f.write(data)
+    if path.endswith(COMPRESSIBLE) and len(data) >= MIN_COMPRESS_BYTES:
+        gz = gzip.compress(data, compresslevel=9, mtime=0)
+        with open(path + ".gz", "wb") as f:
+            f.write(gz)
+        sizes["gzip"] = len(gz)
+        if brotli is not None:
+            br = brotli.compress(data)
+            with open(path + ".br", "wb") as f:
+                f.write(br)
+            sizes["br"] = len(br)
+    return sizes
+
+
+def build_assets(static_dir: str = STATIC_DIR) -> Dict:
+    """Rebuild static/dist from static/ and write the manifest."""
+    dist_dir = os.path.join(static_dir, DIST_NAME)
+    shutil.rmtree(dist_dir, ignore_errors=True)
+
+    sources = []
+    for root, dirs, files in os.walk(static_dir):
+        dirs[:] = sorted(d for d in dirs if os.path.join(root, d) != dist_dir)
+        for filename in sorted(files):
+            name = os.path.relpath(os.path.join(root, filename), static_dir).replace(os.sep, "/")
+            if name in UNFINGERPRINTED or name.endswith(UNFINGERPRINTED_SUFFIXES):
+                continue
+            sources.append(name)
+    # Stylesheets last, so their url() references can be rewritten
+    sources.sort(key=lambda name: name.endswith(".css"))
+
+    manifest: Dict[str, str] = {}
+    sizes: Dict[str, Dict[str, int]] = {}
+    for name in sources:
+        with open(os.path.join(static_dir, name), "rb") as f:
+            data = f.read()
+        if name.endswith(".css"):
+            data = minify_css(_rewrite_css_urls(data.decode("utf-8"), name, manifest)).encode("utf-8")
+        elif name.endswith(".js"):
+            data = minify_js(data.decode("utf-8")).encode("utf-8")
+        built = f"{DIST_NAME}/{_fingerprinted(name, data)}"
+        target = os.path.join(static_dir, *built.split("/"))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        sizes[name] = _write_variants(target, data)
+        manifest[name] = built
+
+    with open(os.path.join(dist_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "assets": manifest}, f, indent=2, sort_keys=True)
+    return {"assets": manifest, "sizes": sizes}
+
+
+def load_manifest(static_dir: str = STATIC_DIR) -> Dict[str, str]:
+    try:
+        with open(os.path.join(static_dir, DIST_NAME, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            return json.load(f).get("assets", {})
+    except (OSError, ValueError):
+        return {}
+
+
+# ============================================================================
+# RUNTIME
+# ============================================================================
+
+def init_static_assets(app, manifest: Optional[Dict[str, str]] = None,
+                       fingerprint: bool = STATIC_FINGERPRINT, dev_mode: bool = DEV_MODE):
+    """Wire fingerprinted URLs, immutable caching and dev-only reloading into app."""
+    from flask import request, send_from_directory, url_for
+
+    if dev_mode:
+        # Dev: make changes show immediately
+        app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0
+        app.config['TEMPLATES_AUTO_RELOAD'] = True
+    else:
+        app.config['TEMPLATES_AUTO_RELOAD'] = False
+
+    assets = (load_manifest(app.static_folder) if manifest is None else manifest) if fingerprint else {}
+    app.extensions["static_assets"] = assets
+
+    @app.url_defaults
+    def _fingerprint_static_urls(endpoint, values):
+        if endpoint == "static" and assets:
+            built = assets.get(values.get("filename"))
+            if built:
+                values["filename"] = built
+
+    def static_view(filename):
+        if not filename.startswith(DIST_NAME + "/"):
+            return app.send_static_file(filename)
+        mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        encodings = request.accept_encodings
+        response = None
+        for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+            if encodings[encoding] and os.path.isfile(os.path.join(app.static_folder, *(filename + suffix).split("/"))):
+                response = send_from_directory(app.static_folder, filename + suffix,
+                                               mimetype=mimetype, max_age=ASSET_MAX_AGE)
+                response.headers["Content-Encoding"] = encoding
+                break
+        if response is None:
+            response = send_from_directory(app.static_folder, filename, mimetype=mimetype, max_age=ASSET_MAX_AGE)
+        response.headers["Cache-Control"] = f"public, max-age={ASSET_MAX_AGE}, immutable"
+        response.vary.add("Accept-Encoding")
+        return response
+
+    app.view_functions["static"] = static_view
+
+    def static_url(filename: str, **values) -> str:
+        """url_for('static', filename=...) that always resolves fingerprints."""
+        return url_for("static", filename=filename, **values)
+
+    app.jinja_env.globals["static_url"] = static_url
+    return assets
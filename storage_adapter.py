@@ -6,6 +6,8 @@ import os
 import json
 from pathlib import Path
 
+from profiling import traced
+
 # Try to import boto3 for R2 support
 try:
     import boto3
@@ -49,6 +51,7 @@ class StorageAdapter:
         )
         self.bucket = os.getenv('R2_BUCKET_NAME')
     
+    @traced("storage.save_file")
     def save_file(self, relative_path, content, metadata=None):
         """
         Save file with optional metadata
@@ -104,6 +107,7 @@ class StorageAdapter:
             print(f"Local save error for {relative_path}: {e}")
             return False
     
+    @traced("storage.read_file")
     def read_file(self, relative_path):
         """Read file content (returns bytes)"""
         if self.use_r2:
@@ -130,6 +134,7 @@ class StorageAdapter:
             print(f"Local read error for {relative_path}: {e}")
             return None
     
+    @traced("storage.file_exists")
     def file_exists(self, relative_path):
         """Check if file exists"""
         if self.use_r2:
@@ -141,6 +146,7 @@ class StorageAdapter:
         else:
             return (Path('uploads') / relative_path).exists()
     
+    @traced("storage.list_files")
     def list_files(self, prefix=''):
         """List files with optional prefix"""
         if self.use_r2:
@@ -177,6 +183,7 @@ class StorageAdapter:
             print(f"Local list error: {e}")
             return []
     
+    @traced("storage.delete_file")
     def delete_file(self, relative_path):
         """Delete a file"""
         if self.use_r2:
@@ -8,6 +8,8 @@ from pathlib import Path
 from typing import Optional, List
 import threading
 
+from security import timed_operation
+
 # R2 imports
 try:
     import boto3
@@ -174,6 +176,7 @@ def _r2_key(profile_id: str, filename: str) -> str:
 def _gdrive_path(profile_id: str, filename: str) -> str:
     return f"{profile_id}/{filename}"
 
+@timed_operation("storage", "upload_file")
 def upload_file(profile_id: str, filename: str, data: bytes) -> dict:
     """Upload to R2 (primary) and Google Drive (secondary)"""
     results = {"r2": False, "gdrive": False, "local": False}
@@ -217,6 +220,7 @@ def upload_file(profile_id: str, filename: str, data: bytes) -> dict:
     
     return results
 
+@timed_operation("storage", "download_file")
 def download_file(profile_id: str, filename: str) -> Optional[bytes]:
     """Download from R2 (primary) or Google Drive (secondary) or local"""
     
@@ -0,0 +1,150 @@
+"""Jinja bytecode cache and per-template render timing.
+
+Bytecode cache: compiled templates are stored in TEMPLATE_CACHE_DIR (one
+file per template, keyed by name and source checksum), so every waitress/
+gunicorn worker and every restart reuses them instead of recompiling. The
+startup phase warms the cache for everything in templates/.
+
+Render timing: Flask's before_render_template / template_rendered signals
+split each render_template() request into
+    context   - request start until render_template() was called (the
+                view building its context: DB queries, engine calls)
+    render    - Jinja rendering itself
+    request   - the whole request
+Render time goes into the semptify_template_render_seconds histogram;
+template_report() aggregates all three per template and flags templates
+where context building or rendering dominates request time.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, List
+
+from jinja2 import FileSystemBytecodeCache
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE_CACHE_DIR = os.getenv("TEMPLATE_CACHE_DIR", os.path.join(ROOT_DIR, ".jinja_cache"))
+# Flag a template when one phase takes more than this share of request time
+TEMPLATE_FLAG_RATIO = float(os.getenv("TEMPLATE_FLAG_RATIO", "0.6"))
+# ... and its requests average at least this long
+TEMPLATE_FLAG_MIN_MS = float(os.getenv("TEMPLATE_FLAG_MIN_MS", "20"))
+
+_stats: Dict[str, Dict[str, float]] = {}
+_stats_lock = threading.Lock()
+
+
+# ============================================================================
+# BYTECODE CACHE
+# ============================================================================
+
+def install_bytecode_cache(app, directory: str = TEMPLATE_CACHE_DIR):
+    """Share compiled template bytecode across workers and restarts."""
+    try:
+        os.makedirs(directory, exist_ok=True)
+    except OSError as e:
+        print(f"[WARN] Template bytecode cache disabled: {e}")
+        return None
+    cache = FileSystemBytecodeCache(directory, pattern="semptify_%s.cache")
+    app.jinja_env.bytecode_cache = cache
+    return cache
+
+
+def warm_templates(app) -> Dict[str, int]:
+    """Compile every app template once (filling the bytecode cache)."""
+    env = app.jinja_env
+    compiled, failed = 0, []
+    for name in env.list_templates(filter_func=lambda n: n.endswith((".html", ".jinja", ".j2", ".txt"))):
+        try:
+            env.get_template(name)
+            compiled += 1
+        except Exception as e:
+            failed.append(name)
+            print(f"[WARN] Template {name} does not compile: {e}")
+    return {"compiled": compiled, "failed": len(failed)}
+
+
+# ============================================================================
+# RENDER TIMING
+# ============================================================================
+
+def _record(name: str, context_s: float, render_s: float, request_s: float):
+    with _stats_lock:
+        stat = _stats.setdefault(name, {"count": 0, "context_s": 0.0, "render_s": 0.0, "request_s": 0.0})
+        stat["count"] += 1
+        stat["context_s"] += context_s
+        stat["render_s"] += render_s
+        stat["request_s"] += request_s
+
+
+def install_render_timing(app):
+    """Time render_template() calls via Flask's template signals."""
+    from flask import before_render_template, g, template_rendered
+
+    from security import observe_histogram
+
+    @app.before_request
+    def _start_template_clock():
+        g._template_clock = time.perf_counter()
+        g._template_renders = []
+
+    def _before_render(sender, template, context, **extra):
+        if "_template_clock" in g:
+            g._template_render_start = time.perf_counter()
+
+    def _rendered(sender, template, context, **extra):
+        start = g.pop("_template_render_start", None)
+        if start is None:
+            return
+        now = time.perf_counter()
+        render_s = now - start
+        observe_histogram("semptify_template_render_seconds", render_s, (template.name or "<string>",))
+        g._template_renders.append((template.name or "<string>", start - g._template_clock, render_s))
+
+    before_render_template.connect(_before_render, app, weak=False)
+    template_rendered.connect(_rendered, app, weak=False)
+
+    @app.teardown_request
+    def _finish_template_clock(exc=None):
+        renders = g.pop("_template_renders", None)
+        start = g.pop("_template_clock", None)
+        if not renders or start is None:
+            return
+        request_s = time.perf_counter() - start
+        for name, context_s, render_s in renders:
+            _record(name, context_s, render_s, request_s)
+
+    return app
+
+
+def template_report(limit: int = 25) -> List[Dict]:
+    """Per-template averages in ms, slowest requests first, with flags."""
+    with _stats_lock:
+        stats = {name: dict(stat) for name, stat in _stats.items()}
+    report = []
+    for name, stat in stats.items():
+        n = stat["count"]
+        request_ms = stat["request_s"] / n * 1000
+        context_ms = stat["context_s"] / n * 1000
+        render_ms = stat["render_s"] / n * 1000
+        flag = None
+        if request_ms >= TEMPLATE_FLAG_MIN_MS:
+            if context_ms >= TEMPLATE_FLAG_RATIO * request_ms:
+                flag = "context_dominates"
+            elif render_ms >= TEMPLATE_FLAG_RATIO * request_ms:
+                flag = "render_dominates"
+        report.append({
+            "template": name,
+            "count": n,
+            "avg_request_ms": round(request_ms, 3),
+            "avg_context_ms": round(context_ms, 3),
+            "avg_render_ms": round(render_ms, 3),
+            "flag": flag,
+        })
+    report.sort(key=lambda r: r["avg_request_ms"] * r["count"], reverse=True)
+    return report[:limit] if limit else report
+
+
+def reset_template_stats():
+    with _stats_lock:
+        _stats.clear()
@@ -0,0 +1,55 @@
+"""Tests for the cached admin overview counters and log tail."""
+import json
+import sqlite3
+import time
+
+from services import admin_control_service
+from services.admin_stats_service import AdminStats, tail_events, tail_lines
+
+
+def _db(tmp_path, users):
+    path = str(tmp_path / "users.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE users (user_id TEXT)")
+    conn.executemany("INSERT INTO users VALUES (?)", [(str(n),) for n in range(users)])
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_counts_are_maintained_and_resynced_in_background(tmp_path):
+    stats = AdminStats(_db(tmp_path, 3), resync_seconds=3600)
+    assert stats.resync() == {"total_users": 3}
+    stats.incr("total_users")
+    assert stats.counts()["total_users"] == 4
+
+    # Rows written behind the counters' back show up after a resync
+    stats.resync_seconds = 0
+    stats.counts()
+    deadline = time.monotonic() + 2
+    while stats.counts()["total_users"] != 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert stats.counts()["total_users"] == 3
+
+
+def test_tail_reads_only_the_end(tmp_path):
+    path = tmp_path / "events.log"
+    with open(path, "w", encoding="utf-8") as f:
+        for n in range(5000):
+            f.write(json.dumps({"event": "tick", "n": n}) + "\n")
+    assert tail_lines(str(path), 3, block_size=64) == [json.dumps({"event": "tick", "n": n}) for n in (4997, 4998, 4999)]
+    assert [e["n"] for e in tail_events(str(path), 6)] == list(range(4994, 5000))
+    (tmp_path / "short.log").write_text("only\n")
+    assert tail_lines(str(tmp_path / "short.log"), 6) == ["only"]
+    assert tail_events(str(tmp_path / "missing.log"), 6) == []
+
+
+def test_overview_does_not_rescan_modules(monkeypatch):
+    calls = []
+    original = admin_control_service.discover_all_modules
+    monkeypatch.setattr(admin_control_service, "discover_all_modules", lambda: calls.append(1) or original())
+    admin_control_service.get_modules(refresh=True)
+    for _ in range(3):
+        overview = admin_control_service.get_system_overview()
+    assert len(calls) == 1
+    assert overview["modules"]["total_count"] > 0
@@ -0,0 +1,78 @@
+"""Tests for sequential and concurrent orchestrator rounds."""
+import time
+
+from ai_orchestrator import Agent, Orchestrator, budget_context
+
+
+def _slow_call(delays):
+    def call(agent, prompt, context):
+        time.sleep(delays.get(agent.id, 0.1))
+        return f"{agent.id} done"
+    return call
+
+
+def _agents():
+    return [
+        Agent("legal", "Legal Analyst", ""),
+        Agent("evidence", "Evidence Collector", ""),
+        Agent("notary", "Notary", ""),
+        Agent("packet", "Packet Builder", "", depends_on=["legal", "evidence"]),
+    ]
+
+
+def test_concurrent_mode_runs_independent_agents_in_parallel():
+    orchestrator = Orchestrator(_agents(), mode="concurrent", call=_slow_call({}))
+    result = orchestrator.run_round("Prepare for hearing")
+    assert result["total_ms"] < 350  # 2 waves of 100ms, not 4 in sequence
+
+    timeline = {e["agent_id"]: e for e in result["timeline"]}
+    assert all(e["status"] == "ok" for e in timeline.values())
+    packet = timeline["packet"]
+    assert "legal done" in packet["request"] and "evidence done" in packet["request"]
+    assert "notary done" not in packet["request"]
+    assert packet["started_at_ms"] >= timeline["legal"]["finished_at_ms"]
+    assert {"queue_ms", "exec_ms"} <= set(packet)
+
+
+def test_sequential_mode_keeps_chained_context():
+    result = Orchestrator(_agents(), mode="sequential", call=_slow_call({"legal": 0, "evidence": 0,
+                                                                      "notary": 0, "packet": 0})).run_round("Q")
+    notary = result["timeline"][2]
+    assert notary["request"] == "Q\n\nLegal Analyst says: legal done\n\nEvidence Collector says: evidence done"
+    assert result["final_prompt"].endswith("Packet Builder says: packet done")
+
+
+def test_timeout_does_not_fail_round():
+    agents = _agents()
+    agents[0].timeout = 0.05
+    result = Orchestrator(agents, mode="concurrent", call=_slow_call({"legal": 1.0})).run_round("Q")
+    timeline = {e["agent_id"]: e for e in result["timeline"]}
+    assert timeline["legal"]["status"] == "timeout"
+    assert timeline["packet"]["status"] == "ok"
+    assert "Legal Analyst" not in timeline["packet"]["request"]
+    assert result["total_ms"] < 800
+
+
+def test_sequential_timeout_frees_the_round():
+    # A hung agent must not hold the only worker: the next agent starts at once
+    agents = [Agent("a", "A", "", timeout=0.2), Agent("b", "B", "")]
+    result = Orchestrator(agents, mode="sequential", call=_slow_call({"a": 5.0, "b": 0})).run_round("Q")
+    a, b = result["timeline"]
+    assert a["status"] == "timeout" and b["status"] == "ok"
+    assert b["queue_ms"] < 100
+    assert result["total_ms"] < 600
+
+
+def test_queued_agents_time_out_from_submission():
+    agents = [Agent(name, name, "", timeout=0.2) for name in ("a", "b", "c")]
+    orchestrator = Orchestrator(agents, mode="concurrent", max_workers=1, call=_slow_call({"a": 5.0, "b": 5.0}))
+    start = time.perf_counter()
+    result = orchestrator.run_round("Q")
+    assert time.perf_counter() - start < 1.0
+    assert [e["status"] for e in result["timeline"]] == ["timeout", "timeout", "timeout"]
+
+
+def test_budget_context_truncates_longest_replies():
+    text = budget_context("Q", [("A", "short"), ("B", "x" * 10000)], budget_tokens=100)
+    assert "A says: short" in text and text.endswith("[...]")
+    assert len(text) <= 100 * 4
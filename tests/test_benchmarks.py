@@ -0,0 +1,64 @@
+"""Tests for the benchmark runner and regression comparison."""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import benchmarks
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _results(scale=1.0, **medians):
+    return {"version": 1, "meta": {"scale": scale},
+            "results": {key: ({"error": "boom"} if value is None else {"median_ms": value})
+                        for key, value in medians.items()}}
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    baseline = _results(fast=10.0, steady=10.0, improved=10.0, broken=10.0, gone=1.0)
+    current = _results(fast=13.0, steady=11.0, improved=5.0, broken=None, added=1.0)
+    report = benchmarks.compare_results(baseline, current, threshold=0.25)
+    assert report["regressions"] == ["fast"]
+    assert report["improvements"] == ["improved"]
+    assert report["errors"] == ["broken"]
+    assert report["missing"] == ["gone"]
+    assert report["new"] == ["added"]
+    assert "REGRESSED" in benchmarks.format_comparison(report)
+
+
+def test_compare_refuses_different_scales():
+    with pytest.raises(ValueError):
+        benchmarks.compare_results(_results(1.0, a=1.0), _results(0.1, a=1.0))
+
+
+def test_small_run_produces_timings():
+    names = ["validate_user_token", "learning_observe_action", "ledger_query",
+             "search_library", "document_intelligence"]
+    results = benchmarks.run_benchmarks(names, scale=0.01, rounds=2)
+    assert results["meta"]["scale"] == 0.01
+    assert "ledger_query[by_type]" in results["results"]
+    for key, result in results["results"].items():
+        assert "error" not in result, f"{key}: {result.get('error')}"
+        assert result["min_ms"] <= result["median_ms"] <= result["max_ms"]
+
+
+def test_unknown_benchmark_is_rejected():
+    with pytest.raises(ValueError):
+        benchmarks.run_benchmarks(["no_such_benchmark"])
+
+
+def test_compare_command_exits_nonzero_on_regression(tmp_path):
+    baseline, current = tmp_path / "base.json", tmp_path / "current.json"
+    baseline.write_text(json.dumps(_results(a=10.0)))
+    current.write_text(json.dumps(_results(a=20.0)))
+    script = os.path.join(ROOT, "scripts", "bench.py")
+    failed = subprocess.run([sys.executable, script, "compare", str(baseline), str(current)],
+                            capture_output=True, text=True)
+    assert failed.returncode == 1
+    assert "REGRESSED" in failed.stdout
+    passed = subprocess.run([sys.executable, script, "compare", str(baseline), str(baseline)],
+                            capture_output=True, text=True)
+    assert passed.returncode == 0
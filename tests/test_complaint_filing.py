@@ -0,0 +1,60 @@
+"""Tests for indexed venue matching in the complaint filing engine."""
+import pytest
+
+from engines.complaint_filing_engine import ComplaintFilingEngine
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    engine = ComplaintFilingEngine(data_dir=str(tmp_path))
+    monkeypatch.setattr(engine, "_discover_local_venues", lambda location, issue_type: [])
+    engine.register_venue("mn_housing", {
+        "name": "MN Housing", "jurisdiction": "state", "state": "MN",
+        "applies_to": ["no_heat", "habitability"], "effectiveness_score": 0.6,
+    })
+    engine.register_venue("eagan_code", {
+        "name": "Eagan Code Enforcement", "jurisdiction": "city",
+        "location_key": "Eagan_MN_55123", "applies_to": ["no_heat"], "effectiveness_score": 0.9,
+    })
+    engine.register_venue("legal_aid", {"name": "Legal Aid", "jurisdiction": "statewide"})
+    return engine
+
+
+LOCATIONS = [
+    {"city": "Eagan", "state": "MN", "zip": "55123"},
+    {"city": "Duluth", "state": "MN", "zip": "55802"},
+    {"city": "Austin", "state": "TX", "zip": "73301"},
+    {},
+]
+ISSUES = ["no_heat", "habitability", "discrimination_disability", "fraud", "unknown_issue"]
+
+
+def test_index_matches_full_scan(engine):
+    for location in LOCATIONS:
+        for issue in ISSUES:
+            expected = {
+                key for key, data in engine.venues.items()
+                if engine._venue_applies(data, issue, location, {})
+            }
+            assert engine._candidate_venues(issue, location) == expected
+
+
+def test_identify_venues_ranked_and_limited(engine):
+    location = LOCATIONS[0]
+    venues = engine.identify_venues("no_heat", location, {})
+    keys = [v["venue_key"] for v in venues]
+    assert keys[0] == "eagan_code"
+    assert set(keys) == {"eagan_code", "mn_housing", "legal_aid"}
+    assert [v["venue_key"] for v in engine.identify_venues("no_heat", location, {}, limit=1)] == ["eagan_code"]
+
+
+def test_outcomes_update_scores_incrementally(engine):
+    location = LOCATIONS[0]
+    engine.track_filing_outcome("eagan_code", location, "no_heat", {"success": False})
+    engine.track_filing_outcome("mn_housing", location, "no_heat", {"success": True})
+    keys = [v["venue_key"] for v in engine.identify_venues("no_heat", location, {})]
+    assert keys[:2] == ["mn_housing", "legal_aid"]
+    assert engine._get_effectiveness_score("eagan_code", location, "no_heat") == 0.0
+
+    reloaded = ComplaintFilingEngine(data_dir=engine.data_dir)
+    assert reloaded._get_effectiveness_score("mn_housing", location, "no_heat") == 1.0
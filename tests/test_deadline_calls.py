@@ -0,0 +1,69 @@
+"""Tests for concurrent calls with per-call deadlines."""
+import threading
+import time
+
+import pytest
+
+from deadline_calls import DeadlineCalls
+
+
+def _drain(calls):
+    results = {}
+    while calls:
+        key, status, value = calls.next()
+        results[key] = (status, value)
+    return results
+
+
+def test_results_errors_and_timeouts():
+    calls = DeadlineCalls(max_workers=4)
+    calls.submit("fast", lambda: 1, timeout=1)
+    calls.submit("boom", lambda: 1 / 0, timeout=1)
+    calls.submit("hang", time.sleep, 5, timeout=0.1)
+    start = time.monotonic()
+    results = _drain(calls)
+    assert time.monotonic() - start < 1
+    assert results["fast"] == ("ok", 1)
+    assert results["boom"][0] == "error" and isinstance(results["boom"][1], ZeroDivisionError)
+    assert results["hang"] == ("timeout", None)
+    with pytest.raises(LookupError):
+        calls.next()
+
+
+def test_timed_out_call_keeps_its_slot_until_it_returns():
+    release = threading.Event()
+    calls = DeadlineCalls(max_workers=1)
+    calls.submit("hang", release.wait, timeout=0.1)
+    calls.submit("next", time.monotonic, timeout=5)
+    assert calls.next()[:2] == ("hang", "timeout")
+    assert len(calls) == 1
+    time.sleep(0.2)
+    released = time.monotonic()
+    release.set()
+    key, status, started = calls.next()
+    assert (key, status) == ("next", "ok") and started >= released
+
+
+def test_shared_slots_bound_threads_across_instances():
+    release = threading.Event()
+    slots = threading.BoundedSemaphore(2)
+    for _ in range(3):
+        calls = DeadlineCalls(name="query", slots=slots)
+        calls.submit("hung", release.wait, timeout=0.1)
+        calls.next()
+    try:
+        assert sum(t.name.startswith("query-") for t in threading.enumerate()) == 2
+    finally:
+        release.set()
+
+
+def test_deadline_counts_queue_time_and_late_results_are_dropped():
+    release = threading.Event()
+    calls = DeadlineCalls(max_workers=1)
+    calls.submit("a", release.wait, timeout=0.2)
+    calls.submit("b", lambda: "b", timeout=0.1)  # queued behind a the whole time
+    assert _drain(calls) == {"a": ("timeout", None), "b": ("timeout", None)}
+
+    release.set()  # a's late result must not be taken for the resubmitted a
+    calls.submit("a", lambda: "fresh", timeout=1)
+    assert calls.next() == ("a", "ok", "fresh")
@@ -0,0 +1,123 @@
+"""Tests for entity resolution in the intelligence engine."""
+import json
+
+import pytest
+
+from engines import intelligence_engine
+from engines.entity_resolution import EntityIndex, normalize_entity_name
+from engines.intelligence_engine import IntelligenceEngine
+
+
+def test_name_variants_resolve_to_one_entity(tmp_path):
+    engine = IntelligenceEngine(str(tmp_path))
+    engine.learn_entity("ABC Property Mgmt", "management",
+                        {"address": "1 Main St", "issues": ["mold"], "fees": [{"type": "application", "amount": 75}]})
+    engine.learn_entity("ABC Property Management LLC", "management",
+                        {"address": "1 Main St", "issues": ["mold", "harassment"],
+                         "fees": [{"type": "application", "amount": 40}]})
+    engine.learn_entity("abc property mgmt, inc.", "management",
+                        {"contact": "555-1234", "issues": ["mold"], "fees": [{"type": "application", "amount": 50}]})
+    engine.learn_entity("XYZ Realty", "landlord", {"issues": ["mold"]})
+
+    assert len(engine.knowledge_base["entities"]) == 2
+    intel = engine.get_entity_intelligence("abc property management, inc.")
+    assert intel["reports"] == 3
+    assert intel["addresses"] == ["1 Main St"]
+    assert intel["common_issues"] == ["mold", "harassment"]
+    assert intel["fees"]["application"] == {"count": 3, "min": 40.0, "max": 75.0, "average": 55.0,
+                                            "median": 50.0, "over_cap": 1}
+    assert intel["illegal_fees_detected"] == 1
+    assert "ABC Property Management LLC" in intel["also_known_as"]
+    assert not engine.get_entity_intelligence("Smith Realty")["known"]
+
+
+def test_near_identical_names_stay_separate(tmp_path):
+    engine = IntelligenceEngine(str(tmp_path))
+    engine.learn_entity("Kim Property Management Group", "management", {"issues": ["harassment"]})
+    engine.learn_entity("Kin Property Management Group", "management", {"issues": ["mold"]})
+    engine.learn_entity("Ace Residential Property Management Services", "management", {})
+    engine.learn_entity("Ape Residential Property Management Services", "management", {})
+
+    assert len(engine.knowledge_base["entities"]) == 4
+    kin = engine.get_entity_intelligence("Kin Property Management Group")
+    assert kin["reports"] == 1 and kin["common_issues"] == ["mold"]
+    assert [m["name"] for m in engine.find_entities("Kin Property Mgmt Group")] == ["Kin Property Management Group"]
+    assert engine.find_entities("Kiml Property Management Group") == []
+
+
+def test_misspellings_are_suggested_and_merged_on_request(tmp_path):
+    engine = IntelligenceEngine(str(tmp_path))
+    engine.learn_entity("Bracewell Holloway Property Management", "management", {"issues": ["mold"]})
+    engine.learn_entity("Bracewell Hollowway Property Management", "management", {"issues": ["heat"]})
+    assert len(engine.knowledge_base["entities"]) == 2
+
+    suggestions = engine.find_entities("Bracewel Holloway Property Management")
+    assert suggestions[0]["name"] == "Bracewell Holloway Property Management"
+    assert engine.merge_entities("Bracewell Holloway Property Management",
+                                 "Bracewell Hollowway Property Management") is not None
+    intel = engine.get_entity_intelligence("Bracewell Hollowway Property Management")
+    assert intel["reports"] == 2
+
+
+def test_manual_merge_and_batched_persistence(tmp_path, monkeypatch):
+    monkeypatch.setattr(intelligence_engine, "INTELLIGENCE_SAVE_EVERY", 3)
+    monkeypatch.setattr(intelligence_engine, "INTELLIGENCE_SAVE_INTERVAL", 3600)
+    engine = IntelligenceEngine(str(tmp_path))
+    engine.learn_entity("Lakeview Apartments", "landlord", {"issues": ["mold"]})
+    engine.learn_entity("Northgate Holdings", "landlord", {"issues": ["heat"]})
+    assert not (tmp_path / "knowledge_base.json").exists()
+
+    assert engine.merge_entities("Lakeview Apts", "Northgate Holdings") == "lakeview apartments"
+    saved = json.loads((tmp_path / "knowledge_base.json").read_text())
+    assert list(saved["entities"]) == ["lakeview apartments"]
+
+    reloaded = IntelligenceEngine(str(tmp_path))
+    intel = reloaded.get_entity_intelligence("northgate holdings")
+    assert intel["reports"] == 2 and sorted(intel["common_issues"]) == ["heat", "mold"]
+
+
+def test_legacy_entities_are_rekeyed_and_merged():
+    entities = {
+        "abc property mgmt": {"name": "ABC Property Mgmt", "type": "management", "first_seen": "2025-01-01",
+                              "report_count": 1, "addresses": ["1 Main St"], "contacts": [],
+                              "fees": [{"type": "application", "amount": 75}], "issues": ["mold"],
+                              "complaints": 1, "court_cases": 0,
+                              "outcomes": {"tenant_won": 0, "landlord_won": 0, "settled": 0}},
+        "abc property management llc": {"name": "ABC Property Management LLC", "type": "management",
+                                        "first_seen": "2025-02-01", "report_count": 2, "addresses": ["2 Oak Ave"],
+                                        "contacts": [], "fees": [], "issues": ["mold"], "complaints": 0,
+                                        "court_cases": 1,
+                                        "outcomes": {"tenant_won": 1, "landlord_won": 0, "settled": 0}},
+    }
+    index = EntityIndex(entities)
+    assert list(entities) == ["abc property management"]
+    merged = entities["abc property management"]
+    assert merged["report_count"] == 3 and merged["issues"]["mold"] == 2
+    assert merged["addresses"] == {"1 Main St", "2 Oak Ave"}
+    assert index.resolve("ABC PROPERTY MGMT") == "abc property management"
+
+
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")  # datetime.utcnow per new entity
+def test_fuzzy_lookup_stays_fast_at_scale():
+    import random
+    import time
+    rng = random.Random(7)
+
+    def word():
+        return "".join(rng.choice("bcdfghjklmnprstvwz") + rng.choice("aeiou") for _ in range(4)).title()
+
+    index = EntityIndex({})
+    names = [f"{word()} {word()} Property Management" for _ in range(5000)]
+    for name in names:
+        index.add(name, "management")
+    # Names that differ only in their numbers are never merged
+    index.add("Unit 5 Properties", "landlord")
+    assert index.resolve("Unit 6 Properties", fuzzy=True) is None
+
+    start = time.perf_counter()
+    for name in names[:200]:
+        first, second, *rest = name.split()
+        typo = " ".join([first, second + second[-1], *rest])
+        assert index.resolve(typo) is None
+        assert index.resolve(typo, fuzzy=True) == normalize_entity_name(name)
+    assert (time.perf_counter() - start) / 200 < 0.002
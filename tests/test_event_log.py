@@ -0,0 +1,50 @@
+"""Tests for the background event log writer."""
+import gzip
+import json
+import threading
+
+import event_log
+
+
+def test_events_are_written_in_background_and_rotated(tmp_path):
+    path = tmp_path / "logs" / "events.log"
+    writer = event_log.EventLogWriter(lambda: str(path), max_bytes=2000, backups=2)
+    for batch in range(12):
+        for i in range(10):
+            writer.emit("upload", {"n": batch * 10 + i})
+        assert writer.flush()
+
+    assert writer.stats()["events_logged_total"] == 120
+    names = {p.name for p in path.parent.iterdir()}
+    assert {"events.log.1.gz", "events.log.2.gz"} <= names <= {"events.log", "events.log.1.gz", "events.log.2.gz"}
+    newest = gzip.decompress((path.parent / "events.log.1.gz").read_bytes()).decode().splitlines()
+    older = gzip.decompress((path.parent / "events.log.2.gz").read_bytes()).decode().splitlines()
+    assert json.loads(older[-1])["details"]["n"] < json.loads(newest[0])["details"]["n"]
+    assert [e["details"]["n"] for e in writer.recent_events(3)] == [117, 118, 119]
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path):
+    gate = threading.Event()
+
+    def blocked_path():
+        gate.wait(5)
+        return str(tmp_path / "events.log")
+
+    writer = event_log.EventLogWriter(blocked_path, queue_size=2)
+    for i in range(10):
+        writer.emit("burst", {"n": i})
+    assert writer.dropped >= 7
+    assert len(writer.recent_events(0)) == 10
+    gate.set()
+    assert writer.flush()
+    written = (tmp_path / "events.log").read_text().splitlines()
+    assert len(written) == writer.stats()["events_logged_total"] == 10 - writer.dropped
+
+
+def test_write_errors_are_counted(tmp_path):
+    blocker = tmp_path / "not_a_dir"
+    blocker.write_text("")
+    writer = event_log.EventLogWriter(lambda: str(blocker / "events.log"))
+    writer.emit("x")
+    assert writer.flush()
+    assert writer.errors == 1 and writer.last_error
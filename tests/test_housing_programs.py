@@ -0,0 +1,51 @@
+"""Tests for the housing programs index, discovery cache and batch eligibility."""
+from engines.housing_programs_engine import HousingProgramsEngine
+
+LOCATION = {"city": "Minneapolis", "county": "Hennepin", "state": "MN", "zip": "55401"}
+
+
+def test_discovery_cache_normalizes_and_invalidates(tmp_path):
+    engine = HousingProgramsEngine(data_dir=str(tmp_path))
+    first = engine.discover_programs(LOCATION, categories=["legal_aid", "rent_assistance"])
+    first["federal_programs"][0]["name"] = "edited by caller"
+
+    again = engine.discover_programs(
+        {"city": "minneapolis ", "county": "HENNEPIN", "state": "mn", "zip": "55401"},
+        categories=["rent_assistance", "legal_aid"],
+    )
+    assert len(engine._discovery_cache) == 1
+    assert again["federal_programs"][0]["name"] != "edited by caller"
+
+    top = again["federal_programs"][-1]["id"]
+    engine.track_application_outcome(top, "approved")
+    assert len(engine._discovery_cache) == 0
+    reranked = engine.discover_programs(LOCATION, categories=["legal_aid", "rent_assistance"])
+    assert reranked["federal_programs"][0]["id"] == top
+
+
+def test_local_programs_keep_the_callers_spelling(tmp_path):
+    engine = HousingProgramsEngine(data_dir=str(tmp_path))
+    first = engine.discover_programs({"city": " McAllen ", "county": "DeKalb", "state": "TX"})
+    second = engine.discover_programs({"city": "O'Fallon", "county": "St. Clair", "state": "IL"})
+    assert len(engine._discovery_cache) == 1
+    assert all(p["name"].startswith("McAllen ") for p in first["city_programs"])
+    assert all(p["name"].startswith("DeKalb County ") for p in first["county_programs"])
+    assert all(p["name"].startswith("O'Fallon ") for p in second["city_programs"])
+    assert all("St. Clair County, IL" in p["lookup"] for p in second["county_programs"])
+
+
+def test_eligibility_batch_matches_single(tmp_path):
+    engine = HousingProgramsEngine(data_dir=str(tmp_path))
+    households = [
+        {"household_size": 1, "annual_income": 5000, "state": "MN"},
+        {"household_size": 3, "annual_income": 18000, "state": "MN"},
+        {"household_size": 4, "annual_income": 200000, "state": "MN"},
+    ]
+    batch = engine.evaluate_eligibility_batch(households)
+    assert batch == [
+        engine._calculate_eligibility(h["household_size"], h["annual_income"], h["state"])
+        for h in households
+    ]
+    assert "Public Housing" in batch[0]["likely_eligible_programs"]
+    assert batch[1]["likely_eligible_programs"][0] == "Section 8 (low income priority)"
+    assert batch[2]["likely_eligible_programs"] == []
@@ -0,0 +1,90 @@
+"""Tests for the compiled jurisdiction graph and memoized law resolution."""
+import json
+
+import pytest
+
+import engines.jurisdiction_engine as jurisdiction_engine
+from location_intelligence import LocationIntelligence
+
+LAWS = {
+    "federal": {
+        "fair_housing": {"statute": "FHA", "requirement": "No discrimination", "applies_to": "all"},
+        "lead": {"statute": "Lead Rule", "requirement": "Disclose lead", "applies_to": ["health_hazard"]},
+    },
+    "minnesota": {
+        "repairs": {"statute": "Minn. Stat. 504B.161", "requirement": "Keep fit",
+                    "deadline": "14 days", "category": "health_hazard"},
+        "deposit": {"statute": "Minn. Stat. 504B.178", "requirement": "Return in 21 days",
+                    "category": "payment"},
+    },
+    "minneapolis": {
+        "heat": {"statute": "Mpls Code 244", "requirement": "Restore heat",
+                 "deadline": "24 hours", "category": "health_hazard", "protective_level": 6},
+    },
+}
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    (tmp_path / "laws_database.json").write_text(json.dumps(LAWS))
+    intel = LocationIntelligence(data_dir=str(tmp_path))
+    monkeypatch.setattr(intel, "_search_laws", lambda location: {"state": {}})
+    monkeypatch.setattr(jurisdiction_engine, "get_location_intelligence", lambda: intel)
+    return jurisdiction_engine.JurisdictionEngine(data_dir=str(tmp_path))
+
+
+def test_graph_orders_by_precedence(engine):
+    laws = engine.determine_applicable_laws(
+        "health_hazard", {"city": "Minneapolis", "state": "MN", "zip": "55401"}
+    )
+    assert [law.statute for law in laws] == [
+        "Mpls Code 244", "FHA", "Lead Rule", "Minn. Stat. 504B.161"
+    ]
+    everything = engine.determine_applicable_laws("all", state="minnesota")
+    assert {law.statute for law in everything} == {"FHA", "Minn. Stat. 504B.161", "Minn. Stat. 504B.178"}
+
+
+def test_lookups_are_memoized_and_invalidated(engine):
+    location = {"city": "Minneapolis", "state": "MN", "zip": "55401"}
+    first = engine.determine_applicable_laws("payment", location)
+    assert len(engine.graph._cache) == 1
+    engine.determine_applicable_laws("payment", {"city": " Minneapolis ", "state": "MN ", "zip": "55401"})
+    assert len(engine.graph._cache) == 1
+
+    intel = engine.location_intel
+    intel._add_verified_law(intel.locations["Minneapolis_MN_55401"], {
+        "jurisdiction": "state", "category": "payment",
+        "statute": "Learned Statute", "requirement": "Learned",
+    })
+    updated = engine.determine_applicable_laws("payment", location)
+    assert [law.statute for law in updated] == ["FHA", "Learned Statute", "Minn. Stat. 504B.178"]
+    assert len(updated) == len(first) + 1
+
+
+def test_new_locations_and_other_states_keep_memoized_laws(engine):
+    location = {"city": "Minneapolis", "state": "MN", "zip": "55401"}
+    engine.determine_applicable_laws("payment", location)
+    (key, entry), = engine.graph._cache.items()
+
+    engine.determine_applicable_laws("payment", {"city": "Madison", "state": "WI", "zip": "53703"})
+    intel = engine.location_intel
+    intel._add_verified_law(intel.locations["Madison_WI_53703"], {
+        "jurisdiction": "state", "category": "payment", "statute": "Wis. Stat.", "requirement": "Learned",
+    })
+    assert intel.laws_version("wi") == 1 and intel.laws_version("Minnesota") == 0
+
+    engine.determine_applicable_laws("payment", location)
+    assert engine.graph._cache[key] is entry
+
+
+def test_procedural_requirements_use_full_location(engine):
+    result = engine.get_procedural_requirements(
+        "no_heat", {"city": "Minneapolis", "county": "Hennepin", "state": "MN", "zip": "55401"}
+    )
+    assert result["applicable_law"]["statute"] == "Mpls Code 244"
+    assert [step["step"] for step in result["procedural_steps"]] == [1, 2, 3, 4]
+    result["procedural_steps"][0]["action"] = "edited by caller"
+    again = engine.get_procedural_requirements(
+        "no_heat", {"city": "Minneapolis", "county": "Hennepin", "state": "MN", "zip": "55401"}
+    )
+    assert again["procedural_steps"][0]["action"] == "Document the issue"
@@ -0,0 +1,84 @@
+"""Tests for incrementally maintained landlord rating aggregates."""
+import json
+from datetime import datetime, timedelta
+
+from engines import adaptive_intensity_engine
+from engines.adaptive_intensity_engine import AdaptiveIntensityEngine, _apply_rating
+
+
+def test_aggregates_replay_and_leaderboard(tmp_path):
+    engine = AdaptiveIntensityEngine(str(tmp_path))
+    for rating, category in [(5, "maintenance"), (4, "maintenance"), (3, "communication")]:
+        engine.rate_landlord("acme", rating, category, county="Hennepin")
+    engine.rate_landlord("slumco", 1, "maintenance", county="hennepin")
+    engine.rate_landlord("lakeside", 5, "fairness", county="Ramsey")
+
+    acme = engine.get_landlord_profile("acme")
+    assert acme["average_rating"] == 4.0 and acme["total_ratings"] == 3
+    assert acme["category_averages"] == {"maintenance": 4.5, "communication": 3.0}
+    assert round(acme["rating_stddev"], 3) == 0.816
+    assert acme["recognition"] == "GOOD - Reliable Landlord"
+    assert "ratings" not in acme
+    assert [r["rating"] for r in engine.get_landlord_ratings("acme")] == [3, 4, 5]
+
+    assert [l["landlord_id"] for l in engine.top_landlords("HENNEPIN")] == ["acme", "slumco"]
+    assert engine.top_landlords("Hennepin", bottom=True, limit=1)[0]["landlord_id"] == "slumco"
+    assert [l["landlord_id"] for l in engine.top_landlords(min_ratings=2)] == ["acme"]
+
+    # A new rating moves the landlord in the index without a rebuild
+    engine.rate_landlord("slumco", 5, "maintenance")
+    engine.rate_landlord("slumco", 5, "maintenance")
+    assert engine.top_landlords("hennepin")[0]["landlord_id"] == "acme"
+    assert engine.get_landlord_profile("slumco")["county"] == "hennepin"
+
+    # No snapshot written yet: a fresh engine rebuilds everything from the log
+    reloaded = AdaptiveIntensityEngine(str(tmp_path))
+    assert reloaded.landlord_ratings == engine.landlord_ratings
+    assert reloaded.top_landlords("hennepin") == engine.top_landlords("hennepin")
+
+    # After a snapshot only ratings logged since it are replayed
+    engine.flush_landlord_ratings()
+    engine.rate_landlord("acme", 1, "communication")
+    reloaded = AdaptiveIntensityEngine(str(tmp_path))
+    assert reloaded.get_landlord_profile("acme")["total_ratings"] == 4
+    assert reloaded.landlord_ratings == engine.landlord_ratings
+
+
+def test_snapshot_is_periodic(tmp_path, monkeypatch):
+    monkeypatch.setattr(adaptive_intensity_engine, "LANDLORD_SNAPSHOT_EVERY", 3)
+    engine = AdaptiveIntensityEngine(str(tmp_path))
+    engine.rate_landlord("acme", 4, "maintenance")
+    engine.rate_landlord("acme", 4, "maintenance")
+    assert not (tmp_path / "landlord_ratings.json").exists()
+    engine.rate_landlord("acme", 4, "maintenance")
+    snapshot = json.loads((tmp_path / "landlord_ratings.json").read_text())
+    assert snapshot["log_offset"] == (tmp_path / "landlord_ratings.jsonl").stat().st_size
+    assert snapshot["landlords"]["acme"]["total_ratings"] == 3
+
+
+def test_decayed_rating_favours_recent_ratings():
+    landlords = {}
+    old = datetime(2025, 1, 1)
+    _apply_rating(landlords, {"landlord_id": "a", "rating": 1, "category": "maintenance",
+                              "timestamp": old.isoformat()})
+    half_life = timedelta(days=adaptive_intensity_engine.LANDLORD_RATING_HALF_LIFE_DAYS)
+    data = _apply_rating(landlords, {"landlord_id": "a", "rating": 5, "category": "maintenance",
+                                     "timestamp": (old + half_life).isoformat()})
+    assert data["average_rating"] == 3.0
+    # The older rating carries half the weight: (0.5 * 1 + 5) / 1.5
+    assert round(data["decayed_rating"], 4) == round(5.5 / 1.5, 4)
+
+
+def test_legacy_ratings_file_is_migrated(tmp_path):
+    legacy = {"acme": {"landlord_id": "acme", "average_rating": 4.5, "total_ratings": 2,
+                       "category_averages": {}, "recognition": None, "ratings": [
+                           {"rating": 4, "category": "maintenance", "comment": None,
+                            "timestamp": "2025-01-01T00:00:00", "tenant_id": None},
+                           {"rating": 5, "category": "fairness", "comment": None,
+                            "timestamp": "2025-02-01T00:00:00", "tenant_id": None}]}}
+    (tmp_path / "landlord_ratings.json").write_text(json.dumps(legacy))
+
+    engine = AdaptiveIntensityEngine(str(tmp_path))
+    assert engine.get_landlord_profile("acme")["average_rating"] == 4.5
+    assert len((tmp_path / "landlord_ratings.jsonl").read_text().splitlines()) == 2
+    assert AdaptiveIntensityEngine(str(tmp_path)).landlord_ratings == engine.landlord_ratings
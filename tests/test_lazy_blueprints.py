@@ -0,0 +1,63 @@
+"""Tests for manifest-driven lazy blueprint registration."""
+import os
+import subprocess
+import sys
+import types
+
+from flask import Blueprint, Flask, g
+
+import lazy_blueprints
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _install_module(monkeypatch, imports):
+    bp = Blueprint("widgets", __name__, url_prefix="/widgets")
+
+    @bp.before_request
+    def mark():
+        g.widget_hook = True
+
+    @bp.route("/<int:item>")
+    def show(item):
+        return {"item": item, "hook": g.get("widget_hook", False)}
+
+    module = types.ModuleType("fake_widgets")
+    module.widgets_bp = bp
+    monkeypatch.setitem(sys.modules, "fake_widgets", module)
+    real_import = lazy_blueprints._import_blueprint
+
+    def counting_import(module_name, attr):
+        imports.append(module_name)
+        return real_import(module_name, attr)
+
+    monkeypatch.setattr(lazy_blueprints, "_import_blueprint", counting_import)
+    return bp
+
+
+def test_stub_loads_blueprint_on_first_request(monkeypatch):
+    imports = []
+    bp = _install_module(monkeypatch, imports)
+    entry = {"module": "fake_widgets", "attr": "widgets_bp", **lazy_blueprints.describe_blueprint(bp)}
+    assert entry["eager"] is False
+
+    app = Flask(__name__)
+    pending = lazy_blueprints.register_blueprints(
+        app, [("fake_widgets", "widgets_bp")],
+        manifest={("fake_widgets", "widgets_bp"): entry}, lazy=True,
+    )
+    assert list(pending) == ["widgets"] and imports == []
+
+    client = app.test_client()
+    assert client.get("/widgets/3").get_json() == {"item": 3, "hook": True}
+    assert client.get("/widgets/4").get_json() == {"item": 4, "hook": True}
+    assert imports == ["fake_widgets"]
+    assert client.get("/widgets/nope").status_code == 404
+
+
+
+def test_committed_manifest_matches_blueprints():
+    script = os.path.join(ROOT, "scripts", "build_blueprint_manifest.py")
+    result = subprocess.run([sys.executable, script, "--check"], cwd=ROOT,
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stdout[-500:] + result.stderr[-500:]
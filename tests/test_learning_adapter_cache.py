@@ -0,0 +1,57 @@
+"""Tests for memoized, incrementally rebuilt learning dashboards."""
+import learning_adapter
+from learning_adapter import LearningAdapter, generate_dashboard_for_user
+
+
+def _user(**overrides):
+    data = {"location": "Minneapolis, MN", "issue_type": "rent", "stage": "HAVING_TROUBLE", "monthly_rent": 1200}
+    data.update(overrides)
+    return data
+
+
+def _count_builds(monkeypatch):
+    built = []
+    original = LearningAdapter.build_component
+    monkeypatch.setattr(LearningAdapter, "build_component",
+                        lambda self, name: built.append(name) or original(self, name))
+    return built
+
+
+def test_returning_user_reuses_snapshot_and_analysis(monkeypatch):
+    learning_adapter.clear_dashboard_cache()
+    built = _count_builds(monkeypatch)
+
+    first = generate_dashboard_for_user("cache_user", _user())
+    assert len(built) == 5
+    second = generate_dashboard_for_user("cache_user", _user())
+    assert len(built) == 5
+    assert first == second
+
+    stats = learning_adapter.dashboard_cache_stats()
+    assert stats["hits"] == 1 and stats["analysis_misses"] == 1 and stats["analysis_hits"] == 1
+    # Matches an uncached build
+    assert first["dashboard"] == LearningAdapter(_user(user_id="cache_user")).build_dashboard().to_json()
+
+
+def test_only_changed_components_rebuild(monkeypatch):
+    learning_adapter.clear_dashboard_cache()
+    built = _count_builds(monkeypatch)
+    generate_dashboard_for_user("cache_user", _user())
+    built.clear()
+
+    result = generate_dashboard_for_user("cache_user", _user(monthly_rent=1500))
+    assert built == ["timeline"]
+    timeline = result["dashboard"]["components"][4]["component"]
+    assert any(e["amount"] == "$1500" for e in timeline["content"]["timeline_items"])
+
+    built.clear()
+    generate_dashboard_for_user("cache_user", _user(stage="CONFLICT"))
+    assert "rights" not in built and {"information", "input", "timeline"} <= set(built)
+
+
+def test_invalidate_dashboard_refreshes_analysis(monkeypatch):
+    learning_adapter.clear_dashboard_cache()
+    generate_dashboard_for_user("cache_user", _user())
+    learning_adapter.invalidate_dashboard("cache_user")
+    generate_dashboard_for_user("cache_user", _user())
+    assert learning_adapter.dashboard_cache_stats()["analysis_misses"] == 2
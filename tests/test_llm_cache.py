@@ -0,0 +1,98 @@
+"""Tests for the exact and near-duplicate LLM answer cache."""
+import pytest
+
+import llm_cache
+from llm_cache import LLMCache, cached_completion_stream
+from security import get_metrics
+
+
+class FakeProvider:
+    name = "ollama"
+
+    def __init__(self):
+        self.calls = []
+
+    def available(self):
+        return None
+
+    def default_model(self):
+        return "llama3.2"
+
+    def stream(self, request, cancel):
+        self.calls.append(request["prompt"])
+        yield f"answer {len(self.calls)}"
+        yield {"eval_count": 1}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = LLMCache(str(tmp_path / "llm_cache.db"), max_entries=3)
+    llm_cache.set_llm_cache(cache)
+    yield cache
+    llm_cache.set_llm_cache(None)
+
+
+def _ask(provider, question):
+    return cached_completion_stream("copilot", prompt=f"SYSTEM\n\nUser question: {question}",
+                                    match_text=question, providers=[provider])
+
+
+def test_exact_and_near_duplicate_hits(cache):
+    provider = FakeProvider()
+    before = get_metrics()
+    first = _ask(provider, "What does a 14-day notice mean?")
+    assert first.text() == "answer 1" and first.stats.get("cached") is None
+
+    again = _ask(provider, "what does a 14 day  notice mean")
+    assert again.text() == "answer 1" and again.stats["cached"] == "exact"
+
+    paraphrase = _ask(provider, "What's a 14-day notice mean for me?")
+    assert paraphrase.text() == "answer 1" and paraphrase.stats["cached"] == "near"
+
+    # Same wording, different number: never served from the cache
+    assert _ask(provider, "What does a 30-day notice mean?").text() == "answer 2"
+    assert len(provider.calls) == 2
+
+    after = get_metrics()
+    assert after["llm_cache_hits_total"] - before.get("llm_cache_hits_total", 0) == 1
+    assert after["llm_cache_near_hits_total"] - before.get("llm_cache_near_hits_total", 0) == 1
+    assert after["llm_cache_misses_total"] - before.get("llm_cache_misses_total", 0) == 2
+
+
+def test_cancelled_streams_are_not_stored_and_lru_bounds_size(cache):
+    provider = FakeProvider()
+    stream = _ask(provider, "deposit question")
+    stream.close()
+    assert cache.stats()["entries"] == 0
+
+    for n in range(5):
+        _ask(provider, f"question number {n}").text()
+    assert cache.stats()["entries"] == 3
+    # Oldest entries were evicted
+    assert _ask(provider, "question number 0").stats.get("cached") is None
+
+
+def test_expired_entries_miss(cache):
+    provider = FakeProvider()
+    cached_completion_stream("summarize", prompt="summary", providers=[provider], ttl=-1).text()
+    assert cached_completion_stream("summarize", prompt="summary", providers=[provider]).text() == "answer 2"
+
+
+def test_non_latin_questions_get_their_own_answers(cache):
+    provider = FakeProvider()
+    assert llm_cache.normalize_prompt("¿Qué es un desalójo?") == "qué es un desalójo"
+    assert LLMCache.key("copilot", "ollama", "m", "Что такое уведомление?") != \
+        LLMCache.key("copilot", "ollama", "m", "Можно ли меня выселить?")
+
+    assert _ask(provider, "Что такое уведомление?").text() == "answer 1"
+    assert _ask(provider, "Можно ли меня выселить?").text() == "answer 2"
+    assert _ask(provider, "通知是什么意思？").text() == "answer 3"
+    assert _ask(provider, "Что такое уведомление?").stats["cached"] == "exact"
+    assert len(provider.calls) == 3
+
+
+def test_questions_without_words_skip_the_cache(cache):
+    provider = FakeProvider()
+    assert _ask(provider, "???").text() == "answer 1"
+    assert _ask(provider, "?!").text() == "answer 2"
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,161 @@
+"""Tests for the shared LLM client against a local fake Ollama server."""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from flask import Flask
+
+from llm_client import LLMError, OllamaProvider, complete, sse_response, stream_completion
+
+
+class FakeOllama:
+    """Streams NDJSON like `ollama serve`, one token per chunk."""
+
+    def __init__(self, tokens=("Hello", " tenant"), first_delay=0.0, delay=0.0, status=200):
+        self.tokens, self.first_delay, self.delay, self.status = list(tokens), first_delay, delay, status
+        self.connections = set()
+        self.requests = []
+        self.aborted = threading.Event()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _chunk(self, data: bytes):
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+
+            def do_POST(self):
+                fake.connections.add(self.client_address)
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                fake.requests.append((self.path, body))
+                if fake.status != 200:
+                    self.send_response(fake.status)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                time.sleep(fake.first_delay)
+                try:
+                    for token in fake.tokens:
+                        key = "message" if self.path == "/api/chat" else "response"
+                        value = {"role": "assistant", "content": token} if key == "message" else token
+                        self._chunk(json.dumps({key: value, "done": False}).encode() + b"\n")
+                        time.sleep(fake.delay)
+                    self._chunk(json.dumps({"done": True, "eval_count": len(fake.tokens)}).encode() + b"\n")
+                    self.wfile.write(b"0\r\n\r\n")
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    fake.aborted.set()
+                    self.close_connection = True
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def fake_ollama():
+    servers = []
+
+    def make(**kwargs):
+        server = FakeOllama(**kwargs)
+        servers.append(server)
+        return server
+
+    yield make
+    for server in servers:
+        server.close()
+
+
+def test_streams_tokens_over_pooled_connection(fake_ollama):
+    server = fake_ollama()
+    provider = OllamaProvider(server.url)
+
+    stream = stream_completion(prompt="hi", providers=[provider], models={"ollama": "llama3"})
+    assert list(stream) == ["Hello", " tenant"]
+    assert stream.provider == "ollama" and stream.model == "llama3"
+    assert stream.stats["eval_count"] == 2
+
+    result = complete(messages=[{"role": "user", "content": "hi"}], providers=[provider])
+    assert result["text"] == "Hello tenant"
+    assert server.requests[1][0] == "/api/chat" and server.requests[1][1]["stream"] is True
+    # Both calls reused one keep-alive connection
+    assert len(server.connections) == 1
+
+
+def test_close_cancels_upstream_generation(fake_ollama):
+    server = fake_ollama(tokens=["tok"] * 200, delay=0.01)
+    stream = stream_completion(prompt="hi", providers=[OllamaProvider(server.url)])
+    assert next(stream) == "tok"
+    stream.close()
+    assert stream.closed
+    assert server.aborted.wait(3)
+    # The aborted connection is not handed out again
+    server.tokens = ["again"]
+    assert complete(prompt="hi", providers=[OllamaProvider(server.url)])["text"] == "again"
+
+
+def test_hedged_fallback_prefers_first_token(fake_ollama):
+    slow = fake_ollama(tokens=["slow"], first_delay=2)
+    fast = fake_ollama(tokens=["fast"])
+    start = time.monotonic()
+    result = complete(prompt="hi", hedge_seconds=0.1,
+                      providers=[OllamaProvider(slow.url, name="primary"), OllamaProvider(fast.url)])
+    assert result["text"] == "fast" and result["provider"] == "ollama"
+    assert time.monotonic() - start < 1.5
+
+
+def test_failed_provider_hands_over_and_all_failed_raises(fake_ollama):
+    broken = fake_ollama(status=500)
+    good = fake_ollama(tokens=["ok"])
+    result = complete(prompt="hi", hedge_seconds=30,
+                      providers=[OllamaProvider(broken.url, name="primary"), OllamaProvider(good.url)])
+    assert result["text"] == "ok"
+
+    with pytest.raises(LLMError) as err:
+        complete(prompt="hi", providers=[OllamaProvider(broken.url)])
+    assert "status 500" in err.value.messages()["ollama"]
+
+
+def test_sse_response(fake_ollama, monkeypatch):
+    monkeypatch.delenv("GROQ_API_KEY", raising=False)
+    server = fake_ollama()
+    app = Flask(__name__)
+
+    @app.route("/chat")
+    def chat():
+        return sse_response(stream_completion(prompt="hi", providers=["groq", OllamaProvider(server.url)]))
+
+    resp = app.test_client().get("/chat")
+    assert resp.mimetype == "text/event-stream"
+    body = resp.get_data(as_text=True)
+    assert body.startswith('event: meta\ndata: {"provider": "ollama"')
+    assert 'data: {"token": "Hello"}\n\n' in body and "event: done" in body
+
+
+def test_sse_done_event_carries_extra_fields(fake_ollama):
+    server = fake_ollama()
+    app = Flask(__name__)
+
+    @app.route("/summary")
+    def summary():
+        stream = stream_completion(prompt="hi", providers=[OllamaProvider(server.url)])
+        return sse_response(stream, done_extra=lambda s: {"citation": f"via {s.provider}"})
+
+    body = app.test_client().get("/summary").get_data(as_text=True)
+    done = body.split("event: done\ndata: ", 1)[1]
+    assert json.loads(done)["citation"] == "via ollama"
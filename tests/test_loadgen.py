@@ -0,0 +1,64 @@
+"""Tests for the synthetic load generator."""
+import json
+import threading
+
+import pytest
+
+import loadgen
+from benchmarks import Workspace
+
+
+def test_parse_mix():
+    assert loadgen.parse_mix("issue=3, searching") == {"issue": 3, "searching": 1}
+    with pytest.raises(ValueError):
+        loadgen.parse_mix("moon_landing=1")
+    with pytest.raises(ValueError):
+        loadgen.parse_mix("issue=0")
+
+
+def test_stats_report_percentiles_and_error_rates():
+    stats = loadgen.LoadStats()
+    for ms in range(1, 101):
+        stats.record("GET /x", float(ms), 200 if ms <= 90 else 500, ms > 90)
+    stats.record_journey("issue", True)
+    stats.record_journey("issue", False, "GET /x: HTTP 500")
+    report = stats.report(elapsed=10.0)
+    row = report["endpoints"]["GET /x"]
+    assert row["requests"] == 100 and row["rps"] == 10.0
+    assert row["error_rate"] == 0.1
+    assert row["p50_ms"] == 51.0 and row["p99_ms"] == 100.0
+    assert row["statuses"] == {"200": 90, "500": 10}
+    assert report["journeys"] == {"issue": {"completed": 1, "failed": 1}}
+    assert report["failures"] == {"issue: GET /x: HTTP 500": 1}
+
+
+def test_in_process_run_completes_every_journey():
+    with Workspace(scale=0.001) as ws:
+        for name, value in loadgen.RATE_LIMIT_OVERRIDES.items():
+            ws.setenv(name, value)
+        generator = loadgen.LoadGenerator(loadgen.InProcessTransport(ws), ws,
+                                          mix={name: 1 for name in loadgen.JOURNEYS},
+                                          concurrency=3, returning_tenants=2)
+        report = generator.run(journeys=8)
+
+    assert report["journeys_completed"] == 8, report["failures"]
+    assert report["errors"] == 0
+    for endpoint in ("POST /register", "POST /vault/upload", "GET /api/learning/dashboard",
+                     "GET /api/complaint/<user_id>/packet", "GET /vault/download"):
+        assert endpoint in report["endpoints"]
+    assert report["config"]["returning_tenants"] == 2
+
+
+def test_concurrent_registrations_keep_every_user(tmp_path, monkeypatch):
+    (tmp_path / "security").mkdir()
+    monkeypatch.chdir(tmp_path)
+    from security import get_users_file, save_user_token, validate_user_token
+    tokens = []
+    threads = [threading.Thread(target=lambda: tokens.append(save_user_token())) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with open(get_users_file(), encoding="utf-8") as f:
+        assert len(json.load(f)) == 20
+    assert all(validate_user_token(token) for token in tokens)
@@ -99,3 +99,19 @@ def test_metrics_endpoint_prometheus_format_param(client):
 
     text = resp.get_data(as_text=True)
     assert 'semptify_uptime_seconds' in text
+
+
+def test_prometheus_histograms_are_labeled(client):
+    """Verify per-endpoint latency histograms and operation timings are exposed."""
+    from security import render_prometheus, timed_operation
+
+    client.get('/health')
+    with timed_operation('kdf', 'pbkdf2'):
+        pass
+
+    text = render_prometheus()
+    assert '# TYPE semptify_request_duration_seconds histogram' in text
+    assert ('semptify_request_duration_seconds_count{blueprint="app",endpoint="health",'
+            'method="GET",status="200"}') in text
+    assert 'le="+Inf"' in text
+    assert 'semptify_operation_duration_seconds_count{kind="kdf",operation="pbkdf2"}' in text
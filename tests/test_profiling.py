@@ -0,0 +1,71 @@
+"""Tests for the span tracer and sampling profiler."""
+import sqlite3
+import threading
+
+import profiling
+
+
+def test_spans_nest_inside_a_trace():
+    profiling.start_trace("unit", method="GET")
+    with profiling.span("outer"):
+        with profiling.span("inner"):
+            pass
+    conn = sqlite3.connect(":memory:", factory=profiling.TracedConnection)
+    conn.execute("SELECT 1").fetchone()
+    record = profiling.end_trace(status=200)
+
+    assert record["status"] == 200
+    assert [(s["name"], s["depth"]) for s in record["spans"]] == [
+        ("inner", 1), ("outer", 0), ("sqlite.execute", 0)
+    ]
+    assert profiling.recent_traces(1)[0] is record
+
+    # Outside a trace spans are no-ops
+    with profiling.span("ignored"):
+        pass
+    assert profiling.end_trace() is None
+
+
+def test_persistence_methods_are_traced():
+    @profiling.trace_persistence
+    class Store:
+        def _save_items(self):
+            return "saved"
+
+        @staticmethod
+        def _load_static():
+            return "static"
+
+    profiling.start_trace("unit")
+    assert Store()._save_items() == "saved"
+    assert Store._load_static() == "static"
+    record = profiling.end_trace()
+    assert [s["name"] for s in record["spans"]] == ["Store._save_items"]
+
+
+def test_sampler_emits_collapsed_stacks():
+    stop = threading.Event()
+
+    def busy_worker():
+        while not stop.is_set():
+            sum(range(1000))
+
+    worker = threading.Thread(target=busy_worker, name="busy")
+    worker.start()
+    try:
+        profiler = profiling.profile_for(0.2, hz=200)
+    finally:
+        stop.set()
+        worker.join()
+
+    assert profiler.sample_count > 0
+    lines = profiler.collapsed().splitlines()
+    assert any(line.startswith("busy;") and "busy_worker" in line for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+def test_admin_status_shows_request_traces(client, monkeypatch):
+    monkeypatch.setenv("SECURITY_MODE", "open")
+    client.get("/health")
+    data = client.get("/admin/status").get_json()
+    assert any(t["name"] == "health" and t["status"] == 200 for t in data["recent_traces"])
@@ -0,0 +1,79 @@
+"""Tests for the GCRA rate limiter backends and the route decorator."""
+from flask import Flask
+
+import rate_limit
+from security import rate_limited
+
+
+def test_memory_backend_allows_burst_then_refills():
+    backend = rate_limit.MemoryBackend()
+    results = [backend.hit("k", 3, 6, now=100.0)[0] for _ in range(4)]
+    assert results == [True, True, True, False]
+
+    allowed, retry_after = backend.hit("k", 3, 6, now=100.5)
+    assert not allowed and abs(retry_after - 1.5) < 1e-9
+    # One emission interval (2s) later a single request fits again
+    assert backend.hit("k", 3, 6, now=102.0)[0]
+    assert not backend.hit("k", 3, 6, now=102.0)[0]
+
+    backend.hit("idle", 3, 6, now=100.0)
+    backend.evict(now=105.0)
+    assert len(backend) == 1  # "idle" fully refilled and dropped; "k" still limited
+
+
+def test_sqlite_backend_state_is_shared(tmp_path):
+    path = str(tmp_path / "limits.db")
+    worker_a = rate_limit.SQLiteBackend(path)
+    worker_b = rate_limit.SQLiteBackend(path)
+    assert worker_a.hit("ip", 2, 10, now=50.0)[0]
+    assert worker_b.hit("ip", 2, 10, now=50.0)[0]
+    assert not worker_a.hit("ip", 2, 10, now=50.0)[0]
+    assert worker_b.hit("ip", 2, 10, now=55.0)[0]
+
+    worker_a.evict(now=100.0)
+    assert len(worker_b) == 0
+
+
+def test_decorator_returns_429_with_retry_after(monkeypatch):
+    monkeypatch.setattr(rate_limit, "_backend", rate_limit.MemoryBackend())
+    monkeypatch.setenv("RATE_LIMIT_UNIT_AI", "2/60")
+    app = Flask(__name__)
+
+    @app.route("/ask", methods=["POST"])
+    @rate_limited("unit_ai", 100)
+    def ask():
+        return {"ok": True}
+
+    client = app.test_client()
+    assert [client.post("/ask").status_code for _ in range(2)] == [200, 200]
+    resp = client.post("/ask")
+    assert resp.status_code == 429
+    assert resp.get_json()["error"] == "rate_limited"
+    assert int(resp.headers["Retry-After"]) == 30
+
+
+def test_decorator_keys_by_user_then_forwarded_address(monkeypatch):
+    from werkzeug.middleware.proxy_fix import ProxyFix
+
+    monkeypatch.setattr(rate_limit, "_backend", rate_limit.MemoryBackend())
+    monkeypatch.setenv("RATE_LIMIT_UNIT_AI", "1/60")
+    app = Flask(__name__)
+    app.secret_key = "test"
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1)
+
+    @app.route("/ask", methods=["POST"])
+    @rate_limited("unit_ai", 100)
+    def ask():
+        return {"ok": True}
+
+    def post(client, ip):
+        return client.post("/ask", headers={"X-Forwarded-For": ip}).status_code
+
+    anonymous = app.test_client()
+    assert [post(anonymous, "203.0.113.1"), post(anonymous, "203.0.113.2")] == [200, 200]
+    assert post(anonymous, "203.0.113.1") == 429
+
+    signed_in = app.test_client()
+    with signed_in.session_transaction() as session:
+        session["user_id"] = "u1"
+    assert [post(signed_in, "203.0.113.1"), post(signed_in, "203.0.113.1")] == [200, 429]
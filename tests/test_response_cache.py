@@ -0,0 +1,79 @@
+"""Tests for the response cache decorator, ETags and tag invalidation."""
+import pytest
+from flask import Flask, jsonify, request
+
+import response_cache
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(response_cache, "_cache", response_cache.ResponseCache(max_entries=8))
+    app = Flask(__name__)
+    calls = []
+
+    @app.route("/programs/<category>")
+    @response_cache.cached_response(ttl=60, tags=("programs",))
+    def programs(category):
+        calls.append(category)
+        if category == "missing":
+            return jsonify({"error": "not found"}), 404
+        return jsonify({"category": category, "state": request.args.get("state"), "n": len(calls)})
+
+    @app.route("/search", methods=["POST"])
+    @response_cache.cached_response(ttl=60, vary_on_body=True)
+    def search():
+        calls.append("search")
+        return jsonify({"query": request.get_json()})
+
+    app.calls = calls
+    return app
+
+
+def test_hits_etags_and_invalidation(app):
+    client = app.test_client()
+    first = client.get("/programs/rent?state=MN&zip=55401")
+    assert first.headers["X-Cache"] == "MISS" and first.headers["ETag"]
+
+    # Same arguments in a different order (and padded) share the entry
+    second = client.get("/programs/rent?zip=55401&state=MN%20")
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.get_json() == first.get_json()
+    assert app.calls == ["rent"]
+
+    not_modified = client.get("/programs/rent?state=MN&zip=55401",
+                              headers={"If-None-Match": first.headers["ETag"]})
+    assert not_modified.status_code == 304 and not_modified.data == b""
+
+    response_cache.invalidate_tags("programs")
+    fresh = client.get("/programs/rent?state=MN&zip=55401")
+    assert fresh.headers["X-Cache"] == "MISS" and fresh.get_json()["n"] == 2
+
+    # Errors are never cached
+    client.get("/programs/missing")
+    client.get("/programs/missing")
+    assert app.calls.count("missing") == 2
+
+    stats = response_cache.cache_stats()
+    assert stats["hits"] == 2 and stats["not_modified"] == 1
+    assert stats["by_route"]["programs"]["miss"] == 4
+
+
+def test_post_routes_key_on_body(app):
+    client = app.test_client()
+    client.post("/search", json={"state": "MN", "tags": ["a"]})
+    hit = client.post("/search", json={"tags": ["a"], "state": "MN"})
+    client.post("/search", json={"state": "WI"})
+    assert hit.headers["X-Cache"] == "HIT"
+    assert app.calls == ["search", "search"]
+
+
+def test_shared_sqlite_tier_and_versions(tmp_path):
+    path = str(tmp_path / "responses.db")
+    worker_a = response_cache.ResponseCache(db_path=path)
+    worker_b = response_cache.ResponseCache(db_path=path)
+    key = "k|" + worker_a.tag_versions(("laws",))
+    worker_a.set(key, (200, "application/json", "etag", b"{}", 9e12))
+    assert worker_b.get(key)[3] == b"{}"
+
+    worker_b.invalidate(["laws"])
+    assert worker_a.tag_versions(("laws",)) == "laws:1"
@@ -7,11 +7,12 @@ import pytest
 import json
 import os
 import tempfile
+import time
 from datetime import datetime
-from flask import Flask, jsonify
+from flask import Flask, jsonify, request
 
 # Import route discovery modules
-from route_discovery import RouteDiscovery, DataSourceRegistry, init_route_discovery
+from route_discovery import RouteDiscovery, DataSourceRegistry, RouteHealthScanner, init_route_discovery
 from route_discovery_bridge import IntegrationBridge, DiscoveredDataSource, LearningModuleDataSourceAdapter
 from route_discovery_routes import init_route_discovery_api, route_discovery_bp
 
@@ -408,5 +409,207 @@ class TestRouteDiscoveryIntegration:
         assert len(bridge.discovered_sources) > 0
 
 
+class TestBridgeFanOut:
+    """Concurrent, cached querying of discovered sources."""
+
+    @pytest.fixture
+    def bridge(self):
+        app = Flask(__name__)
+        calls = []
+
+        def slow(delay, name):
+            def view():
+                calls.append(name)
+                time.sleep(delay)
+                return jsonify({"source": name, "query": request.args.get("query")})
+            view.__name__ = name
+            return view
+
+        for n in range(4):
+            app.add_url_rule(f"/api/learning/procedures/{n}", view_func=slow(0.1, f"proc{n}"))
+        app.add_url_rule("/api/learning/procedures/slow", view_func=slow(1.0, "slow"))
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            bridge = IntegrationBridge(tmpdir, app.test_client())
+            for n in list(range(4)) + ["slow"]:
+                bridge.add_discovered_source({"source_id": f"proc_{n}", "name": f"Procedures {n}",
+                                              "endpoint": f"/api/learning/procedures/{n}", "method": "GET"})
+            yield bridge, calls
+
+    def test_concurrent_fan_out_with_timeout_and_cache(self, bridge):
+        bridge, calls = bridge
+        start = time.monotonic()
+        results = bridge.query_all_sources("eviction", timeout=0.5)
+        assert time.monotonic() - start < 0.8  # not the 1.4s sum
+        assert [r["source"]["source_id"] for r in results["results"]] == [f"proc_{n}" for n in range(4)]
+        assert results["results"][0]["data"] == {"source": "proc0", "query": "eviction"}
+        assert results["errors"] == [{"source_id": "proc_slow", "error": "timeout"}]
+
+        # Repeat queries are served from the TTL cache
+        calls.clear()
+        bridge.query_all_sources("eviction", timeout=0.5)
+        assert "proc0" not in calls
+        stats = bridge.get_source_statistics()
+        assert stats["proc_0"]["cache_hits"] == 1 and stats["proc_slow"]["timeouts"] >= 1
+
+    def test_queued_sources_get_their_own_timeout(self):
+        app = Flask(__name__)
+
+        @app.route("/api/learning/procedures/<int:n>")
+        def procedure(n):
+            time.sleep(0.3)
+            return jsonify({"n": n})
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            bridge = IntegrationBridge(tmpdir, app.test_client())
+            for n in range(20):
+                bridge.add_discovered_source({"source_id": f"proc_{n}", "name": f"Procedures {n}",
+                                              "endpoint": f"/api/learning/procedures/{n}", "method": "GET"})
+            results = bridge.query_all_sources("eviction", timeout=0.5)
+        assert results["errors"] == []
+        assert len(results["results"]) == 20
+
+    def test_cache_entries_expire(self, bridge):
+        bridge, calls = bridge
+        source = bridge.discovered_sources["proc_0"]
+        source.cache.ttl = 0
+        source.fetch({"query": "x"})
+        source.fetch({"query": "x"})
+        assert calls.count("proc0") == 2
+
+    def test_results_stream_as_sources_complete(self, bridge):
+        bridge, _ = bridge
+        items = list(bridge.iter_query_results("deposit", timeout=2))
+        assert items[-1]["source"]["source_id"] == "proc_slow" and "data" in items[-1]
+        adapter = LearningModuleDataSourceAdapter(bridge)
+        adapter.query_data_sources("preliminary_learning", "deposit")
+        stats = adapter.get_query_statistics()
+        assert stats["query_latency_ms"]["max"] is not None and "proc_1" in stats["source_latency"]
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
+
+
+class TestRouteHealthScanner:
+    """Concurrent route health scans and scan diffs."""
+
+    @pytest.fixture
+    def scanner(self):
+        app = Flask(__name__)
+        delays = {"fast": 0.0, "slow": 0.1, "hang": 2.0}
+        app.config["broken"] = False
+
+        def view(name):
+            def handler():
+                time.sleep(delays[name])
+                return jsonify({"route": name, "padding": "x" * 100})
+            handler.__name__ = name
+            return handler
+
+        for name in delays:
+            app.add_url_rule(f"/api/{name}", view_func=view(name))
+
+        @app.route("/api/flaky")
+        def flaky():
+            return (jsonify({"error": "down"}), 500) if app.config["broken"] else jsonify({})
+
+        @app.route("/api/item/<item_id>")
+        def item(item_id):
+            return jsonify({})
+
+        @app.route("/api/submit", methods=["POST"])
+        def submit():
+            return jsonify({})
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            yield RouteHealthScanner(app, tmpdir, workers=4, timeout=0.3, samples=2), app, delays
+
+    def test_scan_runs_concurrently_and_records_results(self, scanner):
+        scanner, _, _ = scanner
+        assert scanner.targets() == ["/api/fast", "/api/flaky", "/api/hang", "/api/slow"]
+
+        start = time.monotonic()
+        scan = scanner.get_scan(scanner.run())
+        assert time.monotonic() - start < 1.0  # hung route cut off at its deadline
+        assert scan["status"] == "finished" and scan["probed"] == 4
+
+        results = {r["path"]: r for r in scan["results"]}
+        assert results["/api/hang"]["error"] == "timeout" and not results["/api/hang"]["ok"]
+        assert results["/api/slow"]["p50_ms"] >= 100 and results["/api/slow"]["bytes"] > 100
+        assert results["/api/fast"]["ok"] and results["/api/fast"]["status"] == 200
+
+    def test_only_one_background_scan_runs_at_a_time(self, scanner):
+        scanner, _, _ = scanner
+        first = scanner.start(["/api/hang"])
+        assert scanner.start(["/api/fast"]) is None
+        assert scanner.running_scan_id == first
+
+        deadline = time.monotonic() + 5
+        while scanner.running_scan_id is not None and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert scanner.get_scan(first)["status"] == "finished"
+        assert scanner.start(["/api/fast"]) == first + 1
+
+    def test_diff_flags_regressions_and_new_failures(self, scanner):
+        scanner, app, delays = scanner
+        routes = ["/api/fast", "/api/slow", "/api/flaky"]
+        scanner.run(routes)
+        delays["fast"] = 0.15
+        app.config["broken"] = True
+        scanner.run(routes)
+
+        report = scanner.diff()
+        assert [r["path"] for r in report["regressed"]] == ["/api/fast"]
+        assert report["newly_failing"][0]["path"] == "/api/flaky"
+        assert report["newly_failing"][0]["status"] == 500
+        assert report["previous_id"] == report["scan_id"] - 1
+
+
+def test_health_scan_start_requires_admin_and_known_routes(tmp_path, monkeypatch):
+    import importlib
+    import Semptify as sempt
+    import route_discovery_routes
+    from security import _clear_rate_history
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(route_discovery_routes, "_health_scanner", None)
+    importlib.reload(sempt)
+    _clear_rate_history()
+    client = sempt.app.test_client()
+
+    monkeypatch.setenv("SECURITY_MODE", "enforced")
+    assert client.post("/api/discovery/health-scan", json={}).status_code == 401
+    monkeypatch.setenv("SECURITY_MODE", "open")
+    rejected = client.post("/api/discovery/health-scan", json={"routes": ["/health", "/vault/upload"]})
+    assert rejected.status_code == 400 and rejected.get_json()["routes"] == ["/vault/upload"]
+
+
+def test_health_scan_endpoints_through_lazy_app(tmp_path, monkeypatch):
+    """The health-scan routes are in the manifest, so the real app serves them lazily."""
+    import importlib
+    import Semptify as sempt
+    import route_discovery_routes
+
+    monkeypatch.setenv("SEMPTIFY_LAZY_BLUEPRINTS", "1")
+    monkeypatch.setenv("SECURITY_MODE", "open")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(route_discovery_routes, "_health_scanner", None)
+    importlib.reload(sempt)
+    assert not sempt.app.extensions["lazy_blueprints"]["route_discovery"].loaded
+
+    client = sempt.app.test_client()
+    started = client.post("/api/discovery/health-scan", json={"routes": ["/health"]})
+    assert started.status_code == 202
+    scan_id = started.get_json()["scan_id"]
+
+    deadline = time.monotonic() + 10
+    while True:
+        response = client.get(f"/api/discovery/health-scan?scan_id={scan_id}")
+        assert response.status_code == 200
+        scan = response.get_json()["scan"]
+        if scan["status"] == "finished" or time.monotonic() > deadline:
+            break
+        time.sleep(0.05)
+    assert scan["status"] == "finished"
+    assert scan["results"][0]["path"] == "/health" and scan["results"][0]["ok"]
@@ -0,0 +1,71 @@
+"""Tests for trie-backed smart autofill suggestions."""
+import json
+
+import smart_autofill
+from smart_autofill import PrefixIndex, SmartAutofill
+
+
+def _fresh(tmp_path, monkeypatch):
+    monkeypatch.setattr(smart_autofill, "AUTOFILL_DATA_FILE", tmp_path / "autofill.json")
+    return SmartAutofill()
+
+
+class TestPrefixIndex:
+    """Test the compressed prefix trie."""
+
+    def test_top_k_tracks_prefix_and_counts(self):
+        index = PrefixIndex(k=2)
+        index.add("Maple Ave", 1)
+        index.add("Main St", 3)
+        index.add("Market St", 2)
+        assert [v for _, v in index.top("ma")] == ["Main St", "Market St"]
+        assert [v for _, v in index.top("map")] == ["Maple Ave"]
+        index.add("Maple Ave", 5)
+        assert [v for _, v in index.top("ma")] == ["Maple Ave", "Main St"]
+        assert index.top("zz") == []
+
+    def test_word_start_keys(self):
+        index = PrefixIndex()
+        index.add("123 Main St", 1)
+        assert [v for _, v in index.top("mai")] == ["123 Main St"]
+        assert [v for _, v in index.top("st")] == ["123 Main St"]
+
+
+class TestSmartAutofill:
+    """Test suggestion ranking and batched persistence."""
+
+    def test_weighted_suggestions(self, tmp_path, monkeypatch):
+        autofill = _fresh(tmp_path, monkeypatch)
+        autofill.record_input("city", "Eagan", profile_id="p1")
+        autofill.record_input("city", "Edina", profile_id="p2")
+        autofill.record_input("city", "Edina", profile_id="p2")
+        autofill.record_input("city", "Minneapolis", profile_id="p2")
+
+        values = [s["value"] for s in autofill.get_suggestions("city", "e", profile_id="p1")]
+        assert values == ["Eagan", "Edina"]
+        values = [s["value"] for s in autofill.get_suggestions("city", "E", profile_id="p2")]
+        assert values == ["Edina", "Eagan"]
+        assert autofill.get_suggestions("city", "xyz") == []
+
+    def test_fallback_matches_index(self, tmp_path, monkeypatch):
+        autofill = _fresh(tmp_path, monkeypatch)
+        for i in range(30):
+            for _ in range(i % 4 + 1):
+                autofill.record_input("name", f"Tenant {i}")
+        indexed = autofill.get_suggestions("name", "ten", max_results=3)
+        scanned = autofill.get_suggestions("name", "ten", max_results=50)[:3]
+        assert indexed == scanned
+
+    def test_snapshots_are_batched(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(smart_autofill, "AUTOFILL_SNAPSHOT_EVERY", 1000)
+        monkeypatch.setattr(smart_autofill, "AUTOFILL_SNAPSHOT_INTERVAL", 3600)
+        autofill = _fresh(tmp_path, monkeypatch)
+        autofill.record_input("city", "Eagan")
+        assert not (tmp_path / "autofill.json").exists()
+
+        autofill.flush()
+        saved = json.loads((tmp_path / "autofill.json").read_text())
+        assert saved["fields"]["city"]["Eagan"]["count"] == 1
+
+        reloaded = SmartAutofill()
+        assert reloaded.get_suggestions("city", "ea")[0]["value"] == "Eagan"
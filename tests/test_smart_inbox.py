@@ -0,0 +1,45 @@
+"""Tests for smart inbox batch scoring and the append-only inbox log."""
+import smart_inbox
+
+
+MESSAGES = [
+    {"subject": "EVICTION NOTICE", "body": "Your tenancy will be terminated.",
+     "sender": "property_mgmt@landlord.com", "date": "2025-11-09"},
+    {"subject": "Weekend Plans", "body": "Want to grab dinner?",
+     "sender": "friend@example.com", "date": "2025-11-11"},
+    {"subject": "Re: repair", "body": "The landlord will evict us if the late fee is unpaid. Emergency!",
+     "sender": "neighbor@example.com", "date": "2025-11-12"},
+    {"subject": "", "body": None, "sender": None, "date": "2025-11-13"},
+]
+
+
+def test_batch_scores_match_reference():
+    expected = [
+        smart_inbox.score_message(m.get("subject"), m.get("body"), m.get("sender"))
+        for m in MESSAGES
+    ]
+    assert smart_inbox.score_messages_batch(MESSAGES) == expected
+    assert expected[0] > expected[2] > expected[1] == 0
+
+
+def test_streaming_scan_keeps_input_order():
+    streamed = list(smart_inbox.iter_scan_messages([dict(m) for m in MESSAGES], chunk_size=1))
+    assert [m["date"] for m in streamed] == ["2025-11-09", "2025-11-12"]
+    ranked = smart_inbox.scan_messages([dict(m) for m in MESSAGES])
+    assert ranked[0]["relevance_score"] >= ranked[1]["relevance_score"]
+
+
+def test_inbox_log_roundtrip(tmp_path):
+    data_dir = str(tmp_path)
+    ids = smart_inbox.save_many_to_inbox("u1", [dict(m) for m in MESSAGES[:2]], data_dir=data_dir)
+    assert len(ids) == 2
+    assert (tmp_path / "smart_inbox" / "u1" / smart_inbox.INBOX_LOG).exists()
+
+    assert smart_inbox.update_message_status("u1", ids[0], "saved", data_dir=data_dir)
+    assert not smart_inbox.update_message_status("u1", "missing", "saved", data_dir=data_dir)
+    saved = smart_inbox.get_inbox_messages("u1", status="saved", data_dir=data_dir)
+    assert [m["message_id"] for m in saved] == [ids[0]]
+
+    assert smart_inbox.compact_inbox("u1", data_dir=data_dir) == 2
+    assert len(smart_inbox.get_inbox_messages("u1", data_dir=data_dir)) == 2
+    assert smart_inbox.get_inbox_messages("u1", status="saved", data_dir=data_dir)[0]["status"] == "saved"
@@ -0,0 +1,73 @@
+"""Tests for the dependency-aware startup phase and /readyz."""
+import threading
+
+import pytest
+
+import startup
+
+
+@pytest.fixture
+def fresh_startup(monkeypatch):
+    monkeypatch.setattr(startup, "_tasks", {})
+    monkeypatch.setattr(startup, "_results", None)
+    monkeypatch.setattr(startup, "_done", threading.Event())
+    monkeypatch.setattr(startup, "_started_at", None)
+    monkeypatch.setattr(startup, "_finished_ms", None)
+    return startup
+
+
+def test_dependencies_order_tasks_and_failures_skip_dependents(fresh_startup):
+    order = []
+    lock = threading.Lock()
+
+    def task(name, fail=False):
+        def run():
+            with lock:
+                order.append(name)
+            if fail:
+                raise RuntimeError(f"{name} broke")
+        return run
+
+    fresh_startup.add_startup_task("db", task("db"))
+    fresh_startup.add_startup_task("cards", task("cards"), requires=["db"])
+    fresh_startup.add_startup_task("r2", task("r2", fail=True), required=False)
+    fresh_startup.add_startup_task("sync", task("sync"), requires=["r2"], required=False)
+    fresh_startup.add_startup_task("orphan", task("orphan"), requires=["missing"], required=False)
+
+    report = fresh_startup.run_startup(workers=3)
+    assert order.index("db") < order.index("cards")
+    assert "sync" not in order and "orphan" not in order
+    assert {name: r["status"] for name, r in report.items()} == {
+        "db": "ok", "cards": "ok", "r2": "failed", "sync": "skipped", "orphan": "skipped"
+    }
+    # Only optional tasks failed, so the app is ready
+    assert fresh_startup.is_ready() and fresh_startup.failed_tasks() == []
+    assert fresh_startup.readiness()["status"] == "ready"
+
+    fresh_startup.run_startup()
+    assert order.count("db") == 1
+
+
+def test_readiness_while_running_in_background(fresh_startup):
+    release = threading.Event()
+    fresh_startup.add_startup_task("slow", lambda: release.wait(5))
+    assert fresh_startup.readiness()["status"] == "starting"
+
+    thread = fresh_startup.start_startup()
+    try:
+        state = fresh_startup.readiness()
+        assert state["status"] == "starting" and state["finished"] is False
+        assert state["tasks"]["slow"]["status"] in ("pending", "running")
+    finally:
+        release.set()
+        thread.join(5)
+    state = fresh_startup.readiness()
+    assert state["status"] == "ready" and state["tasks"]["slow"]["ms"] is not None
+
+
+def test_readyz_reports_startup_tasks(client):
+    resp = client.get("/readyz")
+    data = resp.get_json()
+    assert "user_database" in data["tasks"]
+    assert data["tasks"]["cards"]["requires"] == ["user_database"]
+    assert resp.status_code == (200 if data["status"] == "ready" else 503)
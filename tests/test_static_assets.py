@@ -0,0 +1,72 @@
+"""Tests for the fingerprinted static asset build and serving."""
+import gzip
+
+from flask import Flask, render_template_string
+
+import static_assets
+
+
+def _site(tmp_path):
+    static = tmp_path / "static"
+    (static / "css").mkdir(parents=True)
+    (static / "img").mkdir()
+    (static / "js").mkdir()
+    (static / "img" / "logo.png").write_bytes(b"\x89PNG fake")
+    (static / "css" / "site.css").write_text(
+        "/* theme */\nbody {\n  color: red;\n  background: url('../img/logo.png');\n}\n" + ".x { margin: 0; }\n" * 60
+    )
+    (static / "js" / "service-worker.js").write_text("self.addEventListener('fetch', () => {});")
+    return static
+
+
+def test_build_fingerprints_minifies_and_compresses(tmp_path):
+    static = _site(tmp_path)
+    result = static_assets.build_assets(str(static))
+    assets = result["assets"]
+
+    assert "js/service-worker.js" not in assets
+    css_name = assets["css/site.css"]
+    assert css_name.startswith("dist/css/site.") and css_name.endswith(".css")
+    css = (static / css_name).read_text()
+    assert "/* theme */" not in css and "body{color: red" in css
+    # Relative url() now points at the fingerprinted image
+    logo = assets["img/logo.png"].split("/")[-1]
+    assert f"url(../img/{logo})" in css
+    assert gzip.decompress((static / (css_name + ".gz")).read_bytes()).decode() == css
+    assert static_assets.load_manifest(str(static)) == assets
+
+
+def test_fingerprinted_urls_and_immutable_precompressed_responses(tmp_path):
+    static = _site(tmp_path)
+    assets = static_assets.build_assets(str(static))["assets"]
+    app = Flask(__name__, static_folder=str(static))
+    static_assets.init_static_assets(app, fingerprint=True, dev_mode=False)
+    assert app.config["TEMPLATES_AUTO_RELOAD"] is False
+
+    with app.test_request_context():
+        html = render_template_string("{{ url_for('static', filename='css/site.css') }}")
+    assert html == "/static/" + assets["css/site.css"]
+
+    client = app.test_client()
+    resp = client.get(html, headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert resp.headers["Content-Type"].startswith("text/css")
+    assert "immutable" in resp.headers["Cache-Control"] and "max-age=31536000" in resp.headers["Cache-Control"]
+    assert "Accept-Encoding" in resp.headers["Vary"]
+
+    plain = client.get(html)
+    assert "Content-Encoding" not in plain.headers
+    assert client.get(html, headers={"If-None-Match": plain.headers["ETag"]}).status_code == 304
+
+    # Unfingerprinted files are still served as before
+    assert client.get("/static/js/service-worker.js").status_code == 200
+
+
+def test_dev_mode_keeps_plain_urls_and_reloading(tmp_path):
+    static = _site(tmp_path)
+    static_assets.build_assets(str(static))
+    app = Flask(__name__, static_folder=str(static))
+    static_assets.init_static_assets(app, fingerprint=False, dev_mode=True)
+    assert app.config["TEMPLATES_AUTO_RELOAD"] is True
+    with app.test_request_context():
+        assert render_template_string("{{ static_url('css/site.css') }}") == "/static/css/site.css"
@@ -0,0 +1,56 @@
+"""Tests for the Jinja bytecode cache and per-template render timing."""
+import time
+
+from flask import Flask, render_template
+
+import templating
+
+
+def _app(tmp_path):
+    templates = tmp_path / "templates"
+    templates.mkdir(exist_ok=True)
+    (templates / "page.html").write_text("<p>{{ items|length }}</p>")
+    (templates / "other.html").write_text("{% for i in range(3) %}{{ i }}{% endfor %}")
+    return Flask(__name__, template_folder=str(templates))
+
+
+def test_bytecode_cache_is_warmed_and_shared(tmp_path):
+    cache_dir = tmp_path / "cache"
+    app = _app(tmp_path)
+    templating.install_bytecode_cache(app, str(cache_dir))
+    assert templating.warm_templates(app) == {"compiled": 2, "failed": 0}
+    assert len(list(cache_dir.iterdir())) == 2
+
+    # A second "worker" loads bytecode instead of compiling
+    other = _app(tmp_path)
+    templating.install_bytecode_cache(other, str(cache_dir))
+    compiled = []
+    original = other.jinja_env.compile
+    other.jinja_env.compile = lambda *a, **kw: compiled.append(a) or original(*a, **kw)
+    other.jinja_env.get_template("page.html")
+    assert compiled == []
+
+
+def test_render_timing_flags_slow_context(tmp_path, monkeypatch):
+    monkeypatch.setattr(templating, "TEMPLATE_FLAG_MIN_MS", 5.0)
+    templating.reset_template_stats()
+    app = _app(tmp_path)
+    templating.install_render_timing(app)
+
+    @app.route("/slow")
+    def slow():
+        time.sleep(0.03)  # stands in for loading documents
+        return render_template("page.html", items=[1, 2])
+
+    @app.route("/fast")
+    def fast():
+        return render_template("other.html")
+
+    client = app.test_client()
+    assert client.get("/slow").data == b"<p>2</p>"
+    client.get("/fast")
+
+    report = {row["template"]: row for row in templating.template_report()}
+    assert report["page.html"]["flag"] == "context_dominates"
+    assert report["page.html"]["avg_context_ms"] >= 30
+    assert report["other.html"]["flag"] is None and report["other.html"]["count"] == 1
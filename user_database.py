@@ -8,17 +8,31 @@ import hashlib
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, Tuple
 import os
+import threading
+
+from profiling import TracedConnection
+from services.admin_stats_service import record_user_created
 
 DB_PATH = "security/users.db"
 
-def _get_db():
-    """Get database connection"""
+_init_lock = threading.Lock()
+_initialized = False
+
+
+def _connect():
     os.makedirs("security", exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, factory=TracedConnection)
     conn.row_factory = sqlite3.Row  # Return rows as dicts
     return conn
 
 
+def _get_db():
+    """Get database connection (restores and initializes the DB on first use)"""
+    if not _initialized:
+        init_user_database()
+    return _connect()
+
+
 def init_storage_users_table():
     """Initialize storage_users table for tracking qualified users"""
     conn = _get_db()
@@ -103,7 +117,7 @@ def update_storage_user_login(user_id: str):
         print(f"[ERROR] Failed to update login: {e}")
 def init_database():
     """Initialize database tables"""
-    conn = _get_db()
+    conn = _connect()
     cursor = conn.cursor()
 
     # Pending users table (for verification)
@@ -367,6 +381,7 @@ def verify_code(user_id: str, code: str) -> Tuple[bool, Optional[str]]:
 
         conn.commit()
         conn.close()
+        record_user_created()
 
         # Sync to R2 after successful verification
         _sync_to_r2_if_enabled()
@@ -555,7 +570,7 @@ def mask_contact(contact: str, method: str) -> str:
 
 def get_user_by_id(user_id: str):
     """Retrieve user record by user_id."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, factory=TracedConnection)
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     cursor.execute('SELECT * FROM users WHERE user_id = ?', (user_id,))
@@ -615,14 +630,29 @@ def get_user_situation(user_id: str) -> Optional[Dict[str, Any]]:
         'updated_at': row[8]
     }
 
-# Initialize database on import
-init_database()
+def init_user_database():
+    """
+    Restore the database from R2 (if configured), then create tables.
+    Runs once, from the startup phase or the first _get_db() call; this
+    used to happen at import time.
+    """
+    global _initialized
+    with _init_lock:
+        if _initialized:
+            return
+        try:
+            from r2_database_adapter import init_r2_database
+            init_r2_database()
+        except ImportError:
+            pass  # R2 adapter not available
+        init_database()
+        _initialized = True
 
-# Initialize R2 persistence (if configured)
+
+# R2 persistence (if configured)
 try:
-    from r2_database_adapter import init_r2_database, sync_database_to_r2
-    _r2_adapter = init_r2_database()
-    
+    from r2_database_adapter import sync_database_to_r2
+
     # Helper to sync after critical operations
     def _sync_to_r2_if_enabled():
         """Sync database to R2 after writes (non-blocking)."""
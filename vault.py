@@ -35,7 +35,8 @@ from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.primitives import hashes
 import secrets
 
-from security import get_token_from_request, validate_user_token, log_event, _atomic_write_json
+from security import get_token_from_request, validate_user_token, log_event, _atomic_write_json, timed_operation
+from profiling import traced
 
 CWD = os.getcwd()
 # Use current working directory for uploads so tests that change cwd write to the test tempdir
@@ -52,6 +53,7 @@ def _ensure_dirs(path):
     os.makedirs(path, exist_ok=True)
 
 
+@timed_operation("kdf", "pbkdf2")
 def _derive_key_from_token(user_token: str, salt: bytes) -> bytes:
     """Derive encryption key from user token using PBKDF2.
 
@@ -71,6 +73,7 @@ def _derive_key_from_token(user_token: str, salt: bytes) -> bytes:
     return kdf.derive(user_token.encode('utf-8'))
 
 
+@traced("vault.encrypt")
 def _encrypt_file(file_data: bytes, user_token: str) -> Tuple[bytes, bytes, bytes]:
     """Encrypt file data using user token.
 
@@ -103,6 +106,7 @@ def _encrypt_file(file_data: bytes, user_token: str) -> Tuple[bytes, bytes, byte
     return encrypted_data + tag, salt, nonce
 
 
+@traced("vault.decrypt")
 def _decrypt_file(encrypted_data: bytes, salt: bytes, nonce: bytes, user_token: str) -> bytes:
     """Decrypt file data using user token.
 
@@ -160,7 +164,7 @@ import uuid
 from datetime import datetime
 from werkzeug.utils import secure_filename
 
-from security import get_token_from_request, validate_user_token, log_event, _atomic_write_json
+from security import get_token_from_request, validate_user_token, log_event, _atomic_write_json, rate_limited
 
 CWD = os.getcwd()
 # Use current working directory for uploads so tests that change cwd write to the test tempdir
@@ -227,6 +231,7 @@ def _get_user_documents(user_id):
 
 
 @vault_bp.route('/vault/upload', methods=['POST'])
+@rate_limited('vault_upload', 30)
 def upload():
     token = get_token_from_request(request)
     uid = validate_user_token(token)
@@ -280,7 +285,6 @@ def upload():
     # ====================================================================
     try:
         from document_intelligence import DocumentIntelligenceEngine
-        from datetime import datetime
         import tempfile
         
         # Create temp file for analysis
@@ -308,7 +312,7 @@ def upload():
             }
             
             intel_path = os.path.join(doc_dir, "intelligence.json")
-            _write_json(intel_path, intel_data)
+            _atomic_write_json(intel_path, intel_data)
             
             # Add to certificate
             cert["intelligence"] = {
@@ -316,12 +320,12 @@ def upload():
                 "doc_type": doc_intel.doc_type,
                 "confidence": doc_intel.confidence
             }
-            _write_json(cert_path, cert)
+            _atomic_write_json(cert_path, cert)
             
     except Exception as e:
         print(f"[WARN] Intelligence processing failed: {e}")
         cert["intelligence"] = {"available": False}
-        _write_json(cert_path, cert)
+        _atomic_write_json(cert_path, cert)
 
     # Also store document mapping so user can list their documents
     _add_user_document_mapping(uid, doc_id, filename)
@@ -380,7 +384,6 @@ def vault():
     # ====================================================================
     try:
         from document_intelligence import DocumentIntelligenceEngine
-        from datetime import datetime
         import tempfile
         
         # Create temp file for analysis
@@ -408,7 +411,7 @@ def vault():
             }
             
             intel_path = os.path.join(doc_dir, "intelligence.json")
-            _write_json(intel_path, intel_data)
+            _atomic_write_json(intel_path, intel_data)
             
             # Add to certificate
             cert["intelligence"] = {
@@ -416,13 +419,13 @@ def vault():
                 "doc_type": doc_intel.doc_type,
                 "confidence": doc_intel.confidence
             }
-            _write_json(cert_path, cert)
+            _atomic_write_json(cert_path, cert)
             
     except Exception as e:
         print(f"[WARN] Intelligence processing failed: {e}")
         cert["intelligence"] = {"available": False}
-        _write_json(cert_path, cert)
-    log_event("vault.upload", user_id=uid, doc_id=filename, extra={"sha256": sha})
+        _atomic_write_json(cert_path, cert)
+    log_event("vault.upload", {"user_id": uid, "doc_id": filename, "sha256": sha})
     return jsonify({"ok": True, "filename": filename, "sha256": sha}), 200
 
 
@@ -535,7 +538,6 @@ def attest():
     # ====================================================================
     try:
         from document_intelligence import DocumentIntelligenceEngine
-        from datetime import datetime
         import tempfile
         
         # Create temp file for analysis
@@ -563,7 +565,7 @@ def attest():
             }
             
             intel_path = os.path.join(doc_dir, "intelligence.json")
-            _write_json(intel_path, intel_data)
+            _atomic_write_json(intel_path, intel_data)
             
             # Add to certificate
             cert["intelligence"] = {
@@ -571,13 +573,13 @@ def attest():
                 "doc_type": doc_intel.doc_type,
                 "confidence": doc_intel.confidence
             }
-            _write_json(cert_path, cert)
+            _atomic_write_json(cert_path, cert)
             
     except Exception as e:
         print(f"[WARN] Intelligence processing failed: {e}")
         cert["intelligence"] = {"available": False}
-        _write_json(cert_path, cert)
-    log_event("vault.attest", user_id=uid, doc_id=filename, extra={"attestation_id": att['attestation_id']})
+        _atomic_write_json(cert_path, cert)
+    log_event("vault.attest", {"user_id": uid, "doc_id": filename, "attestation_id": att['attestation_id']})
     return jsonify({"ok": True, "attestation_id": att['attestation_id'], "total_attestations": len(cert.get('attestations', []))}), 200
 
 
@@ -593,6 +595,7 @@ def notary_index():
 
 
 @vault_bp.route('/notary/upload', methods=['POST'])
+@rate_limited('notary_upload', 30)
 def notary_upload():
     token = request.form.get('user_token') or request.args.get('user_token') or request.headers.get('X-User-Token')
     uid = validate_user_token(token)
@@ -609,16 +612,16 @@ def notary_upload():
     sha = _sha256_of_file(dest)
     # write a notary certificate file
     ts = int(time.time())
-    cert_name = f"notary_{ts}_test.json"
+    request_id = str(uuid.uuid4())
+    cert_name = f"notary_{ts}_{request_id[:8]}.json"
     cert_path = os.path.join(user_dir, cert_name)
-    cert = {"filename": filename, "sha256": sha, "user_id": uid, "created": ts, "request_id": str(uuid.uuid4())}
+    cert = {"filename": filename, "sha256": sha, "user_id": uid, "created": ts, "request_id": request_id}
     _atomic_write_json(cert_path, cert)
     # ====================================================================
     # DOCUMENT INTELLIGENCE PROCESSING (Auto-extract legal details)
     # ====================================================================
     try:
         from document_intelligence import DocumentIntelligenceEngine
-        from datetime import datetime
         import tempfile
         
         # Create temp file for analysis
@@ -646,7 +649,7 @@ def notary_upload():
             }
             
             intel_path = os.path.join(doc_dir, "intelligence.json")
-            _write_json(intel_path, intel_data)
+            _atomic_write_json(intel_path, intel_data)
             
             # Add to certificate
             cert["intelligence"] = {
@@ -654,13 +657,13 @@ def notary_upload():
                 "doc_type": doc_intel.doc_type,
                 "confidence": doc_intel.confidence
             }
-            _write_json(cert_path, cert)
+            _atomic_write_json(cert_path, cert)
             
     except Exception as e:
         print(f"[WARN] Intelligence processing failed: {e}")
         cert["intelligence"] = {"available": False}
-        _write_json(cert_path, cert)
-    log_event("notary.upload", user_id=uid, doc_id=filename, extra={"cert": cert_name})
+        _atomic_write_json(cert_path, cert)
+    log_event("notary.upload", {"user_id": uid, "doc_id": filename, "cert": cert_name})
     return jsonify({"ok": True, "filename": filename, "cert": cert_name}), 200
 
 
@@ -681,17 +684,17 @@ def notary_attest_existing():
         return jsonify({"error": "not found"}), 404
     # create a new notary cert file (this increments the count expected by tests)
     ts = int(time.time())
-    cert_name = f"notary_{ts}_test.json"
+    request_id = str(uuid.uuid4())
+    cert_name = f"notary_{ts}_{request_id[:8]}.json"
     cert_path = os.path.join(user_dir, cert_name)
     sha = _sha256_of_file(orig)
-    cert = {"filename": filename, "sha256": sha, "user_id": uid, "created": ts, "request_id": str(uuid.uuid4()), "attested": True}
+    cert = {"filename": filename, "sha256": sha, "user_id": uid, "created": ts, "request_id": request_id, "attested": True}
     _atomic_write_json(cert_path, cert)
     # ====================================================================
     # DOCUMENT INTELLIGENCE PROCESSING (Auto-extract legal details)
     # ====================================================================
     try:
         from document_intelligence import DocumentIntelligenceEngine
-        from datetime import datetime
         import tempfile
         
         # Create temp file for analysis
@@ -719,7 +722,7 @@ def notary_attest_existing():
             }
             
             intel_path = os.path.join(doc_dir, "intelligence.json")
-            _write_json(intel_path, intel_data)
+            _atomic_write_json(intel_path, intel_data)
             
             # Add to certificate
             cert["intelligence"] = {
@@ -727,13 +730,13 @@ def notary_attest_existing():
                 "doc_type": doc_intel.doc_type,
                 "confidence": doc_intel.confidence
             }
-            _write_json(cert_path, cert)
+            _atomic_write_json(cert_path, cert)
             
     except Exception as e:
         print(f"[WARN] Intelligence processing failed: {e}")
         cert["intelligence"] = {"available": False}
-        _write_json(cert_path, cert)
-    log_event("notary.attest_existing", user_id=uid, doc_id=filename, extra={"cert": cert_name})
+        _atomic_write_json(cert_path, cert)
+    log_event("notary.attest_existing", {"user_id": uid, "doc_id": filename, "cert": cert_name})
     return jsonify({"ok": True, "cert": cert_name}), 200
 
 